@@ -851,6 +851,8 @@ CREATE TABLE IF NOT EXISTS devices (
 CREATE INDEX IF NOT EXISTS idx_devices_org ON devices(org_id);
 CREATE INDEX IF NOT EXISTS idx_devices_type ON devices(device_type_id);
 CREATE INDEX IF NOT EXISTS idx_devices_owner ON devices(owner_patient_id);
+-- Paginación por clave de los listados de dispositivos (serial, id)
+CREATE INDEX IF NOT EXISTS idx_devices_org_serial ON devices(org_id, serial, id);
 
 CREATE TABLE IF NOT EXISTS signal_streams (
   id             UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -864,6 +866,7 @@ CREATE TABLE IF NOT EXISTS signal_streams (
 );
 CREATE INDEX IF NOT EXISTS idx_signal_streams_patient ON signal_streams(patient_id);
 CREATE INDEX IF NOT EXISTS idx_signal_streams_device ON signal_streams(device_id);
+CREATE INDEX IF NOT EXISTS idx_signal_streams_device_started ON signal_streams(device_id, started_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_signal_streams_type ON signal_streams(signal_type_id);
 
 CREATE TABLE IF NOT EXISTS timeseries_binding (
@@ -2130,6 +2133,508 @@ CREATE TABLE IF NOT EXISTS patient_locations (
 CREATE INDEX IF NOT EXISTS idx_patient_locations_geom_gix ON patient_locations USING GIST(geom);
 CREATE INDEX IF NOT EXISTS idx_patient_locations_ts ON patient_locations(patient_id, ts DESC);
 
+-- =========================================================
+-- H.1) Estado actual del paciente (desnormalizado)
+-- =========================================================
+-- Una fila por paciente con su última ubicación, su última alerta y el número
+-- de alertas abiertas. La mantienen los triggers de patient_locations y alerts,
+-- de modo que los mapas hacen búsquedas por clave en lugar de recorrer el histórico.
+CREATE TABLE IF NOT EXISTS patient_current_state (
+  patient_id        UUID PRIMARY KEY REFERENCES patients(id) ON DELETE CASCADE,
+  location_ts       TIMESTAMP,
+  geom              geometry(Point,4326),
+  accuracy_m        NUMERIC(7,2),
+  last_alert_id     UUID REFERENCES alerts(id) ON DELETE SET NULL,
+  last_alert_at     TIMESTAMP,
+  open_alerts_count INT NOT NULL DEFAULT 0,
+  updated_at        TIMESTAMP NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_patient_current_state_geom_gix ON patient_current_state USING GIST(geom);
+CREATE INDEX IF NOT EXISTS idx_patient_current_state_location_ts ON patient_current_state(location_ts DESC);
+-- (created_at, id) es también la clave de paginación del historial de alertas
+DROP INDEX IF EXISTS idx_alerts_patient_created;
+CREATE INDEX IF NOT EXISTS idx_alerts_patient_created_id ON alerts(patient_id, created_at DESC, id DESC);
+
+CREATE OR REPLACE FUNCTION heartguard.sp_patient_state_refresh_location(p_patient_id uuid)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO patient_current_state AS s (patient_id, location_ts, geom, accuracy_m, updated_at)
+  SELECT p.id, pl.ts, pl.geom, pl.accuracy_m, NOW()
+  FROM patients p
+  LEFT JOIN LATERAL (
+    SELECT ts, geom, accuracy_m
+    FROM patient_locations
+    WHERE patient_id = p.id
+    ORDER BY ts DESC
+    LIMIT 1
+  ) pl ON TRUE
+  WHERE p.id = p_patient_id
+  ON CONFLICT (patient_id) DO UPDATE
+    SET location_ts = EXCLUDED.location_ts,
+        geom        = EXCLUDED.geom,
+        accuracy_m  = EXCLUDED.accuracy_m,
+        updated_at  = EXCLUDED.updated_at;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION heartguard.sp_patient_state_refresh_alerts(p_patient_id uuid)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  INSERT INTO patient_current_state AS s (patient_id, last_alert_id, last_alert_at, open_alerts_count, updated_at)
+  SELECT
+    p.id,
+    la.id,
+    la.created_at,
+    (
+      SELECT COUNT(*)::int
+      FROM alerts a
+      JOIN alert_status st ON st.id = a.status_id
+      WHERE a.patient_id = p.id
+        AND st.code IN ('created','notified','ack')
+    ),
+    NOW()
+  FROM patients p
+  LEFT JOIN LATERAL (
+    SELECT id, created_at
+    FROM alerts
+    WHERE patient_id = p.id
+    ORDER BY created_at DESC
+    LIMIT 1
+  ) la ON TRUE
+  WHERE p.id = p_patient_id
+  ON CONFLICT (patient_id) DO UPDATE
+    SET last_alert_id     = EXCLUDED.last_alert_id,
+        last_alert_at     = EXCLUDED.last_alert_at,
+        open_alerts_count = EXCLUDED.open_alerts_count,
+        updated_at        = EXCLUDED.updated_at;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION heartguard.trg_patient_state_location()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    -- Caso habitual: solo avanza si la lectura nueva es la más reciente
+    INSERT INTO patient_current_state AS s (patient_id, location_ts, geom, accuracy_m, updated_at)
+    VALUES (NEW.patient_id, NEW.ts, NEW.geom, NEW.accuracy_m, NOW())
+    ON CONFLICT (patient_id) DO UPDATE
+      SET location_ts = EXCLUDED.location_ts,
+          geom        = EXCLUDED.geom,
+          accuracy_m  = EXCLUDED.accuracy_m,
+          updated_at  = EXCLUDED.updated_at
+      WHERE s.location_ts IS NULL OR EXCLUDED.location_ts >= s.location_ts;
+    RETURN NULL;
+  END IF;
+
+  PERFORM heartguard.sp_patient_state_refresh_location(OLD.patient_id);
+  IF TG_OP = 'UPDATE' AND NEW.patient_id <> OLD.patient_id THEN
+    PERFORM heartguard.sp_patient_state_refresh_location(NEW.patient_id);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION heartguard.trg_patient_state_alerts()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM heartguard.sp_patient_state_refresh_alerts(NEW.patient_id);
+  END IF;
+  IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND NEW.patient_id <> OLD.patient_id) THEN
+    PERFORM heartguard.sp_patient_state_refresh_alerts(OLD.patient_id);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_patient_locations_current_state ON patient_locations;
+CREATE TRIGGER trg_patient_locations_current_state
+AFTER INSERT OR DELETE OR UPDATE OF patient_id, ts, geom, accuracy_m ON patient_locations
+FOR EACH ROW
+EXECUTE FUNCTION heartguard.trg_patient_state_location();
+
+DROP TRIGGER IF EXISTS trg_alerts_current_state ON alerts;
+CREATE TRIGGER trg_alerts_current_state
+AFTER INSERT OR DELETE OR UPDATE OF patient_id, status_id, created_at ON alerts
+FOR EACH ROW
+EXECUTE FUNCTION heartguard.trg_patient_state_alerts();
+
+-- Relleno para bases existentes (idempotente)
+SELECT heartguard.sp_patient_state_refresh_location(id), heartguard.sp_patient_state_refresh_alerts(id)
+FROM patients;
+
+-- =========================================================
+-- H.2) Feed de cambios para sincronización incremental
+-- =========================================================
+-- Cada fila modificada guarda el xid de la transacción que la cambió. El
+-- cursor de un cliente es el xmin del snapshot en que leyó: toda transacción
+-- con xid >= xmin podía estar en curso, así que se reenvía en la siguiente
+-- consulta (entrega al menos una vez, sin huecos).
+ALTER TABLE patient_current_state ADD COLUMN IF NOT EXISTS changed_xid BIGINT NOT NULL DEFAULT txid_current();
+ALTER TABLE alerts ADD COLUMN IF NOT EXISTS changed_xid BIGINT NOT NULL DEFAULT txid_current();
+CREATE INDEX IF NOT EXISTS idx_patient_current_state_changed ON patient_current_state(changed_xid);
+CREATE INDEX IF NOT EXISTS idx_alerts_changed ON alerts(changed_xid);
+
+-- Borrados y cambios de acceso (equipos y cuidadores) que no dejan fila que comparar
+CREATE TABLE IF NOT EXISTS sync_events (
+  id           BIGSERIAL PRIMARY KEY,
+  changed_xid  BIGINT NOT NULL DEFAULT txid_current(),
+  kind         VARCHAR(40) NOT NULL,
+  patient_id   UUID,
+  alert_id     UUID,
+  care_team_id UUID,
+  user_id      UUID,
+  created_at   TIMESTAMP NOT NULL DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_sync_events_changed ON sync_events(changed_xid);
+CREATE INDEX IF NOT EXISTS idx_sync_events_created ON sync_events(created_at);
+
+CREATE OR REPLACE FUNCTION heartguard.set_changed_xid()
+RETURNS TRIGGER AS $$
+BEGIN
+  NEW.changed_xid := txid_current();
+  RETURN NEW;
+END; $$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_patient_current_state_changed ON patient_current_state;
+CREATE TRIGGER trg_patient_current_state_changed
+BEFORE INSERT OR UPDATE ON patient_current_state
+FOR EACH ROW
+EXECUTE FUNCTION heartguard.set_changed_xid();
+
+DROP TRIGGER IF EXISTS trg_alerts_changed ON alerts;
+CREATE TRIGGER trg_alerts_changed
+BEFORE INSERT OR UPDATE ON alerts
+FOR EACH ROW
+EXECUTE FUNCTION heartguard.set_changed_xid();
+
+CREATE OR REPLACE FUNCTION heartguard.trg_sync_events()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_row    RECORD;
+  v_action TEXT;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    v_row := OLD;
+    v_action := 'removed';
+  ELSE
+    v_row := NEW;
+    v_action := 'added';
+  END IF;
+
+  IF TG_TABLE_NAME = 'alerts' THEN
+    INSERT INTO sync_events (kind, patient_id, alert_id)
+    VALUES ('alert_removed', v_row.patient_id, v_row.id);
+  ELSIF TG_TABLE_NAME = 'patient_care_team' THEN
+    INSERT INTO sync_events (kind, patient_id, care_team_id)
+    VALUES ('care_team_patient_' || v_action, v_row.patient_id, v_row.care_team_id);
+  ELSIF TG_TABLE_NAME = 'care_team_member' THEN
+    INSERT INTO sync_events (kind, care_team_id, user_id)
+    VALUES ('care_team_member_' || v_action, v_row.care_team_id, v_row.user_id);
+  ELSIF TG_TABLE_NAME = 'caregiver_patient' THEN
+    -- Cualquier cambio de la relación (p. ej. ended_at) obliga a reenviar al paciente
+    INSERT INTO sync_events (kind, patient_id, user_id)
+    VALUES ('caregiver_patient_' || v_action, v_row.patient_id, v_row.user_id);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_alerts_sync_events ON alerts;
+CREATE TRIGGER trg_alerts_sync_events
+AFTER DELETE ON alerts
+FOR EACH ROW
+EXECUTE FUNCTION heartguard.trg_sync_events();
+
+DROP TRIGGER IF EXISTS trg_patient_care_team_sync_events ON patient_care_team;
+CREATE TRIGGER trg_patient_care_team_sync_events
+AFTER INSERT OR DELETE ON patient_care_team
+FOR EACH ROW
+EXECUTE FUNCTION heartguard.trg_sync_events();
+
+DROP TRIGGER IF EXISTS trg_care_team_member_sync_events ON care_team_member;
+CREATE TRIGGER trg_care_team_member_sync_events
+AFTER INSERT OR DELETE ON care_team_member
+FOR EACH ROW
+EXECUTE FUNCTION heartguard.trg_sync_events();
+
+DROP TRIGGER IF EXISTS trg_caregiver_patient_sync_events ON caregiver_patient;
+CREATE TRIGGER trg_caregiver_patient_sync_events
+AFTER INSERT OR UPDATE OR DELETE ON caregiver_patient
+FOR EACH ROW
+EXECUTE FUNCTION heartguard.trg_sync_events();
+
+-- Depuración periódica; los cursores más antiguos que la retención se reinician
+CREATE OR REPLACE FUNCTION heartguard.sp_sync_events_purge(p_retention interval DEFAULT interval '7 days')
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_deleted integer;
+BEGIN
+  DELETE FROM sync_events WHERE created_at < NOW() - p_retention;
+  GET DIAGNOSTICS v_deleted = ROW_COUNT;
+  RETURN v_deleted;
+END;
+$$;
+
+-- =========================================================
+-- H.3) Contadores por equipo de cuidado (dashboard)
+-- =========================================================
+-- El dashboard de organización suma estas filas en lugar de recorrer alerts:
+-- su coste depende del número de equipos del usuario, no del histórico.
+-- Las mantienen los triggers de alerts, patient_care_team y caregiver_patient.
+-- "Abiertas" = estados created, notified y ack, igual que patient_current_state.
+CREATE TABLE IF NOT EXISTS care_team_counters (
+  care_team_id          UUID PRIMARY KEY REFERENCES care_teams(id) ON DELETE CASCADE,
+  patients              INT NOT NULL DEFAULT 0,
+  shared_patients       INT NOT NULL DEFAULT 0,  -- pacientes que también están en otro equipo
+  total_alerts          INT NOT NULL DEFAULT 0,
+  open_alerts           INT NOT NULL DEFAULT 0,
+  max_alerts_by_patient INT NOT NULL DEFAULT 0,
+  latest_alert_at       TIMESTAMP,
+  updated_at            TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+-- Alertas por día y nivel de los pacientes del equipo
+CREATE TABLE IF NOT EXISTS care_team_alert_counters (
+  care_team_id   UUID NOT NULL REFERENCES care_teams(id) ON DELETE CASCADE,
+  day            DATE NOT NULL,
+  alert_level_id UUID NOT NULL REFERENCES alert_levels(id) ON DELETE CASCADE,
+  alerts         INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (care_team_id, day, alert_level_id)
+);
+
+-- Cuidadores de los pacientes del equipo; ends_at es NULL si alguna relación
+-- sigue abierta y, si no, el último ended_at (puede estar en el futuro)
+CREATE TABLE IF NOT EXISTS care_team_caregivers (
+  care_team_id UUID NOT NULL REFERENCES care_teams(id) ON DELETE CASCADE,
+  user_id      UUID NOT NULL REFERENCES users(id)      ON DELETE CASCADE,
+  ends_at      TIMESTAMP,
+  PRIMARY KEY (care_team_id, user_id)
+);
+
+CREATE OR REPLACE FUNCTION heartguard.sp_care_team_caregiver_refresh(p_care_team_id uuid, p_user_id uuid)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  DELETE FROM care_team_caregivers WHERE care_team_id = p_care_team_id AND user_id = p_user_id;
+  INSERT INTO care_team_caregivers (care_team_id, user_id, ends_at)
+  SELECT p_care_team_id, p_user_id,
+         CASE WHEN bool_or(cp.ended_at IS NULL) THEN NULL ELSE MAX(cp.ended_at) END
+  FROM patient_care_team pct
+  JOIN caregiver_patient cp ON cp.patient_id = pct.patient_id AND cp.user_id = p_user_id
+  WHERE pct.care_team_id = p_care_team_id
+  HAVING COUNT(*) > 0;
+END;
+$$;
+
+-- Recalcula todos los contadores de un equipo a partir de las tablas base
+CREATE OR REPLACE FUNCTION heartguard.sp_care_team_counters_refresh(p_care_team_id uuid)
+RETURNS void
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM care_teams WHERE id = p_care_team_id) THEN
+    RETURN;
+  END IF;
+
+  DELETE FROM care_team_alert_counters WHERE care_team_id = p_care_team_id;
+  INSERT INTO care_team_alert_counters (care_team_id, day, alert_level_id, alerts)
+  SELECT p_care_team_id, a.created_at::date, a.alert_level_id, COUNT(*)::int
+  FROM patient_care_team pct
+  JOIN alerts a ON a.patient_id = pct.patient_id
+  WHERE pct.care_team_id = p_care_team_id
+  GROUP BY a.created_at::date, a.alert_level_id;
+
+  DELETE FROM care_team_caregivers WHERE care_team_id = p_care_team_id;
+  INSERT INTO care_team_caregivers (care_team_id, user_id, ends_at)
+  SELECT p_care_team_id, cp.user_id,
+         CASE WHEN bool_or(cp.ended_at IS NULL) THEN NULL ELSE MAX(cp.ended_at) END
+  FROM patient_care_team pct
+  JOIN caregiver_patient cp ON cp.patient_id = pct.patient_id
+  WHERE pct.care_team_id = p_care_team_id
+  GROUP BY cp.user_id;
+
+  INSERT INTO care_team_counters AS c (
+    care_team_id, patients, shared_patients, total_alerts, open_alerts,
+    max_alerts_by_patient, latest_alert_at, updated_at
+  )
+  SELECT
+    p_care_team_id,
+    COUNT(*)::int,
+    COUNT(*) FILTER (WHERE EXISTS (
+      SELECT 1 FROM patient_care_team other
+      WHERE other.patient_id = pct.patient_id AND other.care_team_id <> p_care_team_id
+    ))::int,
+    COALESCE(SUM(pa.total), 0)::int,
+    COALESCE(SUM(pa.open), 0)::int,
+    COALESCE(MAX(pa.total), 0)::int,
+    MAX(pa.latest),
+    NOW()
+  FROM patient_care_team pct
+  CROSS JOIN LATERAL (
+    SELECT
+      COUNT(*)::int AS total,
+      COUNT(*) FILTER (WHERE lower(st.code) IN ('created', 'notified', 'ack'))::int AS open,
+      MAX(a.created_at) AS latest
+    FROM alerts a
+    JOIN alert_status st ON st.id = a.status_id
+    WHERE a.patient_id = pct.patient_id
+  ) pa
+  WHERE pct.care_team_id = p_care_team_id
+  ON CONFLICT (care_team_id) DO UPDATE
+    SET patients              = EXCLUDED.patients,
+        shared_patients       = EXCLUDED.shared_patients,
+        total_alerts          = EXCLUDED.total_alerts,
+        open_alerts           = EXCLUDED.open_alerts,
+        max_alerts_by_patient = EXCLUDED.max_alerts_by_patient,
+        latest_alert_at       = EXCLUDED.latest_alert_at,
+        updated_at            = EXCLUDED.updated_at;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION heartguard.trg_care_team_counters_alerts()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_open_delta     INT;
+  v_patient_alerts INT;
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    -- Camino habitual: incrementos sobre las filas de los equipos del paciente
+    SELECT COUNT(*)::int INTO v_patient_alerts FROM alerts WHERE patient_id = NEW.patient_id;
+    SELECT COUNT(*)::int INTO v_open_delta
+    FROM alert_status WHERE id = NEW.status_id AND lower(code) IN ('created', 'notified', 'ack');
+
+    UPDATE care_team_counters c
+       SET total_alerts          = c.total_alerts + 1,
+           open_alerts           = c.open_alerts + v_open_delta,
+           max_alerts_by_patient = GREATEST(c.max_alerts_by_patient, v_patient_alerts),
+           latest_alert_at       = GREATEST(c.latest_alert_at, NEW.created_at),
+           updated_at            = NOW()
+      FROM patient_care_team pct
+     WHERE pct.patient_id = NEW.patient_id
+       AND c.care_team_id = pct.care_team_id;
+
+    INSERT INTO care_team_alert_counters AS d (care_team_id, day, alert_level_id, alerts)
+    SELECT pct.care_team_id, NEW.created_at::date, NEW.alert_level_id, 1
+    FROM patient_care_team pct
+    WHERE pct.patient_id = NEW.patient_id
+    ON CONFLICT (care_team_id, day, alert_level_id) DO UPDATE
+      SET alerts = d.alerts + 1;
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP = 'UPDATE'
+     AND NEW.patient_id = OLD.patient_id
+     AND NEW.created_at = OLD.created_at
+     AND NEW.alert_level_id = OLD.alert_level_id THEN
+    -- Cambio de estado: solo se mueve el contador de abiertas
+    SELECT
+      COUNT(*) FILTER (WHERE id = NEW.status_id)::int - COUNT(*) FILTER (WHERE id = OLD.status_id)::int
+    INTO v_open_delta
+    FROM alert_status
+    WHERE id IN (NEW.status_id, OLD.status_id) AND lower(code) IN ('created', 'notified', 'ack');
+
+    IF v_open_delta <> 0 THEN
+      UPDATE care_team_counters c
+         SET open_alerts = c.open_alerts + v_open_delta,
+             updated_at  = NOW()
+        FROM patient_care_team pct
+       WHERE pct.patient_id = NEW.patient_id
+         AND c.care_team_id = pct.care_team_id;
+    END IF;
+    RETURN NULL;
+  END IF;
+
+  -- Borrados y reasignaciones son raros (las alertas se cierran por estado):
+  -- se recalculan los equipos afectados
+  PERFORM heartguard.sp_care_team_counters_refresh(pct.care_team_id)
+  FROM patient_care_team pct
+  WHERE pct.patient_id = OLD.patient_id;
+  IF TG_OP = 'UPDATE' AND NEW.patient_id <> OLD.patient_id THEN
+    PERFORM heartguard.sp_care_team_counters_refresh(pct.care_team_id)
+    FROM patient_care_team pct
+    WHERE pct.patient_id = NEW.patient_id;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION heartguard.trg_care_team_counters_membership()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_row RECORD;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    v_row := OLD;
+    PERFORM heartguard.sp_care_team_counters_refresh(OLD.care_team_id);
+  ELSE
+    v_row := NEW;
+  END IF;
+  -- El resto de equipos del paciente cambia su número de pacientes compartidos
+  PERFORM heartguard.sp_care_team_counters_refresh(pct.care_team_id)
+  FROM patient_care_team pct
+  WHERE pct.patient_id = v_row.patient_id;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION heartguard.trg_care_team_counters_caregivers()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM heartguard.sp_care_team_caregiver_refresh(pct.care_team_id, OLD.user_id)
+    FROM patient_care_team pct
+    WHERE pct.patient_id = OLD.patient_id;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM heartguard.sp_care_team_caregiver_refresh(pct.care_team_id, NEW.user_id)
+    FROM patient_care_team pct
+    WHERE pct.patient_id = NEW.patient_id;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_alerts_care_team_counters ON alerts;
+CREATE TRIGGER trg_alerts_care_team_counters
+AFTER INSERT OR DELETE OR UPDATE OF patient_id, status_id, created_at, alert_level_id ON alerts
+FOR EACH ROW
+EXECUTE FUNCTION heartguard.trg_care_team_counters_alerts();
+
+DROP TRIGGER IF EXISTS trg_patient_care_team_counters ON patient_care_team;
+CREATE TRIGGER trg_patient_care_team_counters
+AFTER INSERT OR DELETE ON patient_care_team
+FOR EACH ROW
+EXECUTE FUNCTION heartguard.trg_care_team_counters_membership();
+
+DROP TRIGGER IF EXISTS trg_caregiver_patient_care_team_counters ON caregiver_patient;
+CREATE TRIGGER trg_caregiver_patient_care_team_counters
+AFTER INSERT OR UPDATE OR DELETE ON caregiver_patient
+FOR EACH ROW
+EXECUTE FUNCTION heartguard.trg_care_team_counters_caregivers();
+
+-- Relleno para bases existentes (idempotente)
+SELECT heartguard.sp_care_team_counters_refresh(id) FROM care_teams;
+
 -- =========================================================
 -- I) Operación
 -- =========================================================
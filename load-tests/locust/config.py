@@ -1,4 +1,5 @@
 """Configuración centralizada para las pruebas Locust."""
+import os
 from dataclasses import dataclass
 
 
@@ -6,8 +7,8 @@ from dataclasses import dataclass
 class Config:
     """Configuración del gateway y servicios."""
     
-    # Gateway base URL
-    GATEWAY_HOST = "http://129.212.181.53:8080"
+    # Gateway base URL (GATEWAY_HOST permite apuntar a otra instancia, p.ej. el modo async)
+    GATEWAY_HOST = os.getenv("GATEWAY_HOST", "http://129.212.181.53:8080")
     
     # Credenciales de prueba para autenticación
     # Usuario staff
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from flask import Flask
 from flask_cors import CORS
+from heartguard_common.tracing import init_tracing
 
 from .config import configure_app
 from .routes import register_blueprints
@@ -21,6 +22,9 @@ def create_app() -> Flask:
         }
     })
     
+    # Request, database and auth-service spans, summarized for the gateway via Server-Timing
+    init_tracing(app, "admin-service")
+
     register_blueprints(app)
     return app
 
@@ -16,6 +16,10 @@ class AppConfig:
     database_url: str
     auth_service_url: str
     service_timeout: float
+    identity_header_secret: str
+    tracing_max_traces: int
+    tracing_export_path: str
+    tracing_debug_view: bool
 
 
 class Config:
@@ -31,6 +35,10 @@ class Config:
             ),
             auth_service_url=os.getenv("AUTH_SERVICE_URL", "http://localhost:5001"),
             service_timeout=float(os.getenv("ADMIN_SERVICE_TIMEOUT", "5")),
+            identity_header_secret=os.getenv("IDENTITY_HEADER_SECRET", ""),
+            tracing_max_traces=int(os.getenv("TRACING_MAX_TRACES", "200")),
+            tracing_export_path=os.getenv("TRACING_EXPORT_PATH", ""),
+            tracing_debug_view=_to_bool(os.getenv("TRACING_DEBUG_VIEW", "0")),
         )
 
     @property
@@ -46,6 +54,10 @@ def configure_app(app: Any) -> AppConfig:
         DATABASE_URL=cfg.database_url,
         AUTH_SERVICE_URL=cfg.auth_service_url,
         ADMIN_SERVICE_TIMEOUT=cfg.service_timeout,
+        IDENTITY_HEADER_SECRET=cfg.identity_header_secret,
+        TRACING_MAX_TRACES=cfg.tracing_max_traces,
+        TRACING_EXPORT_PATH=cfg.tracing_export_path,
+        TRACING_DEBUG_VIEW=cfg.tracing_debug_view,
     )
     return cfg
 
@@ -7,12 +7,14 @@ from typing import Iterator
 import psycopg2
 import psycopg2.extras
 from flask import current_app
+from heartguard_common.tracing import span
 
 
 @contextlib.contextmanager
 def get_connection() -> Iterator[psycopg2.extensions.connection]:
     """Yield a database connection with autocommit enabled."""
-    conn = psycopg2.connect(current_app.config["DATABASE_URL"])
+    with span("postgres.connect", "db"):
+        conn = psycopg2.connect(current_app.config["DATABASE_URL"])
     conn.autocommit = False
     try:
         yield conn
@@ -27,14 +29,16 @@ def get_connection() -> Iterator[psycopg2.extensions.connection]:
 def fetch_all(query: str, params: tuple | dict | None = None) -> list[dict]:
     with get_connection() as conn:
         with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            cur.execute(query, params)
+            with span("postgres.query", "db"):
+                cur.execute(query, params)
             return [dict(row) for row in cur.fetchall()]
 
 
 def fetch_one(query: str, params: tuple | dict | None = None) -> dict | None:
     with get_connection() as conn:
         with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            cur.execute(query, params)
+            with span("postgres.query", "db"):
+                cur.execute(query, params)
             row = cur.fetchone()
             return dict(row) if row else None
 
@@ -42,4 +46,5 @@ def fetch_one(query: str, params: tuple | dict | None = None) -> dict | None:
 def execute(query: str, params: tuple | dict | None = None) -> None:
     with get_connection() as conn:
         with conn.cursor() as cur:
-            cur.execute(query, params)
+            with span("postgres.query", "db"):
+                cur.execute(query, params)
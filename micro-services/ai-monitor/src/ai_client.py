@@ -3,12 +3,24 @@ AI Service Client - Comunica con el servicio de predicción de IA
 Usa INTERNAL_SERVICE_KEY para autenticación entre microservicios
 """
 import logging
+import math
 import requests
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from . import config
 
 logger = logging.getLogger(__name__)
 
+# Columnas del formato columnar de /batch-predict (mismo orden que el modelo)
+FEATURE_COLUMNS = (
+    "gps_longitude",
+    "gps_latitude",
+    "heart_rate",
+    "spo2",
+    "systolic_bp",
+    "diastolic_bp",
+    "temperature",
+)
+
 
 class AIServiceClient:
     """Cliente para el servicio de predicción de IA"""
@@ -81,6 +93,92 @@ class AIServiceClient:
             logger.error(f"Error calling AI Service: {e}")
             return None
     
+    def predict_health_batch(self, vital_signs_list: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Envía varias lecturas en una sola llamada usando el formato columnar
+        
+        Args:
+            vital_signs_list: Lista de dicts con los signos vitales de cada paciente
+            
+        Returns:
+            Lista alineada con la entrada; cada elemento es la predicción
+            (mismo formato que predict_health) o None si la lectura no es
+            válida (incompleta, NaN o infinita) o la llamada falla
+        """
+        if not vital_signs_list:
+            return []
+        
+        predictions: List[Optional[Dict]] = [None] * len(vital_signs_list)
+        
+        # Lecturas incompletas o con NaN/inf se descartan (quedan en None) sin
+        # afectar al resto del lote; valid_indexes mapea cada fila a su posición
+        columns = {name: [] for name in FEATURE_COLUMNS}
+        valid_indexes = []
+        for index, vital_signs in enumerate(vital_signs_list):
+            try:
+                row = [
+                    float(vital_signs.get(name, 0) if name.startswith("gps_") else vital_signs[name])
+                    for name in FEATURE_COLUMNS
+                ]
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error(f"Invalid vital signs for patient {vital_signs.get('patient_id')}: {e}")
+                continue
+            if not all(math.isfinite(value) for value in row):
+                # NaN/inf no es JSON válido y el modelo no sabe tratarlo
+                logger.error(f"Non-finite vital signs for patient {vital_signs.get('patient_id')}: {row}")
+                continue
+            for name, value in zip(FEATURE_COLUMNS, row):
+                columns[name].append(value)
+            valid_indexes.append(index)
+        
+        if not valid_indexes:
+            return predictions
+        
+        try:
+            headers = {
+                "Content-Type": "application/json",
+                "X-Internal-Key": self.internal_key
+            }
+            
+            response = self.session.post(
+                f"{self.base_url}/batch-predict",
+                json={"columns": columns},
+                headers=headers,
+                timeout=30
+            )
+            
+            if response.status_code != 200:
+                logger.error(
+                    f"AI Service batch error: {response.status_code} - {response.text}"
+                )
+                return predictions
+            
+            result = response.json()
+            result_columns = result["columns"]
+            for row, index in enumerate(valid_indexes):
+                vital_signs = vital_signs_list[index]
+                predictions[index] = {
+                    "has_problem": result_columns["has_problem"][row],
+                    "probability": result_columns["probability"][row],
+                    "alerts": result_columns["alerts"][row],
+                    "processed_at": result.get("processed_at"),
+                    "model_version": result.get("model_version"),
+                    "model_id": result.get("model_id"),
+                    "timestamp": vital_signs.get("timestamp"),
+                    "patient_id": vital_signs.get("patient_id"),
+                    "gps_latitude": vital_signs.get("gps_latitude"),
+                    "gps_longitude": vital_signs.get("gps_longitude")
+                }
+            
+        except requests.exceptions.Timeout:
+            logger.error("AI Service timeout (batch)")
+        except requests.exceptions.ConnectionError:
+            logger.error(f"Cannot connect to AI Service at {self.base_url}")
+        except Exception as e:
+            logger.error(f"Error calling AI Service batch: {e}")
+        
+        return predictions
+    
     def health_check(self) -> bool:
         """
         Verifica si el servicio de IA está operativo
@@ -6,7 +6,7 @@ import logging
 import time
 import signal
 import sys
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 from datetime import datetime
 
 from . import config
@@ -164,48 +164,79 @@ class AIMonitorWorker:
         
         logger.info(f"Processing {len(active_patients)} active patients")
         
-        # Procesar en batches
+        # Procesar en batches: una llamada columnar al servicio de IA por batch
         alerts_created = 0
         patients_processed = 0
         
-        for patient_id in active_patients:
+        for start in range(0, len(active_patients), self.batch_size):
+            batch = active_patients[start:start + self.batch_size]
             try:
-                alert_created = self._process_patient(patient_id)
-                if alert_created:
-                    alerts_created += 1
-                patients_processed += 1
-                
+                created, processed = self._process_batch(batch)
+                alerts_created += created
+                patients_processed += processed
             except Exception as e:
-                logger.error(f"Error processing patient {patient_id}: {e}")
+                logger.error(f"Error processing batch starting at {start}: {e}")
         
         logger.info(
             f"Cycle completed: {patients_processed} patients processed, "
             f"{alerts_created} alerts created"
         )
     
-    def _process_patient(self, patient_id: str) -> bool:
+    def _process_batch(self, patient_ids: List[str]) -> Tuple[int, int]:
         """
-        Procesa un paciente individual
+        Procesa un batch de pacientes con una sola predicción en lote
         
         Args:
-            patient_id: UUID del paciente
+            patient_ids: UUIDs de los pacientes del batch
             
         Returns:
-            True si se creó una alerta
+            Tupla (pacientes con alerta creada, pacientes procesados)
         """
-        # Obtener signos vitales
-        vital_signs = self.influx_client.get_latest_vital_signs(
-            patient_id=patient_id,
-            lookback_minutes=self.lookback_window
+        readings = []
+        for patient_id in patient_ids:
+            try:
+                vital_signs = self.influx_client.get_latest_vital_signs(
+                    patient_id=patient_id,
+                    lookback_minutes=self.lookback_window
+                )
+            except Exception as e:
+                logger.error(f"Error reading vital signs for patient {patient_id}: {e}")
+                continue
+            
+            if not vital_signs:
+                logger.debug(f"No vital signs found for patient {patient_id}")
+                continue
+            readings.append((patient_id, vital_signs))
+        
+        if not readings:
+            return 0, len(patient_ids)
+        
+        predictions = self.ai_client.predict_health_batch(
+            [vital_signs for _, vital_signs in readings]
         )
         
-        if not vital_signs:
-            logger.debug(f"No vital signs found for patient {patient_id}")
-            return False
+        alerts_created = 0
+        for (patient_id, vital_signs), prediction in zip(readings, predictions):
+            try:
+                if self._evaluate_prediction(patient_id, vital_signs, prediction):
+                    alerts_created += 1
+            except Exception as e:
+                logger.error(f"Error processing patient {patient_id}: {e}")
         
-        # Obtener predicción del modelo de IA
-        prediction = self.ai_client.predict_health(vital_signs)
+        return alerts_created, len(patient_ids)
+    
+    def _evaluate_prediction(
+        self,
+        patient_id: str,
+        vital_signs: Dict,
+        prediction: Optional[Dict]
+    ) -> bool:
+        """
+        Evalúa una predicción y crea alertas si corresponde
         
+        Returns:
+            True si se creó una alerta
+        """
         if not prediction:
             logger.warning(f"No prediction received for patient {patient_id}")
             return False
@@ -294,7 +325,8 @@ class AIMonitorWorker:
                 timestamp=vital_signs.get("timestamp", datetime.now().isoformat()),
                 gps_latitude=vital_signs.get("gps_latitude", 0),
                 gps_longitude=vital_signs.get("gps_longitude", 0),
-                model_id=config.AI_MODEL_ID  # ✅ Pasar el model_id
+                # Preferir el UUID de la versión que hizo la predicción
+                model_id=prediction.get("model_id") or config.AI_MODEL_ID
             )
             
             if alert_id:
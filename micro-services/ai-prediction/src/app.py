@@ -2,22 +2,55 @@
 Flask Application - Servicio de Predicción de IA
 Endpoints para predicciones de salud usando RandomForest
 """
+from .startup import startup_timings
+
+import atexit
 import logging
 import sys
 from pathlib import Path
-from flask import Flask, request, jsonify
+from typing import Optional
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 
+from .batch_formats import (
+    PACKED_CONTENT_TYPE,
+    SHAPE_HEADER,
+    encode_packed_float32,
+    is_columnar_json,
+    parse_columnar_json,
+    parse_packed_float32,
+    parse_packed_shape
+)
+
 from .config import (
     FLASK_HOST,
     FLASK_PORT,
     FLASK_DEBUG,
+    MODEL_DIR,
     MODEL_PATH,
-    DEFAULT_THRESHOLD
+    MODEL_ID,
+    MODEL_BUNDLE_DIR,
+    USE_MODEL_BUNDLE,
+    DEFAULT_THRESHOLD,
+    MAX_BATCH_READINGS,
+    MAX_COLUMNAR_READINGS,
+    INFERENCE_WORKERS,
+    INFERENCE_TIMEOUT,
+    INFERENCE_START_METHOD,
+    FOREST_ARRAYS_DIR,
+    SERVER_TIMING,
+    PROFILE_SLOW_REQUESTS_MS,
+    PROFILE_SAMPLE_INTERVAL_MS,
+    PROFILE_DIR,
+    PROFILE_MAX_FILES
 )
-from .ml.model_loader import ModelLoader
+from .ml.forest_arrays import META_FILENAME
+from .ml.inference_pool import InferencePool
+from .ml.model_loader import ModelLoader, model_version_key
 from .ml.predictor import HealthPredictor
+from .metrics import histograms, init_stage_metrics, stage_timer
 from .middleware import require_auth, optional_auth
+from .profiler import SlowRequestProfiler, init_profiler
 
 # Configurar logging
 logging.basicConfig(
@@ -28,14 +61,67 @@ logging.basicConfig(
     ]
 )
 logger = logging.getLogger(__name__)
+startup_timings.mark("imports")
 
 # Crear app Flask
 app = Flask(__name__)
 CORS(app)
+init_stage_metrics(app, server_timing=SERVER_TIMING)
+
+if PROFILE_SLOW_REQUESTS_MS > 0:
+    init_profiler(app, SlowRequestProfiler(
+        threshold_ms=PROFILE_SLOW_REQUESTS_MS,
+        interval_ms=PROFILE_SAMPLE_INTERVAL_MS,
+        output_dir=PROFILE_DIR,
+        max_files=PROFILE_MAX_FILES
+    ))
 
 # Inicializar predictor
 predictor = HealthPredictor()
 model_loader = ModelLoader()
+inference_pool = None
+
+
+def _start_inference_pool():
+    """Inicia el pool de workers de inferencia (INFERENCE_WORKERS > 0)"""
+    global inference_pool
+    
+    try:
+        model_loader.enable_forest_arrays(FOREST_ARRAYS_DIR)
+        inference_pool = InferencePool(
+            model_loader.get_active_version().bundle_dir,
+            workers=INFERENCE_WORKERS,
+            timeout=INFERENCE_TIMEOUT,
+            start_method=INFERENCE_START_METHOD
+        ).start()
+        predictor.attach_pool(inference_pool)
+        atexit.register(inference_pool.shutdown)
+        logger.info(f"   - Workers de inferencia: {INFERENCE_WORKERS}")
+    except Exception as e:
+        logger.exception(f"❌ Error iniciando pool de inferencia: {e}")
+        logger.warning("⚠️  Las predicciones se evaluarán en el proceso principal")
+        inference_pool = None
+        predictor.attach_pool(None)
+
+
+def _load_bundle() -> bool:
+    """
+    Intenta activar el bundle preconvertido en build
+    
+    Returns:
+        True si el bundle quedó activo; False para caer al .pkl
+    """
+    if not USE_MODEL_BUNDLE or not (MODEL_BUNDLE_DIR / META_FILENAME).exists():
+        return False
+    
+    # Un bundle viejo (de otro .pkl) no se usa: el .pkl manda
+    expected = model_version_key(MODEL_PATH) if MODEL_PATH.exists() else None
+    try:
+        model_loader.load_bundle(MODEL_BUNDLE_DIR, model_id=MODEL_ID, expected_version=expected)
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️  Bundle {MODEL_BUNDLE_DIR} no utilizable ({e}); se cargará el .pkl")
+        return False
 
 
 def _init_model():
@@ -47,24 +133,31 @@ def _init_model():
     # Crear directorio de modelos si no existe
     MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
     
-    # Verificar si el modelo existe
-    if not MODEL_PATH.exists():
-        logger.error(f"❌ Modelo no encontrado en: {MODEL_PATH}")
-        logger.error("Por favor, copia el archivo modelo_salud_randomforest.pkl a:")
-        logger.error(f"   {MODEL_PATH.parent}")
-        logger.warning("⚠️  El servicio iniciará sin modelo cargado")
-        return
-    
-    # Cargar modelo
+    # Cargar modelo: primero el bundle mmap, luego el .pkl
     try:
-        model_loader.load_model(MODEL_PATH)
+        with startup_timings.phase("model_load"):
+            if not _load_bundle():
+                if not MODEL_PATH.exists():
+                    logger.error(f"❌ Modelo no encontrado en: {MODEL_PATH}")
+                    logger.error("Por favor, copia el archivo modelo_salud_randomforest.pkl a:")
+                    logger.error(f"   {MODEL_PATH.parent}")
+                    logger.warning("⚠️  El servicio iniciará sin modelo cargado")
+                    return
+                model_loader.load_model(MODEL_PATH, model_id=MODEL_ID)
         logger.info("✅ Modelo cargado exitosamente")
         
         info = model_loader.get_model_info()
+        startup_timings.detail("model_source", info["source"])
+        logger.info(f"   - Versión: {info['version']} (model_id={info['model_id']})")
+        logger.info(f"   - Origen: {info['source']}")
         logger.info(f"   - Estimadores: {info['n_estimators']}")
         logger.info(f"   - Features: {info['n_features']}")
         logger.info(f"   - Threshold por defecto: {DEFAULT_THRESHOLD}")
         
+        if INFERENCE_WORKERS > 0:
+            with startup_timings.phase("inference_pool"):
+                _start_inference_pool()
+        
     except Exception as e:
         logger.exception(f"❌ Error cargando modelo: {e}")
         logger.warning("⚠️  El servicio iniciará sin modelo cargado")
@@ -74,6 +167,7 @@ def _init_model():
 
 # Cargar modelo al importar el módulo
 _init_model()
+startup_timings.finish(logger)
 
 
 @app.before_request
@@ -94,17 +188,34 @@ def health_check():
         return jsonify({
             "status": "unhealthy",
             "message": "Modelo no cargado",
-            "model": model_info
+            "model": model_info,
+            "startup": startup_timings.to_dict()
         }), 503
     
     return jsonify({
         "status": "healthy",
         "message": "Servicio de IA operativo",
         "model": model_info,
+        "inference_pool": inference_pool.stats() if inference_pool else {"enabled": False},
+        "startup": startup_timings.to_dict(),
         "version": "1.0.0"
     }), 200
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """
+    Histogramas de latencia por endpoint y etapa (formato de texto Prometheus)
+    
+    Etapas: auth, parse, prepare_features, predict_proba, generate_alerts, total
+    """
+    return Response(
+        histograms.render_prometheus(),
+        status=200,
+        content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.route('/predict', methods=['POST'])
 @require_auth
 def predict():
@@ -140,7 +251,8 @@ def predict():
         }
     """
     try:
-        data = request.get_json()
+        with stage_timer("parse"):
+            data = request.get_json()
         
         if not data:
             return jsonify({
@@ -245,9 +357,31 @@ def batch_predict():
                 "avg_probability": float
             }
         }
+    
+    Formatos compactos (sin un objeto por lectura):
+    
+        Columnar JSON -> respuesta columnar (ver HealthPredictor.predict_columns)
+            {
+                "columns": {"gps_longitude": [...], ..., "temperature": [...]},
+                "timestamps": [...] (opcional),
+                "threshold": float (opcional),
+                "include_alerts": bool (opcional, default true)
+            }
+        
+        Binario: Content-Type application/octet-stream, header
+        X-Batch-Shape: <filas>,7 y cuerpo float32 little-endian fila por fila
+        (orden de API_FEATURES); threshold en ?threshold=. Responde las
+        probabilidades como float32 con X-Batch-Shape: <filas>.
     """
+    if request.mimetype == PACKED_CONTENT_TYPE:
+        return _batch_predict_packed()
+    
     try:
-        data = request.get_json()
+        with stage_timer("parse"):
+            data = request.get_json()
+        
+        if is_columnar_json(data):
+            return _batch_predict_columnar(data)
         
         if not data or "readings" not in data:
             return jsonify({
@@ -264,10 +398,10 @@ def batch_predict():
             }), 400
         
         # Límite de lecturas por request (evitar timeout)
-        if len(readings) > 1000:
+        if len(readings) > MAX_BATCH_READINGS:
             return jsonify({
                 "error": "Too many readings",
-                "message": "Máximo 1000 lecturas por request"
+                "message": f"Máximo {MAX_BATCH_READINGS} lecturas por request"
             }), 400
         
         threshold = data.get("threshold", DEFAULT_THRESHOLD)
@@ -290,6 +424,120 @@ def batch_predict():
         }), 500
 
 
+def _validate_batch(n_rows: int, threshold) -> Optional[tuple]:
+    """Valida tamaño y threshold de un lote compacto; retorna respuesta de error o None"""
+    if n_rows == 0:
+        return jsonify({
+            "error": "Invalid readings",
+            "message": "El lote debe contener al menos una lectura"
+        }), 400
+    
+    if n_rows > MAX_COLUMNAR_READINGS:
+        return jsonify({
+            "error": "Too many readings",
+            "message": f"Máximo {MAX_COLUMNAR_READINGS} lecturas por request"
+        }), 400
+    
+    if not isinstance(threshold, (int, float)) or not (0.0 <= threshold <= 1.0):
+        return jsonify({
+            "error": "Invalid threshold",
+            "message": "Threshold debe estar entre 0.0 y 1.0"
+        }), 400
+    
+    return None
+
+
+def _batch_predict_columnar(data: dict):
+    """/batch-predict con cuerpo columnar JSON"""
+    try:
+        with stage_timer("parse"):
+            features, timestamps = parse_columnar_json(data)
+    except ValueError as e:
+        return jsonify({
+            "error": "Validation error",
+            "message": str(e)
+        }), 400
+    
+    threshold = data.get("threshold", DEFAULT_THRESHOLD)
+    error = _validate_batch(len(features), threshold)
+    if error:
+        return error
+    
+    try:
+        result = predictor.predict_columns(
+            features,
+            threshold,
+            timestamps=timestamps,
+            include_alerts=bool(data.get("include_alerts", True))
+        )
+    except RuntimeError as e:
+        logger.error(f"Error de runtime: {e}")
+        return jsonify({
+            "error": "Runtime error",
+            "message": str(e)
+        }), 500
+    
+    logger.info(
+        f"Batch prediction columnar exitoso: {result['summary']['total']} lecturas, "
+        f"{result['summary']['problems_detected']} problemas detectados"
+    )
+    
+    return jsonify(result), 200
+
+
+def _batch_predict_packed():
+    """/batch-predict con cuerpo float32 empaquetado"""
+    try:
+        threshold = float(request.args.get("threshold", DEFAULT_THRESHOLD))
+        # Forma y tamaño se validan antes de leer el cuerpo
+        n_rows = parse_packed_shape(request.headers.get(SHAPE_HEADER), request.content_length)
+    except ValueError as e:
+        return jsonify({
+            "error": "Validation error",
+            "message": str(e)
+        }), 400
+    
+    error = _validate_batch(n_rows, threshold)
+    if error:
+        return error
+    
+    try:
+        with stage_timer("parse"):
+            features = parse_packed_float32(request.get_data(), n_rows)
+    except ValueError as e:
+        return jsonify({
+            "error": "Validation error",
+            "message": str(e)
+        }), 400
+    
+    try:
+        probabilities, version = predictor.predict_matrix(features)
+    except RuntimeError as e:
+        logger.error(f"Error de runtime: {e}")
+        return jsonify({
+            "error": "Runtime error",
+            "message": str(e)
+        }), 500
+    
+    problems = int((probabilities >= threshold).sum())
+    logger.info(
+        f"Batch prediction binario exitoso: {len(probabilities)} lecturas, "
+        f"{problems} problemas detectados"
+    )
+    
+    return Response(
+        encode_packed_float32(probabilities),
+        status=200,
+        mimetype=PACKED_CONTENT_TYPE,
+        headers={
+            SHAPE_HEADER: str(len(probabilities)),
+            "X-Problems-Detected": str(problems),
+            "X-Model-Version": version.version,
+            "X-Model-Id": version.model_id or ""
+        }
+    )
+
+
 @app.route('/model/info', methods=['GET'])
 @optional_auth
 def model_info():
@@ -304,26 +552,81 @@ def model_info():
 @require_auth
 def reload_model():
     """
-    Recarga el modelo desde disco
-    Útil para actualizar el modelo sin reiniciar el servicio
+    Carga una nueva versión del modelo sin interrumpir el servicio
+    
+    La versión se carga, valida y precalienta en segundo plano; solo si todo
+    sale bien reemplaza atómicamente a la versión activa.
+    
+    Request Body (opcional):
+        {
+            "filename": str (archivo .pkl dentro de models/, default: el configurado),
+            "model_id": str (UUID en la tabla models),
+            "wait": bool (esperar a que termine la recarga, default false)
+        }
     """
+    data = request.get_json(silent=True) or {}
+    
+    model_path = MODEL_PATH
+    filename = data.get("filename")
+    if filename:
+        model_path = (MODEL_DIR / filename).resolve()
+        if model_path.parent != MODEL_DIR.resolve() or model_path.suffix != ".pkl":
+            return jsonify({
+                "error": "Invalid filename",
+                "message": "El archivo debe ser un .pkl dentro del directorio de modelos"
+            }), 400
+    
+    model_id = data.get("model_id") or MODEL_ID
+    
     try:
-        model_loader.reload_model(MODEL_PATH)
-        info = model_loader.get_model_info()
-        
-        logger.info("Modelo recargado exitosamente")
-        
+        state = model_loader.reload_in_background(model_path, model_id=model_id)
+    except RuntimeError as e:
         return jsonify({
-            "message": "Modelo recargado exitosamente",
-            "model": info
-        }), 200
-        
-    except Exception as e:
-        logger.exception(f"Error recargando modelo: {e}")
+            "error": "Reload in progress",
+            "message": str(e)
+        }), 409
+    
+    if not data.get("wait"):
+        return jsonify({
+            "message": "Recarga del modelo iniciada",
+            "reload": state
+        }), 202
+    
+    state = model_loader.wait_for_reload()
+    if state.get("status") != "ready":
+        logger.error(f"Error recargando modelo: {state.get('error')}")
         return jsonify({
             "error": "Reload failed",
-            "message": str(e)
+            "message": state.get("error", "Error recargando modelo"),
+            "model": model_loader.get_model_info()
         }), 500
+    
+    logger.info("Modelo recargado exitosamente")
+    
+    return jsonify({
+        "message": "Modelo recargado exitosamente",
+        "model": model_loader.get_model_info()
+    }), 200
+
+
+@app.route('/model/rollback', methods=['POST'])
+@require_auth
+def rollback_model():
+    """
+    Reactiva la versión anterior del modelo registrada en memoria
+    """
+    try:
+        version = model_loader.rollback()
+    except RuntimeError as e:
+        return jsonify({
+            "error": "Rollback failed",
+            "message": str(e)
+        }), 409
+    
+    return jsonify({
+        "message": f"Modelo restaurado a la versión {version.version}",
+        "model": model_loader.get_model_info()
+    }), 200
 
 
 @app.errorhandler(404)
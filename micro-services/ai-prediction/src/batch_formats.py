@@ -0,0 +1,129 @@
+"""
+Formatos compactos para /batch-predict
+Columnar JSON (objeto de arreglos) y cuerpo binario float32 con header de forma
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import API_FEATURES
+
+# Cuerpo binario: float32 little-endian, fila por fila en el orden de API_FEATURES
+PACKED_CONTENT_TYPE = "application/octet-stream"
+SHAPE_HEADER = "X-Batch-Shape"
+PACKED_DTYPE = np.dtype("<f4")
+
+
+def is_columnar_json(data) -> bool:
+    """Un cuerpo JSON es columnar si trae 'columns' en lugar de 'readings'"""
+    return isinstance(data, dict) and isinstance(data.get("columns"), dict)
+
+
+def parse_columnar_json(data: Dict) -> Tuple[np.ndarray, Optional[List]]:
+    """
+    Convierte {"columns": {campo: [valores]}} en una matriz de features
+
+    Args:
+        data: Cuerpo JSON con 'columns' y opcionalmente 'timestamps'
+
+    Returns:
+        Tupla (matriz n_filas x n_features, timestamps o None)
+
+    Raises:
+        ValueError: Si faltan columnas, las longitudes no coinciden o hay valores no numéricos
+    """
+    columns = data["columns"]
+
+    missing = [name for name in API_FEATURES if name not in columns]
+    if missing:
+        raise ValueError(f"Faltan columnas requeridas: {', '.join(missing)}")
+
+    try:
+        arrays = [np.asarray(columns[name], dtype=np.float64) for name in API_FEATURES]
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"Las columnas deben contener solo números: {exc}") from exc
+
+    if any(array.ndim != 1 for array in arrays):
+        raise ValueError("Cada columna debe ser un arreglo de valores")
+
+    n_rows = len(arrays[0])
+    if any(len(array) != n_rows for array in arrays):
+        raise ValueError("Todas las columnas deben ser arreglos de la misma longitud")
+
+    timestamps = data.get("timestamps")
+    if timestamps is not None and (not isinstance(timestamps, list) or len(timestamps) != n_rows):
+        raise ValueError("'timestamps' debe tener la misma longitud que las columnas")
+
+    features = np.column_stack(arrays) if n_rows else np.empty((0, len(API_FEATURES)))
+    _ensure_finite(features)
+    return features, timestamps
+
+
+def parse_packed_shape(shape_header: Optional[str], content_length: Optional[int]) -> int:
+    """
+    Valida X-Batch-Shape contra Content-Length antes de leer el cuerpo
+
+    Args:
+        shape_header: Valor de X-Batch-Shape ("<filas>,<features>")
+        content_length: Content-Length declarado por el cliente
+
+    Returns:
+        Número de filas
+
+    Raises:
+        ValueError: Si el header es inválido o no coincide con Content-Length
+    """
+    if not shape_header:
+        raise ValueError(f"Se requiere el header {SHAPE_HEADER}: <filas>,{len(API_FEATURES)}")
+
+    try:
+        n_rows, n_features = (int(part) for part in shape_header.split(","))
+    except ValueError as exc:
+        raise ValueError(f"{SHAPE_HEADER} inválido: {shape_header}") from exc
+
+    if n_features != len(API_FEATURES) or n_rows < 0:
+        raise ValueError(f"{SHAPE_HEADER} debe ser <filas>,{len(API_FEATURES)}")
+
+    expected = n_rows * n_features * PACKED_DTYPE.itemsize
+    if content_length != expected:
+        raise ValueError(
+            f"Content-Length es {content_length}; se esperaban {expected} bytes para {shape_header}"
+        )
+    return n_rows
+
+
+def parse_packed_float32(body: bytes, n_rows: int) -> np.ndarray:
+    """
+    Interpreta un cuerpo float32 empaquetado
+
+    Args:
+        body: Bytes del request
+        n_rows: Filas validadas con parse_packed_shape
+
+    Returns:
+        Matriz n_filas x n_features (float64)
+
+    Raises:
+        ValueError: Si el cuerpo no tiene el tamaño anunciado
+    """
+    n_features = len(API_FEATURES)
+    if len(body) != n_rows * n_features * PACKED_DTYPE.itemsize:
+        raise ValueError(
+            f"El cuerpo tiene {len(body)} bytes; se esperaban "
+            f"{n_rows * n_features * PACKED_DTYPE.itemsize}"
+        )
+
+    features = np.frombuffer(body, dtype=PACKED_DTYPE).reshape(n_rows, n_features)
+    features = features.astype(np.float64)
+    _ensure_finite(features)
+    return features
+
+
+def encode_packed_float32(values: np.ndarray) -> bytes:
+    """Serializa un vector de probabilidades como float32 little-endian"""
+    return np.ascontiguousarray(values, dtype=PACKED_DTYPE).tobytes()
+
+
+def _ensure_finite(features: np.ndarray) -> None:
+    if not np.all(np.isfinite(features)):
+        raise ValueError("Las features no pueden contener NaN ni infinitos")
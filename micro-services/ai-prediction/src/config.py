@@ -13,6 +13,30 @@ LOGS_DIR = BASE_DIR / "logs"
 MODEL_FILENAME = "modelo_salud_randomforest.pkl"
 MODEL_PATH = MODEL_DIR / MODEL_FILENAME
 DEFAULT_THRESHOLD = float(os.getenv("PREDICTION_THRESHOLD", "0.6"))
+# UUID del modelo en la tabla `models` (lo usa ai-monitor para etiquetar alertas)
+MODEL_ID = os.getenv("MODEL_ID", "988e1fee-e18e-4eb9-9b9d-72ae7d48d8bc")
+# Versiones que se conservan en memoria para rollback
+MODEL_REGISTRY_SIZE = int(os.getenv("MODEL_REGISTRY_SIZE", "3"))
+
+# Pool de inferencia multi-proceso (0 = evaluar en el mismo proceso con scikit-learn)
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "0"))
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", "10"))
+INFERENCE_START_METHOD = os.getenv("INFERENCE_START_METHOD", "fork")
+# Directorio donde se exporta el bosque aplanado que los workers abren con mmap
+FOREST_ARRAYS_DIR = Path(os.getenv("FOREST_ARRAYS_DIR", str(MODEL_DIR / "forest_arrays")))
+# Bundle preconvertido en build (python -m src.ml.convert_model); si existe y
+# corresponde al .pkl, el arranque lo abre con mmap sin importar scikit-learn
+MODEL_BUNDLE_DIR = Path(os.getenv("MODEL_BUNDLE_DIR", str(MODEL_PATH.with_suffix(".bundle"))))
+# false = ignorar el bundle y deserializar siempre el .pkl
+USE_MODEL_BUNDLE = os.getenv("USE_MODEL_BUNDLE", "true").lower() == "true"
+
+# Métricas de latencia por etapa (/metrics) y header Server-Timing
+SERVER_TIMING = os.getenv("SERVER_TIMING", "true").lower() == "true"
+# Profiler por muestreo: guarda pilas de peticiones que superen este umbral (0 = apagado)
+PROFILE_SLOW_REQUESTS_MS = float(os.getenv("PROFILE_SLOW_REQUESTS_MS", "0"))
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", str(LOGS_DIR / "profiles")))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
 
 # Flask
 FLASK_HOST = os.getenv("FLASK_HOST", "0.0.0.0")
@@ -48,6 +72,19 @@ API_TO_MODEL_MAPPING = {
     "temperature": "Body Temperature (°C)"
 }
 
+# Campos de API en el orden de MODEL_FEATURES (columnas del formato compacto)
+API_FEATURES = [
+    next(api for api, model in API_TO_MODEL_MAPPING.items() if model == feature)
+    for feature in MODEL_FEATURES
+]
+
+# Límites de lecturas por request en /batch-predict
+MAX_BATCH_READINGS = int(os.getenv("MAX_BATCH_READINGS", "1000"))
+MAX_COLUMNAR_READINGS = int(os.getenv("MAX_COLUMNAR_READINGS", "10000"))
+
+# Lectura típica usada para precalentar y validar un modelo antes de activarlo
+WARMUP_SAMPLE = [-99.1332, 19.4326, 75.0, 98.0, 120.0, 80.0, 36.7]
+
 # Niveles de severidad basados en probabilidad
 SEVERITY_LEVELS = {
     "low": (0.0, 0.3),      # 0-30% probabilidad de problema
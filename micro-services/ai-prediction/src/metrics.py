@@ -0,0 +1,126 @@
+"""
+Métricas de latencia por etapa
+Cronómetros por petición (auth, parseo, features, bosque, alertas), header
+Server-Timing e histogramas agregados en formato Prometheus para /metrics
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+from flask import Flask, g, has_request_context, request
+
+# Límites superiores (ms) de los buckets del histograma
+STAGE_BUCKETS_MS = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+@contextmanager
+def stage_timer(stage: str) -> Iterator[None]:
+    """
+    Mide un bloque como etapa de la petición actual
+
+    Si la etapa se repite en la misma petición (p.ej. alertas de un lote) los
+    tiempos se suman. Fuera de una petición (hilos de recarga, warm-up) no
+    registra nada.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if has_request_context():
+            stages = g.setdefault("stage_timings", {})
+            stages[stage] = stages.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def request_stages() -> Dict[str, float]:
+    """Etapas (ms) registradas en la petición actual"""
+    return g.get("stage_timings", {})
+
+
+class StageHistograms:
+    """Histogramas acumulados por (endpoint, etapa), seguros entre hilos"""
+
+    def __init__(self, buckets: Tuple[float, ...] = STAGE_BUCKETS_MS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # (endpoint, etapa) -> [conteo por bucket..., +Inf, suma, total]
+        self._series: Dict[Tuple[str, str], List[float]] = {}
+        self._requests: Dict[Tuple[str, int], int] = {}
+
+    def observe(self, endpoint: str, stages: Dict[str, float], status: int) -> None:
+        with self._lock:
+            for stage, value in stages.items():
+                series = self._series.get((endpoint, stage))
+                if series is None:
+                    series = self._series[(endpoint, stage)] = [0] * (len(self.buckets) + 3)
+                series[bisect_left(self.buckets, value)] += 1
+                series[-2] += value
+                series[-1] += 1
+            key = (endpoint, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+    def render_prometheus(self) -> str:
+        """Exposición en formato de texto de Prometheus"""
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+            requests_total = dict(self._requests)
+
+        lines = [
+            "# HELP ai_prediction_requests_total Peticiones atendidas por endpoint y status",
+            "# TYPE ai_prediction_requests_total counter",
+        ]
+        for (endpoint, status), count in sorted(requests_total.items()):
+            lines.append(f'ai_prediction_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP ai_prediction_stage_duration_ms Duración de cada etapa de la petición",
+            "# TYPE ai_prediction_stage_duration_ms histogram",
+        ]
+        for (endpoint, stage), values in sorted(series.items()):
+            labels = f'endpoint="{endpoint}",stage="{stage}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f'ai_prediction_stage_duration_ms_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += values[len(self.buckets)]
+            lines.append(f'ai_prediction_stage_duration_ms_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f"ai_prediction_stage_duration_ms_sum{{{labels}}} {values[-2]:.3f}")
+            lines.append(f"ai_prediction_stage_duration_ms_count{{{labels}}} {values[-1]}")
+
+        return "\n".join(lines) + "\n"
+
+
+histograms = StageHistograms()
+
+
+def init_stage_metrics(app: Flask, server_timing: bool = True) -> None:
+    """
+    Registra los hooks que cronometran cada petición
+
+    Args:
+        app: Aplicación Flask
+        server_timing: Si True agrega el header Server-Timing a las respuestas
+    """
+
+    @app.before_request
+    def _start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request_timings(response):
+        started = g.get("request_started")
+        if started is None:
+            return response
+
+        stages = dict(request_stages())
+        stages["total"] = (time.perf_counter() - started) * 1000
+        g.request_total_ms = stages["total"]
+
+        histograms.observe(request.endpoint or "unknown", stages, response.status_code)
+
+        if server_timing:
+            response.headers["Server-Timing"] = ", ".join(
+                f"{stage};dur={value:.2f}" for stage, value in stages.items()
+            )
+        return response
@@ -8,6 +8,7 @@ from flask import request, jsonify
 from typing import Callable
 
 from .config import JWT_SECRET, JWT_ALGORITHM, INTERNAL_SERVICE_KEY
+from .metrics import stage_timer
 
 logger = logging.getLogger(__name__)
 
@@ -21,70 +22,85 @@ def require_auth(f: Callable) -> Callable:
     """
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        # Verificar si es una llamada de servicio interno
-        internal_key = request.headers.get('X-Internal-Key')
-        if internal_key:
-            if internal_key == INTERNAL_SERVICE_KEY:
-                logger.info("Autenticación de servicio interno exitosa")
-                request.jwt_payload = {"sub": "internal-service", "is_internal": True}
-                return f(*args, **kwargs)
-            else:
-                logger.warning("Internal service key inválida")
-                return jsonify({
-                    "error": "Invalid internal key",
-                    "message": "Clave de servicio interno inválida"
-                }), 401
+        with stage_timer("auth"):
+            error = _authenticate()
+        if error is not None:
+            return error
         
-        # Obtener token del header
-        auth_header = request.headers.get('Authorization')
-        
-        if not auth_header:
-            logger.warning("Request sin header Authorization ni X-Internal-Key")
-            return jsonify({
-                "error": "No authorization header",
-                "message": "Se requiere token de autenticación o clave de servicio"
-            }), 401
-        
-        # Validar formato "Bearer <token>"
-        parts = auth_header.split()
-        if len(parts) != 2 or parts[0].lower() != 'bearer':
-            logger.warning(f"Formato de Authorization inválido: {auth_header}")
+        return f(*args, **kwargs)
+    
+    return decorated_function
+
+
+def _authenticate():
+    """
+    Valida X-Internal-Key o el JWT del header Authorization
+    
+    Returns:
+        None si la petición está autenticada, o la respuesta de error (401)
+    """
+    # Verificar si es una llamada de servicio interno
+    internal_key = request.headers.get('X-Internal-Key')
+    if internal_key:
+        if internal_key == INTERNAL_SERVICE_KEY:
+            logger.info("Autenticación de servicio interno exitosa")
+            request.jwt_payload = {"sub": "internal-service", "is_internal": True}
+            return None
+        else:
+            logger.warning("Internal service key inválida")
             return jsonify({
-                "error": "Invalid authorization header",
-                "message": "Formato debe ser: Bearer <token>"
+                "error": "Invalid internal key",
+                "message": "Clave de servicio interno inválida"
             }), 401
+    
+    # Obtener token del header
+    auth_header = request.headers.get('Authorization')
+    
+    if not auth_header:
+        logger.warning("Request sin header Authorization ni X-Internal-Key")
+        return jsonify({
+            "error": "No authorization header",
+            "message": "Se requiere token de autenticación o clave de servicio"
+        }), 401
+    
+    # Validar formato "Bearer <token>"
+    parts = auth_header.split()
+    if len(parts) != 2 or parts[0].lower() != 'bearer':
+        logger.warning(f"Formato de Authorization inválido: {auth_header}")
+        return jsonify({
+            "error": "Invalid authorization header",
+            "message": "Formato debe ser: Bearer <token>"
+        }), 401
+    
+    token = parts[1]
+    
+    try:
+        # Validar y decodificar token
+        payload = jwt.decode(
+            token,
+            JWT_SECRET,
+            algorithms=[JWT_ALGORITHM]
+        )
         
-        token = parts[1]
+        # Agregar payload al request para uso posterior
+        request.jwt_payload = payload
+        logger.info(f"Token válido para usuario: {payload.get('sub', 'unknown')}")
         
-        try:
-            # Validar y decodificar token
-            payload = jwt.decode(
-                token,
-                JWT_SECRET,
-                algorithms=[JWT_ALGORITHM]
-            )
-            
-            # Agregar payload al request para uso posterior
-            request.jwt_payload = payload
-            logger.info(f"Token válido para usuario: {payload.get('sub', 'unknown')}")
-            
-        except jwt.ExpiredSignatureError:
-            logger.warning("Token expirado")
-            return jsonify({
-                "error": "Token expired",
-                "message": "El token ha expirado"
-            }), 401
-            
-        except jwt.InvalidTokenError as e:
-            logger.warning(f"Token inválido: {e}")
-            return jsonify({
-                "error": "Invalid token",
-                "message": "Token de autenticación inválido"
-            }), 401
+    except jwt.ExpiredSignatureError:
+        logger.warning("Token expirado")
+        return jsonify({
+            "error": "Token expired",
+            "message": "El token ha expirado"
+        }), 401
         
-        return f(*args, **kwargs)
+    except jwt.InvalidTokenError as e:
+        logger.warning(f"Token inválido: {e}")
+        return jsonify({
+            "error": "Invalid token",
+            "message": "Token de autenticación inválido"
+        }), 401
     
-    return decorated_function
+    return None
 
 
 def optional_auth(f: Callable) -> Callable:
@@ -0,0 +1,82 @@
+"""
+Conversión del modelo a bundle de arreglos NumPy (paso de build)
+
+Uso:
+    python -m src.ml.convert_model [--model RUTA.pkl] [--output DIRECTORIO]
+
+El bundle resultante se abre con mmap al arrancar el servicio, sin importar
+scikit-learn ni deserializar el .pkl.
+"""
+import argparse
+import logging
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from ..config import MODEL_BUNDLE_DIR, MODEL_PATH, WARMUP_SAMPLE
+from .forest_arrays import ForestArrays
+from .model_loader import ModelLoader, ModelVersion, model_version_key
+
+logger = logging.getLogger(__name__)
+
+
+def convert_model(model_path: Path, output_dir: Path) -> ForestArrays:
+    """
+    Aplana el .pkl y escribe el bundle junto con la versión de origen
+
+    Args:
+        model_path: Ruta al archivo .pkl del modelo
+        output_dir: Directorio del bundle (se reemplaza si existe)
+
+    Returns:
+        Bundle escrito, abierto con mmap
+    """
+    import joblib
+
+    if not model_path.exists():
+        raise FileNotFoundError(f"Modelo no encontrado: {model_path}")
+
+    model = joblib.load(model_path)
+    ModelLoader._validate(model)
+
+    version_key = model_version_key(model_path)
+    forest = ForestArrays.from_model(model)
+    # El servicio compara source_version con el hash del .pkl para detectar bundles viejos
+    forest.meta["source_version"] = version_key
+    forest.meta["source_path"] = str(model_path)
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir)
+    forest.save(output_dir)
+
+    bundle = ForestArrays.load(output_dir, mmap=True)
+    sample = np.asarray([WARMUP_SAMPLE] * 8, dtype=np.float64)
+    expected = ModelVersion(version_key, model, model_path).predict_proba(sample)
+    if not np.allclose(bundle.predict_proba(sample), expected):
+        raise ValueError("El bundle no reproduce las predicciones del modelo")
+
+    return bundle
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Convierte el modelo .pkl a bundle NumPy")
+    parser.add_argument("--model", type=Path, default=MODEL_PATH, help="Archivo .pkl de origen")
+    parser.add_argument("--output", type=Path, default=MODEL_BUNDLE_DIR, help="Directorio del bundle")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        bundle = convert_model(args.model, args.output)
+    except Exception as e:
+        logger.error(f"❌ Error convirtiendo el modelo: {e}")
+        return 1
+
+    logger.info(f"✅ Bundle {bundle.meta['source_version']} escrito en {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
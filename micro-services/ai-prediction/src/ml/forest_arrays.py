@@ -0,0 +1,195 @@
+"""
+Representación del RandomForest como arreglos planos de NumPy
+Permite compartir el bosque entre procesos mediante archivos memory-mapped
+"""
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Archivos que componen un bundle de arreglos del bosque
+ARRAY_NAMES = ("children_left", "children_right", "feature", "threshold", "value", "roots")
+META_FILENAME = "meta.json"
+
+
+class ForestArrays:
+    """
+    Bosque aplanado: todos los nodos de todos los árboles en arreglos contiguos
+
+    Cada arreglo se puede abrir con mmap_mode="r", de modo que varios procesos
+    comparten las mismas páginas físicas del archivo en lugar de duplicar el
+    modelo en memoria.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], meta: Dict, path: Optional[Path] = None):
+        self.children_left = arrays["children_left"]
+        self.children_right = arrays["children_right"]
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.meta = meta
+        self.path = path
+
+    @property
+    def n_features(self) -> int:
+        return int(self.meta["n_features"])
+
+    @property
+    def max_depth(self) -> int:
+        return int(self.meta["max_depth"])
+
+    @classmethod
+    def from_model(cls, model) -> "ForestArrays":
+        """
+        Aplana un RandomForestClassifier entrenado
+
+        Args:
+            model: RandomForestClassifier de scikit-learn
+
+        Returns:
+            ForestArrays con los nodos concatenados (índices globales)
+        """
+        lefts, rights, features, thresholds, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            left = tree.children_left.astype(np.int32)
+            right = tree.children_right.astype(np.int32)
+            is_leaf = left == -1
+
+            # Índices globales: los hijos apuntan dentro del arreglo concatenado
+            lefts.append(np.where(is_leaf, -1, left + offset).astype(np.int32))
+            rights.append(np.where(is_leaf, -1, right + offset).astype(np.int32))
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(tree.threshold.astype(np.float64))
+
+            # Normalizar cada hoja a probabilidades (igual que DecisionTree.predict_proba)
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(value / normalizer)
+
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, int(tree.max_depth))
+
+        arrays = {
+            "children_left": np.concatenate(lefts),
+            "children_right": np.concatenate(rights),
+            "feature": np.concatenate(features),
+            "threshold": np.concatenate(thresholds),
+            "value": np.ascontiguousarray(np.concatenate(values)),
+            "roots": np.asarray(roots, dtype=np.int32),
+        }
+        meta = {
+            "model_type": type(model).__name__,
+            "n_estimators": int(model.n_estimators),
+            "n_features": int(model.n_features_in_),
+            "n_classes": int(len(model.classes_)),
+            "classes": [c.item() if hasattr(c, "item") else c for c in model.classes_],
+            "max_depth": max_depth,
+            "model_max_depth": model.max_depth,
+            "random_state": model.random_state,
+            "n_nodes": int(offset),
+        }
+        return cls(arrays, meta)
+
+    def save(self, directory: Path) -> Path:
+        """
+        Escribe el bundle en disco (un .npy por arreglo + meta.json)
+
+        Args:
+            directory: Directorio destino (se crea si no existe)
+
+        Returns:
+            Ruta del directorio escrito
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        for name in ARRAY_NAMES:
+            np.save(directory / f"{name}.npy", getattr(self, name), allow_pickle=False)
+        # meta.json al final: su presencia marca el bundle como completo
+        (directory / META_FILENAME).write_text(json.dumps(self.meta, indent=2))
+
+        self.path = directory
+        logger.info(f"Bosque exportado a {directory} ({self.meta['n_nodes']} nodos)")
+        return directory
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "ForestArrays":
+        """
+        Abre un bundle previamente exportado
+
+        Args:
+            directory: Directorio con los .npy y meta.json
+            mmap: Si True, los arreglos se mapean en memoria de solo lectura
+
+        Returns:
+            ForestArrays respaldado por los archivos del bundle
+        """
+        directory = Path(directory)
+        meta_path = directory / META_FILENAME
+        if not meta_path.exists():
+            raise FileNotFoundError(f"Bundle de arreglos incompleto: {directory}")
+
+        mmap_mode = "r" if mmap else None
+        arrays = {
+            name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+            for name in ARRAY_NAMES
+        }
+        meta = json.loads(meta_path.read_text())
+        return cls(arrays, meta, path=directory)
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Evalúa el bosque para un lote de filas
+
+        Recorre todos los árboles en paralelo (vectorizado por nivel) y promedia
+        las probabilidades de las hojas, reproduciendo RandomForest.predict_proba.
+
+        Args:
+            features: Matriz (n_filas, n_features) en el orden de MODEL_FEATURES
+
+        Returns:
+            Matriz (n_filas, n_classes) con probabilidades por clase
+        """
+        # scikit-learn evalúa los árboles en float32
+        X = np.asarray(features, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(
+                f"Se esperaban {self.n_features} features por fila, "
+                f"obtenido: {X.shape}"
+            )
+
+        n_rows, n_trees = X.shape[0], len(self.roots)
+        # Un cursor por (fila, árbol); solo se avanzan los que no llegaron a hoja
+        nodes = np.tile(self.roots, n_rows)
+        rows = np.repeat(np.arange(n_rows), n_trees)
+        active = np.arange(nodes.size)
+
+        for _ in range(self.max_depth + 1):
+            current = nodes[active]
+            left = self.children_left[current]
+            internal = left != -1
+            if not internal.any():
+                break
+            active, current, left = active[internal], current[internal], left[internal]
+            go_left = X[rows[active], self.feature[current]] <= self.threshold[current]
+            nodes[active] = np.where(go_left, left, self.children_right[current])
+
+        leaf_values = self.value[nodes].reshape(n_rows, n_trees, -1)
+        return leaf_values.mean(axis=1)
+
+
+def export_model(model, directory: Path) -> ForestArrays:
+    """Aplana el modelo y lo guarda en disco; retorna el bundle abierto con mmap"""
+    ForestArrays.from_model(model).save(directory)
+    return ForestArrays.load(directory, mmap=True)
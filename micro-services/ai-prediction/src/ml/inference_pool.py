@@ -0,0 +1,283 @@
+"""
+Pool de procesos de inferencia
+Cada worker abre el bosque aplanado con mmap (páginas compartidas entre procesos)
+y evalúa lotes fuera del GIL del proceso que atiende HTTP
+"""
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .forest_arrays import ForestArrays
+
+logger = logging.getLogger(__name__)
+
+# Cada cuánto revisa una petición en espera si su worker sigue vivo (segundos)
+LIVENESS_INTERVAL = 0.5
+
+
+def _worker_main(worker_id: int, tasks, results) -> None:
+    """
+    Bucle principal de un worker
+
+    Mantiene abierto solo el bundle más reciente; al recibir una tarea con otro
+    directorio (p.ej. tras recargar el modelo) lo abre y descarta el anterior.
+    """
+    forest: Optional[ForestArrays] = None
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        request_id, bundle_dir, features = task
+        try:
+            if forest is None or str(forest.path) != bundle_dir:
+                forest = ForestArrays.load(Path(bundle_dir), mmap=True)
+            results.put((request_id, worker_id, forest.predict_proba(features), None))
+        except Exception as exc:  # El error viaja al proceso padre
+            results.put((request_id, worker_id, None, f"{type(exc).__name__}: {exc}"))
+
+
+class _PendingResult:
+    """Resultado en vuelo de una tarea despachada a un worker"""
+
+    __slots__ = ("worker_id", "event", "value", "error")
+
+    def __init__(self, worker_id: int):
+        self.worker_id = worker_id
+        self.event = threading.Event()
+        self.value: Optional[np.ndarray] = None
+        self.error: Optional[str] = None
+
+
+class InferencePool:
+    """
+    Pool pre-fork de workers de inferencia
+
+    Las peticiones se despachan al worker con menos tareas en vuelo. Los workers
+    solo reciben la ruta del bundle y la matriz de features; el modelo nunca se
+    serializa entre procesos.
+    """
+
+    def __init__(
+        self,
+        bundle_dir: Path,
+        workers: int,
+        timeout: float = 10.0,
+        start_method: str = "fork"
+    ):
+        if workers < 1:
+            raise ValueError("El pool requiere al menos un worker")
+
+        self.bundle_dir = str(bundle_dir)
+        self.workers = workers
+        self.timeout = timeout
+        self._ctx = multiprocessing.get_context(start_method)
+
+        self._processes: List = []
+        self._task_queues: List = []
+        self._results = None
+        self._collector: Optional[threading.Thread] = None
+
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._pending: Dict[int, _PendingResult] = {}
+        self._in_flight: List[int] = []
+        self._completed: List[int] = []
+        self._restarts: List[int] = []
+        self._started = False
+
+    def start(self) -> "InferencePool":
+        """Lanza los procesos workers y el hilo colector de resultados"""
+        if self._started:
+            return self
+
+        self._results = self._ctx.Queue()
+        for worker_id in range(self.workers):
+            tasks, process = self._spawn_worker(worker_id)
+            self._task_queues.append(tasks)
+            self._processes.append(process)
+            self._in_flight.append(0)
+            self._completed.append(0)
+            self._restarts.append(0)
+
+        self._collector = threading.Thread(
+            target=self._collect_results,
+            name="inference-pool-collector",
+            daemon=True,
+        )
+        self._collector.start()
+        self._started = True
+
+        logger.info(f"Pool de inferencia iniciado: {self.workers} workers, bundle={self.bundle_dir}")
+        return self
+
+    def _spawn_worker(self, worker_id: int):
+        """Lanza un proceso worker con su propia cola de tareas"""
+        tasks = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, tasks, self._results),
+            name=f"inference-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        return tasks, process
+
+    def predict_proba(self, features: np.ndarray, bundle_dir: Optional[Path] = None) -> np.ndarray:
+        """
+        Evalúa un lote en el worker menos cargado
+
+        Args:
+            features: Matriz (n_filas, n_features)
+            bundle_dir: Bundle a evaluar (por defecto, el configurado en el pool)
+
+        Returns:
+            Matriz (n_filas, n_classes) con probabilidades
+
+        Raises:
+            RuntimeError: Si el pool no está activo, el worker falla o expira el timeout
+        """
+        if not self._started:
+            raise RuntimeError("Pool de inferencia no iniciado")
+
+        bundle = str(bundle_dir) if bundle_dir is not None else self.bundle_dir
+        matrix = np.ascontiguousarray(features, dtype=np.float64)
+        with self._lock:
+            worker_id = self._pick_worker()
+            request_id = next(self._ids)
+            pending = _PendingResult(worker_id)
+            self._pending[request_id] = pending
+            self._in_flight[worker_id] += 1
+            # Bajo el lock: _respawn_worker no puede cerrar la cola entre elegirla y
+            # encolar (put no bloquea, el envío lo hace el hilo feeder de la cola)
+            self._task_queues[worker_id].put((request_id, bundle, matrix))
+
+        if not self._wait(pending):
+            with self._lock:
+                if self._pending.pop(request_id, None) is not None:
+                    self._in_flight[worker_id] -= 1
+            raise RuntimeError(f"Timeout esperando al worker de inferencia {worker_id}")
+
+        if pending.error:
+            raise RuntimeError(f"Error en worker de inferencia: {pending.error}")
+        return pending.value
+
+    def _wait(self, pending: _PendingResult) -> bool:
+        """Espera el resultado comprobando que el worker siga vivo; False si expira el timeout"""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if pending.event.wait(min(remaining, LIVENESS_INTERVAL)):
+                return True
+            with self._lock:
+                if not self._processes[pending.worker_id].is_alive():
+                    self._respawn_worker(pending.worker_id)
+
+    def _pick_worker(self) -> int:
+        """Selecciona el worker con menos tareas en vuelo, relanzando los caídos (requiere _lock)"""
+        for worker_id, process in enumerate(self._processes):
+            if not process.is_alive():
+                self._respawn_worker(worker_id)
+        return min(range(len(self._processes)), key=lambda i: self._in_flight[i])
+
+    def _respawn_worker(self, worker_id: int) -> None:
+        """
+        Reemplaza un worker muerto (requiere _lock)
+
+        Sus tareas en vuelo no van a responder: fallan de inmediato en lugar de
+        esperar el timeout.
+        """
+        exitcode = self._processes[worker_id].exitcode
+        stranded = [
+            request_id for request_id, pending in self._pending.items()
+            if pending.worker_id == worker_id
+        ]
+        for request_id in stranded:
+            pending = self._pending.pop(request_id)
+            pending.error = f"worker {worker_id} terminó (exitcode={exitcode})"
+            pending.event.set()
+
+        old_tasks = self._task_queues[worker_id]
+        self._task_queues[worker_id], self._processes[worker_id] = self._spawn_worker(worker_id)
+        self._in_flight[worker_id] = 0
+        self._restarts[worker_id] += 1
+        old_tasks.close()
+        logger.warning(
+            f"Worker de inferencia {worker_id} terminó (exitcode={exitcode}); "
+            f"relanzado, {len(stranded)} tareas fallidas"
+        )
+
+    def _collect_results(self) -> None:
+        """Hilo que entrega los resultados de los workers a las peticiones en espera"""
+        while True:
+            try:
+                message = self._results.get()
+            except (EOFError, OSError):
+                break
+            if message is None:
+                break
+
+            request_id, worker_id, value, error = message
+            with self._lock:
+                pending = self._pending.pop(request_id, None)
+                if pending is not None:
+                    self._in_flight[worker_id] -= 1
+                self._completed[worker_id] += 1
+
+            if pending is not None:
+                pending.value = value
+                pending.error = error
+                pending.event.set()
+
+    def stats(self) -> Dict:
+        """Estado del pool para /health"""
+        with self._lock:
+            return {
+                "enabled": self._started,
+                "bundle": self.bundle_dir,
+                "workers": [
+                    {
+                        "id": i,
+                        "pid": process.pid,
+                        "alive": process.is_alive(),
+                        "in_flight": self._in_flight[i],
+                        "completed": self._completed[i],
+                        "restarts": self._restarts[i],
+                    }
+                    for i, process in enumerate(self._processes)
+                ],
+            }
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Detiene workers y colector"""
+        if not self._started:
+            return
+
+        for tasks in self._task_queues:
+            try:
+                tasks.put(None)
+            except (OSError, ValueError):
+                pass
+        for process in self._processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+
+        try:
+            self._results.put(None)
+        except (OSError, ValueError):
+            pass
+        if self._collector is not None:
+            self._collector.join(timeout)
+
+        self._started = False
+        logger.info("Pool de inferencia detenido")
@@ -1,119 +1,500 @@
 """
 Cargador del modelo de Machine Learning
-Maneja la carga, caché y validación del modelo RandomForest
+Registro de versiones del modelo RandomForest: carga, validación, precalentamiento
+y cambio atómico de la versión activa sin dejar al servicio sin modelo
 """
-import joblib
+import hashlib
 import logging
+import shutil
+import threading
+from collections import OrderedDict
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
-from sklearn.ensemble import RandomForestClassifier
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+from ..config import MODEL_FEATURES, MODEL_REGISTRY_SIZE, WARMUP_SAMPLE
+from .forest_arrays import ForestArrays, export_model
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestClassifier
 
 logger = logging.getLogger(__name__)
 
 
+def model_version_key(model_path: Path) -> str:
+    """Versión = nombre del archivo + hash corto del contenido"""
+    digest = hashlib.sha256()
+    with open(model_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return f"{model_path.stem}@{digest.hexdigest()[:12]}"
+
+
+class ModelVersion:
+    """
+    Una versión cargada y validada del modelo
+
+    Puede venir de un .pkl (modelo de scikit-learn) o de un bundle de arreglos
+    preconvertido en build; en el segundo caso no hay objeto de scikit-learn y
+    la evaluación se hace sobre los arreglos mapeados en memoria.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        model: Optional["RandomForestClassifier"],
+        model_path: Path,
+        model_id: Optional[str] = None,
+        forest: Optional[ForestArrays] = None
+    ):
+        self.version = version
+        self.model = model
+        self.model_path = model_path
+        self.model_id = model_id
+        self.forest = forest
+        self.bundle_dir: Optional[Path] = forest.path if forest is not None else None
+        # Los bundles generados en build no se borran al retirar la versión
+        self.owns_bundle = forest is None
+        self.loaded_at = datetime.utcnow().isoformat() + "Z"
+
+    @property
+    def source(self) -> str:
+        return "pickle" if self.model is not None else "bundle"
+
+    @property
+    def n_estimators(self) -> int:
+        if self.model is not None:
+            return self.model.n_estimators
+        return int(self.forest.meta["n_estimators"])
+
+    @property
+    def n_features(self) -> int:
+        if self.model is not None:
+            return self.model.n_features_in_
+        return self.forest.n_features
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """
+        Evalúa la versión en el proceso actual
+
+        Args:
+            features: Matriz (n_filas, n_features) en el orden de MODEL_FEATURES
+
+        Returns:
+            Matriz (n_filas, n_classes) con probabilidades por clase
+        """
+        if self.model is None:
+            return self.forest.predict_proba(features)
+
+        import pandas as pd  # Solo las versiones .pkl necesitan pandas
+
+        features_df = pd.DataFrame(features, columns=MODEL_FEATURES, copy=False)
+        return self.model.predict_proba(features_df)
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": self.version,
+            "model_id": self.model_id,
+            "model_path": str(self.model_path),
+            "source": self.source,
+            "loaded_at": self.loaded_at,
+            "n_estimators": self.n_estimators,
+            "n_features": self.n_features
+        }
+
+
 class ModelLoader:
-    """Singleton para cargar y cachear el modelo ML"""
-    
+    """
+    Singleton con el registro de versiones del modelo ML
+
+    La versión activa se reemplaza con una sola asignación de referencia, así
+    que las peticiones en curso terminan con la versión que tomaron al empezar
+    y ninguna petición ve el servicio sin modelo durante una recarga.
+    """
+
     _instance: Optional['ModelLoader'] = None
-    _model: Optional[RandomForestClassifier] = None
-    _model_path: Optional[Path] = None
-    
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
+            cls._instance._init_registry()
         return cls._instance
-    
-    def load_model(self, model_path: Path) -> RandomForestClassifier:
+
+    def _init_registry(self) -> None:
+        self._lock = threading.Lock()
+        self._versions: "OrderedDict[str, ModelVersion]" = OrderedDict()
+        self._active: Optional[ModelVersion] = None
+        self._history: List[str] = []
+        self._arrays_dir: Optional[Path] = None
+        self._reload_thread: Optional[threading.Thread] = None
+        self._reload_state: Dict = {"status": "idle"}
+
+    def enable_forest_arrays(self, arrays_dir: Path) -> None:
         """
-        Carga el modelo desde disco (con caché)
-        
+        Exporta cada versión cargada como bundle de arreglos (para el pool de inferencia)
+
+        Args:
+            arrays_dir: Directorio base; cada versión usa un subdirectorio propio
+        """
+        self._arrays_dir = Path(arrays_dir)
+        active = self._active
+        if active is not None and active.bundle_dir is None:
+            self._export_arrays(active)
+
+    def load_model(
+        self,
+        model_path: Path,
+        model_id: Optional[str] = None
+    ) -> "RandomForestClassifier":
+        """
+        Carga el modelo desde disco y lo activa (con caché por versión)
+
         Args:
             model_path: Ruta al archivo .pkl del modelo
-            
+            model_id: UUID del modelo en la tabla `models` (opcional)
+
         Returns:
             Modelo RandomForest cargado
-            
+
         Raises:
             FileNotFoundError: Si el archivo del modelo no existe
-            Exception: Si hay error cargando el modelo
+            Exception: Si hay error cargando o validando el modelo
         """
-        # Si ya está cargado y es el mismo path, retornar del caché
-        if self._model is not None and self._model_path == model_path:
-            logger.info(f"Usando modelo en caché: {model_path}")
-            return self._model
-        
-        # Validar que el archivo existe
-        if not model_path.exists():
-            raise FileNotFoundError(f"Modelo no encontrado: {model_path}")
-        
-        try:
-            logger.info(f"Cargando modelo desde: {model_path}")
-            self._model = joblib.load(model_path)
-            self._model_path = model_path
-            
-            # Validar que es un RandomForestClassifier
-            if not isinstance(self._model, RandomForestClassifier):
-                raise TypeError(
-                    f"El modelo debe ser RandomForestClassifier, "
-                    f"obtenido: {type(self._model)}"
-                )
-            
-            logger.info(
-                f"Modelo cargado exitosamente: "
-                f"{self._model.n_estimators} estimadores, "
-                f"{self._model.n_features_in_} features"
+        version = self._prepare_version(model_path, model_id)
+        self._activate(version)
+        return version.model
+
+    def load_bundle(
+        self,
+        bundle_dir: Path,
+        model_id: Optional[str] = None,
+        expected_version: Optional[str] = None
+    ) -> ModelVersion:
+        """
+        Activa un bundle de arreglos preconvertido (sin importar scikit-learn)
+
+        Los arreglos se abren con mmap: el arranque no deserializa el bosque y
+        las páginas se cargan bajo demanda.
+
+        Args:
+            bundle_dir: Directorio generado por `python -m src.ml.convert_model`
+            model_id: UUID del modelo en la tabla `models` (opcional)
+            expected_version: Versión del .pkl que el bundle debe reflejar (opcional)
+
+        Returns:
+            Versión activada
+
+        Raises:
+            FileNotFoundError: Si el bundle no existe o está incompleto
+            ValueError: Si el bundle no es compatible o no corresponde al .pkl
+        """
+        forest = ForestArrays.load(bundle_dir, mmap=True)
+        meta = forest.meta
+
+        if meta.get("model_type") != "RandomForestClassifier":
+            raise ValueError(
+                f"El bundle debe venir de un RandomForestClassifier, "
+                f"obtenido: {meta.get('model_type')}"
             )
-            
-            return self._model
-            
-        except Exception as e:
-            logger.error(f"Error cargando modelo: {e}")
-            raise
-    
-    def get_model(self) -> Optional[RandomForestClassifier]:
+        if forest.n_features != len(MODEL_FEATURES):
+            raise ValueError(
+                f"El bundle espera {forest.n_features} features, "
+                f"el servicio envía {len(MODEL_FEATURES)}"
+            )
+
+        version_key = meta.get("source_version") or f"{Path(bundle_dir).name}@bundle"
+        if expected_version is not None and version_key != expected_version:
+            raise ValueError(
+                f"El bundle corresponde a {version_key}, el modelo actual es {expected_version}"
+            )
+        cached = self._versions.get(version_key)
+        if cached is not None:
+            logger.info(f"Usando modelo en caché: {version_key}")
+            self._activate(cached)
+            return cached
+
+        source_path = Path(meta.get("source_path") or bundle_dir)
+        version = ModelVersion(version_key, None, source_path, model_id, forest=forest)
+        self._warm_up(version)
+        self._activate(version)
+
+        logger.info(
+            f"Bundle {version_key} validado: "
+            f"{version.n_estimators} estimadores, {meta['n_nodes']} nodos"
+        )
+        return version
+
+    def get_model(self) -> Optional["RandomForestClassifier"]:
         """
-        Retorna el modelo cargado (si existe)
-        
+        Retorna el modelo activo (si existe)
+
         Returns:
             Modelo o None si no está cargado
         """
-        return self._model
-    
-    def reload_model(self, model_path: Path) -> RandomForestClassifier:
+        active = self._active
+        return active.model if active is not None else None
+
+    def get_active_version(self) -> Optional[ModelVersion]:
+        """Retorna la versión activa; tomarla una vez garantiza consistencia por petición"""
+        return self._active
+
+    def reload_model(
+        self,
+        model_path: Path,
+        model_id: Optional[str] = None
+    ) -> "RandomForestClassifier":
         """
-        Fuerza la recarga del modelo (útil para actualizaciones)
-        
+        Carga, valida y precalienta una nueva versión y luego la activa
+
+        Si algo falla la versión activa sigue sirviendo.
+
         Args:
             model_path: Ruta al archivo .pkl del modelo
-            
+            model_id: UUID del modelo en la tabla `models` (opcional)
+
         Returns:
             Modelo recargado
         """
-        logger.info("Forzando recarga del modelo...")
-        self._model = None
-        self._model_path = None
-        return self.load_model(model_path)
-    
+        logger.info(f"Recargando modelo desde {model_path}...")
+        version = self._prepare_version(model_path, model_id)
+        self._activate(version)
+        return version.model
+
+    def reload_in_background(
+        self,
+        model_path: Path,
+        model_id: Optional[str] = None
+    ) -> Dict:
+        """
+        Lanza reload_model en un hilo; el estado se consulta con get_reload_state()
+
+        Returns:
+            Estado de la recarga
+
+        Raises:
+            RuntimeError: Si ya hay una recarga en curso
+        """
+        with self._lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                raise RuntimeError("Ya hay una recarga del modelo en curso")
+
+            self._reload_state = {
+                "status": "loading",
+                "model_path": str(model_path),
+                "started_at": datetime.utcnow().isoformat() + "Z"
+            }
+            self._reload_thread = threading.Thread(
+                target=self._reload_worker,
+                args=(model_path, model_id),
+                name="model-reload",
+                daemon=True
+            )
+            self._reload_thread.start()
+            return dict(self._reload_state)
+
+    def _reload_worker(self, model_path: Path, model_id: Optional[str]) -> None:
+        try:
+            self.reload_model(model_path, model_id)
+            state = {"status": "ready", "version": self._active.version}
+        except Exception as e:
+            logger.exception(f"Recarga del modelo fallida: {e}")
+            state = {"status": "failed", "error": str(e)}
+
+        with self._lock:
+            self._reload_state.update(state)
+            self._reload_state["finished_at"] = datetime.utcnow().isoformat() + "Z"
+
+    def wait_for_reload(self, timeout: Optional[float] = None) -> Dict:
+        """Espera a que termine la recarga en segundo plano y retorna su estado"""
+        thread = self._reload_thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.get_reload_state()
+
+    def get_reload_state(self) -> Dict:
+        with self._lock:
+            return dict(self._reload_state)
+
+    def rollback(self) -> ModelVersion:
+        """
+        Reactiva la versión anterior del registro
+
+        Returns:
+            Versión que quedó activa
+
+        Raises:
+            RuntimeError: Si no hay una versión anterior disponible
+        """
+        with self._lock:
+            if len(self._history) < 2:
+                raise RuntimeError("No hay una versión anterior a la cual regresar")
+
+            current = self._history.pop()
+            previous = self._versions.get(self._history[-1])
+            if previous is None:
+                self._history.append(current)
+                raise RuntimeError("La versión anterior ya no está en el registro")
+
+            self._active = previous
+
+        logger.info(f"Rollback del modelo: {current} -> {previous.version}")
+        return previous
+
     def is_loaded(self) -> bool:
-        """Verifica si hay un modelo cargado"""
-        return self._model is not None
-    
+        """Verifica si hay un modelo activo"""
+        return self._active is not None
+
     def get_model_info(self) -> dict:
         """
-        Retorna información del modelo cargado
-        
+        Retorna información del modelo activo y de las versiones registradas
+
         Returns:
             Diccionario con información del modelo
         """
-        if not self.is_loaded():
-            return {"loaded": False}
-        
+        active = self._active
+        if active is None:
+            return {
+                "loaded": False,
+                "reload": self.get_reload_state()
+            }
+
+        with self._lock:
+            versions = [
+                {**version.to_dict(), "active": version is active}
+                for version in self._versions.values()
+            ]
+
+        if active.model is not None:
+            model_type = type(active.model).__name__
+            max_depth = active.model.max_depth
+            random_state = active.model.random_state
+        else:
+            model_type = active.forest.meta["model_type"]
+            max_depth = active.forest.meta.get("model_max_depth")
+            random_state = active.forest.meta.get("random_state")
+
         return {
             "loaded": True,
-            "model_path": str(self._model_path),
-            "model_type": type(self._model).__name__,
-            "n_estimators": self._model.n_estimators,
-            "n_features": self._model.n_features_in_,
-            "max_depth": self._model.max_depth,
-            "random_state": self._model.random_state
+            "version": active.version,
+            "model_id": active.model_id,
+            "model_path": str(active.model_path),
+            "source": active.source,
+            "model_type": model_type,
+            "n_estimators": active.n_estimators,
+            "n_features": active.n_features,
+            "max_depth": max_depth,
+            "random_state": random_state,
+            "versions": versions,
+            "reload": self.get_reload_state()
         }
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+    def _prepare_version(
+        self,
+        model_path: Path,
+        model_id: Optional[str]
+    ) -> ModelVersion:
+        """
+        Carga, valida y precalienta una versión sin tocar la versión activa
+
+        La versión se identifica por el hash del archivo: recargar un archivo
+        idéntico reutiliza la versión ya registrada (y su bundle de arreglos,
+        que los workers pueden tener mapeado en memoria).
+        """
+        # Validar que el archivo existe
+        if not model_path.exists():
+            raise FileNotFoundError(f"Modelo no encontrado: {model_path}")
+
+        version_key = model_version_key(model_path)
+        cached = self._versions.get(version_key)
+        if cached is not None:
+            logger.info(f"Usando modelo en caché: {version_key}")
+            if model_id and not cached.model_id:
+                cached.model_id = model_id
+            return cached
+
+        import joblib  # Diferido: solo se necesita al deserializar un .pkl
+
+        logger.info(f"Cargando modelo desde: {model_path}")
+        model = joblib.load(model_path)
+        self._validate(model)
+
+        version = ModelVersion(version_key, model, model_path, model_id)
+        if self._arrays_dir is not None:
+            self._export_arrays(version)
+        self._warm_up(version)
+
+        logger.info(
+            f"Modelo {version_key} validado: "
+            f"{model.n_estimators} estimadores, "
+            f"{model.n_features_in_} features"
+        )
+        return version
+
+    def _activate(self, version: ModelVersion) -> None:
+        """Registra la versión y la activa con una sola asignación"""
+        evicted: List[ModelVersion] = []
+
+        with self._lock:
+            self._versions[version.version] = version
+            self._versions.move_to_end(version.version)
+            self._active = version
+
+            if version.version in self._history:
+                self._history.remove(version.version)
+            self._history.append(version.version)
+
+            # Conservar solo las últimas N versiones (nunca la activa)
+            while len(self._versions) > MODEL_REGISTRY_SIZE:
+                oldest_key = next(iter(self._versions))
+                evicted.append(self._versions.pop(oldest_key))
+                self._history = [key for key in self._history if key != oldest_key]
+
+        for old in evicted:
+            if old.bundle_dir is not None and old.owns_bundle:
+                shutil.rmtree(old.bundle_dir, ignore_errors=True)
+            logger.info(f"Versión retirada del registro: {old.version}")
+
+        logger.info(f"Versión activa del modelo: {version.version}")
+
+    @staticmethod
+    def _validate(model) -> None:
+        from sklearn.ensemble import RandomForestClassifier
+
+        # Validar que es un RandomForestClassifier
+        if not isinstance(model, RandomForestClassifier):
+            raise TypeError(
+                f"El modelo debe ser RandomForestClassifier, "
+                f"obtenido: {type(model)}"
+            )
+        if model.n_features_in_ != len(MODEL_FEATURES):
+            raise ValueError(
+                f"El modelo espera {model.n_features_in_} features, "
+                f"el servicio envía {len(MODEL_FEATURES)}"
+            )
+
+    def _export_arrays(self, version: ModelVersion) -> None:
+        safe_name = version.version.replace("@", "-")
+        bundle_dir = self._arrays_dir / safe_name
+        export_model(version.model, bundle_dir)
+        version.bundle_dir = bundle_dir
+
+    @staticmethod
+    def _warm_up(version: ModelVersion) -> None:
+        """Evalúa un lote de muestra; falla si las probabilidades no son válidas"""
+        sample = np.asarray([WARMUP_SAMPLE] * 8, dtype=np.float64)
+        proba = version.predict_proba(sample)
+
+        if proba.shape != (len(sample), 2) or not np.all(np.isfinite(proba)):
+            raise ValueError("El modelo produjo probabilidades inválidas en el precalentamiento")
+        if not np.allclose(proba.sum(axis=1), 1.0):
+            raise ValueError("Las probabilidades del precalentamiento no suman 1")
+
+        if version.model is not None and version.bundle_dir is not None:
+            arrays_proba = ForestArrays.load(version.bundle_dir).predict_proba(sample)
+            if not np.allclose(arrays_proba, proba):
+                raise ValueError("Los arreglos exportados no reproducen las predicciones del modelo")
@@ -2,13 +2,15 @@
 Lógica de predicción y generación de alertas
 """
 import logging
-import pandas as pd
-from typing import Dict, List, Tuple
+import numpy as np
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
-from .model_loader import ModelLoader
+from .model_loader import ModelLoader, ModelVersion
+from ..metrics import stage_timer
 from ..config import (
     MODEL_FEATURES,
+    API_FEATURES,
     API_TO_MODEL_MAPPING,
     DEFAULT_THRESHOLD,
     SEVERITY_LEVELS,
@@ -23,6 +25,16 @@ class HealthPredictor:
     
     def __init__(self):
         self.model_loader = ModelLoader()
+        self.inference_pool = None
+    
+    def attach_pool(self, pool) -> None:
+        """
+        Delega la evaluación del bosque a un InferencePool
+        
+        Args:
+            pool: Pool iniciado, o None para volver a evaluar en el proceso
+        """
+        self.inference_pool = pool
     
     def predict(
         self,
@@ -51,36 +63,32 @@ class HealthPredictor:
                     "has_problem": bool,
                     "probability": float,
                     "alerts": List[Dict],
-                    "processed_at": str
+                    "processed_at": str,
+                    "model_version": str,
+                    "model_id": str
                 }
         """
-        # Validar que el modelo esté cargado
-        if not self.model_loader.is_loaded():
+        # Tomar la versión activa una sola vez: un hot swap no afecta esta petición
+        version = self.model_loader.get_active_version()
+        if version is None:
             raise RuntimeError("Modelo no está cargado")
         
         # Preparar features en el orden correcto
-        features_df = self._prepare_features(vital_signs)
+        with stage_timer("prepare_features"):
+            features = self._prepare_features(vital_signs)
         
-        # Realizar predicción
-        model = self.model_loader.get_model()
-        proba = model.predict_proba(features_df)[0][1]  # Probabilidad de clase 1 (problema)
-        has_problem = proba >= threshold
+        # Realizar predicción (probabilidad de clase 1 = problema)
+        proba = self._predict_proba(features, version)[0]
         
         logger.info(
             f"Predicción: proba={proba:.3f}, threshold={threshold}, "
-            f"has_problem={has_problem}"
+            f"has_problem={proba >= threshold}"
         )
         
-        # Generar alertas si hay problema
-        alerts = []
-        if has_problem:
-            alerts = self._generate_alerts(vital_signs, proba)
-        
         return {
-            "has_problem": bool(has_problem),
-            "probability": round(float(proba), 4),
-            "alerts": alerts,
-            "processed_at": datetime.utcnow().isoformat() + "Z"
+            **self._build_result(vital_signs, proba, threshold),
+            "model_version": version.version,
+            "model_id": version.model_id
         }
     
     def batch_predict(
@@ -106,26 +114,44 @@ class HealthPredictor:
                     }
                 }
         """
-        predictions = []
+        version = self.model_loader.get_active_version()
+        predictions: List[Optional[Dict]] = [None] * len(readings)
+        valid_indexes = []
+        rows = []
+        
+        # Validar cada lectura; las inválidas se reportan sin detener el lote
+        with stage_timer("prepare_features"):
+            for index, reading in enumerate(readings):
+                try:
+                    if version is None:
+                        raise RuntimeError("Modelo no está cargado")
+                    # Convertir aquí: un valor no numérico o None invalida solo su lectura
+                    rows.append([float(value) for value in self._feature_row(reading)])
+                    valid_indexes.append(index)
+                except Exception as e:
+                    predictions[index] = self._batch_error(reading, e)
+            features = np.asarray(rows, dtype=np.float64)
+        
+        # Una sola evaluación del bosque para todas las lecturas válidas
         total_proba = 0.0
         problems_count = 0
-        
-        for reading in readings:
-            try:
-                pred = self.predict(reading, threshold)
-                predictions.append({
+        if rows:
+            probabilities = self._predict_proba(features, version)
+            
+            for index, proba in zip(valid_indexes, probabilities):
+                reading = readings[index]
+                try:
+                    pred = self._build_result(reading, proba, threshold)
+                except Exception as e:
+                    predictions[index] = self._batch_error(reading, e)
+                    continue
+                predictions[index] = {
                     "timestamp": reading.get("timestamp"),
                     **pred
-                })
+                }
                 total_proba += pred["probability"]
                 if pred["has_problem"]:
                     problems_count += 1
-            except Exception as e:
-                logger.error(f"Error en predicción de lote: {e}")
-                predictions.append({
-                    "timestamp": reading.get("timestamp"),
-                    "error": str(e)
-                })
         
         total = len(predictions)
         avg_proba = total_proba / total if total > 0 else 0.0
@@ -136,10 +162,109 @@ class HealthPredictor:
                 "total": total,
                 "problems_detected": problems_count,
                 "avg_probability": round(avg_proba, 4)
-            }
+            },
+            "model_version": version.version if version else None,
+            "model_id": version.model_id if version else None
+        }
+    
+    @staticmethod
+    def _batch_error(reading, error: Exception) -> Dict:
+        """Entrada de error de una lectura del lote (el resto del lote sigue)"""
+        logger.error(f"Error en predicción de lote: {error}")
+        return {
+            "timestamp": reading.get("timestamp") if isinstance(reading, dict) else None,
+            "error": str(error)
         }
     
-    def _prepare_features(self, vital_signs: Dict[str, float]) -> pd.DataFrame:
+    def predict_columns(
+        self,
+        features: np.ndarray,
+        threshold: float = DEFAULT_THRESHOLD,
+        timestamps: Optional[List] = None,
+        include_alerts: bool = True
+    ) -> Dict:
+        """
+        Predicciones en lote sobre una matriz, con respuesta columnar
+        
+        Evita construir un diccionario por lectura: las alertas solo se generan
+        para las filas que superan el umbral.
+        
+        Args:
+            features: Matriz (n_filas, n_features) en el orden de API_FEATURES
+            threshold: Umbral de probabilidad
+            timestamps: Timestamps por fila (opcional, se devuelven tal cual)
+            include_alerts: Si False omite la columna de alertas
+            
+        Returns:
+            Diccionario columnar:
+                {
+                    "format": "columnar",
+                    "columns": {
+                        "probability": List[float],
+                        "has_problem": List[bool],
+                        "alerts": List[List[Dict]] (opcional),
+                        "timestamp": List (opcional)
+                    },
+                    "summary": {...},
+                    "processed_at": str,
+                    "model_version": str,
+                    "model_id": str
+                }
+        """
+        probabilities, version = self.predict_matrix(features)
+        flags = probabilities >= threshold
+        rounded = np.round(probabilities, 4)
+        
+        columns = {
+            "probability": rounded.tolist(),
+            "has_problem": flags.tolist()
+        }
+        
+        if include_alerts:
+            alerts: List[List[Dict]] = [[] for _ in range(len(probabilities))]
+            with stage_timer("generate_alerts"):
+                for index in np.flatnonzero(flags):
+                    vital_signs = dict(zip(API_FEATURES, features[index].tolist()))
+                    alerts[index] = self._generate_alerts(vital_signs, float(probabilities[index]))
+            columns["alerts"] = alerts
+        
+        if timestamps is not None:
+            columns["timestamp"] = timestamps
+        
+        total = len(probabilities)
+        return {
+            "format": "columnar",
+            "columns": columns,
+            "summary": {
+                "total": total,
+                "problems_detected": int(flags.sum()),
+                "avg_probability": round(float(rounded.mean()), 4) if total else 0.0
+            },
+            "processed_at": datetime.utcnow().isoformat() + "Z",
+            "model_version": version.version,
+            "model_id": version.model_id
+        }
+    
+    def predict_matrix(self, features: np.ndarray) -> Tuple[np.ndarray, ModelVersion]:
+        """
+        Evalúa una matriz de features ya ordenada
+        
+        Args:
+            features: Matriz (n_filas, n_features) en el orden de API_FEATURES
+            
+        Returns:
+            Tupla (probabilidad de problema por fila, versión del modelo usada)
+        """
+        version = self.model_loader.get_active_version()
+        if version is None:
+            raise RuntimeError("Modelo no está cargado")
+        
+        if len(features) == 0:
+            return np.empty(0), version
+        
+        return self._predict_proba(features, version), version
+    
+    def _prepare_features(self, vital_signs: Dict[str, float]) -> np.ndarray:
         """
         Prepara las features en el formato correcto para el modelo
         
@@ -147,7 +272,19 @@ class HealthPredictor:
             vital_signs: Diccionario con signos vitales (nombres de API)
             
         Returns:
-            DataFrame con las features en el orden correcto
+            Matriz de una fila con las features en el orden de MODEL_FEATURES
+        """
+        return np.asarray([self._feature_row(vital_signs)], dtype=np.float64)
+    
+    def _feature_row(self, vital_signs: Dict[str, float]) -> List[float]:
+        """
+        Extrae los valores de una lectura en el orden de MODEL_FEATURES
+        
+        Args:
+            vital_signs: Diccionario con signos vitales (nombres de API)
+            
+        Returns:
+            Lista de valores en el orden del modelo
         """
         # Mapear nombres de API a nombres del modelo
         features_dict = {}
@@ -156,10 +293,56 @@ class HealthPredictor:
                 raise ValueError(f"Falta el campo requerido: {api_name}")
             features_dict[model_name] = vital_signs[api_name]
         
-        # Crear DataFrame con el orden correcto de columnas
-        df = pd.DataFrame([features_dict], columns=MODEL_FEATURES)
+        return [features_dict[name] for name in MODEL_FEATURES]
+    
+    def _predict_proba(self, features: np.ndarray, version: ModelVersion) -> np.ndarray:
+        """
+        Evalúa el bosque en el pool de workers o en el proceso actual
+        
+        Args:
+            features: Matriz con las features en el orden del modelo
+            version: ModelVersion a evaluar
+            
+        Returns:
+            Arreglo con la probabilidad de problema (clase 1) por fila
+        """
+        with stage_timer("predict_proba"):
+            if self.inference_pool is not None and version.bundle_dir is not None:
+                return self.inference_pool.predict_proba(features, version.bundle_dir)[:, 1]
+            
+            return version.predict_proba(features)[:, 1]
+    
+    def _build_result(
+        self,
+        vital_signs: Dict[str, float],
+        proba: float,
+        threshold: float
+    ) -> Dict:
+        """
+        Arma la respuesta de una predicción y sus alertas
+        
+        Args:
+            vital_signs: Diccionario con signos vitales
+            proba: Probabilidad de problema
+            threshold: Umbral de clasificación
+            
+        Returns:
+            Diccionario con has_problem, probability, alerts y processed_at
+        """
+        has_problem = proba >= threshold
+        
+        # Generar alertas si hay problema
+        alerts = []
+        if has_problem:
+            with stage_timer("generate_alerts"):
+                alerts = self._generate_alerts(vital_signs, float(proba))
         
-        return df
+        return {
+            "has_problem": bool(has_problem),
+            "probability": round(float(proba), 4),
+            "alerts": alerts,
+            "processed_at": datetime.utcnow().isoformat() + "Z"
+        }
     
     def _generate_alerts(
         self,
@@ -0,0 +1,136 @@
+"""
+Profiler por muestreo para peticiones lentas
+Un hilo toma la pila de cada petición en curso cada N ms; si la petición supera
+el umbral, las pilas se guardan en formato "folded" (flamegraph.pl, speedscope)
+"""
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from flask import Flask, g, request
+
+logger = logging.getLogger(__name__)
+
+
+def _collapse_stack(frame) -> str:
+    """Pila de raíz a hoja como 'func (archivo:línea);...'"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        filename = "/".join(Path(code.co_filename).parts[-2:])
+        names.append(f"{code.co_name} ({filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SlowRequestProfiler:
+    """
+    Muestreador de pilas para las peticiones activas
+
+    El costo por petición es registrar/quitar el hilo; el muestreo lo hace un
+    único hilo en segundo plano para todas las peticiones en curso.
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        interval_ms: float,
+        output_dir: Path,
+        max_files: int = 200
+    ):
+        self.threshold_ms = threshold_ms
+        self.interval = interval_ms / 1000
+        self.output_dir = Path(output_dir)
+        self.max_files = max_files
+
+        self._lock = threading.Lock()
+        self._active: Dict[int, Tuple[float, Counter]] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SlowRequestProfiler":
+        if self._thread is None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self._thread = threading.Thread(target=self._sample_loop, name="slow-request-profiler", daemon=True)
+            self._thread.start()
+            logger.info(
+                f"Profiler de peticiones lentas activo: umbral={self.threshold_ms}ms, "
+                f"muestreo={self.interval * 1000:.0f}ms, salida={self.output_dir}"
+            )
+        return self
+
+    def begin(self) -> None:
+        """Empieza a muestrear el hilo de la petición actual"""
+        with self._lock:
+            self._active[threading.get_ident()] = (time.perf_counter(), Counter())
+
+    def end(self, endpoint: str) -> Optional[Path]:
+        """
+        Deja de muestrear el hilo actual y guarda las pilas si la petición fue lenta
+
+        Returns:
+            Ruta del archivo escrito o None
+        """
+        with self._lock:
+            entry = self._active.pop(threading.get_ident(), None)
+        if entry is None:
+            return None
+
+        started, samples = entry
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms < self.threshold_ms or not samples:
+            return None
+        return self._dump(endpoint, elapsed_ms, samples)
+
+    def _sample_loop(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for ident, (_, samples) in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        samples[_collapse_stack(frame)] += 1
+
+    def _dump(self, endpoint: str, elapsed_ms: float, samples: Counter) -> Optional[Path]:
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        path = self.output_dir / f"{stamp}-{endpoint}-{elapsed_ms:.0f}ms.folded"
+        try:
+            path.write_text("".join(f"{stack} {count}\n" for stack, count in samples.most_common()))
+            self._prune()
+        except OSError as e:
+            logger.warning(f"No se pudo guardar el perfil de {endpoint}: {e}")
+            return None
+
+        logger.warning(
+            f"Petición lenta {endpoint}: {elapsed_ms:.0f}ms "
+            f"({sum(samples.values())} muestras) -> {path}"
+        )
+        return path
+
+    def _prune(self) -> None:
+        """Conserva solo los max_files perfiles más recientes"""
+        files = sorted(self.output_dir.glob("*.folded"))
+        for old in files[:-self.max_files]:
+            old.unlink(missing_ok=True)
+
+
+def init_profiler(app: Flask, profiler: SlowRequestProfiler) -> None:
+    """Registra el profiler en los hooks de petición de la app"""
+    profiler.start()
+
+    @app.before_request
+    def _begin_sampling():
+        profiler.begin()
+        g.profiling = True
+
+    @app.teardown_request
+    def _end_sampling(exc):
+        if g.pop("profiling", False):
+            profiler.end(request.endpoint or "unknown")
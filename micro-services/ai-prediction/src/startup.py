@@ -0,0 +1,71 @@
+"""
+Tiempos de arranque del servicio
+Registra la duración de cada fase (imports, carga del modelo, pool...) para
+los logs y para /health
+"""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+
+class StartupTimings:
+    """Cronómetro por fases, medido desde que se importa este módulo"""
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._last = self._started
+        self._phases: Dict[str, float] = {}
+        self._finished: Optional[float] = None
+        self._details: Dict[str, str] = {}
+
+    def mark(self, phase: str) -> float:
+        """
+        Cierra una fase que empezó al final de la anterior
+
+        Args:
+            phase: Nombre de la fase
+
+        Returns:
+            Duración de la fase en milisegundos
+        """
+        now = time.perf_counter()
+        elapsed = (now - self._last) * 1000
+        self._phases[phase] = round(elapsed, 1)
+        self._last = now
+        return elapsed
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """Mide el bloque como una fase (aunque el bloque lance una excepción)"""
+        self._last = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(phase)
+
+    def detail(self, key: str, value: str) -> None:
+        """Anota un dato del arranque (p.ej. el origen del modelo)"""
+        self._details[key] = value
+
+    def finish(self, logger: logging.Logger) -> None:
+        """Marca el fin del arranque y escribe el resumen en el log"""
+        self._finished = time.perf_counter()
+        phases = ", ".join(f"{name}={ms:.0f}ms" for name, ms in self._phases.items())
+        logger.info(f"⏱️  Arranque en {self.total_ms:.0f}ms ({phases})")
+
+    @property
+    def total_ms(self) -> float:
+        end = self._finished if self._finished is not None else time.perf_counter()
+        return round((end - self._started) * 1000, 1)
+
+    def to_dict(self) -> Dict:
+        return {
+            "completed": self._finished is not None,
+            "total_ms": self.total_ms,
+            "phases_ms": dict(self._phases),
+            **self._details
+        }
+
+
+startup_timings = StartupTimings()
@@ -0,0 +1,71 @@
+"""Fixtures compartidas para pruebas del AI Prediction Service."""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pytest
+
+# El servicio se importa como paquete `src` (igual que `python -m src.app`)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.config import API_FEATURES, WARMUP_SAMPLE  # noqa: E402
+from src.ml.model_loader import ModelLoader  # noqa: E402
+
+
+def random_vitals(n_rows: int, seed: int = 0) -> np.ndarray:
+    """Filas alrededor de WARMUP_SAMPLE en el orden de API_FEATURES"""
+    rng = np.random.default_rng(seed)
+    base = np.asarray(WARMUP_SAMPLE, dtype=np.float64)
+    spread = np.asarray([0.5, 0.5, 30.0, 6.0, 30.0, 15.0, 1.5])
+    return base + rng.normal(size=(n_rows, len(API_FEATURES))) * spread
+
+
+def train_forest(seed: int = 0, n_estimators: int = 12):
+    from sklearn.ensemble import RandomForestClassifier
+
+    X = random_vitals(400, seed)
+    y = ((X[:, 2] > 100) | (X[:, 3] < 92) | (X[:, 6] > 38)).astype(int)
+    return RandomForestClassifier(n_estimators=n_estimators, max_depth=6, random_state=seed).fit(X, y)
+
+
+@pytest.fixture
+def make_vitals():
+    return random_vitals
+
+
+@pytest.fixture(scope="session")
+def forest_model():
+    return train_forest()
+
+
+@pytest.fixture
+def model_paths(tmp_path):
+    """Dos archivos .pkl distintos (versiones diferentes del modelo)"""
+    paths = []
+    for seed in (0, 1):
+        path = tmp_path / f"modelo_{seed}.pkl"
+        joblib.dump(train_forest(seed), path)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    """ModelLoader limpio: el singleton no se comparte entre pruebas"""
+    monkeypatch.setattr(ModelLoader, "_instance", None)
+    return ModelLoader()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """Cliente de la app real (carga el modelo de models/)"""
+    from src.app import app
+    from src.config import INTERNAL_SERVICE_KEY
+
+    app.config.update(TESTING=True)
+    test_client = app.test_client()
+    test_client.environ_base["HTTP_X_INTERNAL_KEY"] = INTERNAL_SERVICE_KEY
+    return test_client
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from src.batch_formats import PACKED_CONTENT_TYPE, SHAPE_HEADER, encode_packed_float32
+from src.config import API_FEATURES, WARMUP_SAMPLE
+
+
+def test_mixed_batch_returns_per_reading_errors(client):
+    valid = dict(zip(API_FEATURES, WARMUP_SAMPLE), timestamp="ok")
+    readings = [valid, {**valid, "heart_rate": "abc"}, {**valid, "spo2": None}]
+
+    resp = client.post("/batch-predict", json={"readings": readings})
+
+    assert resp.status_code == 200
+    predictions = resp.get_json()["predictions"]
+    assert "probability" in predictions[0]
+    assert "error" in predictions[1] and "error" in predictions[2]
+
+
+def test_columnar_scalar_columns_are_rejected(client):
+    columns = dict(zip(API_FEATURES, WARMUP_SAMPLE))
+
+    resp = client.post("/batch-predict", json={"columns": columns})
+
+    assert resp.status_code == 400
+    assert resp.get_json()["error"] == "Validation error"
+
+
+def test_packed_body_must_match_shape(client, make_vitals):
+    body = encode_packed_float32(make_vitals(2))
+    headers = {"Content-Type": PACKED_CONTENT_TYPE, SHAPE_HEADER: f"3,{len(API_FEATURES)}"}
+
+    resp = client.post("/batch-predict", data=body, headers=headers)
+
+    assert resp.status_code == 400
+    assert "Content-Length" in resp.get_json()["message"]
+
+
+def test_packed_round_trip_through_endpoint(client, make_vitals):
+    body = encode_packed_float32(make_vitals(3))
+    headers = {"Content-Type": PACKED_CONTENT_TYPE, SHAPE_HEADER: f"3,{len(API_FEATURES)}"}
+
+    resp = client.post("/batch-predict", data=body, headers=headers)
+
+    assert resp.status_code == 200
+    assert len(resp.get_data()) == 3 * 4
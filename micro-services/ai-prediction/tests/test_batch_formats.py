@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.batch_formats import (
+    PACKED_DTYPE,
+    encode_packed_float32,
+    is_columnar_json,
+    parse_columnar_json,
+    parse_packed_float32,
+    parse_packed_shape,
+)
+from src.config import API_FEATURES
+
+
+def test_columnar_json_round_trip(make_vitals):
+    matrix = make_vitals(5)
+    body = {
+        "columns": {name: matrix[:, i].tolist() for i, name in enumerate(API_FEATURES)},
+        "timestamps": [f"t{i}" for i in range(5)],
+    }
+
+    assert is_columnar_json(body)
+    features, timestamps = parse_columnar_json(body)
+
+    np.testing.assert_array_equal(features, matrix)
+    assert timestamps == ["t0", "t1", "t2", "t3", "t4"]
+
+
+def test_columnar_json_rejects_missing_column(make_vitals):
+    matrix = make_vitals(2)
+    columns = {name: matrix[:, i].tolist() for i, name in enumerate(API_FEATURES)}
+    columns.pop("spo2")
+    with pytest.raises(ValueError, match="spo2"):
+        parse_columnar_json({"columns": columns})
+
+
+def test_packed_float32_round_trip(make_vitals):
+    matrix = make_vitals(4)
+    body = encode_packed_float32(matrix)
+    header = f"4,{len(API_FEATURES)}"
+
+    n_rows = parse_packed_shape(header, len(body))
+    features = parse_packed_float32(body, n_rows)
+
+    assert features.shape == (4, len(API_FEATURES))
+    np.testing.assert_array_equal(features, matrix.astype(PACKED_DTYPE))
+
+
+def test_packed_probabilities_round_trip():
+    probabilities = np.asarray([0.0, 0.25, 0.5, 1.0])
+    decoded = np.frombuffer(encode_packed_float32(probabilities), dtype=PACKED_DTYPE)
+    np.testing.assert_array_equal(decoded, probabilities)
+
+
+def test_packed_rejects_non_finite(make_vitals):
+    matrix = make_vitals(2)
+    matrix[1, 3] = np.nan
+    body = encode_packed_float32(matrix)
+    with pytest.raises(ValueError):
+        parse_packed_float32(body, 2)
+
+
+def test_columnar_json_rejects_scalar_columns(make_vitals):
+    columns = {name: float(value) for name, value in zip(API_FEATURES, make_vitals(1)[0])}
+    with pytest.raises(ValueError, match="arreglo"):
+        parse_columnar_json({"columns": columns})
+
+
+def test_packed_shape_checked_against_content_length():
+    header = f"2,{len(API_FEATURES)}"
+    expected = 2 * len(API_FEATURES) * PACKED_DTYPE.itemsize
+
+    assert parse_packed_shape(header, expected) == 2
+    for content_length in (None, expected - 4, expected + 4):
+        with pytest.raises(ValueError, match="Content-Length"):
+            parse_packed_shape(header, content_length)
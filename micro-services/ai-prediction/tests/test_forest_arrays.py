@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from src.ml.forest_arrays import ForestArrays, export_model
+
+
+def test_flattened_forest_matches_sklearn(forest_model, make_vitals):
+    X = make_vitals(500, seed=7)
+    expected = forest_model.predict_proba(X)
+
+    np.testing.assert_allclose(ForestArrays.from_model(forest_model).predict_proba(X), expected)
+
+
+def test_exported_bundle_matches_sklearn(forest_model, make_vitals, tmp_path):
+    X = make_vitals(200, seed=8)
+    forest = export_model(forest_model, tmp_path / "bundle")
+
+    assert forest.path == tmp_path / "bundle"
+    assert isinstance(forest.children_left, np.memmap)
+    np.testing.assert_allclose(forest.predict_proba(X), forest_model.predict_proba(X))
+
+
+def test_predict_proba_rejects_wrong_shape(forest_model):
+    forest = ForestArrays.from_model(forest_model)
+    with pytest.raises(ValueError):
+        forest.predict_proba(np.zeros((3, 4)))
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pytest
+
+from src.ml.forest_arrays import export_model
+from src.ml.inference_pool import InferencePool, _PendingResult
+
+
+@pytest.fixture
+def pool(forest_model, tmp_path):
+    bundle = export_model(forest_model, tmp_path / "bundle").path
+    pool = InferencePool(bundle, workers=1, timeout=10.0).start()
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_matches_in_process_forest(pool, forest_model, make_vitals):
+    X = make_vitals(64, seed=3)
+    np.testing.assert_allclose(pool.predict_proba(X), forest_model.predict_proba(X))
+
+
+def test_dead_worker_is_respawned(pool, forest_model, make_vitals):
+    pool._processes[0].kill()
+    pool._processes[0].join(5)
+
+    X = make_vitals(8, seed=4)
+    np.testing.assert_allclose(pool.predict_proba(X), forest_model.predict_proba(X))
+    worker = pool.stats()["workers"][0]
+    assert worker["alive"] is True
+    assert worker["restarts"] == 1
+
+
+def test_pending_task_of_dead_worker_fails_fast(pool):
+    process = pool._processes[0]
+    with pool._lock:
+        pending = _PendingResult(0)
+        pool._pending[next(pool._ids)] = pending
+        pool._in_flight[0] += 1
+    process.kill()
+    process.join(5)
+
+    started = time.monotonic()
+    assert pool._wait(pending) is True
+    assert time.monotonic() - started < 2.0
+    assert "terminó" in pending.error
+    assert pool.stats()["workers"][0]["in_flight"] == 0
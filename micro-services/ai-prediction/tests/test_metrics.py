@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from flask import Flask
+
+from src.metrics import StageHistograms, histograms, init_stage_metrics, stage_timer
+
+
+def test_server_timing_header_and_histograms():
+    app = Flask(__name__)
+    init_stage_metrics(app)
+
+    @app.route("/ping")
+    def ping():
+        with stage_timer("parse"):
+            pass
+        with stage_timer("parse"):
+            pass
+        return "ok"
+
+    response = app.test_client().get("/ping")
+
+    stages = [part.split(";")[0] for part in response.headers["Server-Timing"].split(", ")]
+    assert stages == ["parse", "total"]
+    assert 'ai_prediction_requests_total{endpoint="ping",status="200"}' in histograms.render_prometheus()
+
+
+def test_histogram_buckets_are_cumulative():
+    series = StageHistograms(buckets=(1, 10))
+    for value in (0.5, 5, 50):
+        series.observe("predict", {"predict_proba": value}, 200)
+
+    text = series.render_prometheus()
+    assert 'stage="predict_proba",le="1"} 1' in text
+    assert 'stage="predict_proba",le="10"} 2' in text
+    assert 'stage="predict_proba",le="+Inf"} 3' in text
+    assert 'ai_prediction_stage_duration_ms_count{endpoint="predict",stage="predict_proba"} 3' in text
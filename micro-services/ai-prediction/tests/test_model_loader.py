@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import pytest
+
+from src.ml.model_loader import model_version_key
+
+
+def test_reload_activates_new_version(loader, model_paths):
+    first, second = model_paths
+    loader.load_model(first)
+    loader.reload_model(second)
+
+    assert loader.get_active_version().version == model_version_key(second)
+    assert [v["active"] for v in loader.get_model_info()["versions"]] == [False, True]
+
+
+def test_rollback_restores_previous_version(loader, model_paths):
+    first, second = model_paths
+    loader.load_model(first)
+    loader.reload_model(second)
+
+    restored = loader.rollback()
+
+    assert restored.version == model_version_key(first)
+    assert loader.get_active_version() is restored
+    # Sin más historial no hay a dónde regresar
+    with pytest.raises(RuntimeError):
+        loader.rollback()
+    assert loader.get_active_version() is restored
+
+
+def test_failed_reload_keeps_active_version(loader, model_paths, tmp_path):
+    loader.load_model(model_paths[0])
+    active = loader.get_active_version()
+
+    broken = tmp_path / "roto.pkl"
+    broken.write_bytes(b"no es un pickle")
+    with pytest.raises(Exception):
+        loader.reload_model(broken)
+
+    assert loader.get_active_version() is active
+
+
+def test_background_reload_reports_ready(loader, model_paths):
+    loader.load_model(model_paths[0])
+    loader.reload_in_background(model_paths[1])
+
+    state = loader.wait_for_reload(timeout=30)
+
+    assert state["status"] == "ready"
+    assert state["version"] == model_version_key(model_paths[1])
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+from src.config import API_FEATURES, WARMUP_SAMPLE
+from src.ml.predictor import HealthPredictor
+
+
+def _reading(**overrides):
+    reading = dict(zip(API_FEATURES, WARMUP_SAMPLE))
+    reading["timestamp"] = overrides.pop("timestamp", "2025-01-01T00:00:00Z")
+    reading.update(overrides)
+    return reading
+
+
+def test_batch_predict_reports_invalid_readings_per_entry(loader, model_paths):
+    loader.load_model(model_paths[0])
+    predictor = HealthPredictor()
+    readings = [
+        _reading(timestamp="ok-1"),
+        _reading(timestamp="texto", heart_rate="abc"),
+        _reading(timestamp="nulo", spo2=None),
+        {"timestamp": "incompleta", "heart_rate": 80},
+        _reading(timestamp="ok-2", heart_rate=130, temperature=39.5),
+    ]
+
+    # threshold 0 fuerza la generación de alertas en todas las lecturas válidas
+    result = predictor.batch_predict(readings, threshold=0.0)
+
+    predictions = result["predictions"]
+    assert [p["timestamp"] for p in predictions] == ["ok-1", "texto", "nulo", "incompleta", "ok-2"]
+    for index in (1, 2, 3):
+        assert "error" in predictions[index]
+        assert "probability" not in predictions[index]
+    for index in (0, 4):
+        assert predictions[index]["has_problem"] is True
+        assert predictions[index]["alerts"]
+    assert {a["type"] for a in predictions[4]["alerts"]} >= {"ARRHYTHMIA", "FEVER"}
+    assert result["summary"]["total"] == 5
+    assert result["summary"]["problems_detected"] == 2
+
+
+def test_batch_predict_guards_alert_generation(loader, model_paths):
+    loader.load_model(model_paths[0])
+    predictor = HealthPredictor()
+
+    # "75" es convertible para el bosque, pero no se puede comparar al generar alertas
+    result = predictor.batch_predict([_reading(heart_rate="75"), _reading()], threshold=0.0)
+
+    assert "error" in result["predictions"][0]
+    assert result["predictions"][1]["has_problem"] is True
+    assert result["summary"]["problems_detected"] == 1
@@ -0,0 +1 @@
+"""Utilidades compartidas por los microservicios Flask de HeartGuard."""
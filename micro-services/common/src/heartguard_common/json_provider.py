@@ -0,0 +1,60 @@
+"""Proveedor JSON de Flask: orjson si está instalado y tipos nativos de la BD."""
+from __future__ import annotations
+
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from flask import Response
+from flask.json.provider import JSONProvider
+
+try:  # orjson es opcional: sin él se usa json de la stdlib con las mismas reglas
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Tipos que no son JSON nativo: fechas en ISO 8601, UUID como texto, Decimal como número."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, "__html__"):
+        return str(value.__html__())
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(JSONProvider):
+    """
+    Serializa jsonify/success_response sin pasar por json de la stdlib.
+
+    Los formateadores pueden devolver datetime, UUID y Decimal tal cual. Las
+    claves se emiten en el orden de inserción (sin ordenar).
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return self._encode(obj).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is not None:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encode(obj) + b"\n", mimetype="application/json")
+
+    def _encode(self, obj: Any) -> bytes:
+        pretty = self._app.debug
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+            return orjson.dumps(obj, default=_default, option=option)
+        separators = None if pretty else (",", ":")
+        return json.dumps(obj, default=_default, ensure_ascii=False, indent=2 if pretty else None, separators=separators).encode("utf-8")
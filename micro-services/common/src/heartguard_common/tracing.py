@@ -0,0 +1,186 @@
+"""Trazas distribuidas: spans de la petición y de sus operaciones (PostgreSQL, InfluxDB, HTTP...)."""
+from __future__ import annotations
+
+import json
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Iterator
+
+from flask import Flask, Response, abort, current_app, g, has_request_context, jsonify, request
+
+TRACE_HEADER = "X-Trace-ID"
+PARENT_SPAN_HEADER = "X-Parent-Span-ID"
+SERVER_TIMING_HEADER = "Server-Timing"
+
+# Tipos de span que se resumen en Server-Timing para el gateway, salvo que el
+# servicio indique los suyos en `init_tracing`
+REPORTED_KINDS = ("db", "http")
+
+_ID_RE = re.compile(r"^[A-Za-z0-9-]{8,64}$")
+
+
+@dataclass
+class Span:
+    """Operación medida dentro de una traza."""
+
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    service: str
+    name: str
+    kind: str
+    start: float
+    duration_ms: float
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+
+class RequestTrace:
+    """Spans de la petición en curso; cuelgan del span del gateway (X-Parent-Span-ID)."""
+
+    def __init__(self, service: str, trace_id: str, parent_id: str | None) -> None:
+        self.service = service
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.span_id = secrets.token_hex(8)
+        self.start = time.time()
+        self.started = time.perf_counter()
+        self.spans: list[Span] = []
+
+
+class SpanStore:
+    """Últimas `max_traces` trazas en memoria y, con `export_path`, cada span como línea JSON."""
+
+    def __init__(self, max_traces: int = 200, export_path: str | None = None) -> None:
+        self.max_traces = max_traces
+        self.export_path = export_path
+        self._lock = threading.Lock()
+        self._traces: OrderedDict[str, list[Span]] = OrderedDict()
+
+    def export(self, spans: list[Span]) -> None:
+        trace_id = spans[0].trace_id
+        with self._lock:
+            self._traces.setdefault(trace_id, []).extend(spans)
+            self._traces.move_to_end(trace_id)
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+            if self.export_path:
+                with open(self.export_path, "a", encoding="utf-8") as export_file:
+                    export_file.writelines(json.dumps(asdict(span)) + "\n" for span in spans)
+
+    def recent(self) -> list[list[Span]]:
+        with self._lock:
+            return [list(spans) for spans in reversed(self._traces.values())]
+
+
+@contextmanager
+def span(name: str, kind: str, **attributes: Any) -> Iterator[str | None]:
+    """
+    Mide una operación como span hijo de la petición actual.
+
+    Fuera de una petición (hilos de fondo) no registra nada.
+
+    Yields:
+        ID del span, para propagarlo en llamadas HTTP salientes (`trace_headers`)
+    """
+    trace: RequestTrace | None = g.get("trace") if has_request_context() else None
+    if trace is None:
+        yield None
+        return
+
+    span_id = secrets.token_hex(8)
+    start, started = time.time(), time.perf_counter()
+    try:
+        yield span_id
+    except Exception as exc:
+        attributes["error"] = type(exc).__name__
+        raise
+    finally:
+        trace.spans.append(Span(
+            trace.trace_id, span_id, trace.span_id, trace.service, name, kind,
+            start, (time.perf_counter() - started) * 1000, attributes,
+        ))
+
+
+def trace_headers(span_id: str | None) -> dict[str, str]:
+    """Headers para propagar la traza en una llamada HTTP hecha dentro de `span`."""
+    trace: RequestTrace | None = g.get("trace") if has_request_context() else None
+    if trace is None or span_id is None:
+        return {}
+    return {TRACE_HEADER: trace.trace_id, PARENT_SPAN_HEADER: span_id}
+
+
+def init_tracing(app: Flask, service: str, reported_kinds: tuple[str, ...] = REPORTED_KINDS) -> SpanStore:
+    """
+    Registra las trazas por petición y, con TRACING_DEBUG_VIEW, la vista /debug/traces.
+
+    Args:
+        app: Aplicación Flask con TRACING_MAX_TRACES, TRACING_EXPORT_PATH y TRACING_DEBUG_VIEW
+        service: Nombre del servicio en los spans
+        reported_kinds: Tipos de span que se resumen en Server-Timing
+    """
+    store = SpanStore(app.config["TRACING_MAX_TRACES"], app.config["TRACING_EXPORT_PATH"] or None)
+    app.extensions["tracing"] = store
+
+    @app.before_request
+    def _start_trace() -> None:
+        incoming = request.headers.get(TRACE_HEADER, "")
+        parent = request.headers.get(PARENT_SPAN_HEADER, "")
+        trace_id = incoming if _ID_RE.match(incoming) else secrets.token_hex(16)
+        g.trace = RequestTrace(service, trace_id, parent if _ID_RE.match(parent) else None)
+        g.trace_id = trace_id
+
+    @app.after_request
+    def _finish_trace(response: Response) -> Response:
+        trace: RequestTrace | None = g.pop("trace", None)
+        if trace is None:
+            return response
+        total_ms = (time.perf_counter() - trace.started) * 1000
+        rule = request.url_rule.rule if request.url_rule is not None else request.path
+        root = Span(
+            trace.trace_id, trace.span_id, trace.parent_id, service, f"{request.method} {rule}", "server",
+            trace.start, total_ms, {"status": response.status_code, "path": request.path},
+        )
+        store.export([root, *trace.spans])
+        response.headers[TRACE_HEADER] = trace.trace_id
+        response.headers[SERVER_TIMING_HEADER] = server_timing(trace.spans, total_ms, reported_kinds)
+        return response
+
+    if app.config["TRACING_DEBUG_VIEW"]:
+        app.add_url_rule("/debug/traces", "debug_traces", _debug_traces)
+    return store
+
+
+def server_timing(spans: list[Span], total_ms: float, kinds: tuple[str, ...] = REPORTED_KINDS) -> str:
+    """Tiempo por tipo de operación: `db;dur=12.5;desc="3 ops", ..., total;dur=40.1`."""
+    metrics = []
+    for kind in kinds:
+        durations = [item.duration_ms for item in spans if item.kind == kind]
+        if durations:
+            metrics.append(f'{kind};dur={sum(durations):.2f};desc="{len(durations)} ops"')
+    metrics.append(f"total;dur={total_ms:.2f}")
+    return ", ".join(metrics)
+
+
+def _debug_traces():
+    """Trazas recientes del servicio, las más lentas primero."""
+    if not current_app.config["TRACING_DEBUG_VIEW"]:
+        abort(404)
+    min_ms = request.args.get("min_ms", default=0.0, type=float)
+    traces = []
+    for spans in current_app.extensions["tracing"].recent():
+        roots = [item for item in spans if item.kind == "server"]
+        duration = max((item.duration_ms for item in roots), default=0.0)
+        if duration < min_ms:
+            continue
+        traces.append({
+            "trace_id": spans[0].trace_id,
+            "duration_ms": round(duration, 3),
+            "spans": [asdict(item) for item in sorted(spans, key=lambda item: item.start)],
+        })
+    traces.sort(key=lambda trace: trace["duration_ms"], reverse=True)
+    return jsonify({"traces": traces[:request.args.get("limit", default=50, type=int)]})
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+
+import pytest
+from flask import Flask
+from markupsafe import Markup
+
+from heartguard_common import json_provider
+from heartguard_common.json_provider import FastJSONProvider
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def app(request, monkeypatch):
+    if request.param == "orjson":
+        if json_provider.orjson is None:
+            pytest.skip("orjson no está instalado")
+    else:
+        monkeypatch.setattr(json_provider, "orjson", None)
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+
+def test_database_types_are_encoded(app):
+    record_id = uuid.uuid4()
+    data = {
+        "id": record_id,
+        "created_at": datetime(2025, 3, 1, 12, 30, 5, 250000, tzinfo=timezone.utc),
+        "last_seen_at": datetime(2025, 3, 1, 12, 30, 5),
+        "birth_date": date(1990, 7, 14),
+        "shift_start": time(8, 15),
+        "latitude": Decimal("19.432608"),
+        "tags": {"ecg"},
+        "label": Markup("<b>alta</b>"),
+        "nombre": "María",
+    }
+    with app.app_context():
+        decoded = app.json.loads(app.json.dumps(data))
+
+    assert decoded == {
+        "id": str(record_id),
+        "created_at": "2025-03-01T12:30:05.250000+00:00",
+        "last_seen_at": "2025-03-01T12:30:05",
+        "birth_date": "1990-07-14",
+        "shift_start": "08:15:00",
+        "latitude": 19.432608,
+        "tags": ["ecg"],
+        "label": "<b>alta</b>",
+        "nombre": "María",
+    }
+
+
+def test_response_is_utf8_json_with_trailing_newline(app):
+    with app.test_request_context():
+        response = app.json.response({"nombre": "María", "total": Decimal("2")})
+
+    assert response.mimetype == "application/json"
+    assert response.get_data() == '{"nombre":"María","total":2.0}\n'.encode("utf-8")
+
+
+def test_keys_keep_insertion_order_and_non_string_keys(app):
+    with app.app_context():
+        assert app.json.dumps({"b": 1, "a": 2}) == '{"b":1,"a":2}'
+        assert app.json.loads(app.json.dumps({1: "uno"})) == {"1": "uno"}
+
+
+def test_debug_output_is_indented(app):
+    app.debug = True
+    with app.app_context():
+        assert app.json.dumps({"a": 1}) == '{\n  "a": 1\n}'
+
+
+def test_unsupported_type_raises(app):
+    with app.app_context():
+        with pytest.raises(TypeError):
+            app.json.dumps({"value": object()})
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from flask import Flask
+
+from heartguard_common.tracing import (
+    PARENT_SPAN_HEADER,
+    SERVER_TIMING_HEADER,
+    TRACE_HEADER,
+    init_tracing,
+    span,
+    trace_headers,
+)
+
+
+def _app(reported_kinds=None, **config) -> Flask:
+    app = Flask(__name__)
+    app.config.update({"TRACING_MAX_TRACES": 2, "TRACING_EXPORT_PATH": "", "TRACING_DEBUG_VIEW": False, **config})
+    if reported_kinds is None:
+        init_tracing(app, "test-service")
+    else:
+        init_tracing(app, "test-service", reported_kinds=reported_kinds)
+
+    @app.get("/work")
+    def work():
+        with span("SELECT", "db"):
+            pass
+        with span("query", "influxdb"):
+            pass
+        with span("GET user", "http") as span_id:
+            return trace_headers(span_id)
+
+    return app
+
+
+def test_spans_hang_from_the_gateway_span():
+    app = _app()
+    with app.test_client() as client:
+        response = client.get("/work", headers={TRACE_HEADER: "trace-abc-123", PARENT_SPAN_HEADER: "gateway-span-1"})
+
+    assert response.headers[TRACE_HEADER] == "trace-abc-123"
+    assert response.get_json()[TRACE_HEADER] == "trace-abc-123"
+    (spans,) = app.extensions["tracing"].recent()
+    root, *children = spans
+    assert (root.kind, root.name, root.parent_id) == ("server", "GET /work", "gateway-span-1")
+    assert [item.kind for item in children] == ["db", "influxdb", "http"]
+    assert {item.parent_id for item in children} == {root.span_id}
+    assert response.get_json()[PARENT_SPAN_HEADER] == children[-1].span_id
+
+
+@pytest.mark.parametrize(
+    ("reported_kinds", "expected"),
+    [(None, ["db", "http", "total"]), (("db", "influxdb"), ["db", "influxdb", "total"])],
+)
+def test_server_timing_reports_the_service_kinds(reported_kinds, expected):
+    app = _app(reported_kinds)
+    with app.test_client() as client:
+        header = client.get("/work").headers[SERVER_TIMING_HEADER]
+
+    assert [metric.split(";")[0] for metric in header.split(", ")] == expected
+    assert 'desc="1 ops"' in header
+
+
+def test_invalid_trace_id_is_replaced_and_store_is_bounded():
+    app = _app()
+    with app.test_client() as client:
+        responses = [client.get("/work", headers={TRACE_HEADER: "bad id!"}) for _ in range(3)]
+
+    trace_ids = [response.headers[TRACE_HEADER] for response in responses]
+    assert all(len(trace_id) == 32 for trace_id in trace_ids)
+    assert [spans[0].trace_id for spans in app.extensions["tracing"].recent()] == trace_ids[:0:-1]
+
+
+def test_export_and_debug_view(tmp_path):
+    export_path = tmp_path / "spans.jsonl"
+    app = _app(TRACING_EXPORT_PATH=str(export_path), TRACING_DEBUG_VIEW=True)
+    with app.test_client() as client:
+        client.get("/work", headers={TRACE_HEADER: "trace-abc-123"})
+        traces = client.get("/debug/traces").get_json()["traces"]
+
+    exported = [json.loads(line) for line in export_path.read_text().splitlines()]
+    assert [item["kind"] for item in exported if item["trace_id"] == "trace-abc-123"] == ["server", "db", "influxdb", "http"]
+    assert traces[0]["trace_id"] == "trace-abc-123"
+    assert len(traces[0]["spans"]) == 4
+
+
+def test_span_outside_a_request_records_nothing():
+    with span("SELECT", "db") as span_id:
+        assert span_id is None
+    assert trace_headers(span_id) == {}
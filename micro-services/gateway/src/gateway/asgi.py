@@ -0,0 +1,547 @@
+"""
+Motor asíncrono (ASGI) del gateway.
+
+Sirve la misma aplicación Flask y su tabla de blueprints, pero las llamadas de
+los proxies en streaming se ejecutan con aiohttp sobre asyncio: un hilo solo se
+ocupa mientras Flask resuelve la ruta, no mientras se espera al microservicio.
+Cada servicio upstream tiene su propio límite de peticiones simultáneas, de
+modo que un servicio lento no deja sin capacidad a los demás.
+
+Uso:
+    uvicorn gateway.asgi:create_asgi_app --factory --host 0.0.0.0 --port 8080
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Any, AsyncIterator, Awaitable, Callable, Mapping
+
+import aiohttp
+from flask import Flask
+from werkzeug.exceptions import HTTPException
+
+from .app import create_app
+from .services.async_upstream import CoalescedResponse, DeferredResponse, DeferringRegistry, UpstreamCall
+from .services.compression import EXTENSION_KEY as COMPRESSION_KEY, StreamCompressor
+from .services.http_sessions import EXTENSION_KEY, UPSTREAM_SERVICES
+from .services.rate_limit import RATE_LIMITER_KEY
+from .services.response_cache import cached_response_headers
+from .services.single_flight import ASYNC_ENVIRON_KEY, BYPASS_ENVIRON_KEY
+from .services.tracing import SERVER_TIMING_HEADER
+
+logger = logging.getLogger(__name__)
+
+Scope = dict[str, Any]
+Receive = Callable[[], Awaitable[dict[str, Any]]]
+Send = Callable[[dict[str, Any]], Awaitable[None]]
+Headers = list[tuple[str, str]]
+
+# Servicio upstream de cada blueprint; las rutas propias del gateway (health, 404)
+# usan su propio límite
+BLUEPRINT_SERVICES = {
+    "auth": "auth",
+    "admin": "admin",
+    "user": "user",
+    "patient": "patient",
+    "media": "media",
+    "realtime": "realtime",
+    "ai_proxy": "ai",
+}
+LOCAL_SERVICE = "gateway"
+
+# Servicios cuyos proxies son transparentes (devuelven `streamed_response` sin
+# mirar la respuesta): sus llamadas se ejecutan en el loop. Realtime convierte
+# los errores HTTP del upstream y auth/admin leen el JSON, así que siguen en su
+# pool de hilos.
+DEFERRED_SERVICES = ("user", "patient", "media", "ai")
+
+
+class RequestBody:
+    """
+    Cuerpo de la petición ASGI.
+
+    Flask lo lee como `wsgi.input` desde su hilo; los proxies en streaming lo
+    consumen directamente en el loop con `chunks()`, sin pasar por un hilo.
+    """
+
+    def __init__(self, receive: Receive, loop: asyncio.AbstractEventLoop) -> None:
+        self._receive = receive
+        self._loop = loop
+        self._buffer = bytearray()
+        self._more = True
+
+    async def _next_chunk(self) -> bytes:
+        if not self._more:
+            return b""
+        message = await self._receive()
+        if message["type"] == "http.disconnect":
+            self._more = False
+            return b""
+        self._more = message.get("more_body", False)
+        return message.get("body", b"")
+
+    def _fill(self) -> None:
+        """Espera (desde el hilo de Flask) al siguiente bloque del cliente."""
+        if self._loop.is_running() and _in_loop_thread(self._loop):
+            raise RuntimeError("El cuerpo de un proxy diferido no puede leerse desde el loop")
+        chunk = asyncio.run_coroutine_threadsafe(self._next_chunk(), self._loop).result()
+        self._buffer += chunk
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            while self._more:
+                self._fill()
+            size = len(self._buffer)
+        elif not self._buffer and self._more:
+            self._fill()
+
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def readline(self, size: int = -1) -> bytes:
+        while b"\n" not in self._buffer and self._more:
+            self._fill()
+        end = self._buffer.find(b"\n") + 1 or len(self._buffer)
+        if size is not None and size >= 0:
+            end = min(end, size)
+        data = bytes(self._buffer[:end])
+        del self._buffer[:end]
+        return data
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        if self._buffer:
+            yield bytes(self._buffer)
+            self._buffer.clear()
+        while self._more:
+            chunk = await self._next_chunk()
+            if chunk:
+                yield chunk
+
+
+def _in_loop_thread(loop: asyncio.AbstractEventLoop) -> bool:
+    try:
+        return asyncio.get_running_loop() is loop
+    except RuntimeError:
+        return False
+
+
+def build_environ(scope: Scope, body: RequestBody) -> dict[str, Any]:
+    """Entorno WSGI equivalente a un scope HTTP de ASGI."""
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ: dict[str, Any] = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode().decode("latin-1"),
+        "PATH_INFO": scope["path"].encode().decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        # El servidor ASGI ya delimita el cuerpo (Content-Length o chunked)
+        "wsgi.input_terminated": True,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        ASYNC_ENVIRON_KEY: True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        key = name if name in {"CONTENT_TYPE", "CONTENT_LENGTH"} else f"HTTP_{name}"
+        value = raw_value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class AsyncGateway:
+    """Aplicación ASGI que despacha con Flask y reenvía con aiohttp."""
+
+    def __init__(self, app: Flask) -> None:
+        self.app = app
+        # Las vistas siguen usando get_session(); el streaming queda diferido
+        app.extensions[EXTENSION_KEY] = DeferringRegistry(app.extensions[EXTENSION_KEY], DEFERRED_SERVICES)
+        # Los hooks before_request también corren en el loop: con el límite de
+        # tasa en redis (llamada síncrona) todas las vistas pasan por su pool de hilos
+        limiter = app.extensions.get(RATE_LIMITER_KEY)
+        self.inline_services = () if limiter is not None and limiter.blocking else DEFERRED_SERVICES
+
+        default_limit = app.config["ASYNC_MAX_CONCURRENCY"]
+        limits = app.config["SERVICE_CONCURRENCY"]
+        self.queue_timeout: float = app.config["ASYNC_QUEUE_TIMEOUT"]
+        self.limits = {
+            service: limits.get(service, default_limit)
+            for service in (*UPSTREAM_SERVICES, LOCAL_SERVICE)
+        }
+        self._semaphores = {service: asyncio.Semaphore(limit) for service, limit in self.limits.items()}
+        # Un pool de hilos por servicio: las llamadas síncronas (auth, admin) de un
+        # servicio lento no pueden ocupar los hilos del resto
+        self._executors = {
+            service: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"gateway-{service}")
+            for service, limit in self.limits.items()
+        }
+        self._clients: dict[str, aiohttp.ClientSession] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._handle(scope, receive, send)
+
+    async def aclose(self) -> None:
+        for session in self._clients.values():
+            await session.close()
+        self._clients.clear()
+        for executor in self._executors.values():
+            executor.shutdown(wait=False)
+        self.app.extensions[EXTENSION_KEY].close()
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.aclose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        loop = asyncio.get_running_loop()
+        body = RequestBody(receive, loop)
+        environ = build_environ(scope, body)
+        service = self._service_for(environ)
+
+        semaphore = self._semaphores[service]
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Servicio %s saturado (%d peticiones en curso)", service, self.limits[service])
+            await _send_json(
+                send,
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": "service_busy", "message": f"El servicio {service} está saturado, intenta de nuevo"},
+                [("Retry-After", "1")],
+            )
+            return
+
+        try:
+            status, headers, result = await self._run(service, environ)
+            if isinstance(result, CoalescedResponse):
+                flight = result.flight
+                try:
+                    shared = await flight.wait_async(flight.deadline - time.monotonic())
+                finally:
+                    # Libera lo registrado con call_on_close (p. ej. el cupo del load shedder)
+                    result.close()
+                if shared is not None:
+                    shared_headers = [
+                        *shared.headers,
+                        ("Content-Length", str(len(shared.body))),
+                        ("X-Coalesced", "true"),
+                        *headers,
+                    ]
+                    await _send_response(send, shared.status, shared_headers, shared.body)
+                    return
+                # El líder no pudo compartir su respuesta: petición propia
+                environ[BYPASS_ENVIRON_KEY] = True
+                status, headers, result = await self._run(service, environ)
+
+            if isinstance(result, DeferredResponse):
+                try:
+                    await self._forward(result, headers, body, send)
+                finally:
+                    if result.flight is not None:
+                        # Sin respuesta completa (error o corte) los seguidores no esperan más
+                        result.flight.abandon()
+                    result.close()
+            else:
+                await _send_response(send, status, headers, result)
+        finally:
+            semaphore.release()
+
+    async def _run(
+        self, service: str, environ: dict[str, Any]
+    ) -> tuple[int, Headers, bytes | DeferredResponse | CoalescedResponse]:
+        if service in self.inline_services:
+            # Sus vistas y hooks no hacen E/S bloqueante: se resuelven en el
+            # loop, sin saltar a un hilo ni competir por el GIL
+            return self._dispatch(environ)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executors[service], self._dispatch, environ)
+
+    def _service_for(self, environ: dict[str, Any]) -> str:
+        """Servicio upstream de la ruta, según el blueprint que la atiende."""
+        adapter = self.app.url_map.bind_to_environ(environ)
+        try:
+            endpoint, _ = adapter.match()
+        except HTTPException:
+            return LOCAL_SERVICE
+        return BLUEPRINT_SERVICES.get(endpoint.rpartition(".")[0], LOCAL_SERVICE)
+
+    def _dispatch(self, environ: dict[str, Any]) -> tuple[int, Headers, bytes | DeferredResponse | CoalescedResponse]:
+        """
+        Ejecuta la petición en Flask (mismo flujo que `Flask.wsgi_app`).
+
+        Returns:
+            (status, headers, cuerpo) o, si la vista difirió la llamada upstream,
+            los headers añadidos por Flask (CORS) y la respuesta diferida
+        """
+        app = self.app
+        ctx = app.request_context(environ)
+        error: BaseException | None = None
+        try:
+            try:
+                ctx.push()
+                response = app.full_dispatch_request()
+            except Exception as exc:
+                error = exc
+                response = app.handle_exception(exc)
+            except:  # noqa: E722 - mismo manejo que Flask.wsgi_app
+                error = sys.exc_info()[1]
+                raise
+
+            if isinstance(response, (DeferredResponse, CoalescedResponse)):
+                headers = [
+                    (name, value)
+                    for name, value in response.headers.items()
+                    if name.lower() not in {"content-type", "content-length"}
+                ]
+                return response.status_code, headers, response
+
+            started: dict[str, Any] = {}
+
+            def start_response(status: str, headers: Headers, exc_info: Any = None) -> None:
+                started["status"] = int(status.split(" ", 1)[0])
+                started["headers"] = headers
+
+            app_iter = response(environ, start_response)
+            try:
+                content = b"".join(app_iter)
+            finally:
+                if hasattr(app_iter, "close"):
+                    app_iter.close()
+            return started["status"], started["headers"], content
+        finally:
+            ctx.pop(error)
+
+    async def _forward(self, deferred: DeferredResponse, extra_headers: Headers, body: RequestBody, send: Send) -> None:
+        """
+        Ejecuta la llamada diferida y reenvía la respuesta bloque a bloque.
+
+        Con `cache_fill` el cuerpo se guarda en la caché de respuestas y un 304
+        del upstream se responde con la entrada revalidada; con `flight` la
+        respuesta se publica para las peticiones coalescidas. Con `encoding` el
+        cuerpo se comprime al vuelo si el upstream lo envió sin codificar.
+        """
+        call, cache_fill, flight = deferred.call, deferred.cache_fill, deferred.flight
+        sinks = [sink for sink in (cache_fill, flight) if sink is not None]
+        headers = dict(call.headers or {})
+        data: Any = call.data
+        if call.data is not None and not isinstance(call.data, (bytes, str)):
+            # Stream sobre el cuerpo entrante: se lee directamente del cliente
+            length = len(call.data) if hasattr(call.data, "__len__") else 0
+            if length:
+                headers["Content-Length"] = str(length)
+            data = body.chunks()
+
+        breaker = self.app.extensions[EXTENSION_KEY].breaker(call.service)
+        if not breaker.allow():
+            await _send_json(
+                send,
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": "service_unavailable", "message": f"El servicio {call.service} no está disponible"},
+                [*extra_headers, ("Retry-After", str(max(1, round(breaker.retry_after()))))],
+            )
+            return
+
+        wall_start, started = time.time(), time.monotonic()
+        try:
+            upstream = await self._open(call, headers, data)
+        except asyncio.TimeoutError:
+            breaker.record(time.monotonic() - started, failed=True, route=call.route)
+            _trace_call(call, wall_start, time.monotonic() - started, error="Timeout")
+            logger.error("Timeout al conectar con %s: %s", call.service, call.url)
+            await _send_json(
+                send,
+                HTTPStatus.GATEWAY_TIMEOUT,
+                {"error": "timeout", "message": f"El servicio {call.service} no respondió a tiempo"},
+                extra_headers,
+            )
+            return
+        except aiohttp.ClientError as exc:
+            breaker.record(time.monotonic() - started, failed=True, route=call.route)
+            _trace_call(call, wall_start, time.monotonic() - started, error=type(exc).__name__)
+            logger.error("Error de conexión con %s: %s (%s)", call.service, call.url, exc)
+            await _send_json(
+                send,
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                {"error": "service_unavailable", "message": f"El servicio {call.service} no está disponible"},
+                extra_headers,
+            )
+            return
+
+        breaker.record(time.monotonic() - started, failed=upstream.status >= 500, route=call.route)
+        _trace_call(
+            call, wall_start, time.monotonic() - started,
+            status=upstream.status, server_timing=upstream.headers.get(SERVER_TIMING_HEADER),
+        )
+
+        try:
+            if cache_fill is not None and upstream.status == HTTPStatus.NOT_MODIFIED:
+                entry = cache_fill.not_modified()
+                if entry is not None:
+                    extra = [(name, value) for name, value in extra_headers if name.lower() != "x-cache"]
+                    headers_cached = cached_response_headers(entry, "REVALIDATED")
+                    headers_cached.append(("Content-Length", str(len(entry.body))))
+                    await _send_response(send, entry.status, headers_cached + extra, entry.body)
+                    if flight is not None:
+                        flight.feed(entry.body)
+                        flight.finish(entry.status, headers_cached)
+                    return
+
+            headers_out = [
+                (name.lower(), value)
+                for name, value in upstream.raw_headers
+                if name.decode("latin-1").lower() not in deferred.excluded_headers
+            ]
+            compressor = self._compressor(deferred, upstream)
+            if compressor is not None:
+                headers_out = [(name, value) for name, value in headers_out if name != b"content-length"]
+                headers_out += [(b"content-encoding", compressor.encoding.encode()), (b"vary", b"Accept-Encoding")]
+            await send({
+                "type": "http.response.start",
+                "status": upstream.status,
+                "headers": headers_out + _encode_headers(extra_headers),
+            })
+            # Bytes sin decodificar: Content-Length y Content-Encoding siguen valiendo
+            # salvo que el gateway comprima el cuerpo
+            async for chunk in upstream.content.iter_any():
+                if compressor is not None:
+                    chunk = compressor.compress(chunk)
+                    if not chunk:
+                        continue
+                for sink in sinks:
+                    sink.feed(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            tail = compressor.flush() if compressor is not None else b""
+            for sink in sinks:
+                sink.feed(tail)
+            await send({"type": "http.response.body", "body": tail})
+            decoded = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in headers_out]
+            for sink in sinks:
+                sink.finish(upstream.status, decoded)
+        except (asyncio.TimeoutError, aiohttp.ClientError) as exc:
+            # La respuesta ya empezó: el servidor cierra la conexión incompleta
+            logger.error("Error leyendo la respuesta de %s: %s (%s)", call.service, call.url, exc)
+        finally:
+            upstream.release()
+
+    def _compressor(self, deferred: DeferredResponse, upstream: aiohttp.ClientResponse) -> StreamCompressor | None:
+        compression = self.app.extensions.get(COMPRESSION_KEY)
+        if compression is None or deferred.encoding is None:
+            return None
+        return compression.compressor_for(deferred.encoding, upstream.status, upstream.headers)
+
+    async def _open(self, call: UpstreamCall, headers: dict[str, str], data: Any) -> aiohttp.ClientResponse:
+        """Envía la petición upstream; los fallos de conexión se reintentan (HTTP_MAX_RETRIES)."""
+        session = self._client(call.service)
+        retries = self.app.config["HTTP_MAX_RETRIES"]
+        for attempt in range(retries + 1):
+            try:
+                return await session.request(
+                    call.method,
+                    call.url,
+                    headers=headers,
+                    params=_query_items(call.params),
+                    data=data,
+                    json=call.json,
+                    timeout=_client_timeout(call.timeout),
+                    allow_redirects=call.allow_redirects,
+                )
+            except aiohttp.ClientConnectorError:
+                # Sin conexión no se envió nada del cuerpo: es seguro reintentar
+                if attempt == retries:
+                    raise
+        raise AssertionError("unreachable")
+
+    def _client(self, service: str) -> aiohttp.ClientSession:
+        """Sesión aiohttp del servicio, con su propio pool de conexiones."""
+        session = self._clients.get(service)
+        if session is None:
+            config = self.app.config
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.limits[service],
+                    force_close=not config["HTTP_KEEP_ALIVE"],
+                ),
+                # Igual que en las sesiones síncronas: nunca guardar cookies del upstream
+                cookie_jar=aiohttp.DummyCookieJar(),
+                # El cuerpo se reenvía comprimido tal como llega
+                auto_decompress=False,
+                trust_env=config["HTTP_TRUST_ENV"],
+            )
+            self._clients[service] = session
+        return session
+
+
+def _trace_call(call: UpstreamCall, start: float, duration: float, **details: Any) -> None:
+    """Registra la llamada en la traza de la petición (hasta recibir los headers)."""
+    if call.trace is None:
+        return
+    call.trace.record_upstream(call.span_id, call.service, call.method, call.url, start, duration, **details)
+    if "status" in details:
+        call.trace.status = details["status"]
+
+
+def _client_timeout(timeout: float | tuple[float, float] | None) -> aiohttp.ClientTimeout:
+    if timeout is None:
+        return aiohttp.ClientTimeout(total=None)
+    connect, read = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+    return aiohttp.ClientTimeout(total=None, sock_connect=connect, sock_read=read)
+
+
+def _query_items(params: Any) -> list[tuple[str, str]] | None:
+    """Query string como lista de pares (acepta dict con listas o pares, como `requests`)."""
+    if not params:
+        return None
+    items = params.items() if isinstance(params, Mapping) else params
+    return [
+        (str(name), str(value))
+        for name, values in items
+        for value in (values if isinstance(values, (list, tuple)) else (values,))
+    ]
+
+
+def _encode_headers(headers: Headers) -> list[tuple[bytes, bytes]]:
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+
+
+async def _send_response(send: Send, status: int, headers: Headers, body: bytes) -> None:
+    await send({"type": "http.response.start", "status": status, "headers": _encode_headers(headers)})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send: Send, status: int, payload: dict[str, Any], headers: Headers = ()) -> None:
+    body = json.dumps(payload).encode()
+    await _send_response(
+        send,
+        status,
+        [("Content-Type", "application/json"), ("Content-Length", str(len(body))), *headers],
+        body,
+    )
+
+
+def create_asgi_app(app: Flask | None = None) -> AsyncGateway:
+    """Crea el motor ASGI sobre la aplicación Flask del gateway."""
+    return AsyncGateway(app or create_app())
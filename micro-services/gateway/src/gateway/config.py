@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 from dotenv import load_dotenv
@@ -22,9 +22,60 @@ class AppConfig:
     patient_service_url: str = "http://localhost:5004"
     media_service_url: str = "http://localhost:5005"
     realtime_service_url: str = "http://localhost:5006"
+    http_pool_maxsize: int = 20
+    http_pool_block: bool = False
+    http_keep_alive: bool = True
+    http_max_retries: int = 1
+    http_connect_timeout: float = 2.0
+    http_trust_env: bool = False
+    service_timeouts: dict[str, float] = field(default_factory=dict)
+    circuit_window_seconds: float = 30.0
+    circuit_min_requests: int = 20
+    circuit_failure_rate: float = 0.5
+    circuit_open_seconds: float = 10.0
+    circuit_timeout_multiplier: float = 3.0
+    circuit_min_timeout: float = 1.0
+    async_max_concurrency: int = 100
+    async_queue_timeout: float = 5.0
+    service_concurrency: dict[str, int] = field(default_factory=dict)
+    jwt_secret: str = ""
+    jwt_public_key: str = ""
+    jwt_algorithm: str = "HS256"
+    jwt_cache_size: int = 10_000
+    identity_header_secret: str = ""
+    response_cache_ttls: dict[str, float] = field(default_factory=dict)
+    response_cache_max_entries: int = 1000
+    response_cache_max_body: int = 1024 * 1024
+    single_flight_enabled: bool = True
+    single_flight_max_wait: float = 30.0
+    single_flight_max_body: int = 1024 * 1024
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 5
+    compression_brotli_quality: int = 4
+    compression_cpu_budget: float = 0.8
+    rate_limit_enabled: bool = True
+    rate_limit_rate: float = 20.0
+    rate_limit_burst: float = 40.0
+    rate_limit_critical_reserve: float = 5.0
+    rate_limit_expensive_cost: float = 4.0
+    rate_limit_redis_url: str = ""
+    load_shed_max_in_flight: int = 256
+    load_shed_expensive_at: float = 0.6
+    load_shed_normal_at: float = 0.85
+    tracing_enabled: bool = True
+    tracing_max_traces: int = 500
+    tracing_export_path: str = ""
+    tracing_debug_view: bool = False
 
 CONFIG_CLASS = AppConfig
 
+# Rutas GET que los dashboards consultan en bucle y cambian poco
+DEFAULT_RESPONSE_CACHE_TTLS = (
+    "user.org_care_teams=30,patient.get_profile=60,realtime.get_patients=10,ai_proxy.model_info=300,"
+    "user.care_team_location_tile=15,user.caregiver_location_tile=15"
+)
+
 
 def configure_app(app: Any) -> None:
     """Carga variables de entorno y aplica configuración al objeto Flask."""
@@ -41,6 +92,51 @@ def configure_app(app: Any) -> None:
         user_service_url=os.getenv("USER_SERVICE_URL", "http://localhost:5003"),
         media_service_url=os.getenv("MEDIA_SERVICE_URL", "http://localhost:5005"),
         realtime_service_url=os.getenv("REALTIME_SERVICE_URL", "http://localhost:5006"),
+        http_pool_maxsize=int(os.getenv("HTTP_POOL_MAXSIZE", "20")),
+        http_pool_block=_str_to_bool(os.getenv("HTTP_POOL_BLOCK", "0")),
+        http_keep_alive=_str_to_bool(os.getenv("HTTP_KEEP_ALIVE", "1")),
+        http_max_retries=int(os.getenv("HTTP_MAX_RETRIES", "1")),
+        http_connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "2")),
+        http_trust_env=_str_to_bool(os.getenv("HTTP_TRUST_ENV", "0")),
+        service_timeouts=_service_timeouts(),
+        circuit_window_seconds=float(os.getenv("CIRCUIT_WINDOW_SECONDS", "30")),
+        circuit_min_requests=int(os.getenv("CIRCUIT_MIN_REQUESTS", "20")),
+        circuit_failure_rate=float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5")),
+        circuit_open_seconds=float(os.getenv("CIRCUIT_OPEN_SECONDS", "10")),
+        circuit_timeout_multiplier=float(os.getenv("CIRCUIT_TIMEOUT_MULTIPLIER", "3")),
+        circuit_min_timeout=float(os.getenv("CIRCUIT_MIN_TIMEOUT", "1")),
+        async_max_concurrency=int(os.getenv("ASYNC_MAX_CONCURRENCY", "100")),
+        async_queue_timeout=float(os.getenv("ASYNC_QUEUE_TIMEOUT", "5")),
+        service_concurrency=_service_concurrency(),
+        jwt_secret=os.getenv("JWT_SECRET", ""),
+        jwt_public_key=os.getenv("JWT_PUBLIC_KEY", ""),
+        jwt_algorithm=os.getenv("JWT_ALGORITHM", "HS256"),
+        jwt_cache_size=int(os.getenv("JWT_CACHE_SIZE", "10000")),
+        identity_header_secret=os.getenv("IDENTITY_HEADER_SECRET", ""),
+        response_cache_ttls=_response_cache_ttls(),
+        response_cache_max_entries=int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000")),
+        response_cache_max_body=int(os.getenv("RESPONSE_CACHE_MAX_BODY", str(1024 * 1024))),
+        single_flight_enabled=_str_to_bool(os.getenv("SINGLE_FLIGHT_ENABLED", "1")),
+        single_flight_max_wait=float(os.getenv("SINGLE_FLIGHT_MAX_WAIT", "30")),
+        single_flight_max_body=int(os.getenv("SINGLE_FLIGHT_MAX_BODY", str(1024 * 1024))),
+        compression_enabled=_str_to_bool(os.getenv("COMPRESSION_ENABLED", "1")),
+        compression_min_size=int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+        compression_gzip_level=int(os.getenv("COMPRESSION_GZIP_LEVEL", "5")),
+        compression_brotli_quality=int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4")),
+        compression_cpu_budget=float(os.getenv("COMPRESSION_CPU_BUDGET", "0.8")),
+        rate_limit_enabled=_str_to_bool(os.getenv("RATE_LIMIT_ENABLED", "0")),
+        rate_limit_rate=float(os.getenv("RATE_LIMIT_RATE", "20")),
+        rate_limit_burst=float(os.getenv("RATE_LIMIT_BURST", "40")),
+        rate_limit_critical_reserve=float(os.getenv("RATE_LIMIT_CRITICAL_RESERVE", "5")),
+        rate_limit_expensive_cost=float(os.getenv("RATE_LIMIT_EXPENSIVE_COST", "4")),
+        rate_limit_redis_url=os.getenv("RATE_LIMIT_REDIS_URL", ""),
+        load_shed_max_in_flight=int(os.getenv("LOAD_SHED_MAX_IN_FLIGHT", "256")),
+        load_shed_expensive_at=float(os.getenv("LOAD_SHED_EXPENSIVE_AT", "0.6")),
+        load_shed_normal_at=float(os.getenv("LOAD_SHED_NORMAL_AT", "0.85")),
+        tracing_enabled=_str_to_bool(os.getenv("TRACING_ENABLED", "1")),
+        tracing_max_traces=int(os.getenv("TRACING_MAX_TRACES", "500")),
+        tracing_export_path=os.getenv("TRACING_EXPORT_PATH", ""),
+        tracing_debug_view=_str_to_bool(os.getenv("TRACING_DEBUG_VIEW", "0")),
     )
 
     app.config.update(
@@ -54,8 +150,91 @@ def configure_app(app: Any) -> None:
         USER_SERVICE_URL=config.user_service_url,
         MEDIA_SERVICE_URL=config.media_service_url,
         REALTIME_SERVICE_URL=config.realtime_service_url,
+        HTTP_POOL_MAXSIZE=config.http_pool_maxsize,
+        HTTP_POOL_BLOCK=config.http_pool_block,
+        HTTP_KEEP_ALIVE=config.http_keep_alive,
+        HTTP_MAX_RETRIES=config.http_max_retries,
+        HTTP_CONNECT_TIMEOUT=config.http_connect_timeout,
+        HTTP_TRUST_ENV=config.http_trust_env,
+        SERVICE_TIMEOUTS=config.service_timeouts,
+        CIRCUIT_WINDOW_SECONDS=config.circuit_window_seconds,
+        CIRCUIT_MIN_REQUESTS=config.circuit_min_requests,
+        CIRCUIT_FAILURE_RATE=config.circuit_failure_rate,
+        CIRCUIT_OPEN_SECONDS=config.circuit_open_seconds,
+        CIRCUIT_TIMEOUT_MULTIPLIER=config.circuit_timeout_multiplier,
+        CIRCUIT_MIN_TIMEOUT=config.circuit_min_timeout,
+        ASYNC_MAX_CONCURRENCY=config.async_max_concurrency,
+        ASYNC_QUEUE_TIMEOUT=config.async_queue_timeout,
+        SERVICE_CONCURRENCY=config.service_concurrency,
+        JWT_SECRET=config.jwt_secret,
+        JWT_PUBLIC_KEY=config.jwt_public_key,
+        JWT_ALGORITHM=config.jwt_algorithm,
+        JWT_CACHE_SIZE=config.jwt_cache_size,
+        IDENTITY_HEADER_SECRET=config.identity_header_secret,
+        RESPONSE_CACHE_TTLS=config.response_cache_ttls,
+        RESPONSE_CACHE_MAX_ENTRIES=config.response_cache_max_entries,
+        RESPONSE_CACHE_MAX_BODY=config.response_cache_max_body,
+        SINGLE_FLIGHT_ENABLED=config.single_flight_enabled,
+        SINGLE_FLIGHT_MAX_WAIT=config.single_flight_max_wait,
+        SINGLE_FLIGHT_MAX_BODY=config.single_flight_max_body,
+        COMPRESSION_ENABLED=config.compression_enabled,
+        COMPRESSION_MIN_SIZE=config.compression_min_size,
+        COMPRESSION_GZIP_LEVEL=config.compression_gzip_level,
+        COMPRESSION_BROTLI_QUALITY=config.compression_brotli_quality,
+        COMPRESSION_CPU_BUDGET=config.compression_cpu_budget,
+        RATE_LIMIT_ENABLED=config.rate_limit_enabled,
+        RATE_LIMIT_RATE=config.rate_limit_rate,
+        RATE_LIMIT_BURST=config.rate_limit_burst,
+        RATE_LIMIT_CRITICAL_RESERVE=config.rate_limit_critical_reserve,
+        RATE_LIMIT_EXPENSIVE_COST=config.rate_limit_expensive_cost,
+        RATE_LIMIT_REDIS_URL=config.rate_limit_redis_url,
+        LOAD_SHED_MAX_IN_FLIGHT=config.load_shed_max_in_flight,
+        LOAD_SHED_EXPENSIVE_AT=config.load_shed_expensive_at,
+        LOAD_SHED_NORMAL_AT=config.load_shed_normal_at,
+        TRACING_ENABLED=config.tracing_enabled,
+        TRACING_MAX_TRACES=config.tracing_max_traces,
+        TRACING_EXPORT_PATH=config.tracing_export_path,
+        TRACING_DEBUG_VIEW=config.tracing_debug_view,
     )
 
 
+def _service_timeouts() -> dict[str, float]:
+    """Timeouts por servicio (<SERVICIO>_SERVICE_TIMEOUT); sin valor usa GATEWAY_SERVICE_TIMEOUT."""
+    timeouts = {}
+    for service in ("auth", "admin", "user", "patient", "media", "realtime", "ai"):
+        value = os.getenv(f"{service.upper()}_SERVICE_TIMEOUT")
+        if value:
+            timeouts[service] = float(value)
+    # El servicio de IA históricamente usaba 30 s
+    timeouts.setdefault("ai", 30.0)
+    return timeouts
+
+
+def _service_concurrency() -> dict[str, int]:
+    """Peticiones simultáneas por servicio en modo asíncrono (<SERVICIO>_SERVICE_CONCURRENCY)."""
+    limits = {}
+    for service in ("auth", "admin", "user", "patient", "media", "realtime", "ai"):
+        value = os.getenv(f"{service.upper()}_SERVICE_CONCURRENCY")
+        if value:
+            limits[service] = int(value)
+    return limits
+
+
+def _response_cache_ttls() -> dict[str, float]:
+    """
+    TTL en segundos por endpoint cacheable (RESPONSE_CACHE_TTLS).
+
+    Formato `<endpoint>=<segundos>` separado por comas, p. ej.
+    `user.org_care_teams=30,patient.get_profile=60`; vacío desactiva la caché.
+    """
+    raw = os.getenv("RESPONSE_CACHE_TTLS", DEFAULT_RESPONSE_CACHE_TTLS)
+    ttls = {}
+    for item in raw.split(","):
+        endpoint, _, seconds = item.partition("=")
+        if endpoint.strip() and seconds.strip():
+            ttls[endpoint.strip()] = float(seconds)
+    return ttls
+
+
 def _str_to_bool(value: str) -> bool:
     return value.lower() in {"1", "true", "t", "yes", "on"}
@@ -4,6 +4,14 @@ from __future__ import annotations
 from typing import Any
 from flask_cors import CORS
 
+from .services.compression import init_compression
+from .services.http_sessions import init_http_sessions
+from .services.rate_limit import init_load_shedder, init_rate_limiter
+from .services.response_cache import init_response_cache
+from .services.single_flight import init_single_flight
+from .services.token_verifier import init_token_verifier
+from .services.tracing import init_tracing
+
 
 def init_extensions(app: Any) -> None:
     """Inicializa extensiones asociadas al gateway."""
@@ -15,3 +23,28 @@ def init_extensions(app: Any) -> None:
             "allow_headers": ["Content-Type", "Authorization"],
         }
     })
+
+    # Traza por petición (antes que el resto: también las rechazadas llevan X-Trace-ID)
+    init_tracing(app)
+
+    # Sesiones HTTP con pool keep-alive compartidas por todos los clientes
+    init_http_sessions(app)
+
+    # Descarte de carga por prioridad, antes de gastar CPU en validar el token
+    init_load_shedder(app)
+
+    # Validación de JWT en el borde con caché de tokens ya verificados
+    init_token_verifier(app)
+
+    # Límite de peticiones por principal (tras validar el token: la clave es el usuario)
+    init_rate_limiter(app)
+
+    # Caché de respuestas GET (después de validar el token: la clave incluye el principal)
+    init_response_cache(app)
+
+    # GET idénticos y simultáneos comparten una sola llamada upstream (tras la caché)
+    init_single_flight(app)
+
+    # Compresión gzip/brotli (su after_request se ejecuta primero: caché y
+    # single-flight guardan el cuerpo ya comprimido)
+    init_compression(app)
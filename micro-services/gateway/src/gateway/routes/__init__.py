@@ -3,10 +3,11 @@ from __future__ import annotations
 
 from flask import Blueprint, Flask
 
-from . import admin_proxy, auth_proxy, health, media_proxy, user_proxy, patient_proxy, realtime_proxy, ai_proxy
+from . import admin_proxy, auth_proxy, debug, health, media_proxy, user_proxy, patient_proxy, realtime_proxy, ai_proxy
 
 ROUTES: tuple[Blueprint, ...] = (
     health.bp,
+    debug.bp,
     auth_proxy.bp,
     media_proxy.bp,
     patient_proxy.bp,
@@ -6,15 +6,24 @@ from http import HTTPStatus
 from flask import Blueprint, Response, current_app, request
 
 from ..services.admin_client import AdminClient, AdminClientError
+from ..services.http_sessions import get_session, get_timeout
+from ..services.response_cache import revalidation_headers
+from ..services.streaming import HOP_BY_HOP_HEADERS
+from ..services.token_verifier import forward_identity
 
 bp = Blueprint("admin", __name__, url_prefix="/admin")
 
+# `resp.content` llega ya descomprimido: la codificación y longitud del upstream
+# no valen para el cuerpo reenviado (el gateway lo vuelve a comprimir si procede)
+DECODED_BODY_HEADERS = HOP_BY_HOP_HEADERS | {"content-encoding", "content-length"}
+
 
 def _get_admin_client() -> AdminClient:
     """Obtiene instancia del cliente de administración."""
     return AdminClient(
         base_url=current_app.config["ADMIN_SERVICE_URL"],
-        timeout=current_app.config["GATEWAY_SERVICE_TIMEOUT"],
+        timeout=get_timeout("admin"),
+        session=get_session("admin"),
     )
 
 
@@ -35,6 +44,8 @@ def _proxy_request(path: str, method: str = "GET") -> Response:
         headers["Authorization"] = request.headers["Authorization"]
     if "Content-Type" in request.headers:
         headers["Content-Type"] = request.headers["Content-Type"]
+    revalidation_headers(headers)
+    forward_identity(headers)
     
     # Obtener datos del request
     json_data = None
@@ -63,7 +74,11 @@ def _proxy_request(path: str, method: str = "GET") -> Response:
         return Response(
             response=resp.content,
             status=resp.status_code,
-            headers=dict(resp.headers),
+            headers={
+                name: value
+                for name, value in resp.headers.items()
+                if name.lower() not in DECODED_BODY_HEADERS
+            },
         )
     
     except AdminClientError as e:
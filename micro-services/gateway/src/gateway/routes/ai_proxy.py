@@ -6,6 +6,8 @@ import logging
 from flask import Blueprint, request
 
 from ..services import ai_client
+from ..services.streaming import request_body_stream
+from ..services.token_verifier import public
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +15,7 @@ bp = Blueprint("ai_proxy", __name__, url_prefix="/ai")
 
 
 @bp.route("/health", methods=["GET"])
+@public
 def health():
     """Health check del servicio de IA."""
     return ai_client.forward_request(
@@ -29,7 +32,7 @@ def predict():
         method="POST",
         path="/predict",
         headers=dict(request.headers),
-        data=request.get_data(),
+        data=request_body_stream(),
     )
 
 
@@ -40,7 +43,7 @@ def batch_predict():
         method="POST",
         path="/batch-predict",
         headers=dict(request.headers),
-        data=request.get_data(),
+        data=request_body_stream(),
     )
 
 
@@ -61,4 +64,15 @@ def model_reload():
         method="POST",
         path="/model/reload",
         headers=dict(request.headers),
+        data=request_body_stream(),
+    )
+
+
+@bp.route("/model/rollback", methods=["POST"])
+def model_rollback():
+    """Restaurar la versión anterior del modelo."""
+    return ai_client.forward_request(
+        method="POST",
+        path="/model/rollback",
+        headers=dict(request.headers),
     )
@@ -5,6 +5,7 @@ from http import HTTPStatus
 from flask import Blueprint, current_app, jsonify, request
 
 from ..services.auth_client import AuthClient, AuthClientError
+from ..services.http_sessions import get_session, get_timeout
 
 bp = Blueprint("auth", __name__, url_prefix="/auth")
 
@@ -13,7 +14,8 @@ def _get_auth_client() -> AuthClient:
     """Obtiene instancia del cliente de autenticación."""
     return AuthClient(
         base_url=current_app.config["AUTH_SERVICE_URL"],
-        timeout=current_app.config["GATEWAY_SERVICE_TIMEOUT"],
+        timeout=get_timeout("auth"),
+        session=get_session("auth"),
     )
 
 
@@ -0,0 +1,47 @@
+"""Vista de depuración de trazas (TRACING_DEBUG_VIEW)."""
+from __future__ import annotations
+
+from dataclasses import asdict
+from http import HTTPStatus
+
+from flask import Blueprint, abort, current_app, jsonify, request
+
+from ..services.tracing import EXTENSION_KEY as TRACING_KEY
+from ..services.tracing import SpanStore, summarize
+
+bp = Blueprint("debug", __name__, url_prefix="/debug")
+
+
+@bp.before_request
+def _require_debug_view():
+    if not current_app.config["TRACING_DEBUG_VIEW"] or TRACING_KEY not in current_app.extensions:
+        abort(HTTPStatus.NOT_FOUND)
+
+
+@bp.get("/traces")
+def list_traces():
+    """Trazas recientes, las más lentas primero, con el tiempo por salto."""
+    store: SpanStore = current_app.extensions[TRACING_KEY]
+    min_ms = request.args.get("min_ms", default=0.0, type=float)
+    limit = request.args.get("limit", default=50, type=int)
+    traces = [summary for summary in map(summarize, store.recent()) if summary["duration_ms"] >= min_ms]
+    traces.sort(key=lambda summary: summary["duration_ms"], reverse=True)
+    return jsonify({"traces": traces[:limit]})
+
+
+@bp.get("/traces/<trace_id>")
+def trace_detail(trace_id: str):
+    """Spans de una traza con su desplazamiento desde el inicio de la petición."""
+    store: SpanStore = current_app.extensions[TRACING_KEY]
+    spans = store.get(trace_id)
+    if spans is None:
+        return jsonify({"error": "not_found", "message": "Traza no encontrada"}), HTTPStatus.NOT_FOUND
+
+    origin = min(span.start for span in spans)
+    return jsonify({
+        **summarize(spans),
+        "spans": [
+            {**asdict(span), "offset_ms": round((span.start - origin) * 1000, 3), "duration_ms": round(span.duration_ms, 3)}
+            for span in sorted(spans, key=lambda span: span.start)
+        ],
+    })
@@ -4,17 +4,68 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from flask import Blueprint, current_app, jsonify
 
+from ..services.circuit_breaker import OPEN
+from ..services.compression import EXTENSION_KEY as COMPRESSION_KEY
+from ..services.http_sessions import EXTENSION_KEY as HTTP_SESSIONS_KEY
+from ..services.rate_limit import LOAD_SHEDDER_KEY, RATE_LIMITER_KEY
+from ..services.response_cache import EXTENSION_KEY as RESPONSE_CACHE_KEY
+from ..services.single_flight import EXTENSION_KEY as SINGLE_FLIGHT_KEY
+
 bp = Blueprint("health", __name__, url_prefix="/health")
 
 
 @bp.get("/")
 def healthcheck():
-    """Retorna el estado básico del gateway."""
+    """Retorna el estado básico del gateway y de los circuitos hacia cada servicio."""
+    registry = current_app.extensions[HTTP_SESSIONS_KEY]
+    circuits = registry.circuits(current_app.config["GATEWAY_SERVICE_TIMEOUT"])
+    degraded = any(circuit["state"] == OPEN for circuit in circuits.values())
     return jsonify(
         {
-            "status": "ok",
+            "status": "degraded" if degraded else "ok",
             "service": "heartguard-gateway",
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "debug": bool(current_app.config.get("DEBUG", False)),
+            "circuits": circuits,
+        }
+    )
+
+
+@bp.get("/cache")
+def cache_stats():
+    """Ratio de aciertos de la caché de respuestas por ruta."""
+    cache = current_app.extensions.get(RESPONSE_CACHE_KEY)
+    if cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **cache.stats()})
+
+
+@bp.get("/coalescing")
+def coalescing_stats():
+    """Peticiones GET coalescidas (single-flight) por ruta."""
+    registry = current_app.extensions.get(SINGLE_FLIGHT_KEY)
+    if registry is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **registry.stats()})
+
+
+@bp.get("/compression")
+def compression_stats():
+    """Respuestas comprimidas, reenviadas ya codificadas u omitidas por carga de CPU."""
+    compression = current_app.extensions.get(COMPRESSION_KEY)
+    if compression is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **compression.stats()})
+
+
+@bp.get("/limits")
+def limit_stats():
+    """Peticiones en curso, descartadas por carga y limitadas por principal."""
+    shedder = current_app.extensions.get(LOAD_SHEDDER_KEY)
+    limiter = current_app.extensions.get(RATE_LIMITER_KEY)
+    return jsonify(
+        {
+            "load_shedding": {"enabled": True, **shedder.stats()} if shedder else {"enabled": False},
+            "rate_limit": {"enabled": True, **limiter.stats()} if limiter else {"enabled": False},
         }
     )
@@ -2,11 +2,13 @@
 from __future__ import annotations
 
 from http import HTTPStatus
-from typing import Iterable
-
 from flask import Blueprint, Response, current_app, jsonify, request
 
+from ..services.http_sessions import get_session, get_timeout
+from ..services.response_cache import revalidation_headers
+from ..services.streaming import request_body_stream, streamed_response, upstream_accept_encoding
 from ..services.media_client import MediaClient, MediaClientError
+from ..services.token_verifier import forward_identity, public
 
 bp = Blueprint("media", __name__, url_prefix="/media")
 
@@ -14,7 +16,8 @@ bp = Blueprint("media", __name__, url_prefix="/media")
 def _get_media_client() -> MediaClient:
     return MediaClient(
         base_url=current_app.config["MEDIA_SERVICE_URL"],
-        timeout=current_app.config["GATEWAY_SERVICE_TIMEOUT"],
+        timeout=get_timeout("media"),
+        session=get_session("media"),
     )
 
 
@@ -24,35 +27,18 @@ def _forward_headers() -> dict[str, str]:
         value = request.headers.get(name)
         if value:
             headers[name] = value
-    return headers
-
-
-def _filter_response_headers(headers: Iterable[tuple[str, str]]) -> dict[str, str]:
-    excluded = {"content-length", "transfer-encoding", "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailers", "upgrade"}
-    return {key: value for key, value in headers if key.lower() not in excluded}
+    upstream_accept_encoding(headers)
+    revalidation_headers(headers)
+    return forward_identity(headers)
 
 
 def _proxy_media(path: str, method: str | None = None) -> Response:
     method = method or request.method
     headers = _forward_headers()
 
-    json_payload = None
-    data_payload = None
-    files_payload = None
-    
-    if method in {"POST", "PUT", "PATCH"}:
-        if request.is_json:
-            json_payload = request.get_json(silent=True)
-        elif request.files:
-            # For multipart/form-data with files
-            files_payload = {}
-            for key, file in request.files.items():
-                # Read the file content to avoid stream exhaustion issues
-                file_content = file.read()
-                file.seek(0)  # Reset in case it's needed locally
-                files_payload[key] = (file.filename, file_content, file.content_type)
-        else:
-            data_payload = request.get_data() if request.data else None
+    # Multipart (fotos) y JSON se reenvían tal cual llegan: el Content-Type
+    # original conserva el boundary y el archivo nunca se carga en memoria
+    body = request_body_stream() if method in {"POST", "PUT", "PATCH"} else None
 
     params = list(request.args.items(multi=True)) if request.args else None
 
@@ -62,13 +48,11 @@ def _proxy_media(path: str, method: str | None = None) -> Response:
             method=method,
             path=path,
             headers=headers or None,
-            json=json_payload,
-            data=data_payload,
-            files=files_payload,
+            data=body,
             params=params,
+            stream=True,
         )
-        filtered_headers = _filter_response_headers(upstream.headers.items())
-        return Response(upstream.content, status=upstream.status_code, headers=filtered_headers)
+        return streamed_response(upstream)
     except MediaClientError as exc:
         return jsonify({"error": exc.error, "message": exc.message}), exc.status_code
     except Exception as exc:  # pragma: no cover - defensivo
@@ -77,6 +61,7 @@ def _proxy_media(path: str, method: str | None = None) -> Response:
 
 
 @bp.route("/health", methods=["GET"])
+@public
 def media_health() -> Response:
     return _proxy_media("/health", method="GET")
 
@@ -5,7 +5,11 @@ from http import HTTPStatus
 
 from flask import Blueprint, Response, current_app, jsonify, request
 
+from ..services.http_sessions import get_session, get_timeout
+from ..services.response_cache import revalidation_headers
+from ..services.streaming import request_body_stream, streamed_response, upstream_accept_encoding
 from ..services.patient_client import PatientClient, PatientClientError
+from ..services.token_verifier import forward_identity, public
 
 bp = Blueprint("patient", __name__, url_prefix="/patient")
 
@@ -14,7 +18,8 @@ def _get_patient_client() -> PatientClient:
     """Construye una instancia de paciente que reutiliza la configuración del gateway."""
     return PatientClient(
         base_url=current_app.config["PATIENT_SERVICE_URL"],
-        timeout=current_app.config["GATEWAY_SERVICE_TIMEOUT"],
+        timeout=get_timeout("patient"),
+        session=get_session("patient"),
     )
 
 
@@ -25,14 +30,12 @@ def _proxy_request(path: str, method: str = "GET") -> Response:
         headers["Authorization"] = request.headers["Authorization"]
     if "Content-Type" in request.headers:
         headers["Content-Type"] = request.headers["Content-Type"]
+    upstream_accept_encoding(headers)
+    revalidation_headers(headers)
+    forward_identity(headers)
 
-    json_payload = None
-    raw_payload = None
-    if method in {"POST", "PATCH", "PUT"}:
-        if request.is_json:
-            json_payload = request.get_json(silent=True)
-        if json_payload is None and request.data:
-            raw_payload = request.get_data()
+    # El cuerpo se reenvía como stream, sin parsearlo ni bufferizarlo
+    body = request_body_stream() if method in {"POST", "PATCH", "PUT"} else None
 
     params = request.args.to_dict(flat=False) if request.args else None
 
@@ -42,23 +45,12 @@ def _proxy_request(path: str, method: str = "GET") -> Response:
             method=method,
             path=path,
             headers=headers or None,
-            json=json_payload,
-            data=raw_payload,
+            data=body,
             params=params,
+            stream=True,
         )
 
-        excluded = {"content-length", "transfer-encoding", "connection"}
-        response_headers = [
-            (name, value)
-            for name, value in upstream_response.headers.items()
-            if name.lower() not in excluded
-        ]
-
-        return Response(
-            response=upstream_response.content,
-            status=upstream_response.status_code,
-            headers=response_headers,
-        )
+        return streamed_response(upstream_response)
 
     except PatientClientError as exc:
         return jsonify({"error": exc.error, "message": exc.message}), exc.status_code
@@ -133,6 +125,7 @@ def get_locations() -> Response:
 
 
 @bp.route("/health", methods=["GET"])
+@public
 def health_check() -> Response:
     """Proxy: Health check del Patient Service."""
     return _proxy_request("/patient/health", "GET")
@@ -2,10 +2,12 @@
 from __future__ import annotations
 
 from http import HTTPStatus
-from typing import Iterable
-
 from flask import Blueprint, Response, current_app, jsonify, request
 
+from ..services.http_sessions import get_session, get_timeout
+from ..services.response_cache import revalidation_headers
+from ..services.streaming import request_body_stream, streamed_response, upstream_accept_encoding
+from ..services.token_verifier import forward_identity, public
 from ..services.user_client import UserClient, UserClientError
 
 bp = Blueprint("user", __name__, url_prefix="/user")
@@ -14,7 +16,8 @@ bp = Blueprint("user", __name__, url_prefix="/user")
 def _get_user_client() -> UserClient:
 	return UserClient(
 		base_url=current_app.config["USER_SERVICE_URL"],
-		timeout=current_app.config["GATEWAY_SERVICE_TIMEOUT"],
+		timeout=get_timeout("user"),
+		session=get_session("user"),
 	)
 
 
@@ -24,25 +27,17 @@ def _forward_headers() -> dict[str, str]:
 		value = request.headers.get(header)
 		if value:
 			forwarded[header] = value
-	return forwarded
-
-
-def _filter_response_headers(headers: Iterable[tuple[str, str]]) -> dict[str, str]:
-	excluded = {"content-length", "transfer-encoding", "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailers", "upgrade"}
-	return {key: value for key, value in headers if key.lower() not in excluded}
+	upstream_accept_encoding(forwarded)
+	revalidation_headers(forwarded)
+	return forward_identity(forwarded)
 
 
 def _proxy_user(path: str, method: str | None = None) -> Response:
 	method = method or request.method
 	headers = _forward_headers()
 
-	json_payload = None
-	raw_payload = None
-	if method in {"POST", "PATCH", "PUT"}:
-		if request.is_json:
-			json_payload = request.get_json(silent=True)
-		elif request.data:
-			raw_payload = request.get_data()
+	# El cuerpo se reenvía como stream, sin parsearlo ni bufferizarlo
+	body = request_body_stream() if method in {"POST", "PATCH", "PUT"} else None
 
 	params = list(request.args.items(multi=True)) if request.args else None
 
@@ -52,12 +47,11 @@ def _proxy_user(path: str, method: str | None = None) -> Response:
 			method=method,
 			path=path,
 			headers=headers if headers else None,
-			json=json_payload,
-			data=raw_payload,
+			data=body,
 			params=params,
+			stream=True,
 		)
-		filtered_headers = _filter_response_headers(resp.headers.items())
-		return Response(resp.content, status=resp.status_code, headers=filtered_headers)
+		return streamed_response(resp)
 	except UserClientError as exc:
 		return jsonify({"error": exc.error, "message": exc.message}), exc.status_code
 	except Exception as exc:  # pragma: no cover - defensivo
@@ -66,6 +60,7 @@ def _proxy_user(path: str, method: str | None = None) -> Response:
 
 
 @bp.route("/", methods=["GET"])
+@public
 def service_info() -> Response:
 	return _proxy_user("/")
 
@@ -214,6 +209,16 @@ def care_team_locations() -> Response:
 	return _proxy_user("/care-team/locations")
 
 
+@bp.route("/care-team/locations/changes", methods=["GET"])
+def care_team_location_changes() -> Response:
+	return _proxy_user("/care-team/locations/changes")
+
+
+@bp.route("/care-team/locations/tiles/<int:z>/<int:x>/<int:y>", methods=["GET"])
+def care_team_location_tile(z: int, x: int, y: int) -> Response:
+	return _proxy_user(f"/care-team/locations/tiles/{z}/{x}/{y}")
+
+
 @bp.route("/caregiver/patients", methods=["GET"])
 def caregiver_patients() -> Response:
 	return _proxy_user("/caregiver/patients")
@@ -224,6 +229,16 @@ def caregiver_patient_locations() -> Response:
 	return _proxy_user("/caregiver/patients/locations")
 
 
+@bp.route("/caregiver/patients/locations/changes", methods=["GET"])
+def caregiver_location_changes() -> Response:
+	return _proxy_user("/caregiver/patients/locations/changes")
+
+
+@bp.route("/caregiver/patients/locations/tiles/<int:z>/<int:x>/<int:y>", methods=["GET"])
+def caregiver_location_tile(z: int, x: int, y: int) -> Response:
+	return _proxy_user(f"/caregiver/patients/locations/tiles/{z}/{x}/{y}")
+
+
 @bp.route("/caregiver/patients/<string:patient_id>", methods=["GET"])
 def caregiver_patient_detail(patient_id: str) -> Response:
 	return _proxy_user(f"/caregiver/patients/{patient_id}")
@@ -262,5 +277,6 @@ def caregiver_metrics() -> Response:
 
 
 @bp.route("/event-types", methods=["GET"])
+@public
 def event_types() -> Response:
 	return _proxy_user("/event-types")
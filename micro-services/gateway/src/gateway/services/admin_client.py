@@ -9,9 +9,17 @@ import requests
 class AdminClient:
     """Invocaciones al microservicio de administración."""
 
-    def __init__(self, base_url: str, *, timeout: float = 5.0) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout: float | tuple[float, float] = 5.0,
+        session: requests.Session | None = None,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        # Sesión compartida con pool keep-alive; sin ella cada llamada abre una conexión
+        self._http = session if session is not None else requests
 
     # ------------------------------------------------------------------
     # Método genérico para proxy transparente
@@ -43,7 +51,7 @@ class AdminClient:
         url = f"{self.base_url}{path}"
         
         try:
-            response = requests.request(
+            response = self._http.request(
                 method=method,
                 url=url,
                 headers=headers,
@@ -3,11 +3,16 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Any
+from typing import Any, Iterable
 
 import requests
 from flask import Response
 
+from .http_sessions import get_session, get_timeout
+from .response_cache import revalidation_headers
+from .streaming import streamed_response, upstream_accept_encoding
+from .token_verifier import forward_identity
+
 logger = logging.getLogger(__name__)
 
 AI_SERVICE_URL = os.getenv("AI_SERVICE_URL", "http://localhost:5007")
@@ -17,7 +22,7 @@ def forward_request(
     method: str,
     path: str,
     headers: dict[str, str] | None = None,
-    data: bytes | None = None,
+    data: bytes | Iterable[bytes] | None = None,
     params: dict[str, Any] | None = None,
 ) -> Response:
     """
@@ -27,16 +32,16 @@ def forward_request(
         method: Método HTTP (GET, POST, etc.)
         path: Ruta del endpoint (ej: /predict)
         headers: Headers de la solicitud
-        data: Cuerpo de la solicitud
+        data: Cuerpo de la solicitud (bytes o stream)
         params: Parámetros de query string
         
     Returns:
-        Response de Flask con la respuesta del servicio de IA
+        Response de Flask que reenvía el cuerpo del servicio de IA en streaming
     """
     url = f"{AI_SERVICE_URL}{path}"
     
     # Filtrar headers que no deben reenviarse
-    excluded_headers = {"host", "content-length", "connection", "authorization"}
+    excluded_headers = {"host", "content-length", "transfer-encoding", "connection", "authorization"}
     filtered_headers = {
         key: value
         for key, value in (headers or {}).items()
@@ -46,28 +51,26 @@ def forward_request(
     # Añadir X-Internal-Key para autenticación service-to-service
     internal_key = os.getenv("INTERNAL_SERVICE_KEY", "dev_internal_key")
     filtered_headers["X-Internal-Key"] = internal_key
+    upstream_accept_encoding(filtered_headers)
+    revalidation_headers(filtered_headers)
+    forward_identity(filtered_headers)
     
     try:
         logger.info(f"Forwarding {method} request to AI service: {url}")
         
-        response = requests.request(
+        response = get_session("ai").request(
             method=method,
             url=url,
             headers=filtered_headers,
             data=data,
             params=params,
-            timeout=30,  # Timeout de 30 segundos
+            timeout=get_timeout("ai"),  # AI_SERVICE_TIMEOUT, 30 s por defecto
             allow_redirects=False,
+            stream=True,
         )
         
-        # Crear respuesta de Flask
-        flask_response = Response(
-            response.content,
-            status=response.status_code,
-            headers=dict(response.headers),
-        )
-        
-        return flask_response
+        # Reenviar el cuerpo por bloques, sin bufferizarlo
+        return streamed_response(response)
         
     except requests.exceptions.Timeout:
         logger.error(f"Timeout al conectar con el servicio de IA: {url}")
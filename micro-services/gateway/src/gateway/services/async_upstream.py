@@ -0,0 +1,130 @@
+"""Llamadas upstream diferidas para el modo asíncrono del gateway."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Iterable
+
+import requests
+from flask import Response
+
+from .circuit_breaker import current_route
+from .tracing import RequestTrace, outgoing_span
+
+if TYPE_CHECKING:
+    from .circuit_breaker import CircuitBreaker
+    from .response_cache import CacheFill
+    from .single_flight import Flight
+
+
+@dataclass
+class UpstreamCall:
+    """
+    Petición upstream registrada por una vista en lugar de ejecutarse.
+
+    Solo es válida para pasarla a `streamed_response`: el motor asíncrono la
+    ejecuta después, fuera del hilo de Flask.
+    """
+
+    service: str
+    method: str
+    url: str
+    headers: dict[str, str] | None = None
+    params: Any = None
+    data: Any = None
+    json: Any = None
+    timeout: float | tuple[float, float] | None = None
+    allow_redirects: bool = True
+    # Traza de la petición y span de esta llamada (headers de propagación ya añadidos)
+    trace: RequestTrace | None = None
+    span_id: str | None = None
+    # Endpoint del gateway, para las latencias por endpoint del circuit breaker
+    route: str | None = None
+
+
+class DeferredResponse(Response):
+    """Respuesta de Flask que marca una llamada upstream pendiente."""
+
+    def __init__(self, call: UpstreamCall, excluded_headers: set[str]) -> None:
+        super().__init__(status=202)
+        self.call = call
+        self.excluded_headers = excluded_headers
+        # Caché a rellenar con la respuesta upstream (la asigna response_cache)
+        self.cache_fill: CacheFill | None = None
+        # Peticiones idénticas que esperan esta respuesta (la asigna single_flight)
+        self.flight: Flight | None = None
+        # Codificación negociada con el cliente (la asigna compression)
+        self.encoding: str | None = None
+
+
+class CoalescedResponse(Response):
+    """Respuesta pendiente de otra petición idéntica ya en curso (single-flight)."""
+
+    def __init__(self, flight: Flight) -> None:
+        super().__init__(status=202)
+        self.flight = flight
+
+
+class DeferringSession:
+    """
+    Sesión que difiere las peticiones en streaming.
+
+    Las llamadas con `stream=True` (proxies transparentes) se devuelven como
+    `UpstreamCall`; el resto se delega a la sesión `requests` compartida y se
+    ejecuta de forma síncrona, como en el modo WSGI.
+    """
+
+    def __init__(self, service: str, session: requests.Session) -> None:
+        self.service = service
+        self._session = session
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        if not kwargs.get("stream"):
+            return self._session.request(method, url, **kwargs)
+        headers = dict(kwargs.get("headers") or {})
+        trace, span_id = outgoing_span(headers) or (None, None)
+        return UpstreamCall(
+            service=self.service,
+            method=method.upper(),
+            url=url,
+            headers=headers,
+            params=kwargs.get("params"),
+            data=kwargs.get("data"),
+            json=kwargs.get("json"),
+            timeout=kwargs.get("timeout"),
+            allow_redirects=kwargs.get("allow_redirects", True),
+            trace=trace,
+            span_id=span_id,
+            route=current_route(),
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+
+class DeferringRegistry:
+    """
+    Envuelve un `SessionRegistry` para que las sesiones de `services` difieran
+    el streaming; el resto de servicios usa la sesión compartida sin cambios.
+    """
+
+    def __init__(self, registry: Any, services: Iterable[str]) -> None:
+        self._registry = registry
+        self._sessions = {
+            service: DeferringSession(service, registry.session(service))
+            for service in services
+        }
+
+    def session(self, service: str) -> requests.Session | DeferringSession:
+        return self._sessions.get(service) or self._registry.session(service)
+
+    def timeout(self, service: str, default: float, route: str | None = None) -> tuple[float, float]:
+        return self._registry.timeout(service, default, route)
+
+    def breaker(self, service: str) -> CircuitBreaker:
+        return self._registry.breaker(service)
+
+    def circuits(self, default: float) -> dict[str, dict[str, Any]]:
+        return self._registry.circuits(default)
+
+    def close(self) -> None:
+        self._registry.close()
@@ -9,9 +9,17 @@ import requests
 class AuthClient:
     """Invocaciones al microservicio de autenticación."""
 
-    def __init__(self, base_url: str, *, timeout: float = 5.0) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout: float | tuple[float, float] = 5.0,
+        session: requests.Session | None = None,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        # Sesión compartida con pool keep-alive; sin ella cada llamada abre una conexión
+        self._http = session if session is not None else requests
 
     # ------------------------------------------------------------------
     # Usuarios / pacientes
@@ -49,20 +57,18 @@ class AuthClient:
         return f"{self.base_url}{path}"
 
     def _post(self, path: str, *, json: Mapping[str, Any] | None = None, headers: Mapping[str, str] | None = None) -> dict[str, Any]:
-        response = requests.post(
-            self._url(path),
-            json=json,
-            headers=headers,
-            timeout=self.timeout,
-        )
-        return self._handle_response(response)
+        return self._request("POST", path, json=json, headers=headers)
 
     def _get(self, path: str, *, headers: Mapping[str, str] | None = None) -> dict[str, Any]:
-        response = requests.get(
-            self._url(path),
-            headers=headers,
-            timeout=self.timeout,
-        )
+        return self._request("GET", path, headers=headers)
+
+    def _request(self, method: str, path: str, **kwargs: Any) -> dict[str, Any]:
+        try:
+            response = self._http.request(method, self._url(path), timeout=self.timeout, **kwargs)
+        except requests.Timeout as exc:
+            raise AuthClientError(504, "timeout", "El servicio de autenticación no respondió a tiempo") from exc
+        except requests.ConnectionError as exc:
+            raise AuthClientError(503, "service_unavailable", "El servicio de autenticación no está disponible") from exc
         return self._handle_response(response)
 
     @staticmethod
@@ -0,0 +1,219 @@
+"""Circuit breakers y timeouts adaptativos por servicio upstream."""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any
+
+import requests
+from flask import has_request_context, request as flask_request
+from requests.adapters import HTTPAdapter
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class BreakerSettings:
+    """Parámetros comunes a los circuit breakers de todos los servicios."""
+
+    # Ventana móvil (segundos) sobre la que se calculan error rate y p99
+    window_seconds: float = 30.0
+    # Peticiones mínimas en la ventana antes de abrir o adaptar el timeout
+    min_requests: int = 20
+    failure_rate: float = 0.5
+    # Tiempo abierto antes de dejar pasar una petición de prueba (half-open)
+    open_seconds: float = 10.0
+    # Timeout de lectura = p99 observado del endpoint x multiplicador (acotado)
+    timeout_multiplier: float = 3.0
+    min_timeout: float = 1.0
+    max_samples: int = 200
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """El circuito del servicio está abierto: la petición no se envía."""
+
+    def __init__(self, service: str, retry_after: float, **kwargs: Any) -> None:
+        self.service = service
+        self.retry_after = retry_after
+        super().__init__(f"Circuito abierto para {service}", **kwargs)
+
+
+def current_route() -> str | None:
+    """Endpoint del gateway que origina la llamada upstream (None fuera de una petición)."""
+    return flask_request.endpoint if has_request_context() else None
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker (closed/open/half-open) de un servicio upstream.
+
+    Registra latencia y resultado de cada petición en una ventana móvil. Con
+    suficientes peticiones y un error rate por encima del umbral el circuito
+    se abre y las peticiones fallan al instante; pasado `open_seconds` deja
+    pasar una sola petición de prueba que decide si vuelve a cerrarse.
+
+    Se consideran fallos los errores de conexión, los timeouts y las
+    respuestas 5xx. El error rate es del servicio; las latencias se guardan
+    además por endpoint del gateway, y el timeout adaptativo de cada endpoint
+    sale solo de las suyas (una recarga de modelo no hereda el p99 de /health).
+    """
+
+    def __init__(self, service: str, settings: BreakerSettings) -> None:
+        self.service = service
+        self.settings = settings
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        # (instante, latencia, fallo)
+        self._samples: deque[tuple[float, float, bool]] = deque(maxlen=settings.max_samples)
+        # endpoint -> (instante, latencia) de sus peticiones correctas
+        self._route_latencies: dict[str, deque[tuple[float, float]]] = {}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def allow(self) -> bool:
+        """True si la petición puede enviarse al upstream."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return True
+            # Una prueba sin resultado (cliente desconectado) no bloquea el circuito
+            probe_expired = now >= self._probe_started + self.settings.open_seconds
+            if state == HALF_OPEN and (not self._probe_in_flight or probe_expired):
+                self._state = HALF_OPEN
+                self._probe_in_flight = True
+                self._probe_started = now
+                return True
+            return False
+
+    def retry_after(self) -> float:
+        """Segundos hasta que el circuito abierto admita una petición de prueba."""
+        with self._lock:
+            return max(0.0, self._opened_at + self.settings.open_seconds - time.monotonic())
+
+    def record(self, latency: float, failed: bool, route: str | None = None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = False
+                if failed:
+                    self._open(now)
+                else:
+                    self._state = CLOSED
+                    self._clear_samples()
+                return
+            if self._state == OPEN:
+                # Respuesta de una petición enviada antes de abrir el circuito
+                return
+
+            self._samples.append((now, latency, failed))
+            if route is not None and not failed:
+                latencies = self._route_latencies.get(route)
+                if latencies is None:
+                    latencies = self._route_latencies[route] = deque(maxlen=self.settings.max_samples)
+                latencies.append((now, latency))
+            self._prune(now)
+            failures = sum(1 for _, _, sample_failed in self._samples if sample_failed)
+            if len(self._samples) >= self.settings.min_requests and failures / len(self._samples) >= self.settings.failure_rate:
+                self._open(now)
+
+    def timeout(self, static: float, route: str | None = None) -> float:
+        """
+        Timeout de lectura derivado del p99 de las peticiones correctas de `route`.
+
+        Nunca supera el timeout configurado del servicio (`static`); sin
+        muestras suficientes del endpoint se usa ese valor, así que los
+        endpoints lentos y poco frecuentes conservan el timeout configurado.
+        """
+        p99 = self.p99(route)
+        if p99 is None:
+            return static
+        return max(self.settings.min_timeout, min(static, p99 * self.settings.timeout_multiplier))
+
+    def p99(self, route: str | None = None) -> float | None:
+        """p99 de las peticiones correctas del endpoint, o del servicio si `route` es None."""
+        with self._lock:
+            self._prune(time.monotonic())
+            if route is None:
+                latencies = sorted(latency for _, latency, failed in self._samples if not failed)
+            else:
+                latencies = sorted(latency for _, latency in self._route_latencies.get(route, ()))
+        if len(latencies) < self.settings.min_requests:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+
+    def snapshot(self, static_timeout: float) -> dict[str, Any]:
+        """Estado del circuito para /health."""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            self._prune(now)
+            requests_count = len(self._samples)
+            failures = sum(1 for _, _, failed in self._samples if failed)
+        p99 = self.p99()
+        return {
+            "state": state,
+            "requests": requests_count,
+            "failures": failures,
+            "error_rate": round(failures / requests_count, 4) if requests_count else 0.0,
+            "p99_ms": round(p99 * 1000, 1) if p99 is not None else None,
+            "timeout": round(self.timeout(static_timeout), 3),
+        }
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now >= self._opened_at + self.settings.open_seconds:
+            return HALF_OPEN
+        return self._state
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        # Al cerrar de nuevo, el timeout parte del configurado hasta tener muestras nuevas
+        self._clear_samples()
+
+    def _clear_samples(self) -> None:
+        self._samples.clear()
+        self._route_latencies.clear()
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self.settings.window_seconds
+        while self._samples and self._samples[0][0] < horizon:
+            self._samples.popleft()
+        for route, latencies in list(self._route_latencies.items()):
+            while latencies and latencies[0][0] < horizon:
+                latencies.popleft()
+            if not latencies:
+                del self._route_latencies[route]
+
+
+class CircuitBreakerAdapter(HTTPAdapter):
+    """HTTPAdapter que consulta el circuit breaker y le reporta cada petición."""
+
+    def __init__(self, breaker: CircuitBreaker, **kwargs: Any) -> None:
+        self.breaker = breaker
+        super().__init__(**kwargs)
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        if not self.breaker.allow():
+            raise CircuitOpenError(self.breaker.service, self.breaker.retry_after(), request=request)
+
+        route = current_route()
+        started = time.monotonic()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception:
+            self.breaker.record(time.monotonic() - started, failed=True, route=route)
+            raise
+        # Con stream=True la latencia es hasta recibir los headers
+        self.breaker.record(time.monotonic() - started, failed=response.status_code >= 500, route=route)
+        return response
@@ -0,0 +1,216 @@
+"""Compresión de respuestas (gzip/brotli) negociada con el cliente."""
+from __future__ import annotations
+
+import threading
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, Mapping
+
+from flask import Response, current_app, request
+
+from .async_upstream import CoalescedResponse, DeferredResponse
+
+try:  # brotli es opcional: sin él solo se ofrece gzip
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+EXTENSION_KEY = "compression"
+
+GZIP = "gzip"
+BROTLI = "br"
+
+# Tipos de contenido que compensa comprimir (JSON, XML y texto)
+COMPRESSIBLE_TYPES = ("application/json", "application/xml", "application/javascript", "text/")
+COMPRESSIBLE_SUFFIXES = ("+json", "+xml")
+
+
+@dataclass(frozen=True)
+class CompressionSettings:
+    """Parámetros de compresión de respuestas."""
+
+    # Cuerpos por debajo de este tamaño (bytes) se envían sin comprimir
+    min_size: int = 1024
+    gzip_level: int = 5
+    brotli_quality: int = 4
+    # Fracción de un núcleo de CPU por encima de la cual se deja de comprimir
+    cpu_budget: float = 0.8
+
+
+class CpuBudget:
+    """
+    Uso de CPU del proceso, muestreado como mucho una vez por `interval`.
+
+    `exceeded()` es barato (sin llamadas al sistema entre muestras), así que
+    se puede consultar en cada petición.
+    """
+
+    def __init__(self, budget: float, interval: float = 1.0) -> None:
+        self.budget = budget
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._sampled_at = time.monotonic()
+        self._cpu_at = time.process_time()
+        self.usage = 0.0
+
+    def exceeded(self) -> bool:
+        now = time.monotonic()
+        if now - self._sampled_at >= self.interval:
+            with self._lock:
+                elapsed = now - self._sampled_at
+                if elapsed >= self.interval:
+                    cpu = time.process_time()
+                    self.usage = (cpu - self._cpu_at) / elapsed
+                    self._sampled_at, self._cpu_at = now, cpu
+        return self.usage > self.budget
+
+
+class StreamCompressor:
+    """Compresor incremental para reenviar un cuerpo bloque a bloque."""
+
+    def __init__(self, encoding: str, settings: CompressionSettings) -> None:
+        self.encoding = encoding
+        if encoding == BROTLI:
+            self._brotli = brotli.Compressor(quality=settings.brotli_quality)
+        else:
+            # wbits=31: formato gzip (cabecera y CRC), no deflate crudo
+            self._zlib = zlib.compressobj(settings.gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == BROTLI:
+            return self._brotli.process(chunk)
+        return self._zlib.compress(chunk)
+
+    def flush(self) -> bytes:
+        if self.encoding == BROTLI:
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+    def stream(self, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        for chunk in chunks:
+            compressed = self.compress(chunk)
+            if compressed:
+                yield compressed
+        yield self.flush()
+
+
+class ResponseCompression:
+    """Negociación de Content-Encoding y contadores por resultado."""
+
+    def __init__(self, settings: CompressionSettings) -> None:
+        self.settings = settings
+        self.cpu = CpuBudget(settings.cpu_budget)
+        self._lock = threading.Lock()
+        self._counts: Counter[str] = Counter()
+
+    def negotiate(self, accept_encoding: str) -> str | None:
+        """Codificación preferida por el cliente (br > gzip), o None si no comprime."""
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in (BROTLI, GZIP):
+            if encoding == BROTLI and brotli is None:
+                continue
+            if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+        return None
+
+    def compressor_for(self, encoding: str | None, status: int, headers: Mapping[str, str]) -> StreamCompressor | None:
+        """
+        Compresor para la respuesta, o None si debe enviarse tal cual.
+
+        No se comprime si el cuerpo ya viene codificado (se reenvía sin
+        descomprimir; hoy ningún servicio Flask comprime, pero un upstream
+        tras un proxy podría), si es pequeño o no es texto, ni con la CPU por
+        encima del presupuesto.
+        """
+        if encoding is None or status < 200 or status in (204, 206, 304):
+            return None
+        if headers.get("Content-Encoding", "identity").lower() != "identity":
+            self._count("passthrough")
+            return None
+        if not _compressible(headers.get("Content-Type", "")):
+            return None
+        length = headers.get("Content-Length")
+        if length is not None and int(length) < self.settings.min_size:
+            return None
+        if self.cpu.exceeded():
+            self._count("skipped_cpu")
+            return None
+        self._count(encoding)
+        return StreamCompressor(encoding, self.settings)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        return {"cpu_usage": round(self.cpu.usage, 3), "cpu_budget": self.settings.cpu_budget, "responses": counts}
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self._counts[outcome] += 1
+
+
+def init_compression(app: Any) -> ResponseCompression | None:
+    """Registra la compresión de respuestas si COMPRESSION_ENABLED."""
+    if not app.config["COMPRESSION_ENABLED"]:
+        return None
+
+    compression = ResponseCompression(CompressionSettings(
+        min_size=app.config["COMPRESSION_MIN_SIZE"],
+        gzip_level=app.config["COMPRESSION_GZIP_LEVEL"],
+        brotli_quality=app.config["COMPRESSION_BROTLI_QUALITY"],
+        cpu_budget=app.config["COMPRESSION_CPU_BUDGET"],
+    ))
+    app.extensions[EXTENSION_KEY] = compression
+    app.after_request(_compress_response)
+    return compression
+
+
+def _compress_response(response: Response) -> Response:
+    if request.method == "HEAD" or isinstance(response, CoalescedResponse):
+        # La respuesta compartida ya llega codificada por el líder
+        return response
+
+    compression: ResponseCompression = current_app.extensions[EXTENSION_KEY]
+    encoding = compression.negotiate(request.headers.get("Accept-Encoding", ""))
+    if isinstance(response, DeferredResponse):
+        # El motor asíncrono decide con los headers del upstream
+        response.encoding = encoding
+        return response
+
+    if _compressible(response.headers.get("Content-Type", "")):
+        response.vary.add("Accept-Encoding")
+    compressor = compression.compressor_for(encoding, response.status_code, response.headers)
+    if compressor is None:
+        return response
+
+    if response.is_sequence:
+        response.set_data(compressor.compress(response.get_data()) + compressor.flush())
+    else:
+        response.response = compressor.stream(response.response)
+        response.headers.pop("Content-Length", None)
+    response.headers["Content-Encoding"] = compressor.encoding
+    return response
+
+
+def _compressible(content_type: str) -> bool:
+    mimetype = content_type.split(";", 1)[0].strip().lower()
+    return mimetype.startswith(COMPRESSIBLE_TYPES) or mimetype.endswith(COMPRESSIBLE_SUFFIXES)
+
+
+def _accepted_encodings(header: str) -> dict[str, float]:
+    """Accept-Encoding como {codificación: q}."""
+    accepted = {}
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
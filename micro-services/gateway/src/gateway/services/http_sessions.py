@@ -0,0 +1,161 @@
+"""Sesiones HTTP compartidas (pool keep-alive) por microservicio."""
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Iterable, Mapping
+
+import requests
+from flask import current_app
+from urllib3.util.retry import Retry
+
+from .circuit_breaker import BreakerSettings, CircuitBreaker, current_route
+from .tracing import TracingAdapter
+
+EXTENSION_KEY = "http_sessions"
+
+# Servicios upstream con sesión propia (pool independiente por servicio)
+UPSTREAM_SERVICES = ("auth", "admin", "user", "patient", "media", "realtime", "ai")
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """Parámetros del pool de conexiones de cada sesión."""
+
+    pool_maxsize: int = 20
+    pool_block: bool = False
+    keep_alive: bool = True
+    max_retries: int = 1
+    connect_timeout: float = 2.0
+    trust_env: bool = False
+
+
+class SessionRegistry:
+    """
+    Registro de `requests.Session` por servicio upstream.
+
+    Cada sesión mantiene su propio pool de conexiones keep-alive, de modo que
+    las peticiones del gateway reutilizan sockets TCP en lugar de abrir uno
+    nuevo por request, y su propio circuit breaker. Cada llamada propaga la
+    traza de la petición en curso.
+    """
+
+    def __init__(
+        self,
+        settings: PoolSettings,
+        timeouts: Mapping[str, float],
+        services: Iterable[str] = UPSTREAM_SERVICES,
+        breaker_settings: BreakerSettings | None = None,
+    ) -> None:
+        self.settings = settings
+        self.breaker_settings = breaker_settings or BreakerSettings()
+        self._timeouts = dict(timeouts)
+        self._lock = threading.Lock()
+        self._sessions: dict[str, requests.Session] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        for service in services:
+            self._sessions[service] = self._build_session(service)
+
+    def session(self, service: str) -> requests.Session:
+        """Sesión del servicio; se crea bajo demanda si no estaba registrada."""
+        session = self._sessions.get(service)
+        if session is None:
+            with self._lock:
+                session = self._sessions.setdefault(service, self._build_session(service))
+        return session
+
+    def breaker(self, service: str) -> CircuitBreaker:
+        """Circuit breaker del servicio (compartido por las sesiones síncrona y asíncrona)."""
+        breaker = self._breakers.get(service)
+        if breaker is None:
+            breaker = self._breakers.setdefault(service, CircuitBreaker(service, self.breaker_settings))
+        return breaker
+
+    def timeout(self, service: str, default: float, route: str | None = None) -> tuple[float, float]:
+        """
+        Timeout (connect, read) del servicio para `requests`.
+
+        El de lectura se adapta al p99 observado en el endpoint `route`, con el
+        configurado como máximo.
+        """
+        read_timeout = self.breaker(service).timeout(self._timeouts.get(service, default), route)
+        return (min(self.settings.connect_timeout, read_timeout), read_timeout)
+
+    def circuits(self, default: float) -> dict[str, dict[str, Any]]:
+        """Estado de los circuit breakers por servicio."""
+        return {
+            service: self.breaker(service).snapshot(self._timeouts.get(service, default))
+            for service in sorted(self._sessions)
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def _build_session(self, service: str) -> requests.Session:
+        settings = self.settings
+        session = requests.Session()
+        # Las peticiones son de distintos usuarios: nunca guardar cookies del upstream
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        # Llamadas internas: sin proxies ni .netrc del entorno (evita su lectura por request)
+        session.trust_env = settings.trust_env
+        if not settings.keep_alive:
+            session.headers["Connection"] = "close"
+
+        adapter = TracingAdapter(
+            service,
+            self.breaker(service),
+            pool_connections=1,
+            pool_maxsize=settings.pool_maxsize,
+            pool_block=settings.pool_block,
+            max_retries=Retry(
+                total=settings.max_retries,
+                connect=settings.max_retries,
+                read=0,
+                status=0,
+                allowed_methods=None,
+                raise_on_status=False,
+            ),
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+
+def init_http_sessions(app: Any) -> SessionRegistry:
+    """Crea el registro de sesiones a partir de la configuración de la app."""
+    registry = SessionRegistry(
+        PoolSettings(
+            pool_maxsize=app.config["HTTP_POOL_MAXSIZE"],
+            pool_block=app.config["HTTP_POOL_BLOCK"],
+            keep_alive=app.config["HTTP_KEEP_ALIVE"],
+            max_retries=app.config["HTTP_MAX_RETRIES"],
+            connect_timeout=app.config["HTTP_CONNECT_TIMEOUT"],
+            trust_env=app.config["HTTP_TRUST_ENV"],
+        ),
+        timeouts=app.config["SERVICE_TIMEOUTS"],
+        breaker_settings=BreakerSettings(
+            window_seconds=app.config["CIRCUIT_WINDOW_SECONDS"],
+            min_requests=app.config["CIRCUIT_MIN_REQUESTS"],
+            failure_rate=app.config["CIRCUIT_FAILURE_RATE"],
+            open_seconds=app.config["CIRCUIT_OPEN_SECONDS"],
+            timeout_multiplier=app.config["CIRCUIT_TIMEOUT_MULTIPLIER"],
+            min_timeout=app.config["CIRCUIT_MIN_TIMEOUT"],
+        ),
+    )
+    app.extensions[EXTENSION_KEY] = registry
+    return registry
+
+
+def get_session(service: str) -> requests.Session:
+    """Sesión compartida del servicio para la app actual."""
+    return current_app.extensions[EXTENSION_KEY].session(service)
+
+
+def get_timeout(service: str) -> tuple[float, float]:
+    """Timeout (connect, read) configurado para el servicio en la app actual."""
+    registry: SessionRegistry = current_app.extensions[EXTENSION_KEY]
+    return registry.timeout(service, current_app.config["GATEWAY_SERVICE_TIMEOUT"], current_route())
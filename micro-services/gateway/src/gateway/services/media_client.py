@@ -1,7 +1,7 @@
 """Cliente HTTP para el Media Service."""
 from __future__ import annotations
 
-from typing import Any, Mapping, Sequence
+from typing import Any, Iterable, Mapping, Sequence
 
 import requests
 
@@ -9,9 +9,17 @@ import requests
 class MediaClient:
     """Invocaciones al microservicio de media."""
 
-    def __init__(self, base_url: str, *, timeout: float = 5.0) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout: float | tuple[float, float] = 5.0,
+        session: requests.Session | None = None,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        # Sesión compartida con pool keep-alive; sin ella cada llamada abre una conexión
+        self._http = session if session is not None else requests
 
     def proxy_request(
         self,
@@ -19,10 +27,11 @@ class MediaClient:
         path: str,
         *,
         headers: Mapping[str, str] | None = None,
-        data: bytes | None = None,
+        data: bytes | Iterable[bytes] | None = None,
         json: Any = None,
         files: Mapping[str, Any] | None = None,
         params: Sequence[tuple[str, str]] | None = None,
+        stream: bool = False,
     ) -> requests.Response:
         url = f"{self.base_url}{path}"
         try:
@@ -31,7 +40,7 @@ class MediaClient:
             if files and "Content-Type" in request_headers:
                 del request_headers["Content-Type"]
             
-            response = requests.request(
+            response = self._http.request(
                 method=method,
                 url=url,
                 headers=request_headers or None,
@@ -40,6 +49,7 @@ class MediaClient:
                 files=files,
                 params=params,
                 timeout=self.timeout,
+                stream=stream,
             )
             return response
         except requests.Timeout as exc:
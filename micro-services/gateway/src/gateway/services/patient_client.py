@@ -1,7 +1,7 @@
 """Cliente HTTP para interactuar con Patient Service."""
 from __future__ import annotations
 
-from typing import Any, Mapping
+from typing import Any, Iterable, Mapping
 
 import requests
 
@@ -9,9 +9,17 @@ import requests
 class PatientClient:
     """Invocaciones al microservicio de pacientes."""
 
-    def __init__(self, base_url: str, *, timeout: float = 5.0) -> None:
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout: float | tuple[float, float] = 5.0,
+        session: requests.Session | None = None,
+    ) -> None:
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        # Sesión compartida con pool keep-alive; sin ella cada llamada abre una conexión
+        self._http = session if session is not None else requests
 
     def proxy_request(
         self,
@@ -20,14 +28,15 @@ class PatientClient:
         *,
         headers: Mapping[str, str] | None = None,
         json: Any = None,
-        data: bytes | None = None,
+        data: bytes | Iterable[bytes] | None = None,
         params: Mapping[str, str] | None = None,
+        stream: bool = False,
     ) -> requests.Response:
         """Realiza una petición HTTP al patient-service y retorna la respuesta cruda."""
         url = f"{self.base_url}{path}"
 
         try:
-            response = requests.request(
+            response = self._http.request(
                 method=method,
                 url=url,
                 headers=headers,
@@ -35,6 +44,7 @@ class PatientClient:
                 data=data,
                 params=params,
                 timeout=self.timeout,
+                stream=stream,
             )
             return response
         except requests.Timeout as exc:
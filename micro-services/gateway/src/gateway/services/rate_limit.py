@@ -0,0 +1,327 @@
+"""Limitación de tasa por principal y descarte de carga por prioridad."""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from collections import Counter, OrderedDict
+from http import HTTPStatus
+from typing import Any, Protocol
+
+from flask import Response, current_app, g, jsonify, request
+
+from .response_cache import request_principal
+
+try:  # Backend compartido opcional: sin redis cada réplica limita por su cuenta
+    import redis
+except ImportError:  # pragma: no cover - depende del entorno
+    redis = None
+
+RATE_LIMITER_KEY = "rate_limiter"
+LOAD_SHEDDER_KEY = "load_shedder"
+
+CRITICAL = "critical"
+NORMAL = "normal"
+EXPENSIVE = "expensive"
+
+# Rutas que deben seguir respondiendo bajo carga: renovar sesión y atender alertas
+CRITICAL_ENDPOINTS = {
+    "auth.refresh",
+    "auth.login_user",
+    "auth.login_patient",
+    "admin.alert_ack",
+    "admin.alert_resolve",
+    "user.org_patient_alert_acknowledge",
+    "user.org_patient_alert_resolve",
+    "user.caregiver_patient_alert_acknowledge",
+    "user.caregiver_patient_alert_resolve",
+}
+
+# Lecturas agregadas (dashboards, series de lecturas y ubicaciones, inferencia):
+# son las primeras que se descartan
+EXPENSIVE_ENDPOINTS = {
+    "admin.organization_dashboard",
+    "user.org_dashboard",
+    "user.org_metrics",
+    "user.caregiver_metrics",
+    "user.care_team_locations",
+    "user.caregiver_patient_locations",
+    "user.org_care_team_patients_locations",
+    "patient.get_dashboard",
+    "patient.get_readings",
+    "patient.get_locations",
+    "realtime.get_patients",
+    "ai_proxy.predict",
+    "ai_proxy.batch_predict",
+}
+
+# Rutas propias del gateway: nunca se limitan
+EXEMPT_BLUEPRINTS = {"health", "debug"}
+
+# Token bucket atómico en redis: devuelve los segundos de espera (0 si se admite)
+_REDIS_TAKE = """
+local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local cost, floor = tonumber(ARGV[4]), tonumber(ARGV[5])
+local state = redis.call('HMGET', KEYS[1], 't', 'u')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens - cost >= floor then
+    tokens = tokens - cost
+else
+    wait = (cost + floor - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 't', tokens, 'u', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(wait)
+"""
+
+
+def priority_for(endpoint: str | None) -> str:
+    """Clase de prioridad de un endpoint."""
+    if endpoint in CRITICAL_ENDPOINTS:
+        return CRITICAL
+    if endpoint in EXPENSIVE_ENDPOINTS:
+        return EXPENSIVE
+    return NORMAL
+
+
+class Buckets(Protocol):
+    # True si take() hace E/S de red (no debe llamarse desde el loop de asyncio)
+    blocking: bool
+
+    def take(self, key: str, cost: float, floor: float) -> float: ...
+
+
+class MemoryBuckets:
+    """
+    Token buckets en memoria por clave, con un LRU acotado de claves.
+
+    Un bucket recupera `rate` tokens por segundo hasta `burst`.
+    """
+
+    blocking = False
+
+    def __init__(self, rate: float, burst: float, *, max_keys: int = 100_000) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, key: str, cost: float, floor: float) -> float:
+        """
+        Consume `cost` tokens si al bucket le quedan al menos `floor` después.
+
+        Returns:
+            0 si se admite; si no, segundos hasta que haya tokens suficientes
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens - cost >= floor:
+                tokens -= cost
+            else:
+                wait = (cost + floor - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RedisBuckets:
+    """
+    Token buckets compartidos por todas las réplicas del gateway.
+
+    Si redis no responde se usan los buckets locales: un fallo del backend
+    no debe dejar sin servicio al gateway.
+    """
+
+    blocking = True
+
+    def __init__(self, url: str, rate: float, burst: float, fallback: MemoryBuckets) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._fallback = fallback
+        self._client = redis.Redis.from_url(url, socket_timeout=0.05, socket_connect_timeout=0.05)
+        self._script = self._client.register_script(_REDIS_TAKE)
+
+    def take(self, key: str, cost: float, floor: float) -> float:
+        try:
+            wait = self._script(
+                keys=[f"heartguard:ratelimit:{key}"],
+                args=[self.rate, self.burst, time.time(), cost, floor],
+            )
+        except redis.RedisError as exc:
+            current_app.logger.warning("Rate limit en redis no disponible, se usa el local: %s", exc)
+            return self._fallback.take(key, cost, floor)
+        return float(wait)
+
+
+class RateLimiter:
+    """
+    Límite de peticiones por principal (usuario, paciente o IP anónima).
+
+    Las peticiones no críticas deben dejar `critical_reserve` tokens en el
+    bucket: un cliente que agota su cuota con lecturas aún puede renovar su
+    sesión o atender una alerta.
+    """
+
+    def __init__(self, buckets: Buckets, *, critical_reserve: float, expensive_cost: float) -> None:
+        self.buckets = buckets
+        self.critical_reserve = critical_reserve
+        self.expensive_cost = expensive_cost
+        self._lock = threading.Lock()
+        self._limited: Counter[str] = Counter()
+
+    def check(self, key: str, priority: str) -> float:
+        """Segundos que el cliente debe esperar (0 si se admite la petición)."""
+        cost = self.expensive_cost if priority == EXPENSIVE else 1.0
+        floor = 0.0 if priority == CRITICAL else self.critical_reserve
+        wait = self.buckets.take(key, cost, floor)
+        if wait:
+            with self._lock:
+                self._limited[priority] += 1
+        return wait
+
+    @property
+    def blocking(self) -> bool:
+        return self.buckets.blocking
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            limited = dict(self._limited)
+        return {"backend": type(self.buckets).__name__, "limited": limited}
+
+
+class LoadShedder:
+    """
+    Descarte de carga según las peticiones en curso en el gateway.
+
+    Cada clase se admite hasta una fracción de `max_in_flight`: con el gateway
+    al 60 % se descartan las lecturas costosas, al 85 % el resto, y las
+    críticas se siguen atendiendo hasta el límite.
+    """
+
+    def __init__(self, max_in_flight: int, thresholds: dict[str, float]) -> None:
+        self.max_in_flight = max_in_flight
+        self.limits = {priority: max(1, int(max_in_flight * ratio)) for priority, ratio in thresholds.items()}
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self._shed: Counter[str] = Counter()
+
+    def admit(self, priority: str) -> bool:
+        with self._lock:
+            if self.in_flight >= self.limits[priority]:
+                self._shed[priority] += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_in_flight": self.max_in_flight,
+                "limits": self.limits,
+                "shed": dict(self._shed),
+            }
+
+
+def init_load_shedder(app: Any) -> LoadShedder | None:
+    """Activa el descarte de carga si LOAD_SHED_MAX_IN_FLIGHT > 0."""
+    max_in_flight = app.config["LOAD_SHED_MAX_IN_FLIGHT"]
+    if max_in_flight <= 0:
+        return None
+
+    shedder = LoadShedder(max_in_flight, {
+        EXPENSIVE: app.config["LOAD_SHED_EXPENSIVE_AT"],
+        NORMAL: app.config["LOAD_SHED_NORMAL_AT"],
+        CRITICAL: 1.0,
+    })
+    app.extensions[LOAD_SHEDDER_KEY] = shedder
+    app.before_request(_admit_request)
+    app.after_request(_release_on_close)
+    return shedder
+
+
+def init_rate_limiter(app: Any) -> RateLimiter | None:
+    """Activa el límite por principal si RATE_LIMIT_ENABLED."""
+    if not app.config["RATE_LIMIT_ENABLED"]:
+        return None
+
+    rate, burst = app.config["RATE_LIMIT_RATE"], app.config["RATE_LIMIT_BURST"]
+    buckets: Buckets = MemoryBuckets(rate, burst)
+    redis_url = app.config["RATE_LIMIT_REDIS_URL"]
+    if redis_url and redis is None:
+        app.logger.warning("RATE_LIMIT_REDIS_URL configurado pero redis no está instalado: límite local")
+    elif redis_url:
+        buckets = RedisBuckets(redis_url, rate, burst, fallback=buckets)
+
+    limiter = RateLimiter(
+        buckets,
+        critical_reserve=app.config["RATE_LIMIT_CRITICAL_RESERVE"],
+        expensive_cost=app.config["RATE_LIMIT_EXPENSIVE_COST"],
+    )
+    app.extensions[RATE_LIMITER_KEY] = limiter
+    app.before_request(_limit_rate)
+    return limiter
+
+
+def _admit_request() -> Response | None:
+    if _exempt():
+        return None
+    shedder: LoadShedder = current_app.extensions[LOAD_SHEDDER_KEY]
+    priority = priority_for(request.endpoint)
+    if not shedder.admit(priority):
+        return _reject(HTTPStatus.SERVICE_UNAVAILABLE, "overloaded", "El gateway está saturado, intenta de nuevo", 1)
+    g.load_slot = True
+    return None
+
+
+def _release_on_close(response: Response) -> Response:
+    if g.pop("load_slot", False):
+        # La petición sigue en curso mientras se reenvía el cuerpo
+        response.call_on_close(current_app.extensions[LOAD_SHEDDER_KEY].release)
+    return response
+
+
+def _limit_rate() -> Response | None:
+    if _exempt():
+        return None
+    limiter: RateLimiter = current_app.extensions[RATE_LIMITER_KEY]
+    principal = request_principal()
+    if principal == "anonymous":
+        principal = f"ip:{request.remote_addr}"
+    wait = limiter.check(principal, priority_for(request.endpoint))
+    if wait:
+        return _reject(HTTPStatus.TOO_MANY_REQUESTS, "rate_limited", "Demasiadas peticiones, intenta más tarde", wait)
+    return None
+
+
+def _exempt() -> bool:
+    return request.method == "OPTIONS" or request.blueprint in EXEMPT_BLUEPRINTS or request.blueprint is None
+
+
+def _reject(status: HTTPStatus, error: str, message: str, retry_after: float) -> Response:
+    headers = {"Retry-After": str(max(1, math.ceil(retry_after)))}
+    if request.blueprint == "admin":
+        # Admin responde en XML
+        return Response(
+            f'<?xml version="1.0"?><response><error><code>{error}</code>'
+            f'<message>{message}</message></error></response>',
+            status=status,
+            mimetype="application/xml",
+            headers=headers,
+        )
+    response = jsonify({"error": error, "message": message})
+    response.status_code = status
+    response.headers.update(headers)
+    return response
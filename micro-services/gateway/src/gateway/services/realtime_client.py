@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from http import HTTPStatus
-from typing import Any
+from typing import Any, Iterable
 
 import requests
 
@@ -20,9 +20,16 @@ class RealtimeClientError(Exception):
 class RealtimeClient:
     """Cliente para comunicarse con el Realtime Data Generator Service."""
 
-    def __init__(self, base_url: str, timeout: float = 5.0):
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float | tuple[float, float] = 5.0,
+        session: requests.Session | None = None,
+    ):
         self.base_url = base_url.rstrip("/")
         self.timeout = timeout
+        # Sesión compartida con pool keep-alive; sin ella cada llamada abre una conexión
+        self._http = session if session is not None else requests
 
     def proxy_request(
         self,
@@ -30,8 +37,9 @@ class RealtimeClient:
         path: str,
         headers: dict[str, str] | None = None,
         json: dict[str, Any] | None = None,
-        data: bytes | None = None,
+        data: bytes | Iterable[bytes] | None = None,
         params: dict[str, Any] | None = None,
+        stream: bool = False,
     ) -> requests.Response:
         """
         Reenvía la petición HTTP al Realtime Service.
@@ -41,8 +49,9 @@ class RealtimeClient:
             path: Ruta del endpoint (ej: '/health')
             headers: Encabezados HTTP opcionales
             json: Cuerpo JSON opcional
-            data: Cuerpo raw opcional
+            data: Cuerpo raw opcional (bytes o stream)
             params: Query parameters opcionales
+            stream: Si True el cuerpo de la respuesta no se descarga por adelantado
             
         Returns:
             Response directo de requests
@@ -53,7 +62,7 @@ class RealtimeClient:
         url = f"{self.base_url}{path}"
 
         try:
-            response = requests.request(
+            response = self._http.request(
                 method=method,
                 url=url,
                 headers=headers,
@@ -61,6 +70,7 @@ class RealtimeClient:
                 data=data,
                 params=params,
                 timeout=self.timeout,
+                stream=stream,
             )
             response.raise_for_status()
             return response
@@ -0,0 +1,328 @@
+"""Caché de respuestas GET del gateway con revalidación por ETag."""
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any, Iterable, Iterator
+
+from flask import Response, current_app, g, request
+
+from .async_upstream import DeferredResponse
+
+EXTENSION_KEY = "response_cache"
+
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Headers que no se guardan con la respuesta cacheada
+UNCACHED_HEADERS = {"x-cache", "content-length", "date", "set-cookie"}
+
+CacheKey = tuple[str, tuple[tuple[str, str], ...], str, str]
+
+
+@dataclass
+class CacheEntry:
+    """Respuesta guardada para una ruta, query y principal concretos."""
+
+    route: str
+    path: str
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+    etag: str
+    # True si el ETag lo generó el upstream y sirve para revalidar con él
+    upstream_etag: bool
+    expires_at: float
+
+    def is_fresh(self, now: float) -> bool:
+        return self.expires_at > now
+
+
+class ResponseCache:
+    """
+    LRU de respuestas en memoria, acotado por número de entradas.
+
+    Las entradas caducadas con ETag del upstream se conservan para revalidar
+    con If-None-Match; el resto se descarta al consultarlas.
+    """
+
+    def __init__(self, ttls: dict[str, float], *, max_entries: int = 1000, max_body: int = 1024 * 1024) -> None:
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.max_body = max_body
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+        self._lookups: Counter[str] = Counter()
+        self._hits: Counter[str] = Counter()
+        self._revalidated: Counter[str] = Counter()
+
+    def lookup(self, route: str, key: CacheKey) -> CacheEntry | None:
+        """Entrada para `key` (fresca o revalidable) y contabiliza la consulta."""
+        now = time.time()
+        with self._lock:
+            self._lookups[route] += 1
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.is_fresh(now):
+                self._hits[route] += 1
+            elif not entry.upstream_etag:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key: CacheKey, entry: CacheEntry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def refresh(self, key: CacheKey, entry: CacheEntry, ttl: float) -> None:
+        """El upstream confirmó la entrada (304): vuelve a ser válida `ttl` segundos."""
+        with self._lock:
+            entry.expires_at = time.time() + ttl
+            self._revalidated[entry.route] += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+
+    def invalidate(self, path: str) -> int:
+        """
+        Elimina las entradas afectadas por una escritura en `path` (de cualquier principal).
+
+        Se descarta el subárbol del recurso padre y cada ruta ancestra: un cambio
+        en /user/orgs/1/care-teams/2/members/3 invalida también los listados
+        /user/orgs/1/care-teams/2, /user/orgs/1/care-teams y /user/orgs/1.
+        """
+        prefix = _resource_prefix(path)
+        ancestors = set(_ancestor_paths(path))
+        with self._lock:
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if _within(entry.path, prefix) or entry.path.rstrip("/") in ancestors
+            ]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def stats(self) -> dict[str, Any]:
+        """Consultas, aciertos y ratio de aciertos por ruta."""
+        with self._lock:
+            routes = {}
+            for route, lookups in sorted(self._lookups.items()):
+                hits = self._hits[route]
+                revalidated = self._revalidated[route]
+                routes[route] = {
+                    "ttl": self.ttls.get(route),
+                    "lookups": lookups,
+                    "hits": hits,
+                    "revalidated": revalidated,
+                    "misses": lookups - hits - revalidated,
+                    "hit_ratio": round((hits + revalidated) / lookups, 4) if lookups else 0.0,
+                }
+            return {"entries": len(self._entries), "max_entries": self.max_entries, "routes": routes}
+
+
+class CacheFill:
+    """
+    Petición que no se sirvió desde caché y puede guardar la respuesta.
+
+    El cuerpo se acumula mientras se reenvía al cliente (`feed`) y se guarda
+    al terminar (`finish`) si es un 200 que cabe en `max_body`.
+    """
+
+    def __init__(self, cache: ResponseCache, key: CacheKey, route: str, path: str, ttl: float, stale: CacheEntry | None) -> None:
+        self._cache = cache
+        self._key = key
+        self.route = route
+        self.path = path
+        self.ttl = ttl
+        self.stale = stale
+        self._chunks: list[bytes] = []
+        self._size = 0
+
+    @property
+    def validator(self) -> str | None:
+        """ETag a enviar al upstream en If-None-Match, si hay entrada revalidable."""
+        if self.stale is not None and self.stale.upstream_etag:
+            return self.stale.etag
+        return None
+
+    def not_modified(self) -> CacheEntry | None:
+        """El upstream respondió 304: renueva y devuelve la entrada guardada."""
+        if self.stale is None:
+            return None
+        self._cache.refresh(self._key, self.stale, self.ttl)
+        return self.stale
+
+    def feed(self, chunk: bytes) -> None:
+        if self._size <= self._cache.max_body:
+            self._chunks.append(chunk)
+            self._size += len(chunk)
+
+    def finish(self, status: int, headers: Iterable[tuple[str, str]]) -> None:
+        if status != HTTPStatus.OK or self._size > self._cache.max_body:
+            return
+        headers = [(name, value) for name, value in headers if name.lower() not in UNCACHED_HEADERS]
+        cache_control = ",".join(value for name, value in headers if name.lower() == "cache-control")
+        if "no-store" in cache_control.lower():
+            return
+
+        body = b"".join(self._chunks)
+        etag = next((value for name, value in headers if name.lower() == "etag"), None)
+        upstream_etag = etag is not None
+        if etag is None:
+            etag = f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
+            headers.append(("ETag", etag))
+        self._cache.store(self._key, CacheEntry(
+            route=self.route,
+            path=self.path,
+            status=status,
+            headers=headers,
+            body=body,
+            etag=etag,
+            upstream_etag=upstream_etag,
+            expires_at=time.time() + self.ttl,
+        ))
+
+    def capture(self, chunks: Iterable[bytes], status: int, headers: list[tuple[str, str]]) -> Iterator[bytes]:
+        """Reenvía `chunks` guardando una copia; la entrada se crea al final."""
+        for chunk in chunks:
+            self.feed(chunk)
+            yield chunk
+        self.finish(status, headers)
+
+
+def init_response_cache(app: Any) -> ResponseCache | None:
+    """Registra la caché de respuestas si hay rutas con TTL configurado."""
+    ttls = app.config["RESPONSE_CACHE_TTLS"]
+    if not ttls:
+        return None
+
+    cache = ResponseCache(
+        ttls,
+        max_entries=app.config["RESPONSE_CACHE_MAX_ENTRIES"],
+        max_body=app.config["RESPONSE_CACHE_MAX_BODY"],
+    )
+    app.extensions[EXTENSION_KEY] = cache
+    app.before_request(_serve_from_cache)
+    app.after_request(_fill_or_invalidate)
+    return cache
+
+
+def cached_response_headers(entry: CacheEntry, status: str) -> list[tuple[str, str]]:
+    return [*entry.headers, ("X-Cache", status)]
+
+
+def revalidation_headers(headers: dict[str, str]) -> dict[str, str]:
+    """Añade If-None-Match con el ETag de la entrada caducada, si la hay."""
+    fill: CacheFill | None = g.get("cache_fill")
+    if fill is not None and fill.validator:
+        headers["If-None-Match"] = fill.validator
+    return headers
+
+
+def _serve_from_cache() -> Response | None:
+    if request.method != "GET":
+        return None
+    ttl = current_app.config["RESPONSE_CACHE_TTLS"].get(request.endpoint or "")
+    if not ttl:
+        return None
+
+    cache: ResponseCache = current_app.extensions[EXTENSION_KEY]
+    key = request_key()
+    entry = cache.lookup(request.endpoint, key)
+    if entry is not None and entry.is_fresh(time.time()):
+        return _cached_response(entry, "HIT")
+
+    g.cache_fill = CacheFill(cache, key, request.endpoint, request.path, ttl, stale=entry)
+    return None
+
+
+def _fill_or_invalidate(response: Response) -> Response:
+    cache: ResponseCache = current_app.extensions[EXTENSION_KEY]
+    if request.method in MUTATING_METHODS:
+        path = request.path
+        cache.invalidate(path)
+        # En modo asíncrono el upstream aún no ha respondido: se invalida de nuevo al terminar
+        response.call_on_close(lambda: cache.invalidate(path))
+        return response
+
+    fill: CacheFill | None = g.pop("cache_fill", None)
+    if fill is None:
+        return response
+
+    if isinstance(response, DeferredResponse):
+        # El motor asíncrono rellena la caché al reenviar el cuerpo
+        response.cache_fill = fill
+        response.headers["X-Cache"] = "MISS"
+        return response
+
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        entry = fill.not_modified()
+        if entry is not None:
+            response.close()
+            return _cached_response(entry, "REVALIDATED")
+
+    headers = list(response.headers.items())
+    if response.is_sequence:
+        fill.finish(response.status_code, headers)
+    else:
+        response.response = fill.capture(response.response, response.status_code, headers)
+    response.headers["X-Cache"] = "MISS"
+    return response
+
+
+def _cached_response(entry: CacheEntry, status: str) -> Response:
+    if entry.etag in _if_none_match():
+        response = Response(status=HTTPStatus.NOT_MODIFIED)
+        response.headers["ETag"] = entry.etag
+        response.headers["X-Cache"] = status
+        return response
+    return Response(entry.body, status=entry.status, headers=cached_response_headers(entry, status))
+
+
+def _if_none_match() -> set[str]:
+    return {tag.strip() for tag in request.headers.get("If-None-Match", "").split(",") if tag.strip()}
+
+
+def request_key() -> CacheKey:
+    """Ruta, query ordenada, principal autenticado y Accept-Encoding."""
+    query = tuple(sorted(request.args.items(multi=True)))
+    return (request.path, query, request_principal(), request.headers.get("Accept-Encoding", "identity"))
+
+
+def request_principal() -> str:
+    """Usuario o paciente del token validado; sin validación, un hash del header Authorization."""
+    verified = g.get("verified_token")
+    if verified is not None:
+        claims = verified.claims
+        return f"{claims.get('account_type')}:{claims.get('user_id') or claims.get('patient_id')}"
+    authorization = request.headers.get("Authorization")
+    if authorization:
+        # Sin validación en el borde: cada token es un principal distinto
+        return hashlib.sha256(authorization.encode()).hexdigest()
+    return "anonymous"
+
+
+def _resource_prefix(path: str) -> str:
+    """Recurso padre de la ruta modificada: /user/orgs/1/care-teams/2 -> /user/orgs/1/care-teams."""
+    parent = path.rstrip("/").rpartition("/")[0]
+    return parent or path
+
+
+def _ancestor_paths(path: str) -> Iterator[str]:
+    """Rutas ancestras: /user/orgs/1/care-teams -> /user/orgs/1, /user/orgs, /user."""
+    parent = path.rstrip("/").rpartition("/")[0]
+    while parent:
+        yield parent
+        parent = parent.rpartition("/")[0]
+
+
+def _within(path: str, prefix: str) -> bool:
+    return path == prefix or path.startswith(prefix.rstrip("/") + "/")
@@ -0,0 +1,239 @@
+"""Coalescencia (single-flight) de peticiones GET idénticas y simultáneas."""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any, Iterable, Iterator
+
+from flask import Response, current_app, g, request
+
+from .async_upstream import CoalescedResponse, DeferredResponse
+from .response_cache import CacheKey, request_key
+
+EXTENSION_KEY = "single_flight"
+
+# Clave del environ con la que el motor asíncrono marca sus peticiones
+ASYNC_ENVIRON_KEY = "heartguard.async"
+# Desactiva la coalescencia para una petición (reintento de un seguidor)
+BYPASS_ENVIRON_KEY = "heartguard.single_flight.bypass"
+
+# Rutas propias del gateway: no llaman a ningún upstream
+LOCAL_BLUEPRINTS = {"health", "debug"}
+
+# Headers de la respuesta compartida que cada seguidor recalcula
+UNSHARED_HEADERS = {"content-length", "date", "set-cookie"}
+
+
+@dataclass(frozen=True)
+class SharedResponse:
+    """Respuesta del líder que reciben todas las peticiones coalescidas."""
+
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+
+
+class Flight:
+    """
+    Llamada upstream en curso compartida por peticiones idénticas.
+
+    El líder reenvía su respuesta al cliente y a la vez la acumula; al
+    terminar la publica para los seguidores, que esperan en un hilo
+    (`wait`) o en el event loop (`wait_async`). Si el cuerpo supera
+    `max_body` o el líder no termina, los seguidores reciben None y hacen
+    su propia petición.
+    """
+
+    def __init__(self, registry: SingleFlight, key: CacheKey, deadline: float) -> None:
+        self._registry = registry
+        self.key = key
+        self.deadline = deadline
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self._chunks: list[bytes] = []
+        self._size = 0
+        self.result: SharedResponse | None = None
+
+    @property
+    def done(self) -> bool:
+        return self._event.is_set()
+
+    def feed(self, chunk: bytes) -> None:
+        if self._size <= self._registry.max_body:
+            self._chunks.append(chunk)
+            self._size += len(chunk)
+
+    def finish(self, status: int, headers: Iterable[tuple[str, str]]) -> None:
+        if self._size > self._registry.max_body:
+            self.abandon()
+            return
+        shared_headers = [(name, value) for name, value in headers if name.lower() not in UNSHARED_HEADERS]
+        self._publish(SharedResponse(status, shared_headers, b"".join(self._chunks)))
+
+    def abandon(self) -> None:
+        self._publish(None)
+
+    def capture(self, chunks: Iterable[bytes], status: int, headers: list[tuple[str, str]]) -> Iterator[bytes]:
+        """Reenvía `chunks` acumulándolos; publica al terminar o abandona si se corta."""
+        completed = False
+        try:
+            for chunk in chunks:
+                self.feed(chunk)
+                yield chunk
+            completed = True
+        finally:
+            if completed:
+                self.finish(status, headers)
+            else:
+                self.abandon()
+
+    def wait(self, timeout: float) -> SharedResponse | None:
+        self._event.wait(max(0.0, timeout))
+        return self.result
+
+    async def wait_async(self, timeout: float) -> SharedResponse | None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.done:
+                return self.result
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            return await asyncio.wait_for(future, max(0.0, timeout))
+        except asyncio.TimeoutError:
+            return None
+
+    def _publish(self, result: SharedResponse | None) -> None:
+        with self._lock:
+            if self.done:
+                return
+            self.result = result
+            self._event.set()
+            waiters, self._waiters = self._waiters, []
+        self._registry.land(self)
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future, result)
+
+
+class SingleFlight:
+    """Llamadas en curso por clave (ruta, query, principal, Accept-Encoding)."""
+
+    def __init__(self, *, max_wait: float = 30.0, max_body: int = 1024 * 1024) -> None:
+        self.max_wait = max_wait
+        self.max_body = max_body
+        self._lock = threading.Lock()
+        self._flights: dict[CacheKey, Flight] = {}
+        self._leaders: Counter[str] = Counter()
+        self._collapsed: Counter[str] = Counter()
+
+    def join(self, route: str, key: CacheKey) -> tuple[Flight, bool]:
+        """Vuelo en curso para `key` y si la petición es su líder."""
+        now = time.monotonic()
+        with self._lock:
+            flight = self._flights.get(key)
+            # Un líder que no terminó a tiempo deja de retener a los demás
+            if flight is not None and not flight.done and flight.deadline > now:
+                self._collapsed[route] += 1
+                return flight, False
+            flight = Flight(self, key, deadline=now + self.max_wait)
+            self._flights[key] = flight
+            self._leaders[route] += 1
+            return flight, True
+
+    def land(self, flight: Flight) -> None:
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+
+    def stats(self) -> dict[str, Any]:
+        """Peticiones enviadas al upstream (líderes) y coalescidas por ruta."""
+        with self._lock:
+            routes = {
+                route: {
+                    "upstream": self._leaders[route],
+                    "collapsed": self._collapsed[route],
+                }
+                for route in sorted(set(self._leaders) | set(self._collapsed))
+            }
+            return {
+                "in_flight": len(self._flights),
+                "collapsed": sum(self._collapsed.values()),
+                "routes": routes,
+            }
+
+
+def init_single_flight(app: Any) -> SingleFlight | None:
+    """Activa la coalescencia de GET idénticos si SINGLE_FLIGHT_ENABLED."""
+    if not app.config["SINGLE_FLIGHT_ENABLED"]:
+        return None
+
+    registry = SingleFlight(
+        max_wait=app.config["SINGLE_FLIGHT_MAX_WAIT"],
+        max_body=app.config["SINGLE_FLIGHT_MAX_BODY"],
+    )
+    app.extensions[EXTENSION_KEY] = registry
+    app.before_request(_join_flight)
+    app.after_request(_lead_flight)
+    return registry
+
+
+def shared_response(shared: SharedResponse) -> Response:
+    response = Response(shared.body, status=shared.status, headers=shared.headers)
+    response.headers["X-Coalesced"] = "true"
+    return response
+
+
+def _join_flight() -> Response | None:
+    if request.method != "GET" or request.blueprint in LOCAL_BLUEPRINTS or request.blueprint is None:
+        return None
+    if request.environ.get(BYPASS_ENVIRON_KEY):
+        return None
+
+    registry: SingleFlight = current_app.extensions[EXTENSION_KEY]
+    flight, leader = registry.join(request.endpoint, request_key())
+    if leader:
+        g.flight = flight
+        return None
+
+    if request.environ.get(ASYNC_ENVIRON_KEY):
+        # El motor asíncrono espera la respuesta sin bloquear el event loop
+        return CoalescedResponse(flight)
+    shared = flight.wait(flight.deadline - time.monotonic())
+    if shared is None:
+        # El líder no pudo compartir su respuesta: petición propia
+        return None
+    return shared_response(shared)
+
+
+def _lead_flight(response: Response) -> Response:
+    flight: Flight | None = g.pop("flight", None)
+    if flight is None:
+        return response
+
+    if isinstance(response, DeferredResponse):
+        # El motor asíncrono publica la respuesta al reenviar el cuerpo
+        response.flight = flight
+        return response
+
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        # Revalidación de la caché: cada seguidor obtiene la entrada renovada
+        flight.abandon()
+        return response
+
+    headers = list(response.headers.items())
+    if response.is_sequence:
+        flight.feed(response.get_data())
+        flight.finish(response.status_code, headers)
+    else:
+        response.response = flight.capture(response.response, response.status_code, headers)
+    return response
+
+
+def _resolve(future: asyncio.Future, result: SharedResponse | None) -> None:
+    if not future.done():
+        future.set_result(result)
@@ -0,0 +1,108 @@
+"""Utilidades para reenviar cuerpos de petición y respuesta como streams."""
+from __future__ import annotations
+
+from typing import IO, Iterator
+
+import requests
+from flask import Response, request
+
+from .async_upstream import DeferredResponse, UpstreamCall
+
+# Tamaño de cada bloque leído del upstream / del cliente
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Headers de la conexión con el upstream (RFC 7230 §6.1): no se reenvían al cliente
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
+}
+
+
+class RequestBodyStream:
+    """
+    Cuerpo de la petición entrante como objeto file-like para `requests`.
+
+    Con `__len__`, `requests` envía Content-Length y lee el cuerpo por bloques
+    en lugar de cargarlo completo en memoria; sin longitud conocida se envía
+    con Transfer-Encoding: chunked.
+    """
+
+    def __init__(self, stream: IO[bytes], length: int | None) -> None:
+        self._stream = stream
+        self._length = length
+
+    def read(self, size: int = -1) -> bytes:
+        return self._stream.read(size)
+
+    def __len__(self) -> int:
+        return self._length or 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self._stream.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def request_body_stream() -> RequestBodyStream | Iterator[bytes] | None:
+    """Cuerpo de la petición actual sin bufferizarlo (None si no trae cuerpo)."""
+    length = request.content_length
+    chunked = "chunked" in request.headers.get("Transfer-Encoding", "").lower()
+    if not length and not chunked:
+        return None
+
+    body = RequestBodyStream(request.stream, length)
+    # Sin longitud, `requests` solo usa chunked si recibe un iterador
+    return body if length else iter(body)
+
+
+def upstream_accept_encoding(headers: dict[str, str]) -> dict[str, str]:
+    """
+    Propaga el Accept-Encoding del cliente al upstream (identity si no envía).
+
+    Los servicios Flask no comprimen sus respuestas: la compresión la hace el
+    gateway (`services/compression.py`). Esto solo evita que `requests` pida
+    gzip por defecto y que un upstream que sí codifique (p. ej. tras un proxy)
+    devuelva un cuerpo que el cliente no sabe decodificar, ya que se reenvía
+    sin descomprimir.
+    """
+    headers["Accept-Encoding"] = request.headers.get("Accept-Encoding", "identity")
+    return headers
+
+
+def streamed_response(upstream: requests.Response | UpstreamCall, excluded_headers: set[str] | None = None) -> Response:
+    """
+    Respuesta de Flask que reenvía el cuerpo del upstream bloque a bloque.
+
+    Los bytes se pasan tal cual (sin descomprimir), por lo que Content-Length y
+    Content-Encoding del upstream siguen siendo válidos. La conexión vuelve al
+    pool cuando el cliente termina de recibir la respuesta.
+
+    En el modo asíncrono recibe una `UpstreamCall` y devuelve la respuesta
+    diferida que ejecuta el motor ASGI.
+    """
+    excluded = HOP_BY_HOP_HEADERS | (excluded_headers or set())
+    if isinstance(upstream, UpstreamCall):
+        # Modo asíncrono: el motor ASGI ejecuta la llamada y reenvía el cuerpo
+        return DeferredResponse(upstream, excluded)
+
+    headers = [
+        (name, value)
+        for name, value in upstream.headers.items()
+        if name.lower() not in excluded
+    ]
+
+    response = Response(
+        upstream.raw.stream(STREAM_CHUNK_SIZE, decode_content=False),
+        status=upstream.status_code,
+        headers=headers,
+    )
+    response.call_on_close(upstream.close)
+    return response
@@ -0,0 +1,219 @@
+"""Validación local de JWT en el borde del gateway."""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Any, Callable, Iterable, TypeVar
+
+import jwt
+from flask import Response, current_app, g, jsonify, request
+
+EXTENSION_KEY = "token_verifier"
+
+# Identidad validada por el gateway, firmada con IDENTITY_HEADER_SECRET
+IDENTITY_HEADER = "X-HeartGuard-Identity"
+
+REQUIRED = "required"
+OPTIONAL = "optional"
+
+# Política por blueprint: REQUIRED exige token, OPTIONAL solo valida el que llegue.
+# auth y health no se validan (auth emite y renueva sus propios tokens).
+AUTH_POLICIES = {
+    "user": REQUIRED,
+    "patient": REQUIRED,
+    "media": REQUIRED,
+    "admin": REQUIRED,
+    "ai_proxy": OPTIONAL,
+    "realtime": OPTIONAL,
+}
+
+# Marca de las vistas públicas dentro de blueprints con token obligatorio
+PUBLIC_ATTRIBUTE = "public_route"
+
+View = TypeVar("View", bound=Callable[..., Any])
+
+
+def public(view: View) -> View:
+    """Marca una vista como pública: el gateway no exige ni valida token en ella."""
+    setattr(view, PUBLIC_ATTRIBUTE, True)
+    return view
+
+
+def is_public_endpoint(endpoint: str | None) -> bool:
+    view = current_app.view_functions.get(endpoint or "")
+    return bool(getattr(view, PUBLIC_ATTRIBUTE, False))
+
+
+class InvalidTokenError(Exception):
+    """Token ausente, mal formado, expirado o con firma inválida."""
+
+    def __init__(self, error: str, message: str) -> None:
+        self.error = error
+        self.message = message
+        super().__init__(f"{error}: {message}")
+
+
+@dataclass(frozen=True)
+class VerifiedToken:
+    """Token validado y su identidad firmada para los servicios."""
+
+    signing_input: str
+    claims: dict[str, Any]
+    expires_at: float
+    identity_header: str | None
+
+
+class TokenVerifier:
+    """
+    Verifica JWT con la clave compartida y recuerda los ya validados.
+
+    El LRU se indexa por la firma del token y cada entrada vale hasta el `exp`
+    del token, así que las peticiones siguientes con el mismo token solo
+    cuestan una búsqueda en memoria.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        algorithms: Iterable[str],
+        *,
+        max_entries: int = 10_000,
+        identity_secret: str | None = None,
+    ) -> None:
+        self._key = key
+        self._algorithms = list(algorithms)
+        self._identity_secret = identity_secret.encode() if identity_secret else None
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, VerifiedToken] = OrderedDict()
+
+    def verify(self, token: str) -> VerifiedToken:
+        signing_input, _, signature = token.rpartition(".")
+        if not signing_input or not signature:
+            raise InvalidTokenError("invalid_token", "Token mal formado")
+
+        now = time.time()
+        with self._lock:
+            cached = self._cache.get(signature)
+            if cached is not None:
+                if cached.expires_at > now and hmac.compare_digest(cached.signing_input, signing_input):
+                    self._cache.move_to_end(signature)
+                    return cached
+                if cached.expires_at <= now:
+                    del self._cache[signature]
+
+        try:
+            claims = jwt.decode(token, self._key, algorithms=self._algorithms, options={"require": ["exp"]})
+        except jwt.ExpiredSignatureError as exc:
+            raise InvalidTokenError("token_expired", "Token expirado") from exc
+        except jwt.InvalidTokenError as exc:
+            raise InvalidTokenError("invalid_token", "Token inválido") from exc
+        if claims.get("token_type") != "access":
+            raise InvalidTokenError("invalid_token", "Se requiere un access token")
+
+        verified = VerifiedToken(
+            signing_input=signing_input,
+            claims=claims,
+            expires_at=float(claims["exp"]),
+            identity_header=self._sign_identity(claims),
+        )
+        with self._lock:
+            self._cache[signature] = verified
+            self._cache.move_to_end(signature)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return verified
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _sign_identity(self, claims: dict[str, Any]) -> str | None:
+        if self._identity_secret is None:
+            return None
+        return sign_identity(claims, self._identity_secret)
+
+
+def sign_identity(claims: dict[str, Any], secret: bytes) -> str:
+    """Serializa los claims como `<base64url(json)>.<base64url(hmac-sha256)>`."""
+    body = _b64encode(json.dumps(claims, separators=(",", ":"), sort_keys=True).encode())
+    signature = _b64encode(hmac.new(secret, body.encode(), hashlib.sha256).digest())
+    return f"{body}.{signature}"
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def init_token_verifier(app: Any) -> TokenVerifier | None:
+    """Activa la validación de JWT en el borde si hay clave configurada."""
+    key = app.config["JWT_PUBLIC_KEY"] or app.config["JWT_SECRET"]
+    if not key:
+        app.logger.warning("JWT_SECRET/JWT_PUBLIC_KEY sin configurar: los tokens solo se validan en cada servicio")
+        return None
+
+    verifier = TokenVerifier(
+        key,
+        algorithms=[app.config["JWT_ALGORITHM"]],
+        max_entries=app.config["JWT_CACHE_SIZE"],
+        identity_secret=app.config["IDENTITY_HEADER_SECRET"] or None,
+    )
+    app.extensions[EXTENSION_KEY] = verifier
+    app.before_request(_verify_request_token)
+    return verifier
+
+
+def _verify_request_token() -> Response | tuple[Response, int] | None:
+    """Rechaza en el gateway los tokens inválidos, sin llegar al upstream."""
+    policy = AUTH_POLICIES.get(request.blueprint or "")
+    if policy is None or request.method == "OPTIONS" or is_public_endpoint(request.endpoint):
+        return None
+
+    header = request.headers.get("Authorization")
+    if not header:
+        if policy == REQUIRED:
+            return _reject(InvalidTokenError("missing_token", "Token de autorización requerido"))
+        return None
+
+    scheme, _, token = header.partition(" ")
+    try:
+        if scheme.lower() != "bearer" or not token.strip():
+            raise InvalidTokenError("invalid_token", "Header Authorization debe ser 'Bearer <token>'")
+        g.verified_token = current_app.extensions[EXTENSION_KEY].verify(token.strip())
+    except InvalidTokenError as exc:
+        return _reject(exc)
+    return None
+
+
+def _reject(exc: InvalidTokenError) -> Response | tuple[Response, int]:
+    if request.blueprint == "admin":
+        # Admin responde en XML
+        return Response(
+            f'<?xml version="1.0"?><response><error><code>{exc.error}</code>'
+            f'<message>{exc.message}</message></error></response>',
+            status=HTTPStatus.UNAUTHORIZED,
+            mimetype="application/xml",
+        )
+    return jsonify({"error": exc.error, "message": exc.message}), HTTPStatus.UNAUTHORIZED
+
+
+def forward_identity(headers: dict[str, str]) -> dict[str, str]:
+    """
+    Añade la identidad firmada del token validado a los headers upstream.
+
+    Cualquier valor enviado por el cliente se descarta: solo el gateway puede
+    emitir este header.
+    """
+    for name in [name for name in headers if name.lower() == IDENTITY_HEADER.lower()]:
+        del headers[name]
+
+    verified: VerifiedToken | None = g.get("verified_token")
+    if verified is not None and verified.identity_header:
+        headers[IDENTITY_HEADER] = verified.identity_header
+    return headers
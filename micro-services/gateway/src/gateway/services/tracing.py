@@ -0,0 +1,287 @@
+"""Trazas distribuidas: propagación de X-Trace-ID y spans por salto."""
+from __future__ import annotations
+
+import json
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, MutableMapping
+
+import requests
+from flask import Response, current_app, g, has_request_context, request
+
+from .circuit_breaker import CircuitBreaker, CircuitBreakerAdapter
+
+EXTENSION_KEY = "tracing"
+
+TRACE_HEADER = "X-Trace-ID"
+# Span del gateway que originó la llamada: los servicios cuelgan de él sus spans
+PARENT_SPAN_HEADER = "X-Parent-Span-ID"
+SERVER_TIMING_HEADER = "Server-Timing"
+
+# Identificadores aceptados del cliente; cualquier otro valor se sustituye
+_TRACE_ID_RE = re.compile(r"^[A-Za-z0-9-]{8,64}$")
+
+# Métricas de Server-Timing que los servicios reportan por tipo de operación
+SERVER_TIMING_KINDS = {"db", "influxdb", "http", "storage"}
+
+
+def new_span_id() -> str:
+    return secrets.token_hex(8)
+
+
+@dataclass
+class Span:
+    """Operación medida dentro de una traza."""
+
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    service: str
+    name: str
+    kind: str
+    start: float
+    duration_ms: float
+    attributes: dict[str, Any] = field(default_factory=dict)
+
+
+class RequestTrace:
+    """
+    Traza de una petición en el gateway.
+
+    Acumula los spans de las llamadas upstream (desde el hilo de Flask o desde
+    el event loop) hasta que la respuesta termina y se exporta completa.
+    """
+
+    def __init__(self, trace_id: str, parent_id: str | None) -> None:
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.span_id = new_span_id()
+        self.start = time.time()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.spans: list[Span] = []
+        # Status real de una respuesta diferida (lo asigna el motor asíncrono)
+        self.status: int | None = None
+
+    def record_upstream(
+        self,
+        span_id: str,
+        service: str,
+        method: str,
+        url: str,
+        start: float,
+        duration: float,
+        *,
+        status: int | None = None,
+        server_timing: str | None = None,
+        error: str | None = None,
+    ) -> None:
+        """Registra una llamada upstream y los tiempos que reportó el servicio."""
+        attributes: dict[str, Any] = {"method": method, "url": url}
+        if status is not None:
+            attributes["status"] = status
+        if error is not None:
+            attributes["error"] = error
+        spans = [Span(self.trace_id, span_id, self.span_id, "gateway", f"{method} {service}", "http", start, duration * 1000, attributes)]
+        for name, duration_ms, description in parse_server_timing(server_timing or ""):
+            spans.append(Span(
+                self.trace_id,
+                new_span_id(),
+                span_id,
+                service,
+                name,
+                name if name in SERVER_TIMING_KINDS else "app",
+                start,
+                duration_ms,
+                {"source": "server-timing", **({"description": description} if description else {})},
+            ))
+        with self._lock:
+            self.spans.extend(spans)
+
+    def finish(self, name: str, status: int, attributes: dict[str, Any]) -> list[Span]:
+        root = Span(
+            self.trace_id,
+            self.span_id,
+            self.parent_id,
+            "gateway",
+            name,
+            "server",
+            self.start,
+            (time.perf_counter() - self._started) * 1000,
+            {"status": self.status or status, **attributes},
+        )
+        with self._lock:
+            return [root, *self.spans]
+
+
+class SpanStore:
+    """
+    Exportador local: últimas `max_traces` trazas en memoria y, si hay
+    `export_path`, cada span como una línea JSON en ese fichero.
+    """
+
+    def __init__(self, max_traces: int = 500, export_path: str | None = None) -> None:
+        self.max_traces = max_traces
+        self.export_path = export_path
+        self._lock = threading.Lock()
+        self._traces: OrderedDict[str, list[Span]] = OrderedDict()
+
+    def export(self, spans: list[Span]) -> None:
+        if not spans:
+            return
+        trace_id = spans[0].trace_id
+        with self._lock:
+            # Un mismo X-Trace-ID del cliente puede agrupar varias peticiones
+            self._traces.setdefault(trace_id, []).extend(spans)
+            self._traces.move_to_end(trace_id)
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+            if self.export_path:
+                with open(self.export_path, "a", encoding="utf-8") as export_file:
+                    export_file.writelines(json.dumps(asdict(span)) + "\n" for span in spans)
+
+    def get(self, trace_id: str) -> list[Span] | None:
+        with self._lock:
+            spans = self._traces.get(trace_id)
+            return list(spans) if spans is not None else None
+
+    def recent(self) -> list[list[Span]]:
+        with self._lock:
+            return [list(spans) for spans in reversed(self._traces.values())]
+
+
+class TracingAdapter(CircuitBreakerAdapter):
+    """Adapter que propaga la traza al upstream y registra el span de la llamada."""
+
+    def __init__(self, service: str, breaker: CircuitBreaker, **kwargs: Any) -> None:
+        self.service = service
+        super().__init__(breaker, **kwargs)
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        outgoing = outgoing_span(request.headers)
+        if outgoing is None:
+            return super().send(request, **kwargs)
+
+        trace, span_id = outgoing
+        start, started = time.time(), time.perf_counter()
+        try:
+            response = super().send(request, **kwargs)
+        except Exception as exc:
+            trace.record_upstream(
+                span_id, self.service, request.method, request.url, start,
+                time.perf_counter() - started, error=type(exc).__name__,
+            )
+            raise
+        # Con stream=True la duración es hasta recibir los headers
+        trace.record_upstream(
+            span_id, self.service, request.method, request.url, start, time.perf_counter() - started,
+            status=response.status_code, server_timing=response.headers.get(SERVER_TIMING_HEADER),
+        )
+        return response
+
+
+def init_tracing(app: Any) -> SpanStore | None:
+    """Activa las trazas si TRACING_ENABLED."""
+    if not app.config["TRACING_ENABLED"]:
+        return None
+
+    store = SpanStore(app.config["TRACING_MAX_TRACES"], app.config["TRACING_EXPORT_PATH"] or None)
+    app.extensions[EXTENSION_KEY] = store
+    app.before_request(_start_trace)
+    app.after_request(_finish_on_close)
+    return store
+
+
+def outgoing_span(headers: MutableMapping[str, str]) -> tuple[RequestTrace, str] | None:
+    """Añade los headers de propagación a una llamada upstream y devuelve su span."""
+    trace: RequestTrace | None = g.get("trace") if has_request_context() else None
+    if trace is None:
+        return None
+    span_id = new_span_id()
+    headers[TRACE_HEADER] = trace.trace_id
+    headers[PARENT_SPAN_HEADER] = span_id
+    return trace, span_id
+
+
+def parse_server_timing(header: str) -> list[tuple[str, float, str | None]]:
+    """`db;dur=12.5;desc="3 queries", total;dur=40` -> [(nombre, ms, descripción)]."""
+    metrics = []
+    for entry in header.split(","):
+        name, *params = [part.strip() for part in entry.split(";")]
+        if not name or name == "total":
+            continue
+        duration, description = 0.0, None
+        for param in params:
+            key, _, value = param.partition("=")
+            if key == "dur":
+                try:
+                    duration = float(value)
+                except ValueError:
+                    pass
+            elif key == "desc":
+                description = value.strip('"')
+        metrics.append((name, duration, description))
+    return metrics
+
+
+def summarize(spans: list[Span]) -> dict[str, Any]:
+    """
+    Resumen de una traza: duración total y tiempo propio de cada salto.
+
+    El tiempo de una llamada upstream se reparte entre lo que el servicio
+    reportó (BD, InfluxDB, ...) y el resto (red, serialización, su propio código).
+    """
+    roots = [span for span in spans if span.kind == "server"]
+    root = max(roots, key=lambda span: span.duration_ms) if roots else spans[0]
+    children: dict[str | None, list[Span]] = {}
+    for span in spans:
+        children.setdefault(span.parent_id, []).append(span)
+
+    breakdown: dict[str, float] = {}
+    for span in roots:
+        upstream = children.get(span.span_id, [])
+        breakdown["gateway"] = breakdown.get("gateway", 0.0) + span.duration_ms - sum(c.duration_ms for c in upstream)
+        for call in upstream:
+            reported = children.get(call.span_id, [])
+            service = reported[0].service if reported else call.name.rpartition(" ")[2]
+            key = f"{service}.other"
+            breakdown[key] = breakdown.get(key, 0.0) + call.duration_ms - sum(r.duration_ms for r in reported)
+            for item in reported:
+                key = f"{item.service}.{item.name}"
+                breakdown[key] = breakdown.get(key, 0.0) + item.duration_ms
+
+    return {
+        "trace_id": root.trace_id,
+        "name": root.name,
+        "status": root.attributes.get("status"),
+        "started_at": root.start,
+        "duration_ms": round(root.duration_ms, 3),
+        "breakdown_ms": {key: round(max(value, 0.0), 3) for key, value in sorted(breakdown.items(), key=lambda item: -item[1])},
+    }
+
+
+def _start_trace() -> None:
+    incoming = request.headers.get(TRACE_HEADER, "")
+    trace_id = incoming if _TRACE_ID_RE.match(incoming) else secrets.token_hex(16)
+    parent_id = request.headers.get(PARENT_SPAN_HEADER)
+    g.trace = RequestTrace(trace_id, parent_id if parent_id and _TRACE_ID_RE.match(parent_id) else None)
+
+
+def _finish_on_close(response: Response) -> Response:
+    trace: RequestTrace | None = g.pop("trace", None)
+    if trace is None:
+        return response
+
+    response.headers[TRACE_HEADER] = trace.trace_id
+    store: SpanStore = current_app.extensions[EXTENSION_KEY]
+    rule = request.url_rule.rule if request.url_rule is not None else request.path
+    name = f"{request.method} {rule}"
+    attributes = {"path": request.path, "endpoint": request.endpoint}
+    status = response.status_code
+    # El span raíz termina cuando se ha reenviado todo el cuerpo
+    response.call_on_close(lambda: store.export(trace.finish(name, status, attributes)))
+    return response
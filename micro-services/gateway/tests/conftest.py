@@ -0,0 +1,70 @@
+"""Fixtures compartidas: upstream HTTP local y gateway apuntando a él."""
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from gateway.app import create_app
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    """
+    Base de los upstreams de prueba (HTTP/1.1, sin log).
+
+    Cada módulo la extiende con los `do_<MÉTODO>` que necesita y la expone con
+    el fixture `upstream_handler`.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def send_body(self, status: int, body: bytes, content_type: str = "application/json", headers: dict[str, str] | None = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture()
+def upstream_handler() -> type[BaseHTTPRequestHandler]:
+    """Handler del upstream; los módulos lo redefinen (y reinician su estado) aquí."""
+    return UpstreamHandler
+
+
+@pytest.fixture()
+def gateway_env() -> dict[str, str]:
+    """Variables de entorno del gateway para el módulo, aplicadas antes de `create_app`."""
+    return {}
+
+
+@pytest.fixture()
+def upstream_url(upstream_handler):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), upstream_handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture()
+def app(upstream_url, gateway_env, monkeypatch):
+    """Gateway con user, patient y media apuntando al upstream y sin caché de respuestas."""
+    monkeypatch.setenv("RESPONSE_CACHE_TTLS", "")
+    for name, value in gateway_env.items():
+        monkeypatch.setenv(name, value)
+    app = create_app()
+    app.config.update(
+        TESTING=True,
+        USER_SERVICE_URL=upstream_url,
+        PATIENT_SERVICE_URL=upstream_url,
+        MEDIA_SERVICE_URL=upstream_url,
+    )
+    return app
@@ -0,0 +1,175 @@
+"""Tests para el motor asíncrono (ASGI) del gateway."""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from gateway.asgi import create_asgi_app
+
+from .conftest import UpstreamHandler
+
+LARGE_BODY = b"y" * (512 * 1024 + 7)
+
+
+class _UpstreamHandler(UpstreamHandler):
+    """Upstream mínimo: /users/me tarda 0.5 s, el resto responde al momento."""
+
+    def do_GET(self):  # noqa: N802 - API de http.server
+        if self.path.startswith("/users/me"):
+            time.sleep(0.5)
+        self.send_body(200, LARGE_BODY if self.path.startswith("/users/me") else b'{"ok": true}')
+
+    def do_PATCH(self):  # noqa: N802 - API de http.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        self.send_body(200, json.dumps({"received": body.decode()}).encode())
+
+
+@pytest.fixture()
+def upstream_handler():
+    return _UpstreamHandler
+
+
+@pytest.fixture()
+def gateway_env():
+    return {"RATE_LIMIT_ENABLED": "1"}
+
+
+def _gateway(app, **config):
+    app.config.update(**config)
+    return create_asgi_app(app)
+
+
+class _Response:
+    def __init__(self, status: int, headers: list[tuple[bytes, bytes]], body: bytes) -> None:
+        self.status_code = status
+        self.headers = {name.decode().lower(): value.decode() for name, value in headers}
+        self.content = body
+
+    def json(self):
+        return json.loads(self.content)
+
+
+async def _call(gateway, method: str, path: str, body: bytes = b"", headers: dict[str, str] | None = None) -> _Response:
+    """Invoca la app ASGI directamente, como lo haría uvicorn."""
+    request_headers = [(b"host", b"gateway"), (b"content-length", str(len(body)).encode())]
+    request_headers += [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "root_path": "",
+        "query_string": b"",
+        "headers": request_headers,
+        "client": ("127.0.0.1", 40000),
+        "server": ("gateway", 80),
+    }
+    pending = [{"type": "http.request", "body": body, "more_body": False}]
+    sent: list[dict] = []
+
+    async def receive():
+        return pending.pop(0) if pending else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await gateway(scope, receive, send)
+    start = sent[0]
+    return _Response(start["status"], start["headers"], b"".join(m.get("body", b"") for m in sent[1:]))
+
+
+async def _request(gateway, *requests):
+    try:
+        return await asyncio.gather(*(_call(gateway, method, path, **kwargs) for method, path, kwargs in requests))
+    finally:
+        await gateway.aclose()
+
+
+def test_streaming_proxy_is_served_by_async_engine(app):
+    """Las rutas en streaming se reenvían con httpx conservando headers de Flask (CORS)."""
+    gateway = _gateway(app)
+
+    (response,) = asyncio.run(_request(gateway, ("GET", "/user/users/me", {"headers": {"Origin": "http://app"}})))
+
+    assert response.status_code == 200
+    assert response.content == LARGE_BODY
+    assert response.headers["content-length"] == str(len(LARGE_BODY))
+    assert response.headers["access-control-allow-origin"] == "http://app"
+
+
+def test_request_body_is_streamed_to_upstream(app):
+    """El cuerpo del cliente llega íntegro al upstream."""
+    gateway = _gateway(app)
+    raw = b'{"name": "Ana"}'
+
+    (response,) = asyncio.run(_request(
+        gateway,
+        ("PATCH", "/user/users/me", {"body": raw, "headers": {"Content-Type": "application/json"}}),
+    ))
+
+    assert response.status_code == 200
+    assert response.json() == {"received": raw.decode()}
+
+
+def test_slow_service_does_not_starve_other_services(app):
+    """Con el límite del servicio lento agotado, el resto sigue respondiendo."""
+    gateway = _gateway(app, SERVICE_CONCURRENCY={"user": 1}, ASYNC_QUEUE_TIMEOUT=0.2)
+
+    started = time.perf_counter()
+    slow, busy, fast = asyncio.run(_request(
+        gateway,
+        ("GET", "/user/users/me", {}),
+        ("GET", "/user/users/me", {}),
+        ("GET", "/patient/dashboard", {}),
+    ))
+
+    assert slow.status_code == 200
+    assert busy.status_code == 503
+    assert busy.json()["error"] == "service_busy"
+    assert fast.status_code == 200
+    assert fast.json() == {"ok": True}
+    assert time.perf_counter() - started < 2
+
+
+def test_local_routes_run_through_flask(app):
+    """Las rutas sin upstream (health) se atienden igual que en modo WSGI."""
+    gateway = _gateway(app)
+
+    (response,) = asyncio.run(_request(gateway, ("GET", "/health/", {})))
+
+    assert response.status_code == 200
+    assert response.json()["service"] == "heartguard-gateway"
+
+
+def test_blocking_rate_limit_backend_runs_off_the_loop(app):
+    """Con buckets bloqueantes (redis) los hooks no se ejecutan en el hilo del loop."""
+    from gateway.services.rate_limit import RATE_LIMITER_KEY
+
+    class _BlockingBuckets:
+        blocking = True
+
+        def __init__(self):
+            self.threads = []
+
+        def take(self, key, cost, floor):
+            self.threads.append(threading.current_thread())
+            return 0.0
+
+    buckets = _BlockingBuckets()
+    app.extensions[RATE_LIMITER_KEY].buckets = buckets
+    gateway = create_asgi_app(app)
+
+    async def run():
+        loop_thread = threading.current_thread()
+        (response,) = await _request(gateway, ("GET", "/user/users/me", {"headers": {"Authorization": "Bearer x"}}))
+        return loop_thread, response
+
+    loop_thread, _ = asyncio.run(run())
+
+    assert gateway.inline_services == ()
+    assert buckets.threads and all(thread is not loop_thread for thread in buckets.threads)
@@ -0,0 +1,130 @@
+"""Tests para los circuit breakers y timeouts adaptativos del gateway."""
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from gateway.asgi import create_asgi_app
+from gateway.services import circuit_breaker
+from gateway.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, BreakerSettings, CircuitBreaker
+from gateway.services.http_sessions import get_timeout
+
+from .conftest import UpstreamHandler
+from .test_asgi import _call
+
+
+class _FailingHandler(UpstreamHandler):
+    """Upstream degradado: siempre responde 503."""
+
+    hits = 0
+
+    def do_GET(self):  # noqa: N802 - API de http.server
+        type(self).hits += 1
+        self.send_body(503, b"{}")
+
+
+@pytest.fixture()
+def upstream_handler():
+    _FailingHandler.hits = 0
+    return _FailingHandler
+
+
+@pytest.fixture()
+def gateway_env():
+    return {"CIRCUIT_MIN_REQUESTS": "2"}
+
+
+def test_breaker_opens_and_recovers_through_half_open():
+    breaker = CircuitBreaker("user", BreakerSettings(min_requests=4, failure_rate=0.5, open_seconds=10))
+    for failed in (False, True, False, True):
+        breaker.record(0.01, failed=failed)
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    later = time.monotonic() + 11
+    with patch.object(circuit_breaker.time, "monotonic", return_value=later):
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        # Solo una petición de prueba a la vez
+        assert not breaker.allow()
+        breaker.record(0.01, failed=False)
+        assert breaker.state == CLOSED
+
+
+def test_timeout_follows_observed_p99():
+    breaker = CircuitBreaker("user", BreakerSettings(min_requests=10, timeout_multiplier=3, min_timeout=0.1))
+    assert breaker.timeout(5.0) == 5.0
+
+    for _ in range(10):
+        breaker.record(0.2, failed=False)
+    assert breaker.timeout(5.0) == pytest.approx(0.6)
+    # Nunca por encima del timeout configurado
+    assert breaker.timeout(0.5) == 0.5
+
+
+def test_slow_routes_keep_their_own_timeout():
+    """Las peticiones rápidas de un endpoint no recortan el timeout de los lentos."""
+    breaker = CircuitBreaker("ai", BreakerSettings(min_requests=10, timeout_multiplier=3, min_timeout=1.0))
+    for _ in range(50):
+        breaker.record(0.01, failed=False, route="ai_proxy.health")
+    for _ in range(10):
+        breaker.record(4.0, failed=False, route="ai_proxy.batch_predict")
+    breaker.record(20.0, failed=False, route="ai_proxy.model_reload")
+
+    assert breaker.timeout(30.0, "ai_proxy.health") == 1.0
+    assert breaker.timeout(30.0, "ai_proxy.batch_predict") == pytest.approx(12.0)
+    # Sin muestras suficientes el endpoint conserva el timeout configurado
+    assert breaker.timeout(30.0, "ai_proxy.model_reload") == 30.0
+    assert breaker.timeout(30.0, "ai_proxy.model_info") == 30.0
+    assert breaker.state == CLOSED
+
+
+def test_request_timeout_uses_the_current_endpoint(app):
+    registry = app.extensions["http_sessions"]
+    breaker = registry.breaker("patient")
+    for _ in range(2):
+        breaker.record(0.01, failed=False, route="patient.health_check")
+
+    with app.test_request_context("/patient/health"):
+        fast = get_timeout("patient")
+    with app.test_request_context("/patient/dashboard"):
+        other = get_timeout("patient")
+
+    assert fast[1] == app.config["CIRCUIT_MIN_TIMEOUT"]
+    assert other[1] == app.config["SERVICE_TIMEOUTS"].get("patient", app.config["GATEWAY_SERVICE_TIMEOUT"])
+
+
+def test_open_circuit_fails_fast_and_is_reported_on_health(app):
+    """Con el circuito abierto el gateway responde 503 sin llamar al upstream."""
+    with app.test_client() as client:
+        for _ in range(2):
+            assert client.get("/patient/dashboard").status_code == 503
+        blocked = client.get("/patient/dashboard")
+        health = client.get("/health/").get_json()
+
+    assert blocked.status_code == 503
+    assert blocked.get_json()["error"] == "service_unavailable"
+    assert _FailingHandler.hits == 2
+    assert health["status"] == "degraded"
+    assert health["circuits"]["patient"]["state"] == OPEN
+    assert health["circuits"]["user"]["state"] == CLOSED
+
+
+def test_async_engine_shares_the_breaker(app):
+    gateway = create_asgi_app(app)
+
+    async def run():
+        try:
+            return [await _call(gateway, "GET", "/patient/dashboard") for _ in range(3)]
+        finally:
+            await gateway.aclose()
+
+    responses = asyncio.run(run())
+
+    assert [response.status_code for response in responses] == [503, 503, 503]
+    assert "retry-after" in responses[2].headers
+    assert _FailingHandler.hits == 2
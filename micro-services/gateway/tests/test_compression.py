@@ -0,0 +1,102 @@
+"""Tests para la compresión de respuestas del gateway."""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+from unittest.mock import patch
+
+import brotli
+import pytest
+
+from gateway.asgi import create_asgi_app
+from gateway.services.compression import CpuBudget
+
+from .conftest import UpstreamHandler
+from .test_asgi import _call
+
+LARGE_BODY = json.dumps({"readings": [{"bpm": 72, "spo2": 98}] * 200}).encode()
+PRECOMPRESSED = gzip.compress(LARGE_BODY)
+
+
+class _UpstreamHandler(UpstreamHandler):
+    """Upstream sin compresión salvo en /patient/alerts, que ya envía gzip."""
+
+    accept_encoding: list[str | None] = []
+
+    def do_GET(self):  # noqa: N802 - API de http.server
+        type(self).accept_encoding.append(self.headers.get("Accept-Encoding"))
+        body, encoding = LARGE_BODY, None
+        if self.path.startswith("/patient/profile"):
+            body = b'{"ok": true}'
+        elif self.path.startswith("/patient/alerts"):
+            body, encoding = PRECOMPRESSED, "gzip"
+        self.send_body(200, body, headers={"Content-Encoding": encoding} if encoding else None)
+
+
+@pytest.fixture()
+def upstream_handler():
+    _UpstreamHandler.accept_encoding = []
+    return _UpstreamHandler
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected", "decode"),
+    [("gzip, br", "br", brotli.decompress), ("gzip, br;q=0", "gzip", gzip.decompress)],
+)
+def test_large_json_is_compressed_with_negotiated_encoding(app, accept_encoding, expected, decode):
+    with app.test_client() as client:
+        response = client.get("/patient/dashboard", headers={"Accept-Encoding": accept_encoding}, buffered=True)
+
+    assert response.headers["Content-Encoding"] == expected
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert decode(response.get_data()) == LARGE_BODY
+
+
+def test_small_or_unaccepted_bodies_are_sent_as_is(app):
+    with app.test_client() as client:
+        small = client.get("/patient/profile", headers={"Accept-Encoding": "gzip"}, buffered=True)
+        identity = client.get("/patient/dashboard", buffered=True)
+
+    assert "Content-Encoding" not in small.headers
+    assert "Content-Encoding" not in identity.headers
+    assert identity.get_data() == LARGE_BODY
+
+
+def test_upstream_encoding_is_forwarded_without_recompressing(app):
+    with app.test_client() as client:
+        response = client.get("/patient/alerts", headers={"Accept-Encoding": "gzip"}, buffered=True)
+        stats = client.get("/health/compression").get_json()
+
+    # El upstream recibe el Accept-Encoding del cliente y el gateway no toca su cuerpo
+    assert _UpstreamHandler.accept_encoding == ["gzip"]
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.get_data() == PRECOMPRESSED
+    assert stats["responses"] == {"passthrough": 1}
+
+
+def test_compression_is_skipped_over_cpu_budget(app):
+    with patch.object(CpuBudget, "exceeded", return_value=True), app.test_client() as client:
+        response = client.get("/patient/dashboard", headers={"Accept-Encoding": "gzip"}, buffered=True)
+        stats = client.get("/health/compression").get_json()
+
+    assert "Content-Encoding" not in response.headers
+    assert response.get_data() == LARGE_BODY
+    assert stats["responses"] == {"skipped_cpu": 1}
+
+
+def test_async_engine_compresses_streamed_upstream_body(app):
+    gateway = create_asgi_app(app)
+
+    async def run():
+        try:
+            return await _call(gateway, "GET", "/patient/dashboard", headers={"Accept-Encoding": "gzip"})
+        finally:
+            await gateway.aclose()
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(response.content) == LARGE_BODY
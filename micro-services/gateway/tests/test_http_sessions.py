@@ -0,0 +1,88 @@
+"""Tests para el registro de sesiones HTTP compartidas."""
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from gateway.app import create_app
+from gateway.services.http_sessions import EXTENSION_KEY, PoolSettings, SessionRegistry
+
+
+def test_create_app_registers_session_per_upstream():
+    """create_app debe crear una sesión por servicio upstream."""
+    app = create_app()
+    registry = app.extensions[EXTENSION_KEY]
+
+    assert isinstance(registry.session("user"), requests.Session)
+    assert registry.session("user") is registry.session("user")
+    assert registry.session("user") is not registry.session("admin")
+
+
+def test_proxy_reuses_shared_session_across_requests():
+    """Cada request debe recibir la misma sesión del registro."""
+    app = create_app()
+    app.config.update(TESTING=True)
+    shared = app.extensions[EXTENSION_KEY].session("admin")
+
+    with patch("gateway.routes.admin_proxy.AdminClient") as MockClient:
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = b"{}"
+        mock_response.headers = {"Content-Type": "application/json"}
+        MockClient.return_value.proxy_request.return_value = mock_response
+
+        with app.test_client() as client:
+            client.get("/admin/organizations/")
+            client.get("/admin/organizations/")
+
+    sessions = [call.kwargs["session"] for call in MockClient.call_args_list]
+    assert len(sessions) == 2
+    assert all(session is shared for session in sessions)
+
+
+def test_per_service_timeouts_fall_back_to_gateway_timeout():
+    """Los servicios sin timeout propio usan el default del gateway."""
+    registry = SessionRegistry(PoolSettings(connect_timeout=2.0), timeouts={"ai": 30.0})
+
+    assert registry.timeout("ai", default=5.0) == (2.0, 30.0)
+    assert registry.timeout("user", default=5.0) == (2.0, 5.0)
+    assert registry.timeout("user", default=1.0) == (1.0, 1.0)
+
+
+def test_sessions_reuse_connections_and_drop_upstream_cookies():
+    """La sesión debe reutilizar la conexión TCP y no reenviar cookies del upstream."""
+    seen: list[tuple[int, str | None]] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):  # noqa: N802 - API de http.server
+            seen.append((self.client_address[1], self.headers.get("Cookie")))
+            self.send_response(200)
+            self.send_header("Set-Cookie", "sid=abc; Path=/")
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        registry = SessionRegistry(PoolSettings(), timeouts={})
+        session = registry.session("user")
+        url = f"http://127.0.0.1:{server.server_port}/users/me"
+
+        for _ in range(3):
+            assert session.get(url, timeout=registry.timeout("user", 5.0)).status_code == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len({port for port, _ in seen}) == 1
+    assert all(cookie is None for _, cookie in seen)
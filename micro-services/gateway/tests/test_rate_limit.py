@@ -0,0 +1,97 @@
+"""Tests para el rate limit por principal y el descarte de carga del gateway."""
+from __future__ import annotations
+
+import pytest
+
+from gateway.services.rate_limit import (
+    CRITICAL,
+    EXPENSIVE,
+    LOAD_SHEDDER_KEY,
+    NORMAL,
+    LoadShedder,
+    MemoryBuckets,
+    RateLimiter,
+)
+
+from .conftest import UpstreamHandler
+
+
+class _UpstreamHandler(UpstreamHandler):
+    def do_GET(self):  # noqa: N802 - API de http.server
+        self.send_body(200, b"{}")
+
+
+@pytest.fixture()
+def upstream_handler():
+    return _UpstreamHandler
+
+
+@pytest.fixture()
+def gateway_env():
+    return {"RATE_LIMIT_ENABLED": "1", "RATE_LIMIT_RATE": "0.1", "RATE_LIMIT_BURST": "3", "RATE_LIMIT_CRITICAL_RESERVE": "1"}
+
+
+def test_critical_requests_use_the_reserved_tokens():
+    limiter = RateLimiter(MemoryBuckets(rate=0.01, burst=5), critical_reserve=2, expensive_cost=2)
+
+    assert limiter.check("user:1", EXPENSIVE) == 0
+    assert limiter.check("user:1", NORMAL) == 0
+    # Quedan 2 tokens: reservados para rutas críticas
+    assert limiter.check("user:1", NORMAL) > 0
+    assert limiter.check("user:1", CRITICAL) == 0
+    assert limiter.check("user:1", CRITICAL) == 0
+    assert limiter.check("user:1", CRITICAL) > 0
+    # Cada principal tiene su propio bucket
+    assert limiter.check("user:2", NORMAL) == 0
+    assert limiter.stats()["limited"] == {NORMAL: 1, CRITICAL: 1}
+
+
+def test_shedder_drops_expensive_reads_first():
+    shedder = LoadShedder(10, {EXPENSIVE: 0.5, NORMAL: 0.8, CRITICAL: 1.0})
+    for _ in range(5):
+        assert shedder.admit(NORMAL)
+
+    assert not shedder.admit(EXPENSIVE)
+    assert shedder.admit(NORMAL) and shedder.admit(NORMAL) and shedder.admit(NORMAL)
+    assert not shedder.admit(NORMAL)
+    assert shedder.admit(CRITICAL) and shedder.admit(CRITICAL)
+    assert not shedder.admit(CRITICAL)
+
+    shedder.release()
+    assert shedder.admit(CRITICAL)
+    assert shedder.stats()["shed"] == {EXPENSIVE: 1, NORMAL: 1, CRITICAL: 1}
+
+
+def test_rate_limited_client_gets_429_with_retry_after(app):
+    def get(token: str):
+        return client.get("/patient/profile", headers={"Authorization": token}, buffered=True)
+
+    with app.test_client() as client:
+        allowed = [get("Bearer a") for _ in range(2)]
+        limited = get("Bearer a")
+        other = get("Bearer b")
+        stats = client.get("/health/limits").get_json()
+
+    assert [response.status_code for response in allowed] == [200, 200]
+    assert limited.status_code == 429
+    assert limited.get_json()["error"] == "rate_limited"
+    assert int(limited.headers["Retry-After"]) >= 1
+    assert other.status_code == 200
+    assert stats["rate_limit"]["limited"] == {NORMAL: 1}
+
+
+def test_overloaded_gateway_sheds_with_503_and_releases_slots(app):
+    shedder: LoadShedder = app.extensions[LOAD_SHEDDER_KEY]
+    with app.test_client() as client:
+        assert client.get("/patient/profile", buffered=True).status_code == 200
+        assert shedder.in_flight == 0
+
+        shedder.in_flight = shedder.limits[EXPENSIVE]
+        shed = client.get("/patient/dashboard", buffered=True)
+        served = client.get("/patient/profile", buffered=True)
+
+    assert shed.status_code == 503
+    assert shed.get_json()["error"] == "overloaded"
+    assert shed.headers["Retry-After"] == "1"
+    assert served.status_code == 200
+    assert shedder.in_flight == shedder.limits[EXPENSIVE]
@@ -0,0 +1,160 @@
+"""Tests para la caché de respuestas GET del gateway."""
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from gateway.asgi import create_asgi_app
+from gateway.services import response_cache
+
+from .conftest import UpstreamHandler
+from .test_asgi import _call
+
+ETAG = '"perfil-v1"'
+
+
+class _UpstreamHandler(UpstreamHandler):
+    """Upstream con ETag fijo que registra cada petición recibida."""
+
+    requests: list[tuple[str, str, str | None]] = []
+
+    def do_GET(self):  # noqa: N802 - API de http.server
+        type(self).requests.append(("GET", self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"path": self.path, "auth": self.headers.get("Authorization")}).encode()
+        self.send_body(200, body, headers={"ETag": ETAG} if self.path.startswith("/patient/profile") else None)
+
+    def do_PATCH(self):  # noqa: N802 - API de http.server
+        self.rfile.read(int(self.headers.get("Content-Length", "0")))
+        type(self).requests.append(("PATCH", self.path, None))
+        self.send_body(200, b"{}")
+
+
+@pytest.fixture()
+def upstream_handler():
+    _UpstreamHandler.requests = []
+    return _UpstreamHandler
+
+
+@pytest.fixture()
+def gateway_env():
+    return {"RESPONSE_CACHE_TTLS": "patient.get_profile=60,user.users_me=60"}
+
+
+def _upstream_gets() -> list[tuple[str, str, str | None]]:
+    return [entry for entry in _UpstreamHandler.requests if entry[0] == "GET"]
+
+
+def test_repeated_get_is_served_from_cache_per_principal(app):
+    """La segunda petición del mismo principal no llega al upstream; otro principal sí."""
+    with app.test_client() as client:
+        first = client.get("/patient/profile", buffered=True, headers={"Authorization": "Bearer a"})
+        second = client.get("/patient/profile", buffered=True, headers={"Authorization": "Bearer a"})
+        other = client.get("/patient/profile", buffered=True, headers={"Authorization": "Bearer b"})
+        stats = client.get("/health/cache", buffered=True).get_json()
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_json() == first.get_json()
+    assert other.get_json()["auth"] == "Bearer b"
+    assert len(_upstream_gets()) == 2
+    route = stats["routes"]["patient.get_profile"]
+    assert (route["lookups"], route["hits"], route["misses"]) == (3, 1, 2)
+    assert route["hit_ratio"] == pytest.approx(1 / 3, abs=1e-4)
+
+
+def test_query_params_are_part_of_the_key(app):
+    with app.test_client() as client:
+        client.get("/patient/profile?a=1&b=2", buffered=True)
+        hit = client.get("/patient/profile?b=2&a=1", buffered=True)
+        miss = client.get("/patient/profile?a=2", buffered=True)
+
+    assert hit.headers["X-Cache"] == "HIT"
+    assert miss.headers["X-Cache"] == "MISS"
+
+
+def test_expired_entry_is_revalidated_with_etag(app):
+    """Con la entrada caducada se envía If-None-Match y un 304 reutiliza el cuerpo."""
+    with app.test_client() as client:
+        first = client.get("/patient/profile", buffered=True)
+        with patch.object(response_cache.time, "time", return_value=time.time() + 120):
+            revalidated = client.get("/patient/profile", buffered=True)
+
+    assert revalidated.status_code == 200
+    assert revalidated.headers["X-Cache"] == "REVALIDATED"
+    assert revalidated.get_data() == first.get_data()
+    assert _upstream_gets()[-1][2] == ETAG
+
+
+def test_client_etag_gets_not_modified(app):
+    with app.test_client() as client:
+        first = client.get("/patient/profile", buffered=True)
+        response = client.get(
+            "/patient/profile", buffered=True, headers={"If-None-Match": first.headers["ETag"]}
+        )
+
+    assert response.status_code == 304
+    assert response.headers["X-Cache"] == "HIT"
+
+
+def test_mutation_evicts_resource_prefix(app):
+    """Un PATCH sobre el recurso invalida sus GET cacheados."""
+    with app.test_client() as client:
+        client.get("/user/users/me", buffered=True)
+        client.patch("/user/users/me", buffered=True, json={"name": "Ana"})
+        after = client.get("/user/users/me", buffered=True)
+
+    assert after.headers["X-Cache"] == "MISS"
+    assert len(_upstream_gets()) == 2
+
+
+def test_mutation_evicts_every_ancestor_listing():
+    """Una escritura en un recurso anidado invalida los listados de todos sus ancestros."""
+    cache = response_cache.ResponseCache({})
+
+    def entry(path: str) -> response_cache.CacheEntry:
+        return response_cache.CacheEntry("user.proxy", path, 200, [], b"{}", '"x"', False, time.time() + 60)
+
+    paths = [
+        "/user/orgs/1",
+        "/user/orgs/1/care-teams",
+        "/user/orgs/1/care-teams/2",
+        "/user/orgs/1/care-teams/2/members",
+        "/user/orgs/1/care-teams/2/members/4",
+        "/user/orgs/1/care-teams/9/members",
+        "/user/orgs/2/care-teams",
+    ]
+    for path in paths:
+        cache.store((path, (), "user:1", "identity"), entry(path))
+
+    assert cache.invalidate("/user/orgs/1/care-teams/2/members/3") == 5
+    assert [key[0] for key in cache._entries] == ["/user/orgs/1/care-teams/9/members", "/user/orgs/2/care-teams"]
+
+
+def test_async_engine_fills_and_serves_cache(app):
+    """En modo asíncrono la respuesta diferida también se guarda en caché."""
+    gateway = create_asgi_app(app)
+
+    async def run():
+        try:
+            first = await _call(gateway, "GET", "/patient/profile")
+            second = await _call(gateway, "GET", "/patient/profile")
+            return first, second
+        finally:
+            await gateway.aclose()
+
+    first, second = asyncio.run(run())
+
+    assert first.headers["x-cache"] == "MISS"
+    assert second.headers["x-cache"] == "HIT"
+    assert second.content == first.content
+    assert len(_upstream_gets()) == 1
@@ -0,0 +1,100 @@
+"""Tests para la coalescencia (single-flight) de GET idénticos."""
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from gateway.asgi import create_asgi_app
+from gateway.services.single_flight import SingleFlight
+
+from .conftest import UpstreamHandler
+from .test_asgi import _call
+
+
+class _SlowHandler(UpstreamHandler):
+    """Upstream que tarda 0.3 s y cuenta las peticiones recibidas."""
+
+    hits = 0
+
+    def do_GET(self):  # noqa: N802 - API de http.server
+        type(self).hits += 1
+        time.sleep(0.3)
+        body = json.dumps({"path": self.path, "auth": self.headers.get("Authorization")}).encode()
+        self.send_body(200, body)
+
+
+@pytest.fixture()
+def upstream_handler():
+    _SlowHandler.hits = 0
+    return _SlowHandler
+
+
+def _concurrent_gets(app, tokens: list[str]):
+    barrier = threading.Barrier(len(tokens))
+
+    def get(token: str):
+        with app.test_client() as client:
+            barrier.wait()
+            return client.get("/patient/dashboard", headers={"Authorization": token}, buffered=True)
+
+    with ThreadPoolExecutor(max_workers=len(tokens)) as pool:
+        return list(pool.map(get, tokens))
+
+
+def test_identical_concurrent_gets_share_one_upstream_call(app):
+    responses = _concurrent_gets(app, ["Bearer a"] * 5)
+
+    assert _SlowHandler.hits == 1
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.get_data() for response in responses}) == 1
+    assert sum(response.headers.get("X-Coalesced") == "true" for response in responses) == 4
+
+    with app.test_client() as client:
+        stats = client.get("/health/coalescing").get_json()
+    assert stats["collapsed"] == 4
+    assert stats["routes"]["patient.get_dashboard"] == {"upstream": 1, "collapsed": 4}
+
+
+def test_different_principals_are_not_coalesced(app):
+    responses = _concurrent_gets(app, ["Bearer a", "Bearer b"])
+
+    assert _SlowHandler.hits == 2
+    assert {response.get_json()["auth"] for response in responses} == {"Bearer a", "Bearer b"}
+
+
+def test_async_engine_coalesces_without_blocking_the_loop(app):
+    gateway = create_asgi_app(app)
+
+    async def run():
+        try:
+            return await asyncio.gather(*(
+                _call(gateway, "GET", "/patient/dashboard", headers={"Authorization": "Bearer a"})
+                for _ in range(5)
+            ))
+        finally:
+            await gateway.aclose()
+
+    responses = asyncio.run(run())
+
+    assert _SlowHandler.hits == 1
+    assert len({response.content for response in responses}) == 1
+    assert sum(response.headers.get("x-coalesced") == "true" for response in responses) == 4
+
+
+def test_abandoned_flight_releases_followers():
+    """Si el líder no comparte su respuesta, los seguidores hacen su propia petición."""
+    registry = SingleFlight(max_wait=5)
+    key = ("/patient/dashboard", (), "anonymous", "identity")
+    flight, leader = registry.join("patient.get_dashboard", key)
+    follower, follower_leads = registry.join("patient.get_dashboard", key)
+
+    assert leader and not follower_leads and follower is flight
+    flight.abandon()
+    assert follower.wait(1) is None
+    # El vuelo terminado ya no retiene nuevas peticiones
+    assert registry.join("patient.get_dashboard", key)[1]
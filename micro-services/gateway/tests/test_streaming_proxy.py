@@ -0,0 +1,83 @@
+"""Tests para el reenvío en streaming de cuerpos en los proxies."""
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from .conftest import UpstreamHandler
+
+LARGE_BODY = b"x" * (1024 * 1024 + 123)
+
+
+class _EchoHandler(UpstreamHandler):
+    """Upstream mínimo: GET devuelve un cuerpo grande, POST/PATCH describe lo recibido."""
+
+    def do_GET(self):  # noqa: N802 - API de http.server
+        self.send_body(200, LARGE_BODY, "application/octet-stream")
+
+    def do_POST(self):  # noqa: N802 - API de http.server
+        length = int(self.headers.get("Content-Length", "0"))
+        body = self.rfile.read(length)
+        payload = json.dumps({
+            "path": self.path,
+            "length": len(body),
+            "content_type": self.headers.get("Content-Type"),
+            "accept_encoding": self.headers.get("Accept-Encoding"),
+            "body_head": body[:64].decode("latin-1"),
+        }).encode()
+        self.send_body(201, payload)
+
+    do_PATCH = do_POST
+
+
+@pytest.fixture()
+def upstream_handler():
+    return _EchoHandler
+
+
+def test_large_upstream_body_is_streamed_intact(app):
+    """El cuerpo del upstream se reenvía completo y conserva su Content-Length."""
+    with app.test_client() as client:
+        response = client.get("/user/users/me", buffered=False)
+
+        assert response.is_streamed
+        assert response.headers["Content-Length"] == str(len(LARGE_BODY))
+        assert b"".join(response.response) == LARGE_BODY
+        response.close()
+
+
+def test_json_body_is_forwarded_without_reencoding(app):
+    """El JSON del cliente llega al upstream byte a byte, con su Content-Length."""
+    raw = b'{"name":  "Ana",   "tags": [1, 2]}'
+
+    with app.test_client() as client:
+        response = client.patch(
+            "/user/users/me",
+            data=raw,
+            headers={"Content-Type": "application/json"},
+        )
+
+    assert response.status_code == 201
+    echoed = response.get_json()
+    assert echoed["length"] == len(raw)
+    assert echoed["body_head"] == raw.decode()
+    assert echoed["accept_encoding"] == "identity"
+
+
+def test_multipart_upload_keeps_boundary(app):
+    """Las fotos se reenvían como el multipart original (mismo boundary)."""
+    from io import BytesIO
+
+    with app.test_client() as client:
+        response = client.post(
+            "/media/users/u-1/photo",
+            data={"file": (BytesIO(b"\x89PNG" + b"0" * 5000), "foto.png", "image/png")},
+            content_type="multipart/form-data",
+        )
+
+    assert response.status_code == 201
+    echoed = response.get_json()
+    assert echoed["path"] == "/media/users/u-1/photo"
+    assert echoed["content_type"].startswith("multipart/form-data; boundary=")
+    assert echoed["length"] > 5000
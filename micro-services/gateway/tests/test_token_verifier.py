@@ -0,0 +1,160 @@
+"""Tests para la validación de JWT en el borde del gateway."""
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+from gateway.services import token_verifier
+from gateway.services.token_verifier import IDENTITY_HEADER, InvalidTokenError, TokenVerifier
+
+from .conftest import UpstreamHandler
+
+SECRET = "test-jwt-secret-0123456789abcdef0123"
+IDENTITY_SECRET = "test-identity-secret"
+
+
+class _EchoHandler(UpstreamHandler):
+    """Upstream mínimo que devuelve los headers recibidos y cuenta las peticiones."""
+
+    hits = 0
+
+    def do_GET(self):  # noqa: N802 - API de http.server
+        type(self).hits += 1
+        self.send_body(200, json.dumps({"identity": self.headers.get(IDENTITY_HEADER)}).encode())
+
+
+@pytest.fixture()
+def upstream_handler():
+    _EchoHandler.hits = 0
+    return _EchoHandler
+
+
+@pytest.fixture()
+def gateway_env():
+    return {"JWT_SECRET": SECRET, "IDENTITY_HEADER_SECRET": IDENTITY_SECRET}
+
+
+def _token(token_type: str = "access", expires_in: int = 900, **claims) -> str:
+    now = int(time.time())
+    payload = {
+        "user_id": "u-1",
+        "account_type": "user",
+        "token_type": token_type,
+        "iat": now,
+        "exp": now + expires_in,
+        **claims,
+    }
+    return jwt.encode(payload, SECRET, algorithm="HS256")
+
+
+def _decode_identity(value: str) -> dict:
+    body, signature = value.split(".")
+    expected = hmac.new(IDENTITY_SECRET.encode(), body.encode(), hashlib.sha256).digest()
+    assert hmac.compare_digest(base64.urlsafe_b64decode(signature + "=" * (-len(signature) % 4)), expected)
+    return json.loads(base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)))
+
+
+def test_valid_token_is_verified_once_and_forwarded_as_identity(app):
+    """El token se valida una vez y el upstream recibe la identidad firmada."""
+    headers = {"Authorization": f"Bearer {_token()}"}
+
+    with patch.object(token_verifier.jwt, "decode", wraps=jwt.decode) as decode:
+        with app.test_client() as client:
+            first = client.get("/user/users/me", headers=headers, buffered=True)
+            second = client.get("/user/users/me", headers=headers, buffered=True)
+
+    assert first.status_code == second.status_code == 200
+    assert decode.call_count == 1
+    identity = _decode_identity(first.get_json()["identity"])
+    assert identity["user_id"] == "u-1"
+
+
+def test_invalid_tokens_are_rejected_without_reaching_upstream(app):
+    """Tokens basura, con otra firma o de refresh se rechazan en el gateway."""
+    forged = jwt.encode({"user_id": "u-1", "token_type": "access", "exp": time.time() + 60}, "otro-secreto-0123456789abcdef012345", algorithm="HS256")
+
+    with app.test_client() as client:
+        responses = [
+            client.get("/user/users/me", headers={"Authorization": "Bearer basura"}),
+            client.get("/user/users/me", headers={"Authorization": f"Bearer {forged}"}),
+            client.get("/user/users/me", headers={"Authorization": f"Bearer {_token('refresh')}"}),
+            client.get("/user/users/me", headers={"Authorization": f"Bearer {_token(expires_in=-10)}"}),
+            client.get("/user/users/me"),
+        ]
+
+    assert [response.status_code for response in responses] == [401] * 5
+    assert responses[3].get_json()["error"] == "token_expired"
+    assert responses[4].get_json()["error"] == "missing_token"
+    assert _EchoHandler.hits == 0
+
+
+def test_public_endpoints_and_admin_errors(app):
+    """Los endpoints públicos no piden token; admin responde el 401 en XML."""
+    with app.test_client() as client:
+        public = client.get("/user/")
+        admin = client.get("/admin/organizations/")
+
+    assert public.status_code != 401
+    assert admin.status_code == 401
+    assert admin.mimetype == "application/xml"
+    assert b"<code>missing_token</code>" in admin.data
+
+
+@pytest.mark.parametrize("path", ["/patient/health", "/user/event-types"])
+def test_public_routes_reach_upstream_without_token(app, path):
+    """Health checks y catálogos públicos no exigen token aunque JWT_SECRET esté configurado."""
+    with app.test_client() as client:
+        response = client.get(path)
+
+    assert response.status_code == 200
+    assert _EchoHandler.hits == 1
+
+
+def test_public_marker_is_required_for_anonymous_access(app):
+    """Las rutas sin la marca @public siguen exigiendo token."""
+    with app.test_client() as client:
+        response = client.get("/patient/profile")
+
+    assert response.status_code == 401
+    assert _EchoHandler.hits == 0
+
+
+def test_client_identity_header_is_not_trusted(app):
+    """Un header de identidad enviado por el cliente se reemplaza por el del gateway."""
+    headers = {"Authorization": f"Bearer {_token()}", IDENTITY_HEADER: "falso.falso"}
+
+    with app.test_client() as client:
+        response = client.get("/user/users/me", headers=headers)
+
+    assert _decode_identity(response.get_json()["identity"])["user_id"] == "u-1"
+
+
+def test_cache_is_bounded_and_expires_entries():
+    """El LRU descarta el token menos usado y vuelve a validar los expirados."""
+    verifier = TokenVerifier(SECRET, ["HS256"], max_entries=2)
+    tokens = [_token(user_id=f"u-{index}") for index in range(3)]
+
+    for token in tokens:
+        verifier.verify(token)
+    assert len(verifier) == 2
+
+    short_lived = _token(expires_in=60, user_id="u-9")
+    verifier.verify(short_lived)
+    with patch.object(token_verifier.jwt, "decode", wraps=jwt.decode) as decode:
+        verifier.verify(short_lived)
+        assert decode.call_count == 0
+        # Pasado el `exp` la entrada ya no sirve y el token se valida de nuevo
+        with patch.object(token_verifier.time, "time", return_value=time.time() + 120):
+            verifier.verify(short_lived)
+        assert decode.call_count == 1
+
+    with pytest.raises(InvalidTokenError) as excinfo:
+        verifier.verify(_token(expires_in=-10))
+    assert excinfo.value.error == "token_expired"
@@ -0,0 +1,100 @@
+"""Tests para la propagación de trazas y la vista /debug/traces."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from gateway.app import create_app
+from gateway.asgi import create_asgi_app
+from gateway.services.tracing import parse_server_timing
+
+from .conftest import UpstreamHandler
+from .test_asgi import _call
+
+
+class _TracedHandler(UpstreamHandler):
+    """Upstream que registra los headers de traza y reporta sus tiempos."""
+
+    received: list[tuple[str | None, str | None]] = []
+
+    def do_GET(self):  # noqa: N802 - API de http.server
+        type(self).received.append((self.headers.get("X-Trace-ID"), self.headers.get("X-Parent-Span-ID")))
+        self.send_body(200, b"{}", headers={"Server-Timing": 'db;dur=12.5;desc="2 queries", total;dur=15'})
+
+
+@pytest.fixture()
+def upstream_handler():
+    _TracedHandler.received = []
+    return _TracedHandler
+
+
+@pytest.fixture()
+def gateway_env():
+    return {"TRACING_DEBUG_VIEW": "1"}
+
+
+def test_parse_server_timing_skips_total():
+    assert parse_server_timing('db;dur=12.5;desc="2 queries", influxdb;dur=3, total;dur=20') == [
+        ("db", 12.5, "2 queries"),
+        ("influxdb", 3.0, None),
+    ]
+
+
+def test_trace_is_propagated_and_broken_down_per_hop(app):
+    with app.test_client() as client:
+        response = client.get("/patient/profile", headers={"X-Trace-ID": "trace-abc-123"}, buffered=True)
+        traces = client.get("/debug/traces").get_json()["traces"]
+        detail = client.get("/debug/traces/trace-abc-123").get_json()
+
+    assert response.headers["X-Trace-ID"] == "trace-abc-123"
+    (trace_id, parent_span), = _TracedHandler.received
+    assert trace_id == "trace-abc-123"
+    assert parent_span
+
+    summary = next(trace for trace in traces if trace["trace_id"] == "trace-abc-123")
+    assert summary["name"] == "GET /patient/profile"
+    assert summary["status"] == 200
+    assert summary["breakdown_ms"]["patient.db"] == 12.5
+    assert {"gateway", "patient.other"} <= set(summary["breakdown_ms"])
+
+    spans = {span["name"]: span for span in detail["spans"]}
+    assert spans["GET patient"]["span_id"] == parent_span
+    assert spans["db"]["parent_id"] == parent_span
+    assert spans["db"]["service"] == "patient"
+
+
+def test_invalid_client_trace_id_is_replaced(app):
+    with app.test_client() as client:
+        response = client.get("/patient/profile", headers={"X-Trace-ID": "bad id!"}, buffered=True)
+
+    trace_id = response.headers["X-Trace-ID"]
+    assert trace_id != "bad id!" and len(trace_id) == 32
+    assert _TracedHandler.received[0][0] == trace_id
+
+
+def test_async_engine_records_upstream_span(app):
+    gateway = create_asgi_app(app)
+
+    async def run():
+        try:
+            response = await _call(gateway, "GET", "/patient/profile", headers={"X-Trace-ID": "async-trace-1"})
+            detail = await _call(gateway, "GET", "/debug/traces/async-trace-1")
+            return response, detail
+        finally:
+            await gateway.aclose()
+
+    response, detail = asyncio.run(run())
+
+    assert response.headers["x-trace-id"] == "async-trace-1"
+    assert _TracedHandler.received[0][0] == "async-trace-1"
+    body = detail.json()
+    assert body["status"] == 200
+    assert body["breakdown_ms"]["patient.db"] == 12.5
+
+
+def test_debug_view_is_hidden_unless_enabled(upstream_url, monkeypatch):
+    monkeypatch.setenv("TRACING_DEBUG_VIEW", "0")
+    app = create_app()
+    with app.test_client() as client:
+        assert client.get("/debug/traces").status_code == 404
@@ -1,6 +1,7 @@
 """Flask application entrypoint for Generator Service."""
 import logging
 from flask import Flask, jsonify, request
+from heartguard_common.tracing import init_tracing
 
 from .config import configure_app
 from .db import DatabaseService
@@ -32,6 +33,9 @@ def create_app() -> Flask:
     app = Flask(__name__)
     configure_app(app)
     
+    # Request spans; the worker thread runs outside a request and is not traced
+    init_tracing(app, 'influxdb-service', reported_kinds=('db', 'influxdb'))
+    
     # Initialize services
     global db_service, influx_service, worker
     
@@ -23,6 +23,11 @@ class Config:
     # Generator settings
     GENERATION_INTERVAL = int(os.getenv('GENERATION_INTERVAL', '5'))
     
+    # Tracing
+    TRACING_MAX_TRACES = int(os.getenv('TRACING_MAX_TRACES', '200'))
+    TRACING_EXPORT_PATH = os.getenv('TRACING_EXPORT_PATH', '')
+    TRACING_DEBUG_VIEW = os.getenv('TRACING_DEBUG_VIEW', '0') == '1'
+    
     # Flask
     DEBUG = os.getenv('FLASK_DEBUG', '0') == '1'
 
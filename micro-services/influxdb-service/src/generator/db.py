@@ -1,6 +1,7 @@
 """Database operations for Generator Service."""
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from heartguard_common.tracing import span
 from typing import List, Dict
 import logging
 import json
@@ -86,7 +87,8 @@ class DatabaseService:
                     ORDER BY p.created_at DESC
                     LIMIT 100
                 """
-                cursor.execute(query)
+                with span('postgres.query', 'db'):
+                    cursor.execute(query)
                 results = cursor.fetchall()
                 
                 patients = [
@@ -1,6 +1,7 @@
 """InfluxDB operations for Generator Service."""
 from influxdb_client import InfluxDBClient, Point, WritePrecision
 from influxdb_client.client.write_api import SYNCHRONOUS
+from heartguard_common.tracing import span
 from typing import Dict, List, Optional
 from datetime import datetime
 import logging
@@ -206,7 +207,8 @@ from(bucket: "{self.bucket}")
             logger.debug(f"Executing Flux query for patient {patient_id}")
             
             query_api = self.client.query_api()
-            tables = query_api.query(flux_query, org=self.org)
+            with span('influxdb.query', 'influxdb', bucket=self.bucket):
+                tables = query_api.query(flux_query, org=self.org)
             
             readings = []
             for table in tables:
@@ -2,6 +2,8 @@
 from __future__ import annotations
 
 from flask import Flask
+from heartguard_common.json_provider import FastJSONProvider
+from heartguard_common.tracing import init_tracing
 
 from .blueprints.media import media_bp
 from .config import get_config
@@ -11,6 +13,8 @@ from .utils.responses import success_response
 def create_app() -> Flask:
     """Crea y configura la instancia principal de Flask."""
     app = Flask(__name__)
+    # Serialización con orjson; los formateadores pueden devolver datetime/UUID sin convertir
+    app.json = FastJSONProvider(app)
 
     config = get_config()
     app.config.from_object(config)
@@ -18,6 +22,9 @@ def create_app() -> Flask:
     # Límite de carga máximo basado en configuración (en bytes)
     app.config["MAX_CONTENT_LENGTH"] = config.MEDIA_MAX_FILE_BYTES
 
+    # Spans de la petición, BD y Spaces; el gateway los resume con Server-Timing
+    init_tracing(app, "media-service", reported_kinds=("db", "storage", "http"))
+
     app.register_blueprint(media_bp)
 
     @app.route("/health", methods=["GET"])
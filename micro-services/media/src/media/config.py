@@ -60,6 +60,11 @@ class BaseConfig:
     
     DATABASE_URL: str | None = os.getenv("DATABASE_URL")
 
+    # Trazas (X-Trace-ID del gateway); /debug/traces solo con TRACING_DEBUG_VIEW
+    TRACING_MAX_TRACES: int = int(os.getenv("TRACING_MAX_TRACES", 200))
+    TRACING_EXPORT_PATH: str = os.getenv("TRACING_EXPORT_PATH", "")
+    TRACING_DEBUG_VIEW: bool = os.getenv("TRACING_DEBUG_VIEW", "0").lower() in {"1", "true", "yes", "on"}
+
     def __post_init__(self) -> None:
         if not self.SPACES_ORIGIN_ENDPOINT:
             raise RuntimeError("ORIGIN_ENDPOINT es requerido para inicializar el Media Service")
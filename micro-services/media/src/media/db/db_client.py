@@ -6,12 +6,21 @@ from typing import Any
 from urllib.parse import urlparse
 
 import psycopg2
+from heartguard_common.tracing import span
 from psycopg2 import pool
 from psycopg2.extras import RealDictCursor
 
 logger = logging.getLogger(__name__)
 
 
+class TracedCursor(psycopg2.extensions.cursor):
+    """Cursor que registra cada consulta como span de la petición."""
+
+    def execute(self, query, vars=None):
+        with span("postgres.query", "db"):
+            return super().execute(query, vars)
+
+
 class DatabaseClient:
     """Cliente para interactuar con PostgreSQL."""
 
@@ -34,7 +43,8 @@ class DatabaseClient:
             database=parsed.path.lstrip('/'),
             user=parsed.username,
             password=parsed.password,
-            options='-c search_path=heartguard,public'
+            options='-c search_path=heartguard,public',
+            cursor_factory=TracedCursor,
         )
         logger.info("Database connection pool initialized")
 
@@ -7,6 +7,7 @@ from typing import Any
 import boto3
 from botocore.config import Config
 from botocore.exceptions import BotoCoreError, ClientError
+from heartguard_common.tracing import span
 
 
 class SpacesClientError(RuntimeError):
@@ -54,13 +55,14 @@ class SpacesClient:
 
     def upload_object(self, *, key: str, data: bytes, content_type: str) -> dict[str, Any]:
         try:
-            response = self._client.put_object(
-                Bucket=self.bucket,
-                Key=key,
-                Body=data,
-                ContentType=content_type,
-                ACL=self.default_acl,
-            )
+            with span("spaces.put_object", "storage", key=key, size=len(data)):
+                response = self._client.put_object(
+                    Bucket=self.bucket,
+                    Key=key,
+                    Body=data,
+                    ContentType=content_type,
+                    ACL=self.default_acl,
+                )
         except (BotoCoreError, ClientError) as exc:  # pragma: no cover - depende de red
             raise SpacesClientError("Error al subir objeto a Spaces", error_code="upload_failed") from exc
 
@@ -73,14 +75,15 @@ class SpacesClient:
     def delete_prefix(self, prefix: str) -> int:
         deleted = 0
         try:
-            paginator = self._client.get_paginator("list_objects_v2")
-            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
-                contents = page.get("Contents", [])
-                if not contents:
-                    continue
-                objects = [{"Key": entry["Key"]} for entry in contents]
-                self._client.delete_objects(Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
-                deleted += len(objects)
+            with span("spaces.delete_prefix", "storage", prefix=prefix):
+                paginator = self._client.get_paginator("list_objects_v2")
+                for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                    contents = page.get("Contents", [])
+                    if not contents:
+                        continue
+                    objects = [{"Key": entry["Key"]} for entry in contents]
+                    self._client.delete_objects(Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
+                    deleted += len(objects)
         except (BotoCoreError, ClientError) as exc:  # pragma: no cover - depende de red
             raise SpacesClientError("Error al eliminar objetos en Spaces", error_code="delete_failed") from exc
         return deleted
@@ -98,7 +101,8 @@ class SpacesClient:
             SpacesClientError: Si hay un error al eliminar
         """
         try:
-            self._client.delete_object(Bucket=self.bucket, Key=key)
+            with span("spaces.delete_object", "storage", key=key):
+                self._client.delete_object(Bucket=self.bucket, Key=key)
             return True
         except (BotoCoreError, ClientError) as exc:  # pragma: no cover - depende de red
             raise SpacesClientError(f"Error al eliminar objeto {key} en Spaces", error_code="delete_failed") from exc
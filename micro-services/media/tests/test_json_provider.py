@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+
+from heartguard_common import json_provider
+from heartguard_common.json_provider import FastJSONProvider
+from media.utils.responses import success_response
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "orjson":
+        if json_provider.orjson is None:
+            pytest.skip("orjson no está instalado")
+    else:
+        monkeypatch.setattr(json_provider, "orjson", None)
+    return request.param
+
+
+def test_app_uses_fast_provider(flask_app):
+    assert isinstance(flask_app.json, FastJSONProvider)
+
+
+def test_native_types_are_encoded(flask_app, encoder):
+    photo_id = uuid.uuid4()
+    data = {
+        "id": photo_id,
+        "uploaded_at": datetime(2025, 3, 1, 12, 30, 5, 250000, tzinfo=timezone.utc),
+        "taken_on": date(2025, 3, 1),
+        "size_mb": Decimal("1.50"),
+        "nombre": "fotografía",
+    }
+    with flask_app.test_request_context(headers={"Accept": "application/json"}):
+        resp = success_response(data=data)
+        payload = resp.get_json()
+
+    assert payload["data"] == {
+        "id": str(photo_id),
+        "uploaded_at": "2025-03-01T12:30:05.250000+00:00",
+        "taken_on": "2025-03-01",
+        "size_mb": 1.5,
+        "nombre": "fotografía",
+    }
+    assert "fotografía" in resp.get_data(as_text=True)
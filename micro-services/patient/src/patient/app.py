@@ -3,6 +3,8 @@ Aplicación Flask principal del Patient Service
 """
 from flask import Flask, jsonify
 from flask_cors import CORS
+from heartguard_common.json_provider import FastJSONProvider
+from heartguard_common.tracing import init_tracing
 from .config import get_config
 from .blueprints.patient import patient_bp
 
@@ -15,6 +17,8 @@ def create_app():
         Flask app configurada
     """
     app = Flask(__name__)
+    # Serialización con orjson; los formateadores pueden devolver datetime/UUID sin convertir
+    app.json = FastJSONProvider(app)
     
     # Cargar configuración
     config = get_config()
@@ -29,6 +33,9 @@ def create_app():
         }
     })
     
+    # Spans de la petición y de la BD; el gateway los resume con Server-Timing
+    init_tracing(app, 'patient-service')
+    
     # Registrar blueprints
     app.register_blueprint(patient_bp)
     
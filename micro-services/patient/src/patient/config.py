@@ -26,6 +26,11 @@ class Config:
     
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    
+    # Trazas (X-Trace-ID del gateway)
+    TRACING_MAX_TRACES = int(os.getenv('TRACING_MAX_TRACES', '200'))
+    TRACING_EXPORT_PATH = os.getenv('TRACING_EXPORT_PATH', '')
+    TRACING_DEBUG_VIEW = os.getenv('TRACING_DEBUG_VIEW', '0') == '1'
 
 
 # Configuraciones por entorno
@@ -4,11 +4,20 @@ Extensiones compartidas del servicio
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from contextlib import contextmanager
+from heartguard_common.tracing import span
 from .config import get_config
 
 config = get_config()
 
 
+class TracedCursor(RealDictCursor):
+    """RealDictCursor que registra cada consulta como span de la petición."""
+
+    def execute(self, query, vars=None):
+        with span('postgres.query', 'db'):
+            return super().execute(query, vars)
+
+
 @contextmanager
 def get_db_cursor():
     """
@@ -16,13 +25,14 @@ def get_db_cursor():
     Maneja automáticamente el commit/rollback y el cierre de conexión.
     
     Yields:
-        cursor: Cursor de psycopg2 con RealDictCursor
+        cursor: Cursor de psycopg2 con RealDictCursor (TracedCursor)
     """
     conn = None
     cursor = None
     try:
-        conn = psycopg2.connect(config.DATABASE_URL)
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        with span('postgres.connect', 'db'):
+            conn = psycopg2.connect(config.DATABASE_URL)
+        cursor = conn.cursor(cursor_factory=TracedCursor)
         yield cursor
         conn.commit()
     except Exception as e:
@@ -200,11 +200,11 @@ class PatientService:
         
         return {
             'location': {
-                'latitude': float(location['latitude']) if location['latitude'] else None,
-                'longitude': float(location['longitude']) if location['longitude'] else None,
-                'timestamp': location['timestamp'].isoformat() if location['timestamp'] else None,
+                'latitude': location['latitude'],
+                'longitude': location['longitude'],
+                'timestamp': location['timestamp'],
                 'source': location['source'],
-                'accuracy_meters': float(location['accuracy_meters']) if location['accuracy_meters'] else None
+                'accuracy_meters': location['accuracy_meters']
             }
         }
     
@@ -350,12 +350,12 @@ class PatientService:
     def _format_location(location: Dict) -> Dict:
         """Formatea una ubicación para respuesta"""
         return {
-            'id': str(location['id']),
-            'latitude': float(location['latitude']) if location['latitude'] else None,
-            'longitude': float(location['longitude']) if location['longitude'] else None,
-            'timestamp': location['timestamp'].isoformat() if location['timestamp'] else None,
+            'id': location['id'],
+            'latitude': location['latitude'],
+            'longitude': location['longitude'],
+            'timestamp': location['timestamp'],
             'source': location.get('source'),
-            'accuracy_meters': float(location['accuracy_meters']) if location.get('accuracy_meters') else None
+            'accuracy_meters': location.get('accuracy_meters')
         }
     
     @staticmethod
@@ -0,0 +1,17 @@
+"""Fixtures compartidas para pruebas del Patient Service."""
+import sys
+from pathlib import Path
+
+import pytest
+
+# El servicio se importa como paquete `patient` (igual que PYTHONPATH=src)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
+
+
+@pytest.fixture
+def flask_app():
+    from patient.app import create_app
+
+    app = create_app()
+    app.config.update(TESTING=True)
+    return app
@@ -0,0 +1,69 @@
+"""Tests de serialización de las ubicaciones del paciente (valores nativos de psycopg2)."""
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from flask import jsonify
+from heartguard_common.json_provider import FastJSONProvider
+
+from patient.services.patient_service import PatientService
+
+
+class FakeRepository:
+    def __init__(self, location):
+        self.location = location
+
+    def get_latest_location(self, patient_id):
+        return self.location
+
+    def get_location_history(self, patient_id, limit, offset):
+        return [self.location], 1
+
+
+def _service(location):
+    service = PatientService.__new__(PatientService)
+    service.repo = FakeRepository(location)
+    return service
+
+
+def _row(**overrides):
+    row = {
+        'id': uuid.uuid4(),
+        'latitude': Decimal('19.432608'),
+        'longitude': Decimal('-99.133209'),
+        'timestamp': datetime(2025, 3, 1, 12, 30, 5, 250000),
+        'source': 'gps',
+        'accuracy_meters': Decimal('12.5'),
+    }
+    row.update(overrides)
+    return row
+
+
+def test_app_uses_fast_provider(flask_app):
+    assert isinstance(flask_app.json, FastJSONProvider)
+
+
+def test_latest_location_is_encoded_from_native_values(flask_app):
+    data = _service(_row()).get_latest_location('p-1')
+    with flask_app.test_request_context():
+        payload = jsonify(data).get_json()
+
+    assert payload['location'] == {
+        'latitude': 19.432608,
+        'longitude': -99.133209,
+        'timestamp': '2025-03-01T12:30:05.250000',
+        'source': 'gps',
+        'accuracy_meters': 12.5,
+    }
+
+
+def test_location_history_keeps_zero_and_null_values(flask_app):
+    row = _row(latitude=Decimal('0'), accuracy_meters=None)
+    data = _service(row).get_location_history('p-1')
+    with flask_app.test_request_context():
+        location = jsonify(data).get_json()['locations'][0]
+
+    assert location['id'] == str(row['id'])
+    assert location['latitude'] == 0.0
+    assert location['accuracy_meters'] is None
+    assert location['timestamp'] == '2025-03-01T12:30:05.250000'
@@ -0,0 +1,227 @@
+"""
+Benchmark de /orgs/<org_id>/care-teams y /orgs/<org_id>/care-team-patients.
+
+Siembra una organización sintética (miles de pacientes repartidos en equipos),
+mide la forma anterior (filas planas + reagrupado en Python + serialización)
+frente al JSON construido en PostgreSQL, comprueba que ambos payloads son
+equivalentes y borra los datos sembrados al terminar.
+
+Uso (desde micro-services/user, con DATABASE_URL apuntando a una base de pruebas):
+
+    PYTHONPATH=src python scripts/bench_care_team_payloads.py --patients 5000 --teams 25
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+import psycopg2
+from psycopg2.extras import RealDictCursor
+
+from user.repositories.user_repo import UserRepository
+
+LEGACY_CARE_TEAMS_SQL = """
+    SELECT
+        ct.id AS care_team_id, ct.name AS care_team_name, ct.created_at,
+        ctm.user_id AS member_user_id, u.name AS member_name, u.email AS member_email,
+        u.profile_photo_url AS member_profile_photo_url,
+        tm.code AS member_role_code, tm.label AS member_role_label
+    FROM care_teams ct
+    JOIN care_team_member user_membership ON user_membership.care_team_id = ct.id AND user_membership.user_id = %s
+    LEFT JOIN care_team_member ctm ON ctm.care_team_id = ct.id
+    LEFT JOIN users u ON u.id = ctm.user_id
+    LEFT JOIN team_member_roles tm ON tm.id = ctm.role_id
+    WHERE ct.org_id = %s
+    ORDER BY ct.name ASC, member_name ASC NULLS LAST
+"""
+
+LEGACY_TEAM_PATIENTS_SQL = """
+    SELECT
+        ct.id AS care_team_id, ct.name AS care_team_name,
+        p.id AS patient_id, p.person_name AS patient_name, p.email AS patient_email,
+        rl.code AS risk_level_code, rl.label AS risk_level_label
+    FROM care_teams ct
+    JOIN care_team_member ctm ON ctm.care_team_id = ct.id
+    LEFT JOIN patient_care_team pct ON pct.care_team_id = ct.id
+    LEFT JOIN patients p ON p.id = pct.patient_id
+    LEFT JOIN risk_levels rl ON rl.id = p.risk_level_id
+    WHERE ct.org_id = %s AND ctm.user_id = %s
+    ORDER BY ct.name ASC, patient_name ASC NULLS LAST
+"""
+
+
+def _member(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'user_id': str(row['member_user_id']),
+        'name': row['member_name'],
+        'email': row['member_email'],
+        'profile_photo_url': row['member_profile_photo_url'],
+        'role': {'code': row['member_role_code'], 'label': row['member_role_label']},
+    }
+
+
+def legacy_care_teams(conn, org_id: str, user_id: str) -> str:
+    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(LEGACY_CARE_TEAMS_SQL, (user_id, org_id))
+        rows = cursor.fetchall()
+    teams: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        team = teams.setdefault(str(row['care_team_id']), {
+            'id': str(row['care_team_id']),
+            'name': row['care_team_name'],
+            'created_at': row['created_at'].isoformat(),
+            'members': [],
+        })
+        if row['member_user_id']:
+            team['members'].append(_member(row))
+    return json.dumps(list(teams.values()))
+
+
+def legacy_team_patients(conn, org_id: str, user_id: str) -> str:
+    with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+        cursor.execute(LEGACY_TEAM_PATIENTS_SQL, (org_id, user_id))
+        rows = cursor.fetchall()
+        cursor.execute(LEGACY_CARE_TEAMS_SQL, (user_id, org_id))
+        member_rows = cursor.fetchall()
+    teams: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        team = teams.setdefault(str(row['care_team_id']), {
+            'id': str(row['care_team_id']),
+            'name': row['care_team_name'],
+            'patients': [],
+            'members': [],
+        })
+        if row['patient_id'] is not None:
+            team['patients'].append({
+                'id': str(row['patient_id']),
+                'name': row['patient_name'],
+                'email': row['patient_email'],
+                'risk_level': {'code': row['risk_level_code'], 'label': row['risk_level_label']},
+            })
+    for row in member_rows:
+        team_id = str(row['care_team_id'])
+        if team_id in teams and row['member_user_id']:
+            teams[team_id]['members'].append(_member(row))
+    return json.dumps(list(teams.values()))
+
+
+def seed(conn, tag: str, *, patients: int, teams: int, members: int) -> Dict[str, Any]:
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO organizations(code, name) VALUES (%s, %s) RETURNING id",
+            (f'BENCH-{tag}', f'Benchmark {tag}'),
+        )
+        org_id = cursor.fetchone()[0]
+        cursor.execute(
+            """
+            INSERT INTO users(name, email, password_hash, user_status_id)
+            SELECT 'Usuario ' || g, %s || g || '@bench.local', 'x', (SELECT id FROM user_statuses WHERE code = 'active')
+            FROM generate_series(1, %s) g
+            RETURNING id
+            """,
+            (f'bench-{tag}-', members),
+        )
+        user_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            """
+            INSERT INTO care_teams(org_id, name)
+            SELECT %s, 'Equipo ' || lpad(g::text, 4, '0') FROM generate_series(1, %s) g
+            RETURNING id
+            """,
+            (org_id, teams),
+        )
+        team_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            """
+            INSERT INTO care_team_member(care_team_id, user_id, role_id)
+            SELECT ct, u, (SELECT id FROM team_member_roles ORDER BY code LIMIT 1)
+            FROM unnest(%s::uuid[]) ct CROSS JOIN unnest(%s::uuid[]) u
+            """,
+            (team_ids, user_ids),
+        )
+        cursor.execute(
+            """
+            WITH new_patients AS (
+                INSERT INTO patients(org_id, person_name, email, password_hash, risk_level_id)
+                SELECT %s, 'Paciente ' || lpad(g::text, 6, '0'), %s || g || '@bench.local', 'x',
+                       (SELECT id FROM risk_levels ORDER BY code LIMIT 1)
+                FROM generate_series(1, %s) g
+                RETURNING id
+            )
+            INSERT INTO patient_care_team(patient_id, care_team_id)
+            SELECT np.id, (%s::uuid[])[1 + (row_number() OVER () %% %s)]
+            FROM new_patients np
+            """,
+            (org_id, f'bench-patient-{tag}-', patients, team_ids, len(team_ids)),
+        )
+    conn.commit()
+    return {'org_id': str(org_id), 'user_id': str(user_ids[0]), 'team_ids': team_ids}
+
+
+def cleanup(conn, tag: str, seeded: Dict[str, Any]) -> None:
+    conn.rollback()
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM patients WHERE org_id = %s", (seeded['org_id'],))
+        cursor.execute("DELETE FROM care_teams WHERE org_id = %s", (seeded['org_id'],))
+        cursor.execute("DELETE FROM sync_events WHERE care_team_id = ANY(%s::uuid[])", (seeded['team_ids'],))
+        cursor.execute("DELETE FROM users WHERE email LIKE %s", (f'bench-{tag}-%',))
+        cursor.execute("DELETE FROM organizations WHERE id = %s", (seeded['org_id'],))
+    conn.commit()
+
+
+def _normalized(payload: str) -> List[Dict[str, Any]]:
+    """PostgreSQL recorta los ceros finales de los microsegundos; se comparan como datetime."""
+    teams = json.loads(payload)
+    for team in teams:
+        if team.get('created_at'):
+            team['created_at'] = datetime.fromisoformat(team['created_at'])
+    return teams
+
+
+def measure(label: str, fn: Callable[[], str], repeat: int) -> str:
+    payload = fn()  # calentamiento (planes, caché de páginas)
+    timings: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        payload = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f'  {label:<22} mediana {statistics.median(timings):8.2f} ms  p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:8.2f} ms  {len(payload) / 1024:8.1f} KiB')
+    return payload
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--patients', type=int, default=5000)
+    parser.add_argument('--teams', type=int, default=25)
+    parser.add_argument('--members', type=int, default=8)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+    tag = uuid.uuid4().hex[:8]
+    seeded = seed(conn, tag, patients=args.patients, teams=args.teams, members=args.members)
+    org_id, user_id = seeded['org_id'], seeded['user_id']
+    print(f'Organización sintética: {args.patients} pacientes, {args.teams} equipos, {args.members} miembros por equipo')
+    try:
+        for name, legacy, current in (
+            ('care-teams', legacy_care_teams, UserRepository.list_org_care_teams),
+            ('care-team-patients', legacy_team_patients, UserRepository.list_org_care_team_patients),
+        ):
+            print(name)
+            old = measure('filas + Python', lambda: legacy(conn, org_id, user_id), args.repeat)
+            new = measure('JSON en PostgreSQL', lambda: current(org_id, user_id), args.repeat)
+            if _normalized(old) != _normalized(new):
+                raise SystemExit(f'{name}: los payloads no coinciden')
+    finally:
+        cleanup(conn, tag, seeded)
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
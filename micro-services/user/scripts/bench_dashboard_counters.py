@@ -0,0 +1,282 @@
+"""
+Comprobación y benchmark del dashboard de organización sobre care_team_counters.
+
+Siembra una organización sintética (pacientes repartidos en equipos, alertas de
+los últimos días en todos los estados y cuidadores, algunos ya terminados),
+compara UserRepository.get_org_dashboard_counters con get_org_overview +
+get_org_metrics (las consultas sobre las tablas base) y vuelve a comparar tras
+cambiar estados de alertas, insertar alertas nuevas, mover pacientes de equipo
+y terminar relaciones de cuidador, de modo que se ejercitan los triggers.
+Por último comparte un paciente entre dos equipos y comprueba que el servicio
+cae a las consultas base. Sale con error si algún valor no coincide y borra los
+datos sembrados al terminar.
+
+Uso (desde micro-services/user, con DATABASE_URL apuntando a una base de pruebas):
+
+    PYTHONPATH=src python scripts/bench_dashboard_counters.py --patients 2000 --teams 10
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import time
+import uuid
+from typing import Any, Callable, Dict, List
+
+import psycopg2
+
+from user.repositories.user_repo import UserRepository
+from user.services.user_service import UserService
+
+
+def seed(conn, tag: str, *, patients: int, teams: int, alerts: int, caregivers: int) -> Dict[str, Any]:
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO organizations(code, name) VALUES (%s, %s) RETURNING id",
+            (f'BENCH-{tag}', f'Benchmark {tag}'),
+        )
+        org_id = cursor.fetchone()[0]
+        cursor.execute(
+            """
+            INSERT INTO users(name, email, password_hash, user_status_id)
+            SELECT 'Usuario ' || g, %s || g || '@bench.local', 'x', (SELECT id FROM user_statuses WHERE code = 'active')
+            FROM generate_series(1, %s) g
+            RETURNING id
+            """,
+            (f'bench-{tag}-', caregivers + 1),
+        )
+        user_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            """
+            INSERT INTO care_teams(org_id, name)
+            SELECT %s, 'Equipo ' || lpad(g::text, 4, '0') FROM generate_series(1, %s) g
+            RETURNING id
+            """,
+            (org_id, teams),
+        )
+        team_ids = [row[0] for row in cursor.fetchall()]
+        # El usuario del dashboard pertenece a todos los equipos menos al último
+        cursor.execute(
+            """
+            INSERT INTO care_team_member(care_team_id, user_id, role_id)
+            SELECT ct, %s, (SELECT id FROM team_member_roles ORDER BY code LIMIT 1)
+            FROM unnest(%s::uuid[]) ct
+            """,
+            (user_ids[0], team_ids[:-1] or team_ids),
+        )
+        cursor.execute(
+            """
+            WITH new_patients AS (
+                INSERT INTO patients(org_id, person_name, email, password_hash, risk_level_id)
+                SELECT %s, 'Paciente ' || lpad(g::text, 6, '0'), %s || g || '@bench.local', 'x',
+                       (SELECT id FROM risk_levels ORDER BY code LIMIT 1)
+                FROM generate_series(1, %s) g
+                RETURNING id
+            )
+            INSERT INTO patient_care_team(patient_id, care_team_id)
+            SELECT np.id, (%s::uuid[])[1 + (row_number() OVER () %% %s)]
+            FROM new_patients np
+            RETURNING patient_id
+            """,
+            (org_id, f'bench-patient-{tag}-', patients, team_ids, len(team_ids)),
+        )
+        patient_ids = [row[0] for row in cursor.fetchall()]
+        insert_alerts(cursor, patient_ids, alerts, days=10)
+        cursor.execute(
+            """
+            INSERT INTO caregiver_patient(patient_id, user_id, started_at, ended_at)
+            SELECT p, u, NOW() - INTERVAL '30 days',
+                   CASE WHEN random() < 0.2 THEN NOW() - INTERVAL '1 day' END
+            FROM unnest(%s::uuid[]) WITH ORDINALITY AS pp(p, n)
+            JOIN unnest(%s::uuid[]) WITH ORDINALITY AS uu(u, m) ON uu.m = 1 + (pp.n %% %s)
+            """,
+            (patient_ids, user_ids[1:], caregivers),
+        )
+    conn.commit()
+    return {
+        'org_id': str(org_id),
+        'user_id': str(user_ids[0]),
+        'user_ids': user_ids,
+        'team_ids': team_ids,
+        'patient_ids': patient_ids,
+    }
+
+
+def insert_alerts(cursor, patient_ids: List[Any], count: int, *, days: int) -> None:
+    """Alertas repartidas en los últimos `days` días, con nivel y estado aleatorios."""
+    cursor.execute(
+        """
+        WITH levels AS (SELECT array_agg(id) AS ids FROM alert_levels),
+             statuses AS (SELECT array_agg(id) AS ids FROM alert_status)
+        INSERT INTO alerts(patient_id, type_id, alert_level_id, status_id, created_at)
+        SELECT (%s::uuid[])[1 + floor(random() * %s)::int],
+               (SELECT id FROM alert_types ORDER BY code LIMIT 1),
+               l.ids[1 + floor(random() * array_length(l.ids, 1))::int],
+               s.ids[1 + floor(random() * array_length(s.ids, 1))::int],
+               NOW() - random() * make_interval(days => %s)
+        FROM generate_series(1, %s) g
+        CROSS JOIN levels l
+        CROSS JOIN statuses s
+        """,
+        (patient_ids, len(patient_ids), days, count),
+    )
+
+
+def mutate(conn, seeded: Dict[str, Any], *, alerts: int) -> None:
+    """Cambios que recorren cada rama de los triggers de contadores."""
+    with conn.cursor() as cursor:
+        # Estado: created -> ack (sigue abierta), ack -> resolved (se cierra), resolved -> notified (se reabre)
+        for source, target in (('created', 'ack'), ('ack', 'resolved'), ('resolved', 'notified')):
+            cursor.execute(
+                """
+                UPDATE alerts a SET status_id = (SELECT id FROM alert_status WHERE code = %s)
+                WHERE a.id IN (
+                    SELECT a2.id FROM alerts a2
+                    WHERE a2.patient_id = ANY(%s::uuid[])
+                      AND a2.status_id = (SELECT id FROM alert_status WHERE code = %s)
+                    ORDER BY random() LIMIT %s
+                )
+                """,
+                (target, seeded['patient_ids'], source, max(alerts // 20, 1)),
+            )
+        insert_alerts(cursor, seeded['patient_ids'], max(alerts // 10, 1), days=1)
+        cursor.execute(
+            "DELETE FROM alerts WHERE id IN (SELECT id FROM alerts WHERE patient_id = ANY(%s::uuid[]) ORDER BY random() LIMIT %s)",
+            (seeded['patient_ids'], max(alerts // 50, 1)),
+        )
+        # Pacientes que cambian de equipo (baja y alta, como hace la API; sin quedar compartidos)
+        team_ids = seeded['team_ids']
+        cursor.execute(
+            """
+            WITH moved AS (
+                DELETE FROM patient_care_team
+                WHERE patient_id IN (SELECT unnest(%s::uuid[]) ORDER BY random() LIMIT %s)
+                RETURNING patient_id, care_team_id
+            )
+            INSERT INTO patient_care_team(patient_id, care_team_id)
+            SELECT patient_id, (%s::uuid[])[1 + (array_position(%s::uuid[], care_team_id) %% %s)]
+            FROM moved
+            """,
+            (seeded['patient_ids'], max(len(seeded['patient_ids']) // 20, 1), team_ids, team_ids, len(team_ids)),
+        )
+        cursor.execute(
+            """
+            UPDATE caregiver_patient SET ended_at = NOW() - INTERVAL '1 hour'
+            WHERE (patient_id, user_id) IN (
+                SELECT patient_id, user_id FROM caregiver_patient
+                WHERE patient_id = ANY(%s::uuid[]) AND ended_at IS NULL
+                ORDER BY random() LIMIT %s
+            )
+            """,
+            (seeded['patient_ids'], max(len(seeded['patient_ids']) // 20, 1)),
+        )
+    conn.commit()
+
+
+def share_patient(conn, seeded: Dict[str, Any]) -> None:
+    """Añade el primer paciente a un segundo equipo del usuario."""
+    with conn.cursor() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO patient_care_team(patient_id, care_team_id)
+            SELECT %s, ct FROM unnest(%s::uuid[]) ct
+            ON CONFLICT DO NOTHING
+            """,
+            (seeded['patient_ids'][0], seeded['team_ids'][:2]),
+        )
+    conn.commit()
+
+
+def cleanup(conn, tag: str, seeded: Dict[str, Any]) -> None:
+    conn.rollback()
+    with conn.cursor() as cursor:
+        cursor.execute("DELETE FROM patients WHERE org_id = %s", (seeded['org_id'],))
+        cursor.execute("DELETE FROM care_teams WHERE org_id = %s", (seeded['org_id'],))
+        cursor.execute(
+            """
+            DELETE FROM sync_events
+            WHERE patient_id = ANY(%s::uuid[]) OR care_team_id = ANY(%s::uuid[]) OR user_id = ANY(%s::uuid[])
+            """,
+            (seeded['patient_ids'], seeded['team_ids'], seeded['user_ids']),
+        )
+        cursor.execute("DELETE FROM users WHERE email LIKE %s", (f'bench-{tag}-%',))
+        cursor.execute("DELETE FROM organizations WHERE id = %s", (seeded['org_id'],))
+    conn.commit()
+
+
+def legacy_stats(service: UserService, org_id: str, user_id: str) -> Dict[str, Any]:
+    return {
+        'overview': service._format_org_overview(UserRepository.get_org_overview(org_id, user_id)),
+        'metrics': service._format_org_metrics(UserRepository.get_org_metrics(org_id, user_id)),
+    }
+
+
+def counter_stats(service: UserService, org_id: str, user_id: str) -> Dict[str, Any]:
+    counters = UserRepository.get_org_dashboard_counters(org_id, user_id)
+    return {
+        'overview': service._format_org_overview(counters),
+        'metrics': service._format_org_metrics(counters),
+    }
+
+
+def compare(label: str, expected: Dict[str, Any], actual: Dict[str, Any]) -> None:
+    mismatches = []
+    for section, values in expected.items():
+        for field, value in values.items():
+            other = actual[section][field]
+            if isinstance(value, float):
+                equal = abs(value - other) < 1e-6
+            else:
+                equal = value == other
+            if not equal:
+                mismatches.append(f'{section}.{field}: tablas base {value!r}, contadores {other!r}')
+    if mismatches:
+        raise SystemExit(f'{label}: los contadores no coinciden\n  ' + '\n  '.join(mismatches))
+    print(f'  {label}: coinciden ({expected["overview"]["open_alerts"]} abiertas, {expected["metrics"]["total_alerts"]} alertas)')
+
+
+def measure(label: str, fn: Callable[[], Any], repeat: int) -> None:
+    fn()  # calentamiento (planes, caché de páginas)
+    timings: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f'  {label:<28} mediana {statistics.median(timings):8.2f} ms  p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:8.2f} ms')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--patients', type=int, default=2000)
+    parser.add_argument('--teams', type=int, default=10)
+    parser.add_argument('--alerts', type=int, default=20000)
+    parser.add_argument('--caregivers', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+    tag = uuid.uuid4().hex[:8]
+    seeded = seed(conn, tag, patients=args.patients, teams=args.teams, alerts=args.alerts, caregivers=args.caregivers)
+    org_id, user_id = seeded['org_id'], seeded['user_id']
+    service = UserService()
+    print(f'Organización sintética: {args.patients} pacientes, {args.teams} equipos, {args.alerts} alertas')
+    try:
+        compare('tras sembrar', legacy_stats(service, org_id, user_id), counter_stats(service, org_id, user_id))
+        mutate(conn, seeded, alerts=args.alerts)
+        compare('tras los cambios', legacy_stats(service, org_id, user_id), counter_stats(service, org_id, user_id))
+
+        print('dashboard')
+        measure('overview + metrics (base)', lambda: legacy_stats(service, org_id, user_id), args.repeat)
+        measure('care_team_counters', lambda: counter_stats(service, org_id, user_id), args.repeat)
+
+        if len(seeded['team_ids']) > 2:
+            share_patient(conn, seeded)
+            compare('paciente compartido', legacy_stats(service, org_id, user_id), service._org_dashboard_stats(org_id, user_id))
+    finally:
+        cleanup(conn, tag, seeded)
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
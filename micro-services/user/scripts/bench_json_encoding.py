@@ -0,0 +1,150 @@
+"""
+Benchmark de serialización de los listados de ubicaciones y dispositivos.
+
+Genera filas sintéticas con la forma que devuelve psycopg2 (UUID, datetime,
+Decimal), las pasa por los formateadores del servicio y compara el proveedor
+JSON por defecto de Flask (valores convertidos a texto antes de serializar,
+como hacían los formateadores) con FastJSONProvider, con y sin orjson.
+No necesita base de datos.
+
+Uso (desde micro-services/user):
+
+    PYTHONPATH=src python scripts/bench_json_encoding.py --rows 5000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from heartguard_common import json_provider
+from heartguard_common.json_provider import FastJSONProvider
+
+from user.services.user_service import UserService
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=random.randint(0, 86400))
+
+
+def patient_location_row(team_id: uuid.UUID, org_id: uuid.UUID) -> Dict[str, Any]:
+    return {
+        'patient_id': uuid.uuid4(),
+        'patient_name': 'Paciente Sintético',
+        'patient_email': 'paciente@bench.local',
+        'org_id': org_id,
+        'org_name': 'Clínica Benchmark',
+        'care_team_id': team_id,
+        'care_team_name': 'Equipo Norte',
+        'risk_level_code': 'high',
+        'risk_level_label': 'Alto',
+        'latitude': Decimal(f'19.{random.randint(100000, 999999)}'),
+        'longitude': Decimal(f'-99.{random.randint(100000, 999999)}'),
+        'last_location_at': _now(),
+        'alert_id': uuid.uuid4(),
+        'alert_created_at': _now(),
+        'alert_code': 'TACHY',
+        'alert_label': 'Taquicardia',
+        'alert_level_code': 'high',
+        'alert_level_label': 'Alta',
+    }
+
+
+def org_device_row(org_id: uuid.UUID) -> Dict[str, Any]:
+    return {
+        'id': uuid.uuid4(),
+        'serial': f'HG-{random.randint(0, 10**8):08d}',
+        'brand': 'HeartGuard',
+        'model': 'HG-ECG-2',
+        'active': True,
+        'registered_at': _now(),
+        'active_stream_id': uuid.uuid4(),
+        'device_type_code': 'ecg',
+        'device_type_label': 'Electrocardiógrafo',
+        'owner_patient_id': uuid.uuid4(),
+        'owner_patient_name': 'Paciente Sintético',
+        'owner_patient_email': 'paciente@bench.local',
+        'current_patient_id': uuid.uuid4(),
+        'current_patient_name': 'Paciente Sintético',
+        'connection_started_at': _now(),
+        'total_streams': 42,
+        'last_started_at': _now(),
+    }
+
+
+def _as_text(value: Any) -> Any:
+    """Conversión que hacían los formateadores antes de entregar el dict a jsonify."""
+    if isinstance(value, dict):
+        return {key: _as_text(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_as_text(item) for item in value]
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def measure(label: str, fn: Callable[[], bytes], repeat: int) -> None:
+    body = fn()  # calentamiento
+    timings: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    print(f'  {label:<28} mediana {statistics.median(timings):8.2f} ms  p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:8.2f} ms  {len(body) / 1024:8.1f} KiB')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+
+    service = UserService()
+    org_id, team_id = uuid.uuid4(), uuid.uuid4()
+    listings = {
+        'care-team/locations': (
+            [patient_location_row(team_id, org_id) for _ in range(args.rows)],
+            service._format_team_patient_location,
+        ),
+        'orgs/<org_id>/devices': (
+            [org_device_row(org_id) for _ in range(args.rows)],
+            service._format_org_device,
+        ),
+    }
+
+    default_app = Flask('bench-default')
+    default_app.json = DefaultJSONProvider(default_app)
+    fast_app = Flask('bench-fast')
+    fast_app.json = FastJSONProvider(fast_app)
+    orjson_module = json_provider.orjson
+
+    def render(app: Flask, rows: List[Dict[str, Any]], fmt: Callable, convert: bool) -> bytes:
+        items = [fmt(row) for row in rows]
+        payload = {'status': 'success', 'data': {'items': _as_text(items) if convert else items}}
+        with app.app_context():
+            return app.json.response(payload).get_data()
+
+    print(f'{args.rows} filas por listado, {args.repeat} repeticiones (orjson: {"sí" if orjson_module else "no"})')
+    for name, (rows, fmt) in listings.items():
+        print(name)
+        measure('Flask por defecto (texto)', lambda: render(default_app, rows, fmt, True), args.repeat)
+        json_provider.orjson = None
+        measure('FastJSONProvider (stdlib)', lambda: render(fast_app, rows, fmt, False), args.repeat)
+        json_provider.orjson = orjson_module
+        if orjson_module is not None:
+            measure('FastJSONProvider (orjson)', lambda: render(fast_app, rows, fmt, False), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,15 +5,20 @@ from __future__ import annotations
 
 from flask import Flask
 from flask_cors import CORS
+from heartguard_common.json_provider import FastJSONProvider
+from heartguard_common.tracing import init_tracing
 
 from .blueprints.user import user_bp
 from .config import get_config
+from .extensions import get_pool, release_request_connection
 from .utils.response_builder import error_response, fail_response, success_response
 
 
 def create_app() -> Flask:
     """Factory para crear la aplicación Flask del servicio."""
     app = Flask(__name__)
+    # Serialización con orjson; los formateadores pueden devolver datetime/UUID sin convertir
+    app.json = FastJSONProvider(app)
 
     config = get_config()
     app.config.from_object(config)
@@ -22,21 +27,31 @@ def create_app() -> Flask:
         r"/users/*": {
             "origins": config.CORS_ORIGINS,
             "methods": ["GET", "PATCH", "POST", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization", "X-Trace-ID"],
+            "allow_headers": ["Content-Type", "Authorization", "X-Trace-ID", "X-Parent-Span-ID"],
         },
         r"/orgs/*": {
             "origins": config.CORS_ORIGINS,
             "methods": ["GET", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization", "X-Trace-ID"],
+            "allow_headers": ["Content-Type", "Authorization", "X-Trace-ID", "X-Parent-Span-ID"],
         },
     })
 
+    # Spans de la petición, BD e InfluxDB; el gateway los resume con Server-Timing
+    init_tracing(app, 'user-service', reported_kinds=('db', 'influxdb', 'http'))
+
+    # Conexión del pool compartida por las consultas de una misma petición
+    app.teardown_appcontext(release_request_connection)
+
     app.register_blueprint(user_bp)
 
     @app.route('/health', methods=['GET'])
     def global_health():  # pragma: no cover - endpoint simple
         return success_response(data={'service': 'user-service', 'status': 'healthy'}, message='OK')
 
+    @app.route('/health/db-pool', methods=['GET'])
+    def db_pool_health():  # pragma: no cover - endpoint simple
+        return success_response(data=get_pool().stats(), message='OK')
+
     @app.errorhandler(404)
     def not_found(_error):  # pragma: no cover - uso genérico
         return fail_response(message='El recurso solicitado no existe', error_code='not_found', status_code=404)
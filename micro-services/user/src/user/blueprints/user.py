@@ -26,11 +26,18 @@ def _parse_int_param(name: str, *, default: int, minimum: int = 0, maximum: int
     return value
 
 
+def _tile_response(data):
+    """Respuesta de un tile: cacheable por el cliente mientras dura la caché del servicio."""
+    response, status_code = success_response(data=data, message='Tile de ubicaciones recuperado correctamente')
+    response.headers['Cache-Control'] = f"private, max-age={int(current_app.config['MAP_TILE_CACHE_TTL'])}"
+    return response, status_code
+
+
 @user_bp.before_request
 def assign_trace_id() -> None:
-    """Asigna un trace_id a cada request para seguimiento."""
+    """Asigna un trace_id a cada request para seguimiento (el de la traza, si la hay)."""
     header_trace = request.headers.get('X-Trace-ID') or request.headers.get('X-Trace-Id')
-    g.trace_id = header_trace or uuid.uuid4().hex
+    g.trace_id = g.get('trace_id') or header_trace or uuid.uuid4().hex
 
 
 @user_bp.route('/', methods=['GET'])
@@ -446,7 +453,14 @@ def org_patient_alerts(org_id: str, patient_id: str, current_user_id: str):
         return fail_response(message=str(exc), error_code='validation_error', status_code=400)
 
     try:
-        data = user_service.list_org_patient_alerts(org_id, patient_id, current_user_id, limit=limit, offset=offset)
+        data = user_service.list_org_patient_alerts(
+            org_id,
+            patient_id,
+            current_user_id,
+            limit=limit,
+            offset=offset,
+            cursor=request.args.get('cursor'),
+        )
         return success_response(data=data, message='Alertas de paciente recuperadas correctamente')
     except PermissionError as exc:
         return fail_response(message=str(exc), error_code='forbidden', status_code=403)
@@ -601,6 +615,32 @@ def care_team_locations(current_user_id: str):
         return error_response(message='Error interno al obtener ubicaciones de equipos', error_code='internal_error', status_code=500)
 
 
+@user_bp.route('/care-team/locations/changes', methods=['GET'])
+@require_user_token
+def care_team_location_changes(current_user_id: str):
+    try:
+        data = user_service.get_care_team_location_changes(current_user_id, request.args)
+        return success_response(data=data, message='Cambios de ubicaciones de equipos recuperados correctamente')
+    except ValueError as exc:
+        return fail_response(message=str(exc), error_code='validation_error', status_code=400)
+    except Exception:  # pragma: no cover - defensivo
+        current_app.logger.exception('Error al obtener cambios de ubicaciones de care teams', extra={'trace_id': g.trace_id, 'user_id': current_user_id})
+        return error_response(message='Error interno al obtener cambios de ubicaciones', error_code='internal_error', status_code=500)
+
+
+@user_bp.route('/care-team/locations/tiles/<int:z>/<int:x>/<int:y>', methods=['GET'])
+@require_user_token
+def care_team_location_tile(z: int, x: int, y: int, current_user_id: str):
+    try:
+        data = user_service.get_care_team_location_tile(current_user_id, z, x, y, request.args)
+        return _tile_response(data)
+    except ValueError as exc:
+        return fail_response(message=str(exc), error_code='validation_error', status_code=400)
+    except Exception:  # pragma: no cover - defensivo
+        current_app.logger.exception('Error al obtener tile de ubicaciones de care teams', extra={'trace_id': g.trace_id, 'user_id': current_user_id, 'tile': f'{z}/{x}/{y}'})
+        return error_response(message='Error interno al obtener el tile de ubicaciones', error_code='internal_error', status_code=500)
+
+
 @user_bp.route('/caregiver/patients', methods=['GET'])
 @require_user_token
 def caregiver_patients(current_user_id: str):
@@ -634,6 +674,32 @@ def caregiver_patient_locations(current_user_id: str):
         return error_response(message='Error interno al obtener ubicaciones de pacientes', error_code='internal_error', status_code=500)
 
 
+@user_bp.route('/caregiver/patients/locations/changes', methods=['GET'])
+@require_user_token
+def caregiver_location_changes(current_user_id: str):
+    try:
+        data = user_service.get_caregiver_location_changes(current_user_id, request.args)
+        return success_response(data=data, message='Cambios de ubicaciones de pacientes recuperados correctamente')
+    except ValueError as exc:
+        return fail_response(message=str(exc), error_code='validation_error', status_code=400)
+    except Exception:  # pragma: no cover - defensivo
+        current_app.logger.exception('Error al obtener cambios de ubicaciones para cuidador', extra={'trace_id': g.trace_id, 'user_id': current_user_id})
+        return error_response(message='Error interno al obtener cambios de ubicaciones', error_code='internal_error', status_code=500)
+
+
+@user_bp.route('/caregiver/patients/locations/tiles/<int:z>/<int:x>/<int:y>', methods=['GET'])
+@require_user_token
+def caregiver_location_tile(z: int, x: int, y: int, current_user_id: str):
+    try:
+        data = user_service.get_caregiver_location_tile(current_user_id, z, x, y, request.args)
+        return _tile_response(data)
+    except ValueError as exc:
+        return fail_response(message=str(exc), error_code='validation_error', status_code=400)
+    except Exception:  # pragma: no cover - defensivo
+        current_app.logger.exception('Error al obtener tile de ubicaciones para cuidador', extra={'trace_id': g.trace_id, 'user_id': current_user_id, 'tile': f'{z}/{x}/{y}'})
+        return error_response(message='Error interno al obtener el tile de ubicaciones', error_code='internal_error', status_code=500)
+
+
 @user_bp.route('/caregiver/patients/<string:patient_id>', methods=['GET'])
 @require_user_token
 def caregiver_patient_detail(patient_id: str, current_user_id: str):
@@ -662,7 +728,13 @@ def caregiver_patient_alerts(patient_id: str, current_user_id: str):
         return fail_response(message=str(exc), error_code='validation_error', status_code=400)
 
     try:
-        data = user_service.list_caregiver_patient_alerts(patient_id, current_user_id, limit=limit, offset=offset)
+        data = user_service.list_caregiver_patient_alerts(
+            patient_id,
+            current_user_id,
+            limit=limit,
+            offset=offset,
+            cursor=request.args.get('cursor'),
+        )
         return success_response(data=data, message='Alertas del paciente recuperadas correctamente')
     except PermissionError as exc:
         return fail_response(message=str(exc), error_code='forbidden', status_code=403)
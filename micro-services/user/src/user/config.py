@@ -17,6 +17,33 @@ class Config:
     HOST = os.getenv('HOST', '0.0.0.0')
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*')
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    # Pool de conexiones PostgreSQL (por proceso)
+    DB_POOL_MIN_SIZE = int(os.getenv('DB_POOL_MIN_SIZE', 1))
+    DB_POOL_MAX_SIZE = int(os.getenv('DB_POOL_MAX_SIZE', 10))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', 5))
+    DB_POOL_HEALTH_CHECK_AFTER = float(os.getenv('DB_POOL_HEALTH_CHECK_AFTER', 30))
+    DB_POOL_MAX_IDLE = float(os.getenv('DB_POOL_MAX_IDLE', 300))
+    DB_STATEMENT_TIMEOUT_MS = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', 15000))
+    # Caché de tiles de clusters (/care-team/locations/tiles, /caregiver/patients/locations/tiles)
+    MAP_TILE_CACHE_TTL = float(os.getenv('MAP_TILE_CACHE_TTL', 30))
+    MAP_TILE_CACHE_SIZE = int(os.getenv('MAP_TILE_CACHE_SIZE', 2048))
+    # Caché de autorización (membresías, equipos de cuidado y relaciones de cuidador)
+    AUTHZ_CACHE_TTL = float(os.getenv('AUTHZ_CACHE_TTL', 30))
+    AUTHZ_CACHE_SIZE = int(os.getenv('AUTHZ_CACHE_SIZE', 10000))
+    # InfluxDB (signos vitales) y caché de rollups horarios por paciente
+    INFLUXDB_URL = os.getenv('INFLUXDB_URL', 'http://localhost:8086')
+    INFLUXDB_TOKEN = os.getenv('INFLUXDB_TOKEN', '')
+    INFLUXDB_ORG = os.getenv('INFLUXDB_ORG', 'heartguard')
+    INFLUXDB_BUCKET = os.getenv('INFLUXDB_BUCKET', 'timeseries')
+    VITALS_ROLLUP_MAX_PATIENTS = int(os.getenv('VITALS_ROLLUP_MAX_PATIENTS', 1000))
+    VITALS_ROLLUP_MAX_HOURS = int(os.getenv('VITALS_ROLLUP_MAX_HOURS', 24 * 30))
+    VITALS_ROLLUP_SETTLE_SECONDS = int(os.getenv('VITALS_ROLLUP_SETTLE_SECONDS', 300))
+    # Feeds de cambios: antigüedad máxima de un cursor (retención de sync_events) y alertas por página
+    SYNC_CURSOR_MAX_AGE = int(os.getenv('SYNC_CURSOR_MAX_AGE', 7 * 24 * 3600))
+    SYNC_MAX_ALERTS = int(os.getenv('SYNC_MAX_ALERTS', 1000))
+    TRACING_MAX_TRACES = int(os.getenv('TRACING_MAX_TRACES', '200'))
+    TRACING_EXPORT_PATH = os.getenv('TRACING_EXPORT_PATH', '')
+    TRACING_DEBUG_VIEW = os.getenv('TRACING_DEBUG_VIEW', '0') == '1'
 
 
 class DevelopmentConfig(Config):
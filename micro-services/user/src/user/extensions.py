@@ -2,10 +2,18 @@
 Extensiones compartidas del servicio User
 """
 import logging
+import os
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
 
 import psycopg2
+from flask import g, has_app_context
+from heartguard_common.tracing import span
+from psycopg2 import extensions as pg_extensions
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import PoolError
 
 from .config import get_config
 
@@ -13,27 +21,270 @@ config = get_config()
 logger = logging.getLogger('user-service')
 logging.basicConfig(level=getattr(logging, str(config.LOG_LEVEL).upper(), logging.INFO))
 
+# Errores tras los que la conexión ya no es reutilizable
+_BROKEN_CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+
+class TracedCursor(RealDictCursor):
+    """RealDictCursor que registra cada consulta como span de la petición."""
+
+    def execute(self, query, vars=None):
+        with span('postgres.query', 'db'):
+            return super().execute(query, vars)
+
+
+class PoolTimeout(PoolError):
+    """No se liberó ninguna conexión del pool dentro del tiempo de espera."""
+
+
+class ConnectionPool:
+    """
+    Pool de conexiones PostgreSQL compartido por todo el proceso (thread-safe).
+
+    Mantiene entre `min_size` y `max_size` conexiones. Si todas están en uso,
+    espera hasta `timeout` segundos a que se libere alguna. Las conexiones
+    ociosas más de `health_check_after` segundos se comprueban con `SELECT 1`
+    antes de entregarlas, y las que superan `max_idle` se cierran mientras el
+    pool tenga más de `min_size`.
+    """
+
+    def __init__(
+        self,
+        dsn,
+        *,
+        min_size=1,
+        max_size=10,
+        timeout=5.0,
+        health_check_after=30.0,
+        max_idle=300.0,
+        statement_timeout_ms=0,
+    ):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size, 1)
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self.max_idle = max_idle
+        self.statement_timeout_ms = statement_timeout_ms
+        self.pid = os.getpid()
+
+        self._cond = threading.Condition()
+        # (conexión, instante en que quedó libre); se reutiliza la más reciente
+        self._idle = deque()
+        self._size = 0
+        self._counters = {'leases': 0, 'waits': 0, 'timeouts': 0, 'created': 0, 'discarded': 0, 'health_checks': 0}
+        self._wait_ms = 0.0
+
+    def warm_up(self):
+        """Abre las `min_size` conexiones iniciales; un fallo no impide arrancar."""
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except psycopg2.Error as exc:
+                with self._cond:
+                    self._size -= 1
+                logger.warning('No se pudo precalentar el pool de PostgreSQL: %s', exc)
+                return
+            self.putconn(conn)
+
+    def getconn(self):
+        """Arrienda una conexión sana; lanza `PoolTimeout` si el pool sigue lleno."""
+        deadline = time.monotonic() + self.timeout
+        while True:
+            conn, idle_since = self._checkout(deadline)
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                return conn
+            if self._is_healthy(conn, idle_since):
+                return conn
+            self._discard(conn)
+
+    def putconn(self, conn, *, discard=False):
+        """Devuelve una conexión al pool (o la cierra si está rota o `discard`)."""
+        if not discard and not conn.closed and conn.info.transaction_status != pg_extensions.TRANSACTION_STATUS_IDLE:
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                discard = True
+        if discard or conn.closed or os.getpid() != self.pid:
+            self._discard(conn)
+            return
+
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            self._idle.append((conn, now))
+            # Las conexiones más antiguas quedan al principio de la cola
+            while self._size - len(expired) > self.min_size and self._idle and now - self._idle[0][1] > self.max_idle:
+                expired.append(self._idle.popleft()[0])
+            self._size -= len(expired)
+            self._counters['discarded'] += len(expired)
+            self._cond.notify()
+        for stale in expired:
+            stale.close()
+
+    def stats(self):
+        """Uso del pool para /health/db-pool."""
+        with self._cond:
+            leases = self._counters['leases']
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                **self._counters,
+                'avg_wait_ms': round(self._wait_ms / leases, 3) if leases else 0.0,
+            }
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+        for conn, _ in idle:
+            conn.close()
+
+    def _checkout(self, deadline):
+        """Toma una conexión ociosa o reserva un hueco para abrir una nueva (None)."""
+        started = time.monotonic()
+        with self._cond:
+            waited = False
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(f'Pool de PostgreSQL agotado ({self.max_size} conexiones en uso)')
+                waited = True
+                self._cond.wait(remaining)
+
+            self._counters['leases'] += 1
+            if waited:
+                self._counters['waits'] += 1
+                self._wait_ms += (time.monotonic() - started) * 1000
+            if self._idle:
+                return self._idle.pop()
+            self._size += 1
+            return None, None
+
+    def _connect(self):
+        options = {}
+        if self.statement_timeout_ms:
+            options['options'] = f'-c statement_timeout={int(self.statement_timeout_ms)}'
+        with span('postgres.connect', 'db'):
+            conn = psycopg2.connect(self.dsn, **options)
+        with self._cond:
+            self._counters['created'] += 1
+        return conn
+
+    def _is_healthy(self, conn, idle_since):
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.health_check_after:
+            return True
+        with self._cond:
+            self._counters['health_checks'] += 1
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        finally:
+            with self._cond:
+                self._size -= 1
+                self._counters['discarded'] += 1
+                self._cond.notify()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Pool del proceso; se crea al primer uso (y de nuevo tras un fork)."""
+    global _pool
+    pool = _pool
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pool_lock:
+        if _pool is None or _pool.pid != os.getpid():
+            _pool = ConnectionPool(
+                config.DATABASE_URL,
+                min_size=config.DB_POOL_MIN_SIZE,
+                max_size=config.DB_POOL_MAX_SIZE,
+                timeout=config.DB_POOL_TIMEOUT,
+                health_check_after=config.DB_POOL_HEALTH_CHECK_AFTER,
+                max_idle=config.DB_POOL_MAX_IDLE,
+                statement_timeout_ms=config.DB_STATEMENT_TIMEOUT_MS,
+            )
+            _pool.warm_up()
+        return _pool
+
+
+def release_request_connection(_exc=None):
+    """Devuelve al pool la conexión arrendada por la petición (teardown_appcontext)."""
+    conn = g.pop('db_conn', None)
+    if conn is not None:
+        get_pool().putconn(conn)
+
 
 @contextmanager
 def get_db_cursor():
     """
     Context manager para obtener un cursor de base de datos.
     Gestiona commit/rollback y cierre de recursos.
+
+    Dentro de una petición todas las llamadas reutilizan la misma conexión del
+    pool, que se devuelve en `release_request_connection`; solo el bloque más
+    externo hace commit/rollback. Fuera de Flask se arrienda una por llamada.
     """
-    conn = None
+    pool = get_pool()
+    shared = has_app_context()
+    conn = g.get('db_conn') if shared else None
+    if conn is None:
+        conn = pool.getconn()
+        if shared:
+            g.db_conn = conn
+    depth = g.get('db_depth', 0) if shared else 0
+    if shared:
+        g.db_depth = depth + 1
+
     cursor = None
+    broken = False
     try:
-        conn = psycopg2.connect(config.DATABASE_URL)
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
+        cursor = conn.cursor(cursor_factory=TracedCursor)
         yield cursor
-        conn.commit()
+        if depth == 0:
+            conn.commit()
     except Exception as exc:
-        if conn:
+        broken = isinstance(exc, _BROKEN_CONNECTION_ERRORS) or conn.closed
+        if depth == 0 and not broken:
             conn.rollback()
         logger.exception('Database operation failed', exc_info=exc)
         raise
     finally:
         if cursor:
             cursor.close()
-        if conn:
-            conn.close()
+        if shared:
+            g.db_depth = depth
+        if not shared:
+            pool.putconn(conn, discard=broken)
+        elif broken and g.get('db_conn') is conn:
+            # Las siguientes llamadas de la petición arriendan otra conexión
+            g.pop('db_conn')
+            pool.putconn(conn, discard=True)
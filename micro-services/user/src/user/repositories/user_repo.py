@@ -1,11 +1,59 @@
 """Repositorio de acceso a datos para usuarios"""
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
 
 from ..extensions import get_db_cursor
 
 
+class SortKey(NamedTuple):
+    """Columna de orden de un listado paginado por clave (keyset)."""
+
+    expression: str
+    direction: str
+    cast: str
+    # Centinela SQL para columnas que pueden ser NULL (p. ej. tras un LEFT JOIN)
+    null_value: Optional[str] = None
+
+
+ALERT_SORT = (
+    SortKey('a.created_at', 'DESC', 'timestamp'),
+    SortKey('a.id', 'DESC', 'uuid'),
+)
+ORG_DEVICE_SORT = (
+    SortKey('d.serial', 'ASC', 'text'),
+    SortKey('d.id', 'ASC', 'uuid'),
+)
+DEVICE_STREAM_SORT = (
+    SortKey('ss.started_at', 'DESC', 'timestamp'),
+    SortKey('ss.id', 'DESC', 'uuid'),
+)
+CARE_TEAM_DEVICE_SORT = (
+    SortKey('p.person_name', 'ASC', 'text'),
+    SortKey('d.serial', 'ASC', 'text'),
+    SortKey('d.id', 'ASC', 'uuid'),
+)
+DISCONNECTED_DEVICE_SORT = (
+    SortKey('ls.last_ended_at', 'ASC', 'timestamp', "'-infinity'::timestamp"),
+    SortKey('d.serial', 'ASC', 'text'),
+    SortKey('d.id', 'ASC', 'uuid'),
+)
+CAREGIVER_LOCATION_SORTS = {
+    'recent': (
+        SortKey('ll.ts', 'DESC', 'timestamp', "'-infinity'::timestamp"),
+        SortKey('la.alert_level_weight', 'DESC', 'int', '0'),
+        SortKey('p.person_name', 'ASC', 'text'),
+        SortKey('cp.patient_id', 'ASC', 'uuid'),
+    ),
+    'severity': (
+        SortKey('la.alert_level_weight', 'DESC', 'int', '0'),
+        SortKey('ll.ts', 'DESC', 'timestamp', "'-infinity'::timestamp"),
+        SortKey('p.person_name', 'ASC', 'text'),
+        SortKey('cp.patient_id', 'ASC', 'uuid'),
+    ),
+}
+
+
 class UserRepository:
     """Operaciones de base de datos relacionadas con usuarios"""
 
@@ -147,7 +195,7 @@ class UserRepository:
                 FROM alerts a
                 JOIN team_patients tp ON tp.patient_id = a.patient_id
                 JOIN alert_status ast ON ast.id = a.status_id
-                WHERE lower(ast.code) IN ('created', 'notified')
+                WHERE lower(ast.code) IN ('created', 'notified', 'ack')
             ),
             latest_alert AS (
                 SELECT MAX(a.created_at) AS latest_alert_at
@@ -169,123 +217,228 @@ class UserRepository:
             return dict(row)
 
     @staticmethod
-    def list_org_care_teams(org_id: str, user_id: str) -> List[Dict]:
+    def get_org_dashboard_counters(org_id: str, user_id: str) -> Dict[str, Any]:
         """
-        Lista equipos de cuidado con sus miembros.
-        SOLO devuelve equipos donde el usuario actual es miembro.
+        Overview y métricas del dashboard en una sola consulta sobre los
+        contadores por equipo (care_team_counters y afines), sin recorrer alerts.
+
+        La suma por equipo solo coincide con la de pacientes distintos si los
+        equipos del usuario no comparten pacientes; `shared_patients` lo indica.
         """
         query = """
+            WITH
+            user_teams AS (
+                SELECT ct.id AS care_team_id
+                FROM care_team_member ctm
+                JOIN care_teams ct ON ct.id = ctm.care_team_id
+                WHERE ct.org_id = %s AND ctm.user_id = %s
+            ),
+            team_totals AS (
+                SELECT
+                    COUNT(*)::int AS total_care_teams,
+                    COALESCE(SUM(c.patients), 0)::int AS total_patients,
+                    COALESCE(SUM(c.shared_patients), 0)::int AS shared_patients,
+                    COALESCE(SUM(c.total_alerts), 0)::int AS total_alerts,
+                    COALESCE(SUM(c.open_alerts), 0)::int AS open_alerts,
+                    COALESCE(MAX(c.max_alerts_by_patient), 0)::int AS max_alerts_by_patient,
+                    MAX(c.latest_alert_at) AS latest_alert_at
+                FROM user_teams ut
+                LEFT JOIN care_team_counters c ON c.care_team_id = ut.care_team_id
+            ),
+            alerts_since_day AS (
+                SELECT COALESCE(SUM(d.alerts), 0)::int AS total
+                FROM care_team_alert_counters d
+                JOIN user_teams ut ON ut.care_team_id = d.care_team_id
+                WHERE d.day >= (NOW() - INTERVAL '7 days')::date
+            ),
+            alerts_before_cutoff AS (
+                -- Los contadores son diarios: se descuenta la parte del primer día anterior al corte
+                SELECT COUNT(*)::int AS total
+                FROM alerts a
+                JOIN patient_care_team pct ON pct.patient_id = a.patient_id
+                JOIN user_teams ut ON ut.care_team_id = pct.care_team_id
+                WHERE a.created_at >= (NOW() - INTERVAL '7 days')::date
+                  AND a.created_at < NOW() - INTERVAL '7 days'
+            ),
+            caregiver_count AS (
+                SELECT COUNT(DISTINCT cc.user_id)::int AS total_caregivers
+                FROM care_team_caregivers cc
+                JOIN user_teams ut ON ut.care_team_id = cc.care_team_id
+                WHERE cc.ends_at IS NULL OR cc.ends_at > NOW()
+            )
             SELECT
-                ct.id AS care_team_id,
-                ct.name AS care_team_name,
-                ct.created_at,
-                ctm.user_id AS member_user_id,
-                u.name AS member_name,
-                u.email AS member_email,
-                u.profile_photo_url AS member_profile_photo_url,
-                tm.code AS member_role_code,
-                tm.label AS member_role_label
-            FROM care_teams ct
-            JOIN care_team_member user_membership ON user_membership.care_team_id = ct.id AND user_membership.user_id = %s
-            LEFT JOIN care_team_member ctm ON ctm.care_team_id = ct.id
-            LEFT JOIN users u ON u.id = ctm.user_id
-            LEFT JOIN team_member_roles tm ON tm.id = ctm.role_id
-            WHERE ct.org_id = %s
-            ORDER BY ct.name ASC, member_name ASC NULLS LAST
+                tt.total_patients,
+                tt.total_care_teams,
+                tt.shared_patients,
+                cc.total_caregivers,
+                asd.total - abc.total AS alerts_last_7d,
+                tt.open_alerts,
+                tt.latest_alert_at,
+                tt.total_alerts,
+                tt.max_alerts_by_patient,
+                CASE WHEN tt.total_patients > 0
+                     THEN tt.total_alerts::numeric / tt.total_patients
+                     ELSE 0
+                END AS avg_alerts_per_patient
+            FROM team_totals tt
+            CROSS JOIN alerts_since_day asd
+            CROSS JOIN alerts_before_cutoff abc
+            CROSS JOIN caregiver_count cc
+        """
+        with get_db_cursor() as cursor:
+            cursor.execute(query, (org_id, user_id))
+            row = cursor.fetchone() or {}
+            return dict(row)
+
+    @staticmethod
+    def list_org_care_teams(org_id: str, user_id: str) -> str:
+        """
+        Equipos de cuidado con sus miembros, como arreglo JSON ya serializado.
+        SOLO devuelve equipos donde el usuario actual es miembro.
+        """
+        query = f"""
+            SELECT COALESCE(json_agg(team.payload ORDER BY team.name), '[]'::json)::text AS care_teams
+            FROM (
+                SELECT
+                    ct.name,
+                    json_build_object(
+                        'id', ct.id,
+                        'name', ct.name,
+                        'created_at', ct.created_at,
+                        'members', {UserRepository._care_team_members_json('ct.id')}
+                    ) AS payload
+                FROM care_teams ct
+                JOIN care_team_member user_membership ON user_membership.care_team_id = ct.id AND user_membership.user_id = %s
+                WHERE ct.org_id = %s
+            ) team
         """
         with get_db_cursor() as cursor:
             cursor.execute(query, (user_id, org_id))
-            rows = cursor.fetchall() or []
-            return list(rows)
+            return cursor.fetchone()['care_teams']
 
     @staticmethod
-    def list_org_care_team_patients(org_id: str, user_id: str) -> List[Dict]:
+    def list_org_care_team_patients(org_id: str, user_id: str) -> str:
         """
-        Lista pacientes agrupados por equipos de cuidado.
+        Pacientes y miembros agrupados por equipo de cuidado, como arreglo JSON.
         SOLO devuelve equipos donde el usuario actual es miembro.
-        Incluye equipos sin pacientes (con patient_id NULL).
+        Incluye equipos sin pacientes (con `patients` vacío).
         """
-        query = """
-            SELECT
-                ct.id AS care_team_id,
-                ct.name AS care_team_name,
-                p.id AS patient_id,
-                p.person_name AS patient_name,
-                p.email AS patient_email,
-                rl.code AS risk_level_code,
-                rl.label AS risk_level_label
-            FROM care_teams ct
-            JOIN care_team_member ctm ON ctm.care_team_id = ct.id
-            LEFT JOIN patient_care_team pct ON pct.care_team_id = ct.id
-            LEFT JOIN patients p ON p.id = pct.patient_id
-            LEFT JOIN risk_levels rl ON rl.id = p.risk_level_id
-            WHERE ct.org_id = %s AND ctm.user_id = %s
-            ORDER BY ct.name ASC, patient_name ASC NULLS LAST
+        query = f"""
+            SELECT COALESCE(json_agg(team.payload ORDER BY team.name), '[]'::json)::text AS care_teams
+            FROM (
+                SELECT
+                    ct.name,
+                    json_build_object(
+                        'id', ct.id,
+                        'name', ct.name,
+                        'patients', COALESCE((
+                            SELECT json_agg(
+                                json_build_object(
+                                    'id', p.id,
+                                    'name', p.person_name,
+                                    'email', p.email,
+                                    'risk_level', json_build_object('code', rl.code, 'label', rl.label)
+                                )
+                                ORDER BY p.person_name ASC
+                            )
+                            FROM patient_care_team pct
+                            JOIN patients p ON p.id = pct.patient_id
+                            LEFT JOIN risk_levels rl ON rl.id = p.risk_level_id
+                            WHERE pct.care_team_id = ct.id
+                        ), '[]'::json),
+                        'members', {UserRepository._care_team_members_json('ct.id')}
+                    ) AS payload
+                FROM care_teams ct
+                JOIN care_team_member ctm ON ctm.care_team_id = ct.id
+                WHERE ct.org_id = %s AND ctm.user_id = %s
+            ) team
         """
         with get_db_cursor() as cursor:
             cursor.execute(query, (org_id, user_id))
-            rows = cursor.fetchall() or []
-            return list(rows)
+            return cursor.fetchone()['care_teams']
 
     @staticmethod
-    def list_org_care_team_patients_locations(org_id: str, user_id: str) -> List[Dict]:
+    def list_org_care_team_patients_locations(org_id: str, user_id: str) -> str:
         """
-        Lista pacientes de care teams con sus ubicaciones.
+        Pacientes de care teams con sus ubicaciones, como arreglo JSON.
         SOLO devuelve equipos donde el usuario actual es miembro y pacientes con ubicación.
+
+        `last_update` sale en ISO 8601 como el resto de fechas del servicio, y
+        `last_alert` solo aparece si el paciente tiene alerta.
         """
         query = """
-            SELECT
-                ct.id AS care_team_id,
-                ct.name AS care_team_name,
-                p.id AS patient_id,
-                p.person_name AS patient_name,
-                p.email AS patient_email,
-                p.profile_photo_url AS patient_profile_photo_url,
-                rl.code AS risk_level_code,
-                rl.label AS risk_level_label,
-                ST_Y(pl.geom) AS latitude,
-                ST_X(pl.geom) AS longitude,
-                pl.ts AS last_update,
-                CASE 
-                    WHEN pl.accuracy_m IS NOT NULL AND pl.accuracy_m > 100 THEN true
-                    ELSE false
-                END AS approximate,
-                et.code AS last_alert_code,
-                et.description AS last_alert_label,
-                al.code AS alert_level_code,
-                al.label AS alert_level_label
-            FROM care_teams ct
-            JOIN care_team_member ctm ON ctm.care_team_id = ct.id
-            JOIN patient_care_team pct ON pct.care_team_id = ct.id
-            JOIN patients p ON p.id = pct.patient_id
-            LEFT JOIN risk_levels rl ON rl.id = p.risk_level_id
-            LEFT JOIN LATERAL (
-                SELECT geom, ts, accuracy_m
-                FROM patient_locations
-                WHERE patient_id = p.id
-                ORDER BY ts DESC
-                LIMIT 1
-            ) pl ON TRUE
-            LEFT JOIN LATERAL (
-                SELECT 
-                    a.type_id,
-                    a.alert_level_id
-                FROM alerts a
-                WHERE a.patient_id = p.id
-                ORDER BY a.created_at DESC
-                LIMIT 1
-            ) last_alert ON TRUE
-            LEFT JOIN alert_types et ON et.id = last_alert.type_id
-            LEFT JOIN alert_levels al ON al.id = last_alert.alert_level_id
-            WHERE ct.org_id = %s 
-              AND ctm.user_id = %s
-              AND pl.geom IS NOT NULL
-            ORDER BY ct.name ASC, patient_name ASC
+            SELECT COALESCE(json_agg(team.payload ORDER BY team.name), '[]'::json)::text AS care_teams
+            FROM (
+                SELECT
+                    ct.name,
+                    json_build_object(
+                        'id', ct.id,
+                        'name', ct.name,
+                        'patients', json_agg(patient.payload ORDER BY patient.name)
+                    ) AS payload
+                FROM care_teams ct
+                JOIN care_team_member ctm ON ctm.care_team_id = ct.id
+                CROSS JOIN LATERAL (
+                    SELECT
+                        p.person_name AS name,
+                        jsonb_build_object(
+                            'id', p.id,
+                            'name', p.person_name,
+                            'email', p.email,
+                            'profile_photo_url', p.profile_photo_url,
+                            'risk_level', jsonb_build_object('code', rl.code, 'label', rl.label),
+                            'location', jsonb_build_object(
+                                'latitude', ST_Y(pcs.geom),
+                                'longitude', ST_X(pcs.geom),
+                                'last_update', pcs.location_ts,
+                                'approximate', COALESCE(pcs.accuracy_m > 100, false)
+                            )
+                        ) || CASE
+                            WHEN et.code IS NULL THEN '{}'::jsonb
+                            ELSE jsonb_build_object('last_alert', jsonb_build_object(
+                                'code', et.code,
+                                'label', et.description,
+                                'level', jsonb_build_object('code', al.code, 'label', al.label)
+                            ))
+                        END AS payload
+                    FROM patient_care_team pct
+                    JOIN patients p ON p.id = pct.patient_id
+                    LEFT JOIN risk_levels rl ON rl.id = p.risk_level_id
+                    JOIN patient_current_state pcs ON pcs.patient_id = p.id
+                    LEFT JOIN alerts last_alert ON last_alert.id = pcs.last_alert_id
+                    LEFT JOIN alert_types et ON et.id = last_alert.type_id
+                    LEFT JOIN alert_levels al ON al.id = last_alert.alert_level_id
+                    WHERE pct.care_team_id = ct.id
+                      AND pcs.geom IS NOT NULL
+                ) patient
+                WHERE ct.org_id = %s
+                  AND ctm.user_id = %s
+                GROUP BY ct.id, ct.name
+            ) team
         """
         with get_db_cursor() as cursor:
             cursor.execute(query, (org_id, user_id))
-            rows = cursor.fetchall() or []
-            return list(rows)
+            return cursor.fetchone()['care_teams']
+
+    @staticmethod
+    def _care_team_members_json(care_team_column: str) -> str:
+        """Subconsulta con los miembros del equipo como arreglo JSON (vacío si no hay)."""
+        return f"""COALESCE((
+            SELECT json_agg(
+                json_build_object(
+                    'user_id', member.user_id,
+                    'name', u.name,
+                    'email', u.email,
+                    'profile_photo_url', u.profile_photo_url,
+                    'role', json_build_object('code', tm.code, 'label', tm.label)
+                )
+                ORDER BY u.name ASC NULLS LAST
+            )
+            FROM care_team_member member
+            LEFT JOIN users u ON u.id = member.user_id
+            LEFT JOIN team_member_roles tm ON tm.id = member.role_id
+            WHERE member.care_team_id = {care_team_column}
+        ), '[]'::json)"""
 
     @staticmethod
     def get_patient(org_id: str, patient_id: str) -> Optional[Dict]:
@@ -344,8 +497,14 @@ class UserRepository:
             return cursor.fetchone()
 
     @staticmethod
-    def list_patient_alerts(patient_id: str, limit: int, offset: int) -> List[Dict]:
-        query = """
+    def list_patient_alerts(
+        patient_id: str,
+        limit: int,
+        offset: int,
+        after: Optional[Sequence[Any]] = None,
+    ) -> List[Dict]:
+        keyset_clause, order_clause, keyset_params = UserRepository._keyset(ALERT_SORT, after)
+        query = f"""
             SELECT
                 a.id,
                 a.patient_id,
@@ -362,11 +521,12 @@ class UserRepository:
             JOIN alert_levels al ON al.id = a.alert_level_id
             JOIN alert_status ast ON ast.id = a.status_id
             WHERE a.patient_id = %s
-            ORDER BY a.created_at DESC
+            {keyset_clause}
+            {order_clause}
             LIMIT %s OFFSET %s
         """
         with get_db_cursor() as cursor:
-            cursor.execute(query, (patient_id, limit, offset))
+            cursor.execute(query, (patient_id, *keyset_params, limit, offset))
             rows = cursor.fetchall() or []
             return list(rows)
 
@@ -706,11 +866,11 @@ class UserRepository:
 
         location_clauses: List[str] = []
         if updated_after:
-            location_clauses.append("pl.ts >= %s")
+            location_clauses.append("pcs.location_ts >= %s")
             params.append(updated_after)
 
         if bbox:
-            location_clauses.append("pl.geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)")
+            location_clauses.append("pcs.geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)")
             params.extend([
                 bbox['min_lng'],
                 bbox['min_lat'],
@@ -761,30 +921,29 @@ class UserRepository:
                 JOIN patient_care_team pct ON pct.care_team_id = up.care_team_id
             ),
             latest_locations AS (
-                SELECT DISTINCT ON (pl.patient_id)
-                    pl.patient_id,
-                    pl.ts,
-                    pl.geom
-                FROM patient_locations pl
-                JOIN team_patients tp ON tp.patient_id = pl.patient_id
-                WHERE 1=1
+                SELECT
+                    pcs.patient_id,
+                    pcs.location_ts AS ts,
+                    pcs.geom
+                FROM patient_current_state pcs
+                JOIN (SELECT DISTINCT patient_id FROM team_patients) tp ON tp.patient_id = pcs.patient_id
+                WHERE pcs.location_ts IS NOT NULL
                 {location_filter_sql}
-                ORDER BY pl.patient_id, pl.ts DESC
             ),
             latest_alerts AS (
-                SELECT DISTINCT ON (a.patient_id)
-                    a.patient_id,
+                SELECT
+                    pcs.patient_id,
                     a.id,
                     a.created_at,
                     at.code AS alert_code,
                     at.description AS alert_label,
                     al.code AS alert_level_code,
                     al.label AS alert_level_label
-                FROM alerts a
+                FROM patient_current_state pcs
+                JOIN (SELECT DISTINCT patient_id FROM team_patients) tp ON tp.patient_id = pcs.patient_id
+                JOIN alerts a ON a.id = pcs.last_alert_id
                 JOIN alert_types at ON at.id = a.type_id
                 JOIN alert_levels al ON al.id = a.alert_level_id
-                JOIN team_patients tp ON tp.patient_id = a.patient_id
-                ORDER BY a.patient_id, a.created_at DESC
             )
             SELECT
                 tp.patient_id,
@@ -857,11 +1016,11 @@ class UserRepository:
 
         location_clauses: List[str] = []
         if updated_after:
-            location_clauses.append("pl.ts >= %s")
+            location_clauses.append("pcs.location_ts >= %s")
             params.append(updated_after)
 
         if bbox:
-            location_clauses.append("pl.geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)")
+            location_clauses.append("pcs.geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)")
             params.extend([
                 bbox['min_lng'],
                 bbox['min_lat'],
@@ -914,24 +1073,23 @@ class UserRepository:
                 JOIN patient_care_team pct ON pct.care_team_id = up.care_team_id
             ),
             latest_locations AS (
-                SELECT DISTINCT ON (pl.patient_id)
-                    pl.patient_id,
-                    pl.ts,
-                    pl.geom
-                FROM patient_locations pl
-                JOIN team_patients tp ON tp.patient_id = pl.patient_id
-                WHERE 1=1
+                SELECT
+                    pcs.patient_id,
+                    pcs.location_ts AS ts,
+                    pcs.geom
+                FROM patient_current_state pcs
+                JOIN (SELECT DISTINCT patient_id FROM team_patients) tp ON tp.patient_id = pcs.patient_id
+                WHERE pcs.location_ts IS NOT NULL
                 {location_filter_sql}
-                ORDER BY pl.patient_id, pl.ts DESC
             ),
             latest_alerts AS (
-                SELECT DISTINCT ON (a.patient_id)
-                    a.patient_id,
+                SELECT
+                    pcs.patient_id,
                     al.code AS alert_level_code
-                FROM alerts a
+                FROM patient_current_state pcs
+                JOIN (SELECT DISTINCT patient_id FROM team_patients) tp ON tp.patient_id = pcs.patient_id
+                JOIN alerts a ON a.id = pcs.last_alert_id
                 JOIN alert_levels al ON al.id = a.alert_level_id
-                JOIN team_patients tp ON tp.patient_id = a.patient_id
-                ORDER BY a.patient_id, a.created_at DESC
             ),
             filtered_patients AS (
                 SELECT
@@ -1017,16 +1175,17 @@ class UserRepository:
         sort_by: str,
         limit: int,
         offset: int,
+        after: Optional[Sequence[Any]] = None,
     ) -> List[Dict]:
         params: List[Any] = [user_id]
 
         location_clauses: List[str] = []
         if updated_after:
-            location_clauses.append("pl.ts >= %s")
+            location_clauses.append("pcs.location_ts >= %s")
             params.append(updated_after)
 
         if bbox:
-            location_clauses.append("pl.geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)")
+            location_clauses.append("pcs.geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)")
             params.extend([
                 bbox['min_lng'],
                 bbox['min_lat'],
@@ -1065,9 +1224,8 @@ class UserRepository:
         elif has_active_alerts is False:
             alerts_clause = " AND (la.status_code IS NULL OR lower(la.status_code) NOT IN ('created','notified','ack'))"
 
-        order_clause = "ORDER BY ll.ts DESC NULLS LAST, la.alert_level_weight DESC NULLS LAST, p.person_name ASC"
-        if sort_by == 'severity':
-            order_clause = "ORDER BY la.alert_level_weight DESC NULLS LAST, ll.ts DESC NULLS LAST, p.person_name ASC"
+        keyset_clause, order_clause, keyset_params = UserRepository._keyset(CAREGIVER_LOCATION_SORTS[sort_by], after)
+        params.extend(keyset_params)
 
         query = f"""
             WITH caregiver_patients AS (
@@ -1077,31 +1235,30 @@ class UserRepository:
                 WHERE cp.user_id = %s
             ),
             latest_locations AS (
-                SELECT DISTINCT ON (pl.patient_id)
-                    pl.patient_id,
-                    pl.ts,
-                    pl.geom
-                FROM patient_locations pl
-                JOIN caregiver_patients cp ON cp.patient_id = pl.patient_id
-                WHERE 1=1
+                SELECT
+                    pcs.patient_id,
+                    pcs.location_ts AS ts,
+                    pcs.geom
+                FROM patient_current_state pcs
+                JOIN caregiver_patients cp ON cp.patient_id = pcs.patient_id
+                WHERE pcs.location_ts IS NOT NULL
                 {location_filter_sql}
-                ORDER BY pl.patient_id, pl.ts DESC
             ),
             latest_alerts AS (
-                SELECT DISTINCT ON (a.patient_id)
-                    a.patient_id,
+                SELECT
+                    pcs.patient_id,
                     at.code AS alert_code,
                     at.description AS alert_label,
                     al.code AS alert_level_code,
                     al.label AS alert_level_label,
                     al.weight AS alert_level_weight,
                     ast.code AS status_code
-                FROM alerts a
+                FROM patient_current_state pcs
+                JOIN caregiver_patients cp ON cp.patient_id = pcs.patient_id
+                JOIN alerts a ON a.id = pcs.last_alert_id
                 JOIN alert_types at ON at.id = a.type_id
                 JOIN alert_levels al ON al.id = a.alert_level_id
                 JOIN alert_status ast ON ast.id = a.status_id
-                JOIN caregiver_patients cp ON cp.patient_id = a.patient_id
-                ORDER BY a.patient_id, a.created_at DESC
             )
             SELECT
                 cp.patient_id,
@@ -1129,17 +1286,10 @@ class UserRepository:
             {bbox_clause}
             {location_requirement_clause}
             {alerts_clause}
+            {keyset_clause}
             {order_clause}
             LIMIT %s OFFSET %s
-        """.format(
-            location_filter_sql=location_filter_sql,
-            risk_clause=risk_clause,
-            updated_clause=updated_clause,
-            bbox_clause=bbox_clause,
-            location_requirement_clause=location_requirement_clause,
-            alerts_clause=alerts_clause,
-            order_clause=order_clause,
-        )
+        """
 
         params.extend([limit, offset])
 
@@ -1148,6 +1298,510 @@ class UserRepository:
             rows = cursor.fetchall() or []
             return list(rows)
 
+    @staticmethod
+    def cluster_care_team_patient_locations(
+        user_id: str,
+        *,
+        org_id: Optional[str],
+        care_team_id: Optional[str],
+        alert_level: Optional[str],
+        updated_after,
+        bbox: Dict[str, float],
+        cell_size: float,
+        limit: int,
+    ) -> List[Dict]:
+        """
+        Agrupa en celdas de `cell_size` metros (Web Mercator) los pacientes de los
+        equipos del usuario con ubicación actual dentro de `bbox`.
+        """
+        params: List[Any] = [user_id]
+
+        org_clause = ""
+        if org_id:
+            org_clause = " AND ct.org_id = %s"
+            params.append(org_id)
+
+        care_team_clause = ""
+        if care_team_id:
+            care_team_clause = " AND ct.id = %s"
+            params.append(care_team_id)
+
+        params.extend([bbox['min_lng'], bbox['min_lat'], bbox['max_lng'], bbox['max_lat']])
+
+        updated_clause = ""
+        if updated_after:
+            updated_clause = " AND pcs.location_ts >= %s"
+            params.append(updated_after)
+
+        alert_level_clause = ""
+        if alert_level:
+            alert_level_clause = " AND al.code IS NOT NULL AND lower(al.code) = %s"
+            params.append(alert_level)
+
+        points_sql = f"""
+            team_patients AS (
+                SELECT DISTINCT pct.patient_id
+                FROM care_team_member ctm
+                JOIN care_teams ct ON ct.id = ctm.care_team_id
+                JOIN patient_care_team pct ON pct.care_team_id = ct.id
+                WHERE ctm.user_id = %s
+                {org_clause}
+                {care_team_clause}
+            ),
+            points AS (
+                SELECT
+                    pcs.patient_id,
+                    pcs.geom,
+                    pcs.location_ts,
+                    pcs.open_alerts_count,
+                    al.code AS alert_level_code,
+                    al.label AS alert_level_label,
+                    al.weight AS alert_level_weight
+                FROM team_patients tp
+                JOIN patient_current_state pcs ON pcs.patient_id = tp.patient_id
+                LEFT JOIN alerts a ON a.id = pcs.last_alert_id
+                LEFT JOIN alert_levels al ON al.id = a.alert_level_id
+                WHERE pcs.geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)
+                {updated_clause}
+                {alert_level_clause}
+            )
+        """
+        return UserRepository._cluster_points(points_sql, params, cell_size=cell_size, limit=limit)
+
+    @staticmethod
+    def cluster_caregiver_patient_locations(
+        user_id: str,
+        *,
+        updated_after,
+        bbox: Dict[str, float],
+        risk_level: Optional[str],
+        has_active_alerts: Optional[bool],
+        cell_size: float,
+        limit: int,
+    ) -> List[Dict]:
+        """Agrupa en celdas los pacientes del cuidador con ubicación actual dentro de `bbox`."""
+        params: List[Any] = [user_id, bbox['min_lng'], bbox['min_lat'], bbox['max_lng'], bbox['max_lat']]
+
+        updated_clause = ""
+        if updated_after:
+            updated_clause = " AND pcs.location_ts >= %s"
+            params.append(updated_after)
+
+        risk_clause = ""
+        if risk_level:
+            risk_clause = " AND rl.code IS NOT NULL AND lower(rl.code) = %s"
+            params.append(risk_level)
+
+        alerts_clause = ""
+        if has_active_alerts is True:
+            alerts_clause = " AND ast.code IS NOT NULL AND lower(ast.code) IN ('created','notified','ack')"
+        elif has_active_alerts is False:
+            alerts_clause = " AND (ast.code IS NULL OR lower(ast.code) NOT IN ('created','notified','ack'))"
+
+        points_sql = f"""
+            points AS (
+                SELECT
+                    pcs.patient_id,
+                    pcs.geom,
+                    pcs.location_ts,
+                    pcs.open_alerts_count,
+                    al.code AS alert_level_code,
+                    al.label AS alert_level_label,
+                    al.weight AS alert_level_weight
+                FROM caregiver_patient cp
+                JOIN patients p ON p.id = cp.patient_id
+                LEFT JOIN risk_levels rl ON rl.id = p.risk_level_id
+                JOIN patient_current_state pcs ON pcs.patient_id = cp.patient_id
+                LEFT JOIN alerts a ON a.id = pcs.last_alert_id
+                LEFT JOIN alert_levels al ON al.id = a.alert_level_id
+                LEFT JOIN alert_status ast ON ast.id = a.status_id
+                WHERE cp.user_id = %s
+                  AND pcs.geom && ST_MakeEnvelope(%s, %s, %s, %s, 4326)
+                {updated_clause}
+                {risk_clause}
+                {alerts_clause}
+            )
+        """
+        return UserRepository._cluster_points(points_sql, params, cell_size=cell_size, limit=limit)
+
+    @staticmethod
+    def get_sync_high_water() -> int:
+        """
+        xmin del snapshot actual: cursor de la siguiente sincronización.
+
+        Debe leerse antes que los datos; las transacciones con xid >= xmin aún
+        podían estar en curso y se reenvían en la próxima consulta.
+        """
+        with get_db_cursor() as cursor:
+            cursor.execute("SELECT txid_snapshot_xmin(txid_current_snapshot()) AS xmin")
+            return int(cursor.fetchone()['xmin'])
+
+    @staticmethod
+    def list_care_team_location_changes(
+        user_id: str,
+        *,
+        org_id: Optional[str],
+        care_team_id: Optional[str],
+        since_xid: Optional[int],
+        alerts_limit: int,
+    ) -> Dict[str, List[Dict]]:
+        """
+        Cambios visibles para un miembro de care teams desde `since_xid`
+        (todo el estado actual si es None).
+        """
+        team_params: List[Any] = [user_id]
+        org_clause = ""
+        if org_id:
+            org_clause = " AND ct.org_id = %s"
+            team_params.append(org_id)
+        care_team_clause = ""
+        if care_team_id:
+            care_team_clause = " AND ct.id = %s"
+            team_params.append(care_team_id)
+
+        user_teams_sql = f"""
+            user_teams AS (
+                SELECT
+                    ct.id AS care_team_id,
+                    ct.name AS care_team_name,
+                    ct.org_id,
+                    o.name AS org_name
+                FROM care_team_member ctm
+                JOIN care_teams ct ON ct.id = ctm.care_team_id
+                JOIN organizations o ON o.id = ct.org_id
+                WHERE ctm.user_id = %s
+                {org_clause}
+                {care_team_clause}
+            ),
+            team_patients AS (
+                SELECT ut.*, pct.patient_id
+                FROM user_teams ut
+                JOIN patient_care_team pct ON pct.care_team_id = ut.care_team_id
+            )
+        """
+
+        params: List[Any] = list(team_params)
+        change_clause = ""
+        if since_xid is not None:
+            # Además de las filas cambiadas, las que el usuario acaba de poder ver
+            change_clause = """
+                WHERE pcs.changed_xid >= %s
+                   OR (tp.care_team_id, tp.patient_id) IN (
+                        SELECT e.care_team_id, e.patient_id
+                        FROM sync_events e
+                        WHERE e.changed_xid >= %s AND e.kind = 'care_team_patient_added'
+                        UNION
+                        SELECT pct.care_team_id, pct.patient_id
+                        FROM sync_events e
+                        JOIN patient_care_team pct ON pct.care_team_id = e.care_team_id
+                        WHERE e.changed_xid >= %s AND e.kind = 'care_team_member_added' AND e.user_id = %s
+                   )
+            """
+            params.extend([since_xid, since_xid, since_xid, user_id])
+
+        patients_query = f"""
+            WITH {user_teams_sql}
+            SELECT
+                tp.patient_id,
+                p.person_name AS patient_name,
+                p.email AS patient_email,
+                tp.care_team_id,
+                tp.care_team_name,
+                tp.org_id,
+                tp.org_name,
+                rl.code AS risk_level_code,
+                rl.label AS risk_level_label,
+                pcs.location_ts AS last_location_at,
+                ST_X(pcs.geom) AS longitude,
+                ST_Y(pcs.geom) AS latitude,
+                a.id AS alert_id,
+                a.created_at AS alert_created_at,
+                at.code AS alert_code,
+                at.description AS alert_label,
+                al.code AS alert_level_code,
+                al.label AS alert_level_label
+            FROM team_patients tp
+            JOIN patients p ON p.id = tp.patient_id
+            LEFT JOIN risk_levels rl ON rl.id = p.risk_level_id
+            LEFT JOIN patient_current_state pcs ON pcs.patient_id = tp.patient_id
+            LEFT JOIN alerts a ON a.id = pcs.last_alert_id
+            LEFT JOIN alert_types at ON at.id = a.type_id
+            LEFT JOIN alert_levels al ON al.id = a.alert_level_id
+            {change_clause}
+            ORDER BY pcs.location_ts DESC NULLS LAST, p.person_name ASC
+        """
+
+        visible_sql = f"""
+            {user_teams_sql},
+            visible AS (
+                SELECT DISTINCT patient_id FROM team_patients
+            )
+        """
+
+        with get_db_cursor() as cursor:
+            cursor.execute(patients_query, tuple(params))
+            patients = list(cursor.fetchall() or [])
+            alerts = UserRepository._changed_alerts(cursor, visible_sql, team_params, since_xid, alerts_limit)
+
+            removed_patients: List[Dict] = []
+            removed_care_teams: List[Dict] = []
+            removed_alerts: List[Dict] = []
+            if since_xid is not None:
+                cursor.execute(
+                    """
+                        SELECT DISTINCT e.care_team_id, e.patient_id
+                        FROM sync_events e
+                        JOIN care_team_member ctm ON ctm.care_team_id = e.care_team_id AND ctm.user_id = %s
+                        WHERE e.changed_xid >= %s
+                          AND e.kind = 'care_team_patient_removed'
+                          AND NOT EXISTS (
+                              SELECT 1 FROM patient_care_team pct
+                              WHERE pct.care_team_id = e.care_team_id AND pct.patient_id = e.patient_id
+                          )
+                    """,
+                    (user_id, since_xid),
+                )
+                removed_patients = list(cursor.fetchall() or [])
+                cursor.execute(
+                    """
+                        SELECT DISTINCT e.care_team_id
+                        FROM sync_events e
+                        WHERE e.changed_xid >= %s
+                          AND e.kind = 'care_team_member_removed'
+                          AND e.user_id = %s
+                          AND NOT EXISTS (
+                              SELECT 1 FROM care_team_member ctm
+                              WHERE ctm.care_team_id = e.care_team_id AND ctm.user_id = %s
+                          )
+                    """,
+                    (since_xid, user_id, user_id),
+                )
+                removed_care_teams = list(cursor.fetchall() or [])
+                removed_alerts = UserRepository._removed_alerts(cursor, visible_sql, team_params, since_xid)
+
+        return {
+            'patients': patients,
+            'alerts': alerts,
+            'removed_patients': removed_patients,
+            'removed_care_teams': removed_care_teams,
+            'removed_alerts': removed_alerts,
+        }
+
+    @staticmethod
+    def list_caregiver_location_changes(user_id: str, *, since_xid: Optional[int], alerts_limit: int) -> Dict[str, List[Dict]]:
+        """Cambios visibles para un cuidador desde `since_xid` (todo el estado actual si es None)."""
+        params: List[Any] = [user_id]
+        change_clause = ""
+        if since_xid is not None:
+            change_clause = """
+                AND (
+                    pcs.changed_xid >= %s
+                    OR cp.patient_id IN (
+                        SELECT e.patient_id
+                        FROM sync_events e
+                        WHERE e.changed_xid >= %s AND e.kind = 'caregiver_patient_added' AND e.user_id = %s
+                    )
+                )
+            """
+            params.extend([since_xid, since_xid, user_id])
+
+        patients_query = f"""
+            SELECT
+                cp.patient_id,
+                p.person_name AS patient_name,
+                p.email AS patient_email,
+                rl.code AS risk_level_code,
+                rl.label AS risk_level_label,
+                pcs.location_ts AS last_location_at,
+                ST_X(pcs.geom) AS longitude,
+                ST_Y(pcs.geom) AS latitude,
+                at.code AS alert_code,
+                at.description AS alert_label,
+                al.code AS alert_level_code,
+                al.label AS alert_level_label,
+                al.weight AS alert_level_weight,
+                ast.code AS status_code
+            FROM caregiver_patient cp
+            JOIN patients p ON p.id = cp.patient_id
+            LEFT JOIN risk_levels rl ON rl.id = p.risk_level_id
+            LEFT JOIN patient_current_state pcs ON pcs.patient_id = cp.patient_id
+            LEFT JOIN alerts a ON a.id = pcs.last_alert_id
+            LEFT JOIN alert_types at ON at.id = a.type_id
+            LEFT JOIN alert_levels al ON al.id = a.alert_level_id
+            LEFT JOIN alert_status ast ON ast.id = a.status_id
+            WHERE cp.user_id = %s
+            {change_clause}
+            ORDER BY pcs.location_ts DESC NULLS LAST, p.person_name ASC
+        """
+
+        visible_sql = """
+            visible AS (
+                SELECT cp.patient_id
+                FROM caregiver_patient cp
+                WHERE cp.user_id = %s
+            )
+        """
+
+        with get_db_cursor() as cursor:
+            cursor.execute(patients_query, tuple(params))
+            patients = list(cursor.fetchall() or [])
+            alerts = UserRepository._changed_alerts(cursor, visible_sql, [user_id], since_xid, alerts_limit)
+
+            removed_patients: List[Dict] = []
+            removed_alerts: List[Dict] = []
+            if since_xid is not None:
+                cursor.execute(
+                    """
+                        SELECT DISTINCT e.patient_id
+                        FROM sync_events e
+                        WHERE e.changed_xid >= %s
+                          AND e.kind = 'caregiver_patient_removed'
+                          AND e.user_id = %s
+                          AND NOT EXISTS (
+                              SELECT 1 FROM caregiver_patient cp
+                              WHERE cp.patient_id = e.patient_id AND cp.user_id = %s
+                          )
+                    """,
+                    (since_xid, user_id, user_id),
+                )
+                removed_patients = list(cursor.fetchall() or [])
+                removed_alerts = UserRepository._removed_alerts(cursor, visible_sql, [user_id], since_xid)
+
+        return {
+            'patients': patients,
+            'alerts': alerts,
+            'removed_patients': removed_patients,
+            'removed_alerts': removed_alerts,
+        }
+
+    @staticmethod
+    def _changed_alerts(cursor, visible_sql: str, visible_params: List[Any], since_xid: Optional[int], limit: int) -> List[Dict]:
+        """Alertas de los pacientes visibles cambiadas desde `since_xid`; sin cursor, las abiertas."""
+        if since_xid is None:
+            change_clause = "ast.code IN ('created','notified','ack')"
+            params = [*visible_params, limit]
+        else:
+            change_clause = "a.changed_xid >= %s"
+            params = [*visible_params, since_xid, limit]
+        cursor.execute(
+            f"""
+                WITH {visible_sql}
+                SELECT
+                    a.id,
+                    a.patient_id,
+                    a.created_at,
+                    a.description,
+                    at.code AS alert_type_code,
+                    at.description AS alert_type_label,
+                    al.code AS level_code,
+                    al.label AS level_label,
+                    ast.code AS status_code,
+                    ast.description AS status_label
+                FROM alerts a
+                JOIN visible v ON v.patient_id = a.patient_id
+                JOIN alert_types at ON at.id = a.type_id
+                JOIN alert_levels al ON al.id = a.alert_level_id
+                JOIN alert_status ast ON ast.id = a.status_id
+                WHERE {change_clause}
+                ORDER BY a.created_at DESC
+                LIMIT %s
+            """,
+            tuple(params),
+        )
+        return list(cursor.fetchall() or [])
+
+    @staticmethod
+    def _removed_alerts(cursor, visible_sql: str, visible_params: List[Any], since_xid: int) -> List[Dict]:
+        cursor.execute(
+            f"""
+                WITH {visible_sql}
+                SELECT DISTINCT e.alert_id
+                FROM sync_events e
+                JOIN visible v ON v.patient_id = e.patient_id
+                WHERE e.changed_xid >= %s AND e.kind = 'alert_removed'
+            """,
+            (*visible_params, since_xid),
+        )
+        return list(cursor.fetchall() or [])
+
+    @staticmethod
+    def _keyset(keys: Sequence[SortKey], after: Optional[Sequence[Any]]) -> Tuple[str, str, List[Any]]:
+        """
+        Condición de "filas posteriores a `after`" y ORDER BY de un listado por clave.
+
+        `after` son los valores de las claves en la última fila de la página
+        anterior. Si todas las claves van en la misma dirección se compara la
+        tupla completa, que PostgreSQL resuelve como un único rango del índice.
+        """
+        def column(key: SortKey) -> str:
+            return f"COALESCE({key.expression}, {key.null_value})" if key.null_value else key.expression
+
+        def value(key: SortKey) -> str:
+            return f"COALESCE(%s::{key.cast}, {key.null_value})" if key.null_value else f"%s::{key.cast}"
+
+        def operator(key: SortKey) -> str:
+            return '<' if key.direction == 'DESC' else '>'
+
+        order_clause = "ORDER BY " + ", ".join(f"{column(key)} {key.direction}" for key in keys)
+        if after is None:
+            return "", order_clause, []
+
+        if len({key.direction for key in keys}) == 1:
+            columns = ", ".join(column(key) for key in keys)
+            values = ", ".join(value(key) for key in keys)
+            return f" AND ({columns}) {operator(keys[0])} ({values})", order_clause, list(after)
+
+        clauses: List[str] = []
+        params: List[Any] = []
+        for index, key in enumerate(keys):
+            terms = [f"{column(previous)} = {value(previous)}" for previous in keys[:index]]
+            terms.append(f"{column(key)} {operator(key)} {value(key)}")
+            clauses.append("(" + " AND ".join(terms) + ")")
+            params.extend(after[:index + 1])
+        return f" AND ({' OR '.join(clauses)})", order_clause, params
+
+    @staticmethod
+    def _cluster_points(points_sql: str, params: List[Any], *, cell_size: float, limit: int) -> List[Dict]:
+        """
+        Agrega el CTE `points` por celdas de la rejilla Web Mercator.
+
+        Las celdas usan floor() y no ST_SnapToGrid para quedar alineadas con los
+        bordes de los tiles z/x/y: un cluster nunca cruza dos tiles.
+        """
+        query = f"""
+            WITH {points_sql},
+            cells AS (
+                SELECT
+                    pt.*,
+                    floor(ST_X(merc.geom) / %s) AS cell_x,
+                    floor(ST_Y(merc.geom) / %s) AS cell_y
+                FROM points pt
+                CROSS JOIN LATERAL (SELECT ST_Transform(pt.geom, 3857) AS geom) merc
+            )
+            SELECT
+                COUNT(*)::int AS patient_count,
+                ST_X(ST_Centroid(ST_Collect(geom))) AS longitude,
+                ST_Y(ST_Centroid(ST_Collect(geom))) AS latitude,
+                ST_XMin(ST_Extent(geom)) AS min_lng,
+                ST_YMin(ST_Extent(geom)) AS min_lat,
+                ST_XMax(ST_Extent(geom)) AS max_lng,
+                ST_YMax(ST_Extent(geom)) AS max_lat,
+                MAX(location_ts) AS last_location_at,
+                COALESCE(SUM(open_alerts_count), 0)::int AS open_alerts_count,
+                (ARRAY_AGG(alert_level_code ORDER BY alert_level_weight DESC NULLS LAST))[1] AS alert_level_code,
+                (ARRAY_AGG(alert_level_label ORDER BY alert_level_weight DESC NULLS LAST))[1] AS alert_level_label,
+                MAX(alert_level_weight) AS alert_level_weight,
+                CASE WHEN COUNT(*) = 1 THEN MIN(patient_id::text) END AS patient_id
+            FROM cells
+            GROUP BY cell_x, cell_y
+            ORDER BY patient_count DESC, cell_x, cell_y
+            LIMIT %s
+        """
+        with get_db_cursor() as cursor:
+            cursor.execute(query, (*params, cell_size, cell_size, limit))
+            rows = cursor.fetchall() or []
+            return list(rows)
+
     @staticmethod
     def get_org_metrics(org_id: str, user_id: str) -> Dict[str, Any]:
         """
@@ -1225,6 +1879,7 @@ class UserRepository:
         connected: Optional[bool],
         limit: int,
         offset: int,
+        after: Optional[Sequence[Any]] = None,
     ) -> List[Dict]:
         """
         Lista todos los dispositivos de una organización.
@@ -1249,7 +1904,8 @@ class UserRepository:
             conditions.append("active_stream.stream_id IS NULL")
 
         where_clause = " AND ".join(conditions)
-        params.extend([limit, offset])
+        keyset_clause, order_clause, keyset_params = UserRepository._keyset(ORG_DEVICE_SORT, after)
+        params.extend([*keyset_params, limit, offset])
 
         query = f"""
             WITH active_stream AS (
@@ -1294,7 +1950,8 @@ class UserRepository:
             LEFT JOIN patients current_p ON current_p.id = active_stream.current_patient_id
             LEFT JOIN all_streams_count sc ON sc.device_id = d.id
             WHERE {where_clause}
-            ORDER BY d.serial ASC
+            {keyset_clause}
+            {order_clause}
             LIMIT %s OFFSET %s
         """
 
@@ -1362,9 +2019,11 @@ class UserRepository:
         *,
         limit: int,
         offset: int,
+        after: Optional[Sequence[Any]] = None,
     ) -> List[Dict]:
         """Lista todos los signal_streams de un dispositivo (historial completo)."""
-        query = """
+        keyset_clause, order_clause, keyset_params = UserRepository._keyset(DEVICE_STREAM_SORT, after)
+        query = f"""
             SELECT
                 ss.id,
                 ss.device_id,
@@ -1380,11 +2039,12 @@ class UserRepository:
             FROM signal_streams ss
             JOIN patients p ON p.id = ss.patient_id
             WHERE ss.device_id = %s
-            ORDER BY ss.started_at DESC
+            {keyset_clause}
+            {order_clause}
             LIMIT %s OFFSET %s
         """
         with get_db_cursor() as cursor:
-            cursor.execute(query, (device_id, limit, offset))
+            cursor.execute(query, (device_id, *keyset_params, limit, offset))
             rows = cursor.fetchall() or []
             return list(rows)
 
@@ -1420,6 +2080,7 @@ class UserRepository:
         active: Optional[bool],
         limit: int,
         offset: int,
+        after: Optional[Sequence[Any]] = None,
     ) -> List[Dict]:
         patient_clause = ""
         active_clause = ""
@@ -1433,7 +2094,8 @@ class UserRepository:
             patient_clause = " AND tp.patient_id = %s"
             params.append(patient_id)
 
-        params.extend([limit, offset])
+        keyset_clause, order_clause, keyset_params = UserRepository._keyset(CARE_TEAM_DEVICE_SORT, after)
+        params.extend([*keyset_params, limit, offset])
 
         query = f"""
             WITH team_patients AS (
@@ -1473,7 +2135,8 @@ class UserRepository:
             WHERE d.org_id = %s
             {active_clause}
             {patient_clause}
-            ORDER BY p.person_name ASC, d.serial ASC
+            {keyset_clause}
+            {order_clause}
             LIMIT %s OFFSET %s
         """
 
@@ -1543,10 +2206,12 @@ class UserRepository:
         *,
         limit: int,
         offset: int,
+        after: Optional[Sequence[Any]] = None,
     ) -> List[Dict]:
-        params: List[Any] = [care_team_id, org_id, device_id, limit, offset]
+        keyset_clause, order_clause, keyset_params = UserRepository._keyset(DEVICE_STREAM_SORT, after)
+        params: List[Any] = [care_team_id, org_id, device_id, *keyset_params, limit, offset]
 
-        query = """
+        query = f"""
             WITH team_patients AS (
                 SELECT pct.patient_id
                 FROM patient_care_team pct
@@ -1571,7 +2236,8 @@ class UserRepository:
             JOIN allowed_devices ad ON ad.id = ss.device_id
             JOIN signal_types st ON st.id = ss.signal_type_id
             WHERE ss.device_id = %s
-            ORDER BY ss.started_at DESC
+            {keyset_clause}
+            {order_clause}
             LIMIT %s OFFSET %s
         """
 
@@ -1587,10 +2253,12 @@ class UserRepository:
         *,
         limit: int,
         offset: int,
+        after: Optional[Sequence[Any]] = None,
     ) -> List[Dict]:
-        params: List[Any] = [care_team_id, org_id, limit, offset]
+        keyset_clause, order_clause, keyset_params = UserRepository._keyset(DISCONNECTED_DEVICE_SORT, after)
+        params: List[Any] = [care_team_id, org_id, *keyset_params, limit, offset]
 
-        query = """
+        query = f"""
             WITH team_patients AS (
                 SELECT pct.patient_id
                 FROM patient_care_team pct
@@ -1631,7 +2299,8 @@ class UserRepository:
                   ls.last_ended_at IS NULL 
                   OR ls.last_ended_at < NOW() - INTERVAL '24 hours'
               )
-            ORDER BY ls.last_ended_at NULLS FIRST, d.serial ASC
+            {keyset_clause}
+            {order_clause}
             LIMIT %s OFFSET %s
         """
 
@@ -3,14 +3,24 @@ Cliente de InfluxDB para consultas de datos en tiempo real
 """
 from influxdb_client import InfluxDBClient
 from influxdb_client.client.query_api import QueryApi
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from heartguard_common.tracing import span
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
 import logging
+import threading
 
 from ..config import get_config
 
 logger = logging.getLogger(__name__)
 
+SUMMARY_FIELDS = ('heart_rate', 'spo2', 'systolic_bp', 'diastolic_bp', 'temperature')
+ROLLUP_STATS = ('count', 'sum', 'min', 'max')
+HOUR = timedelta(hours=1)
+
+# (count, sum, min, max) de un campo en una hora
+Rollup = Tuple[int, float, float, float]
+
 
 class InfluxDBService:
     """Servicio para interactuar con InfluxDB"""
@@ -23,6 +33,12 @@ class InfluxDBService:
         self.bucket = config.INFLUXDB_BUCKET
         self._client = None
         self._query_api = None
+        # patient_id -> {inicio de hora (UTC) -> {campo -> Rollup}}; solo horas cerradas
+        self._rollups: "OrderedDict[str, Dict[datetime, Dict[str, Rollup]]]" = OrderedDict()
+        self._rollups_lock = threading.Lock()
+        self._rollup_max_patients = config.VITALS_ROLLUP_MAX_PATIENTS
+        self._rollup_max_hours = config.VITALS_ROLLUP_MAX_HOURS
+        self._rollup_settle = timedelta(seconds=config.VITALS_ROLLUP_SETTLE_SECONDS)
     
     @property
     def client(self) -> InfluxDBClient:
@@ -47,6 +63,11 @@ class InfluxDBService:
             self._query_api = self.client.query_api()
         return self._query_api
     
+    def _query(self, query: str):
+        """Ejecuta una consulta Flux registrándola como span de la petición."""
+        with span('influxdb.query', 'influxdb', bucket=self.bucket):
+            return self.query_api.query(query, org=self.org)
+    
     def get_patient_realtime_data(
         self, 
         patient_id: str, 
@@ -79,7 +100,7 @@ class InfluxDBService:
             logger.debug(f"Ejecutando query InfluxDB para paciente {patient_id}")
             
             # Ejecutar query
-            tables = self.query_api.query(query, org=self.org)
+            tables = self._query(query)
             
             # Procesar resultados
             results = []
@@ -111,10 +132,14 @@ class InfluxDBService:
     def get_patient_latest_vitals(self, patient_id: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene los últimos signos vitales de un paciente
-        
+
+        Usa last() por campo en lugar de pivotar las últimas 24h: InfluxDB
+        devuelve una fila por campo y solo se conservan las del instante más
+        reciente, igual que la fila que devolvía el pivot.
+
         Args:
             patient_id: UUID del paciente
-            
+
         Returns:
             Diccionario con los últimos valores o None
         """
@@ -124,91 +149,98 @@ class InfluxDBService:
                 |> range(start: -24h)
                 |> filter(fn: (r) => r["_measurement"] == "vital_signs")
                 |> filter(fn: (r) => r["patient_id"] == "{patient_id}")
-                |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
-                |> sort(columns: ["_time"], desc: true)
-                |> limit(n: 1)
+                |> last()
             '''
-            
-            tables = self.query_api.query(query, org=self.org)
-            
+
+            tables = self._query(query)
+
+            latest_time = None
+            values: Dict[str, Any] = {}
             for table in tables:
                 for record in table.records:
-                    return {
-                        'timestamp': record.get_time().isoformat(),
-                        'gps_longitude': record.values.get('gps_longitude'),
-                        'gps_latitude': record.values.get('gps_latitude'),
-                        'heart_rate': record.values.get('heart_rate'),
-                        'spo2': record.values.get('spo2'),
-                        'systolic_bp': record.values.get('systolic_bp'),
-                        'diastolic_bp': record.values.get('diastolic_bp'),
-                        'body_temperature': record.values.get('temperature'),
-                        'heart_rate_alert': int(record.values.get('heart_rate_alert', 0)),
-                        'spo2_alert': int(record.values.get('spo2_alert', 0)),
-                        'bp_alert': int(record.values.get('bp_alert', 0)),
-                        'temperature_alert': int(record.values.get('temperature_alert', 0)),
-                    }
-            
-            return None
-            
+                    record_time = record.get_time()
+                    if latest_time is None or record_time > latest_time:
+                        latest_time, values = record_time, {}
+                    if record_time == latest_time:
+                        values[record.get_field()] = record.get_value()
+
+            if latest_time is None:
+                return None
+
+            return {
+                'timestamp': latest_time.isoformat(),
+                'gps_longitude': values.get('gps_longitude'),
+                'gps_latitude': values.get('gps_latitude'),
+                'heart_rate': values.get('heart_rate'),
+                'spo2': values.get('spo2'),
+                'systolic_bp': values.get('systolic_bp'),
+                'diastolic_bp': values.get('diastolic_bp'),
+                'body_temperature': values.get('temperature'),
+                'heart_rate_alert': int(values.get('heart_rate_alert', 0)),
+                'spo2_alert': int(values.get('spo2_alert', 0)),
+                'bp_alert': int(values.get('bp_alert', 0)),
+                'temperature_alert': int(values.get('temperature_alert', 0)),
+            }
+
         except Exception as e:
             logger.error(f"Error obteniendo últimos vitales para paciente {patient_id}: {e}")
             return None
-    
+
     def get_patient_vitals_summary(
-        self, 
-        patient_id: str, 
+        self,
+        patient_id: str,
         hours: int = 24
     ) -> Dict[str, Any]:
         """
         Obtiene resumen estadístico de signos vitales
-        
+
+        El resumen se arma con agregados horarios (count, sum, min, max) que
+        se combinan en Python. Las horas cerradas se guardan en la caché de
+        rollups, así que solo se consultan a InfluxDB las horas parciales de
+        los extremos y las que aún no están en caché, todo en una consulta.
+
         Args:
             patient_id: UUID del paciente
             hours: Ventana de tiempo en horas
-            
+
         Returns:
             Diccionario con estadísticas (promedio, min, max)
         """
         try:
-            query = f'''
-            from(bucket: "{self.bucket}")
-                |> range(start: -{hours}h)
-                |> filter(fn: (r) => r["_measurement"] == "vital_signs")
-                |> filter(fn: (r) => r["patient_id"] == "{patient_id}")
-                |> filter(fn: (r) => 
-                    r["_field"] == "heart_rate" or 
-                    r["_field"] == "spo2" or 
-                    r["_field"] == "systolic_bp" or 
-                    r["_field"] == "diastolic_bp" or
-                    r["_field"] == "temperature"
-                )
-                |> group(columns: ["_field"])
-            '''
-            
-            # Calcular estadísticas
-            mean_query = query + '|> mean()'
-            min_query = query + '|> min()'
-            max_query = query + '|> max()'
-            
+            now = datetime.now(timezone.utc)
+            start = now - timedelta(hours=hours)
+            segments = self._summary_segments(start, now)
+
+            cached = self._cached_rollups(patient_id, [hour for _, _, hour in segments if hour is not None])
+            pending = [(seg_start, seg_stop) for seg_start, seg_stop, hour in segments if hour is None or hour not in cached]
+
+            fetched: Dict[datetime, Dict[str, Rollup]] = {}
+            if pending:
+                fetched = self._query_hourly_rollups(patient_id, self._merge_ranges(pending))
+                closed_hours = {hour for _, _, hour in segments if hour is not None and hour not in cached}
+                # Las horas cerradas sin datos también se guardan (vacías)
+                self._store_rollups(patient_id, {hour: fetched.get(hour, {}) for hour in closed_hours})
+
+            totals: Dict[str, Rollup] = {}
+            for buckets in (cached, fetched):
+                for fields in buckets.values():
+                    for field, rollup in fields.items():
+                        totals[field] = self._merge_rollup(totals.get(field), rollup)
+
             results = {
                 'mean': {},
                 'min': {},
                 'max': {},
                 'period_hours': hours
             }
-            
-            # Ejecutar queries
-            for stat_type, stat_query in [('mean', mean_query), ('min', min_query), ('max', max_query)]:
-                tables = self.query_api.query(stat_query, org=self.org)
-                for table in tables:
-                    for record in table.records:
-                        field = record.values.get('_field')
-                        value = record.values.get('_value')
-                        if field and value is not None:
-                            results[stat_type][field] = round(float(value), 2)
-            
+            for field, (count, total, minimum, maximum) in totals.items():
+                if count:
+                    results['mean'][field] = round(total / count, 2)
+                    results['min'][field] = round(float(minimum), 2)
+                    results['max'][field] = round(float(maximum), 2)
+
             return results
-            
+
         except Exception as e:
             logger.error(f"Error obteniendo resumen de vitales para paciente {patient_id}: {e}")
             return {
@@ -218,7 +250,131 @@ class InfluxDBService:
                 'period_hours': hours,
                 'error': str(e)
             }
-    
+
+    def _summary_segments(self, start: datetime, now: datetime) -> List[Tuple[datetime, datetime, Optional[datetime]]]:
+        """
+        Divide [start, now) en tramos (inicio, fin, hora cacheable o None).
+
+        Son cacheables las horas completas que terminaron hace más de
+        VITALS_ROLLUP_SETTLE_SECONDS (margen para puntos que llegan tarde).
+        """
+        first_hour = start.replace(minute=0, second=0, microsecond=0)
+        if first_hour < start:
+            first_hour += HOUR
+        settled = now - self._rollup_settle
+
+        segments: List[Tuple[datetime, datetime, Optional[datetime]]] = []
+        if start < min(first_hour, now):
+            segments.append((start, min(first_hour, now), None))
+        hour = first_hour
+        while hour < now:
+            stop = min(hour + HOUR, now)
+            cacheable = stop - hour == HOUR and stop <= settled
+            segments.append((hour, stop, hour if cacheable else None))
+            hour = stop
+        return segments
+
+    @staticmethod
+    def _merge_ranges(ranges: List[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+        merged: List[Tuple[datetime, datetime]] = []
+        for range_start, range_stop in ranges:
+            if merged and merged[-1][1] == range_start:
+                merged[-1] = (merged[-1][0], range_stop)
+            else:
+                merged.append((range_start, range_stop))
+        return merged
+
+    def _query_hourly_rollups(
+        self,
+        patient_id: str,
+        ranges: List[Tuple[datetime, datetime]]
+    ) -> Dict[datetime, Dict[str, Rollup]]:
+        """
+        Agregados horarios de los tramos indicados en una sola consulta Flux.
+
+        count devuelve enteros y sum/min/max flotantes con la misma clave de
+        grupo (_field); se pasan todos a float antes del union para que las
+        tablas tengan el mismo esquema.
+        """
+        field_filter = ' or '.join(f'r["_field"] == "{field}"' for field in SUMMARY_FIELDS)
+        windows = ',\n'.join(
+            f'            vitals(start: {self._flux_time(range_start)}, stop: {self._flux_time(range_stop)}) |> hourly(fn: {stat}, stat: "{stat}")'
+            for range_start, range_stop in ranges
+            for stat in ROLLUP_STATS
+        )
+        query = f'''
+            vitals = (start, stop) => from(bucket: "{self.bucket}")
+                |> range(start: start, stop: stop)
+                |> filter(fn: (r) => r["_measurement"] == "vital_signs")
+                |> filter(fn: (r) => r["patient_id"] == "{patient_id}")
+                |> filter(fn: (r) => {field_filter})
+                |> group(columns: ["_field"])
+
+            hourly = (tables=<-, fn, stat) => tables
+                |> aggregateWindow(every: 1h, fn: fn, timeSrc: "_start", createEmpty: false)
+                |> toFloat()
+                |> set(key: "stat", value: stat)
+
+            union(tables: [
+{windows}
+            ])
+        '''
+
+        buckets: Dict[datetime, Dict[str, Dict[str, float]]] = {}
+        for table in self._query(query):
+            for record in table.records:
+                value = record.get_value()
+                if value is None:
+                    continue
+                hour = record.get_time().astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+                stats = buckets.setdefault(hour, {}).setdefault(record.get_field(), {})
+                stats[record.values.get('stat')] = value
+
+        rollups: Dict[datetime, Dict[str, Rollup]] = {}
+        for hour, fields_stats in buckets.items():
+            for field, stats in fields_stats.items():
+                if stats.get('count'):
+                    rollups.setdefault(hour, {})[field] = (
+                        int(stats['count']), float(stats['sum']), float(stats['min']), float(stats['max'])
+                    )
+        return rollups
+
+    @staticmethod
+    def _merge_rollup(current: Optional[Rollup], other: Rollup) -> Rollup:
+        if current is None:
+            return other
+        return (
+            current[0] + other[0],
+            current[1] + other[1],
+            min(current[2], other[2]),
+            max(current[3], other[3]),
+        )
+
+    @staticmethod
+    def _flux_time(value: datetime) -> str:
+        return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+    def _cached_rollups(self, patient_id: str, hours: List[datetime]) -> Dict[datetime, Dict[str, Rollup]]:
+        with self._rollups_lock:
+            patient_rollups = self._rollups.get(patient_id)
+            if patient_rollups is None:
+                return {}
+            self._rollups.move_to_end(patient_id)
+            return {hour: patient_rollups[hour] for hour in hours if hour in patient_rollups}
+
+    def _store_rollups(self, patient_id: str, rollups: Dict[datetime, Dict[str, Rollup]]) -> None:
+        if not rollups:
+            return
+        oldest = datetime.now(timezone.utc) - timedelta(hours=self._rollup_max_hours)
+        with self._rollups_lock:
+            patient_rollups = self._rollups.setdefault(patient_id, {})
+            patient_rollups.update(rollups)
+            for hour in [hour for hour in patient_rollups if hour < oldest]:
+                del patient_rollups[hour]
+            self._rollups.move_to_end(patient_id)
+            while len(self._rollups) > self._rollup_max_patients:
+                self._rollups.popitem(last=False)
+
     def close(self):
         """Cierra la conexión con InfluxDB"""
         if self._client:
@@ -1,13 +1,39 @@
 """Servicio de lógica de negocio para usuarios"""
 from __future__ import annotations
 
+import base64
+import binascii
+import json
+import math
+import time
 from datetime import datetime, timezone
 from decimal import Decimal
 from typing import Any, Dict, List, Mapping, Optional, Tuple
 from uuid import UUID
 
+from ..config import get_config
 from ..extensions import get_db_cursor
 from ..repositories.user_repo import UserRepository
+from ..utils.response_builder import RawJSON
+from ..utils.ttl_cache import TTLCache
+
+# Rejilla de clustering: celdas por lado de tile (tiles de 256 px -> celdas de 32 px)
+CLUSTER_CELLS_PER_TILE = 8
+WEB_MERCATOR_WORLD_M = 40075016.685578488
+MAX_MAP_ZOOM = 22
+MAX_CLUSTERS = 2000
+
+# Columnas de cada fila que forman el cursor de página; mismo orden que las
+# claves *_SORT del repositorio
+ALERT_CURSOR_FIELDS = ('created_at', 'id')
+ORG_DEVICE_CURSOR_FIELDS = ('serial', 'id')
+DEVICE_STREAM_CURSOR_FIELDS = ('started_at', 'id')
+CARE_TEAM_DEVICE_CURSOR_FIELDS = ('patient_name', 'serial', 'id')
+DISCONNECTED_DEVICE_CURSOR_FIELDS = ('last_ended_at', 'serial', 'id')
+CAREGIVER_LOCATION_CURSOR_FIELDS = {
+    'recent': ('last_location_at', 'alert_level_weight', 'patient_name', 'patient_id'),
+    'severity': ('alert_level_weight', 'last_location_at', 'patient_name', 'patient_id'),
+}
 
 
 class UserService:
@@ -15,6 +41,13 @@ class UserService:
 
     def __init__(self) -> None:
         self.repo = UserRepository()
+        config = get_config()
+        # Tiles de clusters por usuario y filtros; la ubicación se refresca en segundos
+        self._tile_cache = TTLCache(config.MAP_TILE_CACHE_SIZE, config.MAP_TILE_CACHE_TTL)
+        self._sync_cursor_max_age = config.SYNC_CURSOR_MAX_AGE
+        # Accesos concedidos por (tipo, ..., user_id); solo se cachean los positivos
+        self._authz_cache = TTLCache(config.AUTHZ_CACHE_SIZE, config.AUTHZ_CACHE_TTL)
+        self._sync_max_alerts = config.SYNC_MAX_ALERTS
 
     def ensure_membership(self, org_id: str, user_id: str) -> Dict[str, Any]:
         """Permite validar membresía desde otros módulos."""
@@ -132,6 +165,8 @@ class UserService:
             )
             membership_detail = cursor.fetchone()
 
+        self.invalidate_authorization(user_id)
+
         formatted_membership = self._format_membership(membership_detail) if membership_detail else {
             'org_id': str(membership_row['org_id']),
             'role_code': membership_row['role_code'],
@@ -179,6 +214,8 @@ class UserService:
 
             updated_invitation = self._fetch_invitation_for_user(cursor, invite_id, normalized_email)
 
+        self.invalidate_authorization(user_id)
+
         formatted_invitation = self._format_invitation(updated_invitation) if updated_invitation else self._format_invitation({
             **invitation,
             'used_at': invite_status.get('used_at'),
@@ -194,144 +231,42 @@ class UserService:
     # ------------------------------------------------------------------
     def get_org_dashboard(self, org_id: str, user_id: str) -> Dict[str, Any]:
         membership = self._ensure_membership(org_id, user_id)
-        overview = self.repo.get_org_overview(org_id, user_id)
-        metrics = self.repo.get_org_metrics(org_id, user_id)
         return {
             'organization': membership,
+            **self._org_dashboard_stats(org_id, user_id),
+        }
+
+    def _org_dashboard_stats(self, org_id: str, user_id: str) -> Dict[str, Any]:
+        counters = self.repo.get_org_dashboard_counters(org_id, user_id)
+        if counters.get('total_care_teams', 0) > 1 and counters.get('shared_patients'):
+            # Un paciente en varios equipos se sumaría una vez por equipo: se cuenta sobre las tablas base
+            overview = self.repo.get_org_overview(org_id, user_id)
+            metrics = self.repo.get_org_metrics(org_id, user_id)
+        else:
+            overview = metrics = counters
+        return {
             'overview': self._format_org_overview(overview),
             'metrics': self._format_org_metrics(metrics),
         }
 
     def list_org_care_teams(self, org_id: str, user_id: str) -> Dict[str, Any]:
         membership = self._ensure_membership(org_id, user_id)
-        rows = self.repo.list_org_care_teams(org_id, user_id)
-        teams: Dict[str, Dict[str, Any]] = {}
-        for row in rows:
-            team_id = str(row['care_team_id'])
-            team = teams.setdefault(
-                team_id,
-                {
-                    'id': team_id,
-                    'name': row.get('care_team_name'),
-                    'created_at': self._serialize_datetime(row.get('created_at')),
-                    'members': [],
-                },
-            )
-            if row.get('member_user_id'):
-                team['members'].append({
-                    'user_id': str(row['member_user_id']),
-                    'name': row.get('member_name'),
-                    'email': row.get('member_email'),
-                    'profile_photo_url': row.get('member_profile_photo_url'),
-                    'role': {
-                        'code': row.get('member_role_code'),
-                        'label': row.get('member_role_label'),
-                    },
-                })
-
         return {
             'organization': membership,
-            'care_teams': list(teams.values()),
+            'care_teams': RawJSON(self.repo.list_org_care_teams(org_id, user_id)),
         }
 
     def list_org_care_team_patients(self, org_id: str, user_id: str) -> Dict[str, Any]:
         membership = self._ensure_membership(org_id, user_id)
-        rows = self.repo.list_org_care_team_patients(org_id, user_id)
-        teams: Dict[str, Any] = {}
-        for row in rows:
-            team_id = str(row['care_team_id'])
-            team = teams.setdefault(
-                team_id,
-                {
-                    'id': team_id,
-                    'name': row.get('care_team_name'),
-                    'patients': [],
-                    'members': [],
-                },
-            )
-            # Solo agregar pacientes si patient_id no es NULL
-            if row.get('patient_id') is not None:
-                team['patients'].append({
-                    'id': str(row['patient_id']),
-                    'name': row.get('patient_name'),
-                    'email': row.get('patient_email'),
-                    'risk_level': {
-                        'code': row.get('risk_level_code'),
-                        'label': row.get('risk_level_label'),
-                    },
-                })
-
-        # Agregar miembros a los equipos
-        member_rows = self.repo.list_org_care_teams(org_id, user_id)
-        for row in member_rows:
-            team_id = str(row['care_team_id'])
-            if team_id in teams and row.get('member_user_id'):
-                teams[team_id]['members'].append({
-                    'user_id': str(row['member_user_id']),
-                    'name': row.get('member_name'),
-                    'email': row.get('member_email'),
-                    'profile_photo_url': row.get('member_profile_photo_url'),
-                    'role': {
-                        'code': row.get('member_role_code'),
-                        'label': row.get('member_role_label'),
-                    },
-                })
-
         return {
             'organization': membership,
-            'care_teams': list(teams.values()),
+            'care_teams': RawJSON(self.repo.list_org_care_team_patients(org_id, user_id)),
         }
 
     def list_org_care_team_patients_locations(self, org_id: str, user_id: str) -> Dict[str, Any]:
         """Lista pacientes de care teams con sus ubicaciones."""
-        membership = self._ensure_membership(org_id, user_id)
-        rows = self.repo.list_org_care_team_patients_locations(org_id, user_id)
-        
-        teams: Dict[str, Dict[str, Any]] = {}
-        for row in rows:
-            team_id = str(row['care_team_id'])
-            team = teams.setdefault(
-                team_id,
-                {
-                    'id': team_id,
-                    'name': row.get('care_team_name'),
-                    'patients': [],
-                },
-            )
-            
-            # Solo agregar pacientes que tienen ubicación
-            if row.get('patient_id') and row.get('latitude') and row.get('longitude'):
-                patient = {
-                    'id': str(row['patient_id']),
-                    'name': row.get('patient_name'),
-                    'email': row.get('patient_email'),
-                    'profile_photo_url': row.get('patient_profile_photo_url'),
-                    'risk_level': {
-                        'code': row.get('risk_level_code'),
-                        'label': row.get('risk_level_label'),
-                    },
-                    'location': {
-                        'latitude': float(row['latitude']),
-                        'longitude': float(row['longitude']),
-                        'last_update': row.get('last_update'),
-                        'approximate': row.get('approximate', False),
-                    },
-                }
-                
-                # Agregar last_alert si existe
-                if row.get('last_alert_code'):
-                    patient['last_alert'] = {
-                        'code': row.get('last_alert_code'),
-                        'label': row.get('last_alert_label'),
-                        'level': {
-                            'code': row.get('alert_level_code'),
-                            'label': row.get('alert_level_label'),
-                        },
-                    }
-                
-                team['patients'].append(patient)
-        
-        return {'care_teams': list(teams.values())}
+        self._ensure_membership(org_id, user_id)
+        return {'care_teams': RawJSON(self.repo.list_org_care_team_patients_locations(org_id, user_id))}
 
     def get_org_patient_detail(self, org_id: str, patient_id: str, user_id: str) -> Dict[str, Any]:
         membership = self._ensure_membership(org_id, user_id)
@@ -351,12 +286,14 @@ class UserService:
         *,
         limit: int,
         offset: int,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
         membership = self._ensure_membership(org_id, user_id)
         patient_record = self.repo.get_patient(org_id, patient_id)
         if not patient_record:
             raise ValueError("Paciente no encontrado en la organización indicada")
-        alerts = self.repo.list_patient_alerts(patient_id, limit, offset)
+        after = self._decode_page_cursor(cursor, 'alerts', ALERT_CURSOR_FIELDS, offset=offset)
+        alerts = self.repo.list_patient_alerts(patient_id, limit, offset, after)
         return {
             'organization': membership,
             'patient': self._format_patient_summary(patient_record),
@@ -365,6 +302,7 @@ class UserService:
                 'limit': limit,
                 'offset': offset,
                 'count': len(alerts),
+                'next_cursor': self._next_page_cursor(alerts, limit, 'alerts', ALERT_CURSOR_FIELDS),
             },
         }
 
@@ -468,12 +406,9 @@ class UserService:
 
     def get_org_metrics(self, org_id: str, user_id: str) -> Dict[str, Any]:
         membership = self._ensure_membership(org_id, user_id)
-        overview = self.repo.get_org_overview(org_id, user_id)
-        metrics = self.repo.get_org_metrics(org_id, user_id)
         return {
             'organization': membership,
-            'overview': self._format_org_overview(overview),
-            'metrics': self._format_org_metrics(metrics),
+            **self._org_dashboard_stats(org_id, user_id),
         }
 
     # ------------------------------------------------------------------
@@ -503,12 +438,14 @@ class UserService:
         *,
         limit: int,
         offset: int,
+        cursor: Optional[str] = None,
     ) -> Dict[str, Any]:
         relationship = self._ensure_caregiver_access(patient_id, user_id)
         patient_record = self.repo.get_patient_by_id(patient_id)
         if not patient_record:
             raise ValueError("Paciente no encontrado")
-        alerts = self.repo.list_patient_alerts(patient_id, limit, offset)
+        after = self._decode_page_cursor(cursor, 'alerts', ALERT_CURSOR_FIELDS, offset=offset)
+        alerts = self.repo.list_patient_alerts(patient_id, limit, offset, after)
         return {
             'patient': self._format_patient_summary(patient_record),
             'relationship': self._format_relationship(relationship),
@@ -517,6 +454,7 @@ class UserService:
                 'limit': limit,
                 'offset': offset,
                 'count': len(alerts),
+                'next_cursor': self._next_page_cursor(alerts, limit, 'alerts', ALERT_CURSOR_FIELDS),
             },
         }
 
@@ -718,6 +656,7 @@ class UserService:
         patient_id = self._normalize_uuid(patient_value, field='patient_id') if patient_value else None
         limit = self._parse_limit(params.get('limit'), default=200, maximum=500, field='limit')
         offset = self._parse_offset(params.get('offset'), field='offset')
+        after = self._decode_page_cursor(params.get('cursor'), 'org_devices', ORG_DEVICE_CURSOR_FIELDS, offset=offset)
 
         rows = self.repo.list_org_devices(
             org_id,
@@ -726,6 +665,7 @@ class UserService:
             connected=connected,
             limit=limit,
             offset=offset,
+            after=after,
         )
         devices = [self._format_org_device(row) for row in rows]
 
@@ -736,6 +676,7 @@ class UserService:
                 'limit': limit,
                 'offset': offset,
                 'returned': len(devices),
+                'next_cursor': self._next_page_cursor(rows, limit, 'org_devices', ORG_DEVICE_CURSOR_FIELDS),
             },
         }
 
@@ -773,11 +714,13 @@ class UserService:
 
         limit = self._parse_limit(params.get('limit'), default=50, maximum=200, field='limit')
         offset = self._parse_offset(params.get('offset'), field='offset')
+        after = self._decode_page_cursor(params.get('cursor'), 'device_streams', DEVICE_STREAM_CURSOR_FIELDS, offset=offset)
 
         rows = self.repo.list_device_streams(
             device_id,
             limit=limit,
             offset=offset,
+            after=after,
         )
         streams = [self._format_device_stream(row) for row in rows]
 
@@ -789,6 +732,7 @@ class UserService:
                 'limit': limit,
                 'offset': offset,
                 'returned': len(streams),
+                'next_cursor': self._next_page_cursor(rows, limit, 'device_streams', DEVICE_STREAM_CURSOR_FIELDS),
             },
         }
 
@@ -806,6 +750,7 @@ class UserService:
         patient_id = self._normalize_uuid(patient_value, field='patient_id') if patient_value else None
         limit = self._parse_limit(params.get('limit'), default=200, maximum=500, field='limit')
         offset = self._parse_offset(params.get('offset'), field='offset')
+        after = self._decode_page_cursor(params.get('cursor'), 'care_team_devices', CARE_TEAM_DEVICE_CURSOR_FIELDS, offset=offset)
 
         rows = self.repo.list_care_team_devices(
             org_id,
@@ -814,6 +759,7 @@ class UserService:
             active=active,
             limit=limit,
             offset=offset,
+            after=after,
         )
         devices = [self._format_care_team_device(row) for row in rows]
 
@@ -825,6 +771,7 @@ class UserService:
                 'limit': limit,
                 'offset': offset,
                 'returned': len(devices),
+                'next_cursor': self._next_page_cursor(rows, limit, 'care_team_devices', CARE_TEAM_DEVICE_CURSOR_FIELDS),
             },
         }
 
@@ -861,6 +808,7 @@ class UserService:
 
         limit = self._parse_limit(params.get('limit'), default=200, maximum=500, field='limit')
         offset = self._parse_offset(params.get('offset'), field='offset')
+        after = self._decode_page_cursor(params.get('cursor'), 'device_streams', DEVICE_STREAM_CURSOR_FIELDS, offset=offset)
 
         rows = self.repo.list_care_team_device_streams(
             org_id,
@@ -868,6 +816,7 @@ class UserService:
             device_id,
             limit=limit,
             offset=offset,
+            after=after,
         )
         streams = [self._format_device_stream(row) for row in rows]
 
@@ -880,6 +829,7 @@ class UserService:
                 'limit': limit,
                 'offset': offset,
                 'returned': len(streams),
+                'next_cursor': self._next_page_cursor(rows, limit, 'device_streams', DEVICE_STREAM_CURSOR_FIELDS),
             },
         }
 
@@ -894,12 +844,14 @@ class UserService:
 
         limit = self._parse_limit(params.get('limit'), default=200, maximum=500, field='limit')
         offset = self._parse_offset(params.get('offset'), field='offset')
+        after = self._decode_page_cursor(params.get('cursor'), 'disconnected_devices', DISCONNECTED_DEVICE_CURSOR_FIELDS, offset=offset)
 
         rows = self.repo.list_care_team_disconnected_devices(
             org_id,
             care_team_id,
             limit=limit,
             offset=offset,
+            after=after,
         )
         devices = [self._format_care_team_device(row) for row in rows]
 
@@ -911,6 +863,7 @@ class UserService:
                 'limit': limit,
                 'offset': offset,
                 'returned': len(devices),
+                'next_cursor': self._next_page_cursor(rows, limit, 'disconnected_devices', DISCONNECTED_DEVICE_CURSOR_FIELDS),
             },
         }
 
@@ -1059,41 +1012,51 @@ class UserService:
         include_patients = type_param in {'all', 'patients'}
         include_members = type_param in {'all', 'members'}
 
-        org_id = self._normalize_uuid(params.get('org_id'), field='org_id')
-        care_team_id = self._normalize_uuid(params.get('care_team_id'), field='care_team_id')
-
-        alert_level = self._normalize_code(params.get('alert_level'), field='alert_level')
-        updated_after = self._parse_datetime_param(params.get('updated_after'), field='updated_after')
+        filters = self._care_team_location_filters(params)
         bbox = self._parse_bbox(params.get('bbox'))
         limit = self._parse_limit(params.get('limit'), default=500, maximum=1000, field='limit')
+        mode = self._parse_location_mode(params)
 
         patients: List[Dict[str, Any]] = []
+        clusters: List[Dict[str, Any]] = []
         members: List[Dict[str, Any]] = []
 
-        if include_patients:
+        if include_patients and mode == 'clusters':
+            zoom, bbox = self._parse_cluster_view(params, bbox)
+            cluster_rows = self.repo.cluster_care_team_patient_locations(
+                user_id,
+                bbox=bbox,
+                cell_size=self._cluster_cell_size(zoom),
+                limit=MAX_CLUSTERS,
+                **filters,
+            )
+            clusters = [self._format_location_cluster(row) for row in cluster_rows]
+        elif include_patients:
             patient_rows = self.repo.list_care_team_patient_locations(
                 user_id,
-                org_id=org_id,
-                care_team_id=care_team_id,
-                alert_level=alert_level,
-                updated_after=updated_after,
                 bbox=bbox,
                 limit=limit,
+                **filters,
             )
             patients = [self._format_team_patient_location(row) for row in patient_rows]
 
         if include_members:
             member_rows = self.repo.list_care_team_member_locations(
                 user_id,
-                org_id=org_id,
-                care_team_id=care_team_id,
-                alert_level=alert_level,
-                updated_after=updated_after,
                 bbox=bbox,
                 limit=limit,
+                **filters,
             )
             members = [self._format_team_member_location(row) for row in member_rows]
 
+        if mode == 'clusters':
+            return {
+                'mode': mode,
+                'count': sum(cluster['count'] for cluster in clusters),
+                'clusters': clusters,
+                'members': members,
+            }
+
         total = len(patients) + len(members)
         return {
             'count': total,
@@ -1101,11 +1064,37 @@ class UserService:
             'members': members,
         }
 
+    def get_care_team_location_tile(self, user_id: str, z: int, x: int, y: int, params: Mapping[str, Any]) -> Dict[str, Any]:
+        return self._location_tile(
+            'care_team',
+            user_id,
+            (z, x, y),
+            self._care_team_location_filters(params),
+            self.repo.cluster_care_team_patient_locations,
+        )
+
     def list_caregiver_patient_locations(self, user_id: str, params: Mapping[str, Any]) -> Dict[str, Any]:
-        updated_after = self._parse_datetime_param(params.get('updated_after'), field='updated_after')
+        filters = self._caregiver_location_filters(params)
         bbox = self._parse_bbox(params.get('bbox'))
-        risk_level = self._normalize_code(params.get('risk_level'), field='risk_level')
-        has_active_alerts = self._parse_bool(params.get('has_active_alerts'), field='has_active_alerts')
+        if self._parse_location_mode(params) == 'clusters':
+            zoom, bbox = self._parse_cluster_view(params, bbox)
+            rows = self.repo.cluster_caregiver_patient_locations(
+                user_id,
+                bbox=bbox,
+                cell_size=self._cluster_cell_size(zoom),
+                limit=MAX_CLUSTERS,
+                **filters,
+            )
+            clusters = [self._format_location_cluster(row) for row in rows]
+            return {
+                'mode': 'clusters',
+                'count': sum(cluster['count'] for cluster in clusters),
+                'clusters': clusters,
+            }
+
+        updated_after = filters['updated_after']
+        risk_level = filters['risk_level']
+        has_active_alerts = filters['has_active_alerts']
         include_without_location = bool(self._parse_bool(params.get('include_without_location'), field='include_without_location') or False)
         limit = self._parse_limit(params.get('limit'), default=500, maximum=1000, field='limit')
         offset = self._parse_offset(params.get('offset'), field='offset')
@@ -1113,6 +1102,9 @@ class UserService:
         sort_param = str(params.get('sort', 'recent') or 'recent').strip().lower()
         if sort_param not in {'recent', 'severity'}:
             raise ValueError("El parámetro sort debe ser recent o severity")
+        listing = f'caregiver_locations:{sort_param}'
+        cursor_fields = CAREGIVER_LOCATION_CURSOR_FIELDS[sort_param]
+        after = self._decode_page_cursor(params.get('cursor'), listing, cursor_fields, offset=offset)
 
         rows = self.repo.list_caregiver_patient_locations(
             user_id,
@@ -1124,6 +1116,7 @@ class UserService:
             sort_by=sort_param,
             limit=limit,
             offset=offset,
+            after=after,
         )
 
         patients = [self._format_caregiver_patient_location(row) for row in rows]
@@ -1134,27 +1127,329 @@ class UserService:
                 'limit': limit,
                 'offset': offset,
                 'returned': len(patients),
+                'next_cursor': self._next_page_cursor(rows, limit, listing, cursor_fields),
             },
         }
 
+    def get_caregiver_location_tile(self, user_id: str, z: int, x: int, y: int, params: Mapping[str, Any]) -> Dict[str, Any]:
+        return self._location_tile(
+            'caregiver',
+            user_id,
+            (z, x, y),
+            self._caregiver_location_filters(params),
+            self.repo.cluster_caregiver_patient_locations,
+        )
+
+    # ------------------------------------------------------------------
+    # Sincronización incremental (feeds de cambios con cursor opaco)
+    # ------------------------------------------------------------------
+    def get_care_team_location_changes(self, user_id: str, params: Mapping[str, Any]) -> Dict[str, Any]:
+        org_id = self._normalize_uuid(params.get('org_id'), field='org_id')
+        care_team_id = self._normalize_uuid(params.get('care_team_id'), field='care_team_id')
+        scope = f"care_team:{org_id or '*'}:{care_team_id or '*'}"
+        since_xid = self._decode_sync_cursor(params.get('cursor'), scope)
+
+        high_water = self.repo.get_sync_high_water()
+        changes = self.repo.list_care_team_location_changes(
+            user_id,
+            org_id=org_id,
+            care_team_id=care_team_id,
+            since_xid=since_xid,
+            alerts_limit=self._sync_max_alerts,
+        )
+        if since_xid is not None and len(changes['alerts']) >= self._sync_max_alerts:
+            # Demasiadas alertas para un delta: se reenvía el estado completo
+            since_xid = None
+            changes = self.repo.list_care_team_location_changes(
+                user_id,
+                org_id=org_id,
+                care_team_id=care_team_id,
+                since_xid=None,
+                alerts_limit=self._sync_max_alerts,
+            )
+        removed = {
+            'patients': [
+                {'care_team_id': str(row['care_team_id']), 'patient_id': str(row['patient_id'])}
+                for row in changes['removed_patients']
+            ],
+            'care_teams': [str(row['care_team_id']) for row in changes['removed_care_teams']],
+            'alerts': [str(row['alert_id']) for row in changes['removed_alerts']],
+        }
+        return self._format_sync_page(
+            scope,
+            high_water,
+            since_xid,
+            [self._format_team_patient_location(row) for row in changes['patients']],
+            [self._format_alert(row) for row in changes['alerts']],
+            removed,
+        )
+
+    def get_caregiver_location_changes(self, user_id: str, params: Mapping[str, Any]) -> Dict[str, Any]:
+        scope = 'caregiver'
+        since_xid = self._decode_sync_cursor(params.get('cursor'), scope)
+
+        high_water = self.repo.get_sync_high_water()
+        changes = self.repo.list_caregiver_location_changes(
+            user_id,
+            since_xid=since_xid,
+            alerts_limit=self._sync_max_alerts,
+        )
+        if since_xid is not None and len(changes['alerts']) >= self._sync_max_alerts:
+            # Demasiadas alertas para un delta: se reenvía el estado completo
+            since_xid = None
+            changes = self.repo.list_caregiver_location_changes(
+                user_id,
+                since_xid=None,
+                alerts_limit=self._sync_max_alerts,
+            )
+        removed = {
+            'patients': [str(row['patient_id']) for row in changes['removed_patients']],
+            'alerts': [str(row['alert_id']) for row in changes['removed_alerts']],
+        }
+        return self._format_sync_page(
+            scope,
+            high_water,
+            since_xid,
+            [self._format_caregiver_patient_location(row) for row in changes['patients']],
+            [self._format_alert(row) for row in changes['alerts']],
+            removed,
+        )
+
+    def _format_sync_page(
+        self,
+        scope: str,
+        high_water: int,
+        since_xid: Optional[int],
+        patients: List[Dict[str, Any]],
+        alerts: List[Dict[str, Any]],
+        removed: Dict[str, List[Any]],
+    ) -> Dict[str, Any]:
+        return {
+            'cursor': self._encode_sync_cursor(scope, high_water),
+            'reset': since_xid is None,
+            'has_changes': bool(patients or alerts or any(removed.values())),
+            'patients': patients,
+            'alerts': alerts,
+            'removed': removed,
+        }
+
+    @staticmethod
+    def _encode_sync_cursor(scope: str, xid: int) -> str:
+        payload = json.dumps({'x': xid, 's': scope, 't': int(time.time())}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def _decode_sync_cursor(self, value: Any, scope: str) -> Optional[int]:
+        """
+        xid desde el que sincronizar, o None para enviar el estado completo.
+
+        Un cursor de otro alcance (filtros distintos) o más antiguo que la
+        retención de sync_events provoca una resincronización completa.
+        """
+        if value in (None, ''):
+            return None
+        text = str(value).strip()
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(text + '=' * (-len(text) % 4)))
+            xid = int(payload['x'])
+            issued_at = int(payload['t'])
+            cursor_scope = str(payload['s'])
+        except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+            raise ValueError("El parámetro cursor no es válido") from exc
+        if cursor_scope != scope or time.time() - issued_at > self._sync_cursor_max_age:
+            return None
+        return xid
+
+    # ------------------------------------------------------------------
+    # Paginación por clave (keyset)
+    # ------------------------------------------------------------------
+    def _next_page_cursor(self, rows: List[Dict[str, Any]], limit: int, listing: str, fields: Tuple[str, ...]) -> Optional[str]:
+        """Cursor de la página siguiente; None si esta página ya no se llenó."""
+        if not rows or len(rows) < limit:
+            return None
+        last = rows[-1]
+        values = [self._cursor_value(last.get(name)) for name in fields]
+        payload = json.dumps({'l': listing, 'k': values}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def _decode_page_cursor(value: Any, listing: str, fields: Tuple[str, ...], *, offset: int) -> Optional[List[Any]]:
+        """Claves de la última fila vista; sin cursor se pagina con offset."""
+        if value in (None, ''):
+            return None
+        if offset:
+            raise ValueError("Los parámetros cursor y offset no pueden usarse juntos")
+        text = str(value).strip()
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(text + '=' * (-len(text) % 4)))
+            cursor_listing = payload['l']
+            values = payload['k']
+        except (binascii.Error, ValueError, TypeError, KeyError) as exc:
+            raise ValueError("El parámetro cursor no es válido") from exc
+        if cursor_listing != listing or not isinstance(values, list) or len(values) != len(fields):
+            raise ValueError("El parámetro cursor no es válido")
+        return values
+
+    @staticmethod
+    def _cursor_value(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        if isinstance(value, (UUID, Decimal)):
+            return str(value)
+        return value
+
+    # ------------------------------------------------------------------
+    # Clusters y tiles de ubicaciones
+    # ------------------------------------------------------------------
+    def _care_team_location_filters(self, params: Mapping[str, Any]) -> Dict[str, Any]:
+        return {
+            'org_id': self._normalize_uuid(params.get('org_id'), field='org_id'),
+            'care_team_id': self._normalize_uuid(params.get('care_team_id'), field='care_team_id'),
+            'alert_level': self._normalize_code(params.get('alert_level'), field='alert_level'),
+            'updated_after': self._parse_datetime_param(params.get('updated_after'), field='updated_after'),
+        }
+
+    def _caregiver_location_filters(self, params: Mapping[str, Any]) -> Dict[str, Any]:
+        return {
+            'updated_after': self._parse_datetime_param(params.get('updated_after'), field='updated_after'),
+            'risk_level': self._normalize_code(params.get('risk_level'), field='risk_level'),
+            'has_active_alerts': self._parse_bool(params.get('has_active_alerts'), field='has_active_alerts'),
+        }
+
+    @staticmethod
+    def _parse_location_mode(params: Mapping[str, Any]) -> str:
+        mode = str(params.get('mode', 'points') or 'points').strip().lower()
+        if mode not in {'points', 'clusters'}:
+            raise ValueError("El parámetro mode debe ser points o clusters")
+        return mode
+
+    @staticmethod
+    def _parse_cluster_view(params: Mapping[str, Any], bbox: Optional[Dict[str, float]]) -> Tuple[int, Dict[str, float]]:
+        if bbox is None:
+            raise ValueError("El modo clusters requiere el parámetro bbox")
+        zoom_value = params.get('zoom')
+        if zoom_value in (None, ''):
+            raise ValueError("El modo clusters requiere el parámetro zoom")
+        try:
+            zoom = int(zoom_value)
+        except (TypeError, ValueError) as exc:
+            raise ValueError("El parámetro zoom debe ser un entero válido") from exc
+        if not 0 <= zoom <= MAX_MAP_ZOOM:
+            raise ValueError(f"El parámetro zoom debe estar entre 0 y {MAX_MAP_ZOOM}")
+        return zoom, bbox
+
+    @staticmethod
+    def _cluster_cell_size(zoom: int) -> float:
+        """Lado de la celda en metros Web Mercator; cada tile se divide en CLUSTER_CELLS_PER_TILE²."""
+        return WEB_MERCATOR_WORLD_M / (2 ** zoom) / CLUSTER_CELLS_PER_TILE
+
+    @staticmethod
+    def _tile_bbox(z: int, x: int, y: int) -> Dict[str, float]:
+        if not 0 <= z <= MAX_MAP_ZOOM:
+            raise ValueError(f"El nivel de zoom del tile debe estar entre 0 y {MAX_MAP_ZOOM}")
+        tiles = 2 ** z
+        if not (0 <= x < tiles and 0 <= y < tiles):
+            raise ValueError("Las coordenadas del tile están fuera de rango")
+
+        def latitude(row: int) -> float:
+            return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / tiles))))
+
+        return {
+            'min_lng': x / tiles * 360.0 - 180.0,
+            'min_lat': latitude(y + 1),
+            'max_lng': (x + 1) / tiles * 360.0 - 180.0,
+            'max_lat': latitude(y),
+        }
+
+    def _location_tile(self, scope: str, user_id: str, tile: Tuple[int, int, int], filters: Dict[str, Any], cluster) -> Dict[str, Any]:
+        z, x, y = tile
+        bbox = self._tile_bbox(z, x, y)
+        key = (scope, user_id, tile, tuple(sorted((name, str(value)) for name, value in filters.items())))
+        cached = self._tile_cache.get(key)
+        if cached is not None:
+            return cached
+
+        rows = cluster(user_id, bbox=bbox, cell_size=self._cluster_cell_size(z), limit=MAX_CLUSTERS, **filters)
+        clusters = [self._format_location_cluster(row) for row in rows]
+        data = {
+            'tile': {'z': z, 'x': x, 'y': y, 'bbox': bbox},
+            'count': sum(cluster['count'] for cluster in clusters),
+            'clusters': clusters,
+        }
+        self._tile_cache.set(key, data)
+        return data
+
+    def _format_location_cluster(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        level = None
+        if row.get('alert_level_code'):
+            level = {
+                'code': row.get('alert_level_code'),
+                'label': row.get('alert_level_label'),
+                'weight': row.get('alert_level_weight'),
+            }
+        return {
+            'count': row['patient_count'],
+            'latitude': self._coerce_float(row.get('latitude')),
+            'longitude': self._coerce_float(row.get('longitude')),
+            'bounds': {
+                'min_lng': self._coerce_float(row.get('min_lng')),
+                'min_lat': self._coerce_float(row.get('min_lat')),
+                'max_lng': self._coerce_float(row.get('max_lng')),
+                'max_lat': self._coerce_float(row.get('max_lat')),
+            },
+            'last_update': self._serialize_datetime(row.get('last_location_at')),
+            'open_alerts': row.get('open_alerts_count', 0),
+            'worst_alert_level': level,
+            'patient_id': row.get('patient_id'),
+        }
+
     # ------------------------------------------------------------------
     # Helpers de validación y formateo
     # ------------------------------------------------------------------
+    def invalidate_authorization(self, user_id: str) -> None:
+        """Olvida los accesos cacheados del usuario (p. ej. al aceptar una invitación)."""
+        user_key = str(user_id)
+        self._authz_cache.discard_where(lambda key: key[-1] == user_key)
+
+    def _cached_access(self, key: Tuple[str, ...], load) -> Optional[Dict[str, Any]]:
+        """
+        Registro de acceso desde la caché de autorización o, si no está, desde `load`.
+
+        Las denegaciones no se cachean: un acceso recién concedido desde otro
+        servicio se ve de inmediato, y uno revocado dura como mucho AUTHZ_CACHE_TTL.
+        """
+        record = self._authz_cache.get(key)
+        if record is None:
+            record = load()
+            if not record:
+                return None
+            self._authz_cache.set(key, record)
+        return dict(record)
+
     def _ensure_membership(self, org_id: str, user_id: str) -> Dict[str, Any]:
-        membership = self.repo.get_membership(org_id, user_id)
+        membership = self._cached_access(
+            ('membership', str(org_id), str(user_id)),
+            lambda: self.repo.get_membership(org_id, user_id),
+        )
         if not membership:
             raise PermissionError("No perteneces a la organización solicitada")
         return self._format_membership(membership)
 
     def _ensure_care_team_access(self, org_id: str, care_team_id: str, user_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
         membership = self._ensure_membership(org_id, user_id)
-        care_team = self.repo.get_care_team_membership(org_id, care_team_id, user_id)
+        care_team = self._cached_access(
+            ('care_team', str(org_id), str(care_team_id), str(user_id)),
+            lambda: self.repo.get_care_team_membership(org_id, care_team_id, user_id),
+        )
         if not care_team:
             raise PermissionError("No perteneces al equipo de cuidado solicitado")
         return membership, care_team
 
     def _ensure_caregiver_access(self, patient_id: str, user_id: str) -> Dict[str, Any]:
-        relationship = self.repo.get_caregiver_relationship(user_id, patient_id)
+        # ended_at se evalúa en cada llamada, también con la relación cacheada
+        relationship = self._cached_access(
+            ('caregiver', str(patient_id), str(user_id)),
+            lambda: self.repo.get_caregiver_relationship(user_id, patient_id),
+        )
         if not relationship:
             raise PermissionError("No tienes relación de cuidador con este paciente")
         if not self._relationship_is_active(relationship):
@@ -1422,14 +1717,14 @@ class UserService:
         location = {
             'latitude': self._coerce_float(row.get('latitude')),
             'longitude': self._coerce_float(row.get('longitude')),
-            'last_update': self._serialize_datetime(row.get('last_location_at')),
+            'last_update': row.get('last_location_at'),
             'approximate': False,
         }
         alert = None
         if row.get('alert_id'):
             alert = {
-                'id': str(row['alert_id']),
-                'created_at': self._serialize_datetime(row.get('alert_created_at')),
+                'id': row['alert_id'],
+                'created_at': row.get('alert_created_at'),
                 'code': row.get('alert_code'),
                 'label': row.get('alert_label'),
                 'level': {
@@ -1439,15 +1734,15 @@ class UserService:
             }
 
         return {
-            'id': str(row['patient_id']),
+            'id': row['patient_id'],
             'name': row.get('patient_name'),
             'email': row.get('patient_email'),
             'organization': {
-                'id': str(row['org_id']) if row.get('org_id') else None,
+                'id': row.get('org_id'),
                 'name': row.get('org_name'),
             },
             'care_team': {
-                'id': str(row['care_team_id']),
+                'id': row['care_team_id'],
                 'name': row.get('care_team_name'),
             },
             'risk_level': {
@@ -1468,20 +1763,20 @@ class UserService:
             location = {
                 'latitude': latitude,
                 'longitude': longitude,
-                'last_update': self._serialize_datetime(row.get('last_seen_at')),
+                'last_update': row.get('last_seen_at'),
                 'approximate': True,
             }
 
         return {
-            'id': str(row['member_user_id']),
+            'id': row['member_user_id'],
             'name': row.get('member_name'),
             'email': row.get('member_email'),
             'organization': {
-                'id': str(row['org_id']) if row.get('org_id') else None,
+                'id': row.get('org_id'),
                 'name': row.get('org_name'),
             },
             'care_team': {
-                'id': str(row['care_team_id']),
+                'id': row['care_team_id'],
                 'name': row.get('care_team_name'),
             },
             'role': {
@@ -1499,7 +1794,7 @@ class UserService:
             location = {
                 'latitude': latitude,
                 'longitude': longitude,
-                'last_update': self._serialize_datetime(row.get('last_location_at')),
+                'last_update': row.get('last_location_at'),
                 'approximate': False,
             }
 
@@ -1515,7 +1810,7 @@ class UserService:
             }
 
         return {
-            'id': str(row['patient_id']),
+            'id': row['patient_id'],
             'name': row.get('patient_name'),
             'email': row.get('patient_email'),
             'risk_level': {
@@ -1537,54 +1832,54 @@ class UserService:
         current_patient_id = row.get('current_patient_id')
         
         return {
-            'id': str(row['id']),
+            'id': row['id'],
             'serial': row.get('serial'),
             'brand': row.get('brand'),
             'model': row.get('model'),
             'active': bool(row.get('active', False)),
-            'registered_at': self._serialize_datetime(row.get('registered_at')),
+            'registered_at': row.get('registered_at'),
             'connected': bool(row.get('active', False)) and row.get('active_stream_id') is not None,
             'type': {
                 'code': row.get('device_type_code'),
                 'label': row.get('device_type_label'),
             },
             'owner': {
-                'id': str(owner_id) if owner_id else None,
+                'id': owner_id,
                 'name': row.get('owner_patient_name'),
                 'email': row.get('owner_patient_email'),
             },
             'current_connection': {
-                'patient_id': str(current_patient_id) if current_patient_id else None,
+                'patient_id': current_patient_id,
                 'patient_name': row.get('current_patient_name'),
-                'started_at': self._serialize_datetime(row.get('connection_started_at')),
+                'started_at': row.get('connection_started_at'),
             } if current_patient_id else None,
             'streams': {
                 'total': int(row.get('total_streams') or 0),
-                'last_started_at': self._serialize_datetime(row.get('last_started_at')),
+                'last_started_at': row.get('last_started_at'),
             },
         }
 
     def _format_care_team_device(self, row: Dict[str, Any]) -> Dict[str, Any]:
         owner_id = row.get('owner_patient_id')
         return {
-            'id': str(row['id']),
+            'id': row['id'],
             'serial': row.get('serial'),
             'brand': row.get('brand'),
             'model': row.get('model'),
             'active': bool(row.get('active', False)),
-            'registered_at': self._serialize_datetime(row.get('registered_at')),
+            'registered_at': row.get('registered_at'),
             'type': {
                 'code': row.get('device_type_code'),
                 'label': row.get('device_type_label'),
             },
             'owner': {
-                'id': str(owner_id) if owner_id else None,
+                'id': owner_id,
                 'name': row.get('patient_name'),
                 'email': row.get('patient_email'),
             },
             'streams': {
-                'last_started_at': self._serialize_datetime(row.get('last_started_at')),
-                'last_ended_at': self._serialize_datetime(row.get('last_ended_at')),
+                'last_started_at': row.get('last_started_at'),
+                'last_ended_at': row.get('last_ended_at'),
                 'count': int(row.get('total_streams') or 0),
             },
         }
@@ -1592,16 +1887,16 @@ class UserService:
     def _format_device_stream(self, row: Dict[str, Any]) -> Dict[str, Any]:
         patient_id = row.get('patient_id')
         return {
-            'id': str(row['id']),
-            'device_id': str(row['device_id']) if row.get('device_id') else None,
+            'id': row['id'],
+            'device_id': row.get('device_id'),
             'status': row.get('status'),
             'patient': {
-                'id': str(patient_id) if patient_id else None,
+                'id': patient_id,
                 'name': row.get('patient_name'),
                 'email': row.get('patient_email'),
             },
-            'started_at': self._serialize_datetime(row.get('started_at')),
-            'ended_at': self._serialize_datetime(row.get('ended_at')),
+            'started_at': row.get('started_at'),
+            'ended_at': row.get('ended_at'),
         }
 
     def _format_push_device(self, record: Dict[str, Any]) -> Dict[str, Any]:
@@ -4,7 +4,11 @@ from __future__ import annotations
 import uuid
 from typing import Any
 
-from flask import Response, jsonify, g
+from flask import Response, current_app, jsonify, g
+
+
+class RawJSON(str):
+    """Fragmento JSON ya serializado (p. ej. por PostgreSQL) que se inserta sin reprocesar."""
 
 
 def _ensure_trace_id() -> str:
@@ -25,9 +29,27 @@ def build_response(*, status: str, message: str | None, data: Any, error: Any, s
         'data': data,
         'trace_id': trace_id,
     }
+    if _contains_raw(payload):
+        return current_app.response_class(_dumps_with_raw(payload) + '\n', mimetype='application/json'), status_code
     return jsonify(payload), status_code
 
 
+def _contains_raw(value: Any) -> bool:
+    if isinstance(value, RawJSON):
+        return True
+    return isinstance(value, dict) and any(_contains_raw(item) for item in value.values())
+
+
+def _dumps_with_raw(value: Any) -> str:
+    """Serializa como jsonify, pero copiando tal cual los valores RawJSON."""
+    if isinstance(value, RawJSON):
+        return value
+    if isinstance(value, dict) and _contains_raw(value):
+        items = (f'{current_app.json.dumps(str(key))}:{_dumps_with_raw(item)}' for key, item in sorted(value.items()))
+        return '{' + ','.join(items) + '}'
+    return current_app.json.dumps(value, separators=(',', ':'))
+
+
 def success_response(*, data: Any = None, message: str | None = 'OK', status_code: int = 200) -> tuple[Response, int]:
     """Respuesta de éxito."""
     return build_response(status='success', message=message, data=data, error=None, status_code=status_code)
@@ -0,0 +1,6 @@
+"""Fixtures compartidas para pruebas del User Service."""
+import sys
+from pathlib import Path
+
+# El servicio se importa como paquete `user` (igual que PYTHONPATH=src)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'src'))
@@ -0,0 +1,143 @@
+"""Tests del resumen de vitales con rollups horarios en caché."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from user.services import influxdb_service
+from user.services.influxdb_service import HOUR, InfluxDBService
+
+NOW = datetime(2025, 3, 1, 12, 20, tzinfo=timezone.utc)
+PATIENT_ID = '7f1c2a4e-0000-4000-8000-000000000001'
+
+
+class FakeRecord:
+    """Registro Flux con la interfaz de influxdb_client.FluxRecord que usa el servicio."""
+
+    def __init__(self, hour: datetime, field: str, stat: str, value):
+        self.values = {'_time': hour, '_field': field, '_value': value, 'stat': stat}
+
+    def get_value(self):
+        return self.values['_value']
+
+    def get_time(self):
+        return self.values['_time']
+
+    def get_field(self):
+        return self.values['_field']
+
+
+class FakeTable:
+    def __init__(self, records):
+        self.records = records
+
+
+def hour_records(hour: datetime, field: str, values):
+    """Registros count/sum/min/max de una hora, como los devuelve la consulta (todos float)."""
+    return [
+        FakeRecord(hour, field, 'count', float(len(values))),
+        FakeRecord(hour, field, 'sum', float(sum(values))),
+        FakeRecord(hour, field, 'min', float(min(values))),
+        FakeRecord(hour, field, 'max', float(max(values))),
+    ]
+
+
+class FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(influxdb_service, 'datetime', FrozenDatetime)
+    service = InfluxDBService()
+    service._rollup_settle = timedelta(minutes=5)
+    service.queries = []
+
+    # Cada hora tiene heart_rate [60, 80] salvo la de las 10:00 (sin datos)
+    def fake_query(query):
+        service.queries.append(query)
+        records = []
+        hour = NOW.replace(minute=0) - timedelta(hours=3)
+        while hour <= NOW:
+            if hour.hour != 10:
+                records.extend(hour_records(hour, 'heart_rate', [60, 80]))
+            hour += HOUR
+        return [FakeTable(records)]
+
+    monkeypatch.setattr(service, '_query', fake_query)
+    return service
+
+
+def test_summary_segments_split_partial_and_cacheable_hours(service):
+    start = NOW - timedelta(hours=2)
+    segments = service._summary_segments(start, NOW)
+
+    assert segments == [
+        (start, NOW.replace(minute=0) - HOUR, None),
+        (NOW.replace(minute=0) - HOUR, NOW.replace(minute=0), NOW.replace(minute=0) - HOUR),
+        (NOW.replace(minute=0), NOW, None),
+    ]
+
+
+def test_recent_hour_is_not_cacheable_until_settled(service):
+    now = NOW.replace(minute=2)
+    segments = service._summary_segments(now - timedelta(hours=1), now)
+
+    assert [hour for _, _, hour in segments] == [None, None]
+
+
+def test_merge_ranges_joins_contiguous_segments():
+    t = [NOW + timedelta(hours=offset) for offset in range(5)]
+
+    merged = InfluxDBService._merge_ranges([(t[0], t[1]), (t[1], t[2]), (t[3], t[4])])
+
+    assert merged == [(t[0], t[2]), (t[3], t[4])]
+
+
+def test_merge_rollup_combines_count_sum_min_max():
+    assert InfluxDBService._merge_rollup(None, (2, 140.0, 60.0, 80.0)) == (2, 140.0, 60.0, 80.0)
+    assert InfluxDBService._merge_rollup((2, 140.0, 60.0, 80.0), (3, 300.0, 90.0, 110.0)) == (5, 440.0, 60.0, 110.0)
+
+
+def test_query_converts_every_stat_to_float(service):
+    service._query_hourly_rollups(PATIENT_ID, [(NOW - HOUR, NOW)])
+
+    hourly = service.queries[0].split('hourly = ')[1]
+    assert hourly.index('aggregateWindow') < hourly.index('toFloat()') < hourly.index('set(key: "stat"')
+
+
+def test_query_hourly_rollups_builds_rollups_from_records(service):
+    rollups = service._query_hourly_rollups(PATIENT_ID, [(NOW - timedelta(hours=3), NOW)])
+
+    assert rollups[NOW.replace(minute=0) - HOUR] == {'heart_rate': (2, 140.0, 60.0, 80.0)}
+    assert isinstance(rollups[NOW.replace(minute=0)]['heart_rate'][0], int)
+    assert NOW.replace(hour=10, minute=0) not in rollups
+
+
+def test_summary_caches_closed_hours_and_only_queries_the_rest(service):
+    first = service.get_patient_vitals_summary(PATIENT_ID, hours=3)
+    cached = service._cached_rollups(PATIENT_ID, [NOW.replace(hour=hour, minute=0) for hour in (10, 11)])
+    second = service.get_patient_vitals_summary(PATIENT_ID, hours=3)
+
+    assert first['mean'] == second['mean'] == {'heart_rate': 70.0}
+    assert first['min'] == {'heart_rate': 60.0}
+    assert first['max'] == {'heart_rate': 80.0}
+    # Las horas cerradas sin datos también quedan en caché (vacías)
+    assert cached == {NOW.replace(hour=10, minute=0): {}, NOW.replace(hour=11, minute=0): {'heart_rate': (2, 140.0, 60.0, 80.0)}}
+    # La segunda consulta solo pide los extremos parciales
+    assert service.queries[1].count('vitals(start:') == 2 * len(influxdb_service.ROLLUP_STATS)
+    assert 'start: 2025-03-01T10:00:00' not in service.queries[1]
+
+
+def test_store_rollups_evicts_old_hours_and_patients(service):
+    service._rollup_max_patients = 1
+    service._rollup_max_hours = 2
+    old_hour = NOW.replace(minute=0) - timedelta(hours=5)
+    recent_hour = NOW.replace(minute=0) - HOUR
+
+    service._store_rollups('a', {old_hour: {}, recent_hour: {'spo2': (1, 97.0, 97.0, 97.0)}})
+    assert service._cached_rollups('a', [old_hour, recent_hour]) == {recent_hour: {'spo2': (1, 97.0, 97.0, 97.0)}}
+
+    service._store_rollups('b', {recent_hour: {}})
+    assert service._cached_rollups('a', [recent_hour]) == {}
@@ -0,0 +1,64 @@
+"""Tests de serialización de las respuestas del User Service."""
+import json
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from heartguard_common import json_provider
+from heartguard_common.json_provider import FastJSONProvider
+
+from user.app import create_app
+from user.utils.response_builder import RawJSON, success_response
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def app(request, monkeypatch):
+    if request.param == 'orjson':
+        if json_provider.orjson is None:
+            pytest.skip('orjson no está instalado')
+    else:
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    app = create_app()
+    app.config.update(TESTING=True)
+    return app
+
+
+def test_app_uses_fast_provider(app):
+    assert isinstance(app.json, FastJSONProvider)
+
+
+def test_native_values_from_formatters(app):
+    device_id = uuid.uuid4()
+    data = {
+        'id': device_id,
+        'registered_at': datetime(2025, 3, 1, 12, 30, 5, tzinfo=timezone.utc),
+        'location': {'latitude': Decimal('19.432608'), 'longitude': Decimal('-99.133209')},
+    }
+    with app.test_request_context():
+        response, status = success_response(data=data)
+        payload = json.loads(response.get_data())
+
+    assert status == 200
+    assert payload['data'] == {
+        'id': str(device_id),
+        'registered_at': '2025-03-01T12:30:05+00:00',
+        'location': {'latitude': 19.432608, 'longitude': -99.133209},
+    }
+
+
+def test_raw_json_is_embedded_next_to_native_values(app):
+    care_teams = RawJSON('[{"id":"t-1","patients":[{"location":{"last_update":"2025-03-01T12:30:05.25"}}]}]')
+    data = {
+        'organization': {'id': uuid.uuid4(), 'joined_at': datetime(2024, 1, 2, 3, 4, 5)},
+        'care_teams': care_teams,
+    }
+    with app.test_request_context():
+        response, _ = success_response(data=data)
+        body = response.get_data(as_text=True)
+
+    assert care_teams in body
+    payload = json.loads(body)
+    assert payload['data']['care_teams'][0]['patients'][0]['location']['last_update'] == '2025-03-01T12:30:05.25'
+    assert payload['data']['organization']['joined_at'] == '2024-01-02T03:04:05'
+    assert payload['status'] == 'success'